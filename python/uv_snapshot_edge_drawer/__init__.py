@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 """ Draw edge lines on UV Snapshot images"""
 import sys
+import copy
 import math
 import json
 import tempfile
 import subprocess
 import os
 import time
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
 
 from maya.api import OpenMaya as om
 from maya import (
@@ -22,12 +27,14 @@ if sys.version_info > (3, 0):
             Dict,  # noqa: F401
             List,  # noqa: F401
             Tuple,  # noqa: F401
+            Set,  # noqa: F401
             Pattern,  # noqa: F401
             Callable,  # noqa: F401
             Any,  # noqa: F401
             Text,  # noqa: F401
             Generator,  # noqa: F401
             Union,  # noqa: F401
+            Sequence,  # noqa: F401
             Iterable # noqa: F401
         )
         Point = Tuple[float, float, float]
@@ -84,6 +91,10 @@ class EdgeLineDrawerConfig:
 
 
 PROFILE_ENABLED = os.environ.get("MAYA_UV_SNAPSHOT_PROFILE") == "1"
+# When profiling, also write the latest snapshot's report here as a Chrome trace.
+PROFILE_TRACE_PATH = os.environ.get("MAYA_UV_SNAPSHOT_PROFILE_TRACE")
+# tracemalloc slows Python allocations down a lot, so memory is opt-in on top of timings.
+PROFILE_MEMORY_ENABLED = PROFILE_ENABLED and os.environ.get("MAYA_UV_SNAPSHOT_PROFILE_MEMORY") == "1"
 _MESH_TOPOLOGY_CACHE = {}
 _MESH_DIRTY_CALLBACKS = {}
 DEFAULT_PADDING_WARNING_COLOR = [255, 64, 64, 255]
@@ -92,7 +103,18 @@ DEFAULT_ISLAND_FILL_OPACITY = 0.25
 DEFAULT_ISLAND_FILL_PADDING_PIXELS = 0.0
 TOPOLOGY_WARMUP_BATCH_ITEMS = 256
 TOPOLOGY_WARMUP_BUDGET_MS = 5.0
+# Geometry LOD: snap interior vertices to a grid of LOD_CELLS_PER_PIXEL cells
+# per output pixel, between the coarsest and finest pyramid levels below.
+LOD_CELLS_PER_PIXEL = 2
+LOD_MIN_CELLS_PER_UV = 64
+LOD_MAX_CELLS_PER_UV = 8192
+LOD_MIN_POLYGONS = 10000
 WINDOWS_COMMAND_LINE_JSON_LIMIT = 30000
+PNG_COMPRESSION_LEVELS = ("default", "fast", "none", "best")
+PADDING_WARNING_MODES = ("exact", "raster")
+IN_MEMORY_OUTPUT_FORMATS = ("png", "svg", "tga", "bmp", "rgba")
+UDIM_FIRST_TILE = 1001
+UDIM_TILES_PER_ROW = 10
 
 
 def _profile_log(label, started_at):
@@ -101,6 +123,178 @@ def _profile_log(label, started_at):
         print("uv_snapshot_edge_drawer: {} {:.4f}s".format(label, time.time() - started_at))
 
 
+class ProfileReport(object):
+    """Phase timings, counters and memory of one snapshot, from Python and the native drawer.
+
+    Each phase is a dict of name, start, seconds and thread, with start in
+    seconds from the beginning of the report. Python phases without an
+    explicit start are laid out one after another on the "python" thread.
+    peak_bytes holds the largest heap peak of each phase and snapshot_bytes
+    the estimated size of each mesh snapshot. memory_unavailable says why
+    Python peaks were requested but could not be measured, else None.
+    """
+
+    def __init__(self, label):
+        # type: (Text) -> None
+        self.label = label
+        self.phases = []  # type: List[Dict[Text, Any]]
+        self.counters = {}  # type: Dict[Text, int]
+        self.peak_bytes = {}  # type: Dict[Text, int]
+        self.snapshot_bytes = {}  # type: Dict[Text, int]
+        self.memory_unavailable = None  # type: Optional[Text]
+        self._python_end = 0.0
+
+    def add_phase(self, name, seconds, start=None, thread="python"):
+        # type: (Text, float, Optional[float], Text) -> float
+        """Record a phase and return its start."""
+        if start is None:
+            start = self._python_end
+        self.phases.append({"name": name, "start": float(start), "seconds": float(seconds), "thread": thread})
+        if thread == "python":
+            self._python_end = max(self._python_end, start + seconds)
+        return start
+
+    def add_counter(self, name, value):
+        # type: (Text, int) -> None
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def add_peak_bytes(self, phase, peak_bytes):
+        # type: (Text, int) -> None
+        self.peak_bytes[phase] = max(self.peak_bytes.get(phase, 0), int(peak_bytes))
+
+    def merge_native(self, native_report, start):
+        # type: (Dict[Text, Any], float) -> None
+        """Add a native capture that began at start, one thread per native worker."""
+        for phase in native_report.get("phases", []):
+            self.add_phase(
+                phase["name"],
+                phase["seconds"],
+                start=start + phase["start"],
+                thread="native-{}".format(phase["thread"]),
+            )
+        for name, value in native_report.get("counters", {}).items():
+            self.add_counter(name, value)
+        for phase, peak_bytes in native_report.get("peak_bytes", {}).items():
+            self.add_peak_bytes(phase, peak_bytes)
+
+    def as_dict(self):
+        # type: () -> Dict[Text, Any]
+        return {
+            "label": self.label,
+            "phases": self.phases,
+            "counters": self.counters,
+            "peak_bytes": self.peak_bytes,
+            "snapshot_bytes": self.snapshot_bytes,
+            "memory_unavailable": self.memory_unavailable,
+        }
+
+    def to_chrome_trace(self):
+        # type: () -> Dict[Text, Any]
+        """The report in Chrome trace event format, for chrome://tracing or Perfetto."""
+        thread_ids = {}  # type: Dict[Text, int]
+        events = []  # type: List[Dict[Text, Any]]
+        for phase in self.phases:
+            thread = phase["thread"]
+            if thread not in thread_ids:
+                thread_ids[thread] = len(thread_ids) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": thread_ids[thread], "args": {"name": thread}})
+            events.append({
+                "name": phase["name"],
+                "cat": self.label,
+                "ph": "X",
+                "pid": 1,
+                "tid": thread_ids[thread],
+                "ts": phase["start"] * 1e6,
+                "dur": phase["seconds"] * 1e6,
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "label": self.label,
+                "counters": self.counters,
+                "peak_bytes": self.peak_bytes,
+                "snapshot_bytes": self.snapshot_bytes,
+                "memory_unavailable": self.memory_unavailable,
+            },
+        }
+
+    def write_chrome_trace(self, path):
+        # type: (Text) -> Text
+        with open(path, "w") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+        return path
+
+
+class PhaseMemoryTracker(object):
+    """Peak traced Python memory of named phases, measured with tracemalloc.
+
+    Each peak is relative to the memory traced when the phase started, and a
+    phase that runs several times keeps its largest peak. Phases must not
+    nest. Inactive unless PROFILE_MEMORY_ENABLED. When enabled but
+    tracemalloc cannot reset its peak (Python < 3.9) it is inactive too, and
+    unavailable holds the reason so reports do not read as zero memory.
+    """
+
+    def __init__(self, enabled=None):
+        # type: (Optional[bool]) -> None
+        if enabled is None:
+            enabled = PROFILE_MEMORY_ENABLED
+        self.unavailable = None  # type: Optional[Text]
+        if enabled and tracemalloc is None:
+            self.unavailable = "tracemalloc is not available"
+        elif enabled and not hasattr(tracemalloc, "reset_peak"):
+            self.unavailable = "tracemalloc.reset_peak needs Python 3.9"
+        self.enabled = bool(enabled) and self.unavailable is None
+        self.peak_bytes = {}  # type: Dict[Text, int]
+        self._started_tracing = False
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def start_phase(self):
+        # type: () -> Optional[int]
+        """Return the traced bytes the phase peak is measured against, or None when inactive."""
+        if not self.enabled:
+            return None
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def finish_phase(self, name, baseline):
+        # type: (Text, Optional[int]) -> None
+        if baseline is None:
+            return
+        peak = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), peak)
+
+    def stop(self):
+        # type: () -> Dict[Text, int]
+        """Stop tracing if this tracker started it and return the peaks."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self.peak_bytes
+
+
+def _sequence_bytes(values):
+    # type: (Any) -> int
+    """Size of a list of numbers or an array, counting list items as separate objects."""
+    size = sys.getsizeof(values)
+    if isinstance(values, list) and values:
+        size += len(values) * sys.getsizeof(values[0])
+    return size
+
+
+def _edge_line_bytes(line):
+    # type: (EdgeLine) -> int
+    return (
+        sys.getsizeof(line)
+        + sys.getsizeof(line.__dict__)
+        + _sequence_bytes(line.uv1)
+        + _sequence_bytes(line.uv2)
+    )
+
+
 class FoldCandidate(object):
     """Fold edge candidate with precalculated face angle."""
 
@@ -129,6 +323,32 @@ class MeshTopologySnapshot(object):
         self.build_profile = dict(build_profile or {})
         self.has_edge_data = bool(has_edge_data)
         self.has_polygon_data = bool(has_polygon_data)
+        self._lod_levels = {}  # type: Dict[int, MeshTopologySnapshot]
+        self._uv_bounds = None  # type: Optional[Tuple[float, float, float, float]]
+        self._lod_topology = None  # type: Optional[Tuple[Dict[Tuple[float, float], Tuple[float, float]], Dict[Tuple[float, float], int], List[Tuple[Tuple[float, float], Tuple[float, float]]], List[Tuple[Tuple[float, float], Tuple[float, float]]]]]
+        self._udim_tiles = {}  # type: Dict[float, Dict[int, MeshTopologySnapshot]]
+
+    def estimated_bytes(self):
+        # type: () -> int
+        """Approximate bytes held by the polygon buffers, edge lines and fold candidates.
+
+        Edge types and fold candidates share line objects, so each line is
+        counted once, sized like the first one. LOD levels and UDIM tile
+        snapshots are not included.
+        """
+        size = _sequence_bytes(self.polygon_offsets) + _sequence_bytes(self.polygon_points)
+        line_lists = list(self.edge_lines.values()) + [candidate.lines for candidate in self.fold_candidates]
+        unique_lines = {}  # type: Dict[int, EdgeLine]
+        for lines in line_lists:
+            size += sys.getsizeof(lines)
+            for line in lines:
+                unique_lines[id(line)] = line
+        if unique_lines:
+            size += len(unique_lines) * _edge_line_bytes(next(iter(unique_lines.values())))
+        if self.fold_candidates:
+            candidate = self.fold_candidates[0]
+            size += len(self.fold_candidates) * (sys.getsizeof(candidate) + sys.getsizeof(candidate.__dict__))
+        return size
 
     def _ensure_polygons(self):
         # type: () -> List[UVPolygon]
@@ -136,6 +356,173 @@ class MeshTopologySnapshot(object):
             self.polygons = _polygons_from_flat_buffers(self.polygon_offsets, self.polygon_points)
         return self.polygons
 
+    def get_lod_snapshot(self, pixels_per_uv):
+        # type: (Optional[float]) -> MeshTopologySnapshot
+        """Return the pyramid level matching the output density, or self for full detail.
+
+        Levels are built on first use and kept on the snapshot, so they are
+        dropped together with it when the mesh changes.
+        """
+        cells_per_uv = lod_cells_per_uv(pixels_per_uv)
+        if cells_per_uv is None or len(self.polygon_offsets) - 1 < LOD_MIN_POLYGONS:
+            return self
+
+        level = self._lod_levels.get(cells_per_uv)
+        if level is None:
+            started_at = time.time()
+            level = self._build_lod_level(cells_per_uv)
+            self._lod_levels[cells_per_uv] = level
+            _profile_log("mesh lod {} cells={}".format(self.mesh_name, cells_per_uv), started_at)
+        return level
+
+    def _get_lod_topology(self):
+        # type: () -> Tuple[Dict[Tuple[float, float], Tuple[float, float]], Dict[Tuple[float, float], int], List[Tuple[Tuple[float, float], Tuple[float, float]]], List[Tuple[Tuple[float, float], Tuple[float, float]]]]
+        """Pinned points, the island id of every polygon point, the polygon edges and the outline/border edges."""
+        if self._lod_topology is not None:
+            return self._lod_topology
+
+        pinned = {}
+        barriers = []  # type: List[Tuple[Tuple[float, float], Tuple[float, float]]]
+        edge_counts = _polygon_edge_counts(self.polygon_offsets, self.polygon_points)
+        for edge, count in edge_counts.items():
+            if count != 1:
+                continue
+            barriers.append(edge)
+            for point in edge:
+                pinned.setdefault(point, point)
+        for key in ("border", "boundary"):
+            for line in self.edge_lines.get(key, []):
+                edge = ((line.uv1[0], line.uv1[1]), (line.uv2[0], line.uv2[1]))
+                barriers.append(edge)
+                for point in edge:
+                    pinned.setdefault(point, point)
+        islands = _polygon_point_islands(self.polygon_offsets, self.polygon_points)
+        self._lod_topology = (pinned, islands, list(edge_counts), barriers)
+        return self._lod_topology
+
+    def _build_lod_level(self, cells_per_uv):
+        # type: (int) -> MeshTopologySnapshot
+        """Vertex-cluster interior geometry onto a cells_per_uv grid.
+
+        Interior vertices of a grid cell are clustered when polygon edges
+        inside the cell connect them without passing a pinned vertex, and
+        each moves to the first vertex of its cluster. Pinned outline
+        vertices never move, so outline chains are unchanged and interior
+        lines stay attached to them. Clusters never span islands or reach
+        around a concave notch, and a snap that would still carry a polygon
+        edge across an outline or border edge is undone. Lines and faces
+        that collapse are dropped.
+        """
+        level_buffers = self._build_native_lod_buffers(cells_per_uv)
+        if level_buffers is None:
+            pinned, islands, polygon_edges, barriers = self._get_lod_topology()
+            moved = _cluster_lod_points(pinned, islands, polygon_edges, float(cells_per_uv))
+            _undo_crossing_snaps(moved, polygon_edges, barriers, float(cells_per_uv))
+            polygon_offsets, polygon_points = _snap_polygon_buffers(self.polygon_offsets, self.polygon_points, moved)
+        else:
+            polygon_offsets, polygon_points, moved = level_buffers
+        snap = moved.get
+
+        edge_lines = {}
+        for key, lines in self.edge_lines.items():
+            edge_lines[key] = lines if key in ("border", "boundary") else _snap_lod_lines(lines, snap)
+
+        fold_candidates = []
+        for candidate in self.fold_candidates:
+            lines = _snap_lod_lines(candidate.lines, snap)
+            if lines:
+                fold_candidates.append(FoldCandidate(candidate.angle_radians, lines))
+
+        return MeshTopologySnapshot(
+            self.mesh_name,
+            self.uv_set_name,
+            edge_lines,
+            fold_candidates,
+            polygon_offsets=polygon_offsets,
+            polygon_points=polygon_points,
+            build_profile=self.build_profile,
+            has_edge_data=self.has_edge_data,
+            has_polygon_data=self.has_polygon_data,
+        )
+
+    def _build_native_lod_buffers(self, cells_per_uv):
+        # type: (int) -> Optional[Tuple[List[int], List[float], Dict[Tuple[float, float], Tuple[float, float]]]]
+        """Level polygon buffers and point snaps from the native module, or None without it.
+
+        The native build runs without the GIL, so a preview worker building a
+        level of a dense mesh does not stall Maya. Snaps are only collected
+        when there are edge lines to move with them.
+        """
+        barrier_points = []  # type: List[float]
+        for key in ("border", "boundary"):
+            for line in self.edge_lines.get(key, []):
+                barrier_points.extend((line.uv1[0], line.uv1[1], line.uv2[0], line.uv2[1]))
+        try:
+            from uv_snapshot_edge_drawer import _edge_drawer
+
+            if not hasattr(_edge_drawer, "build_lod_level"):
+                return None
+            polygon_offsets, polygon_points, moved_points = _edge_drawer.build_lod_level(
+                self.polygon_offsets, self.polygon_points, barrier_points, float(cells_per_uv)
+            )
+        except (ImportError, AttributeError, RuntimeError, TypeError, ValueError):
+            return None
+
+        moved = {}  # type: Dict[Tuple[float, float], Tuple[float, float]]
+        snapped_keys = [key for key in self.edge_lines if key not in ("border", "boundary")]
+        if self.fold_candidates or any(self.edge_lines[key] for key in snapped_keys):
+            for index in range(0, len(moved_points), 4):
+                from_u, from_v, to_u, to_v = moved_points[index:index + 4]
+                moved[(from_u, from_v)] = (to_u, to_v)
+        return polygon_offsets, polygon_points, moved
+
+    def get_udim_tile_snapshots(self, margin=0.0):
+        # type: (float) -> Dict[int, MeshTopologySnapshot]
+        """Split the snapshot into one sub-snapshot per occupied UDIM tile.
+
+        Lines and polygons are bucketed in a single pass. A tile is occupied
+        when geometry lies inside it; geometry within margin (in UV units) of
+        an occupied tile is copied into it as well so strokes and padding
+        checks crossing the tile border still render. Coordinates stay in UV
+        space, so each tile renders with its udim_tile_range as the output
+        range. Results are kept on the snapshot per margin.
+        """
+        tiles = self._udim_tiles.get(margin)
+        if tiles is not None:
+            return tiles
+
+        started_at = time.time()
+        occupied = set()  # type: Set[int]
+        tile_lines = _bucket_udim_lines(self.edge_lines.items(), margin, occupied)
+        tile_folds = _bucket_udim_lines(
+            ((candidate.angle_radians, candidate.lines) for candidate in self.fold_candidates), margin, occupied
+        )
+        tile_polygons = {}  # type: Dict[int, Tuple[List[int], List[float]]]
+        if self.has_polygon_data:
+            tile_polygons = _bucket_udim_polygons(self.polygon_offsets, self.polygon_points, margin, occupied)
+
+        tiles = {}
+        for tile in sorted(occupied):
+            lines_by_key = tile_lines.get(tile, {})
+            offsets, points = tile_polygons.get(tile, ([0], []))
+            tiles[tile] = MeshTopologySnapshot(
+                self.mesh_name,
+                self.uv_set_name,
+                dict((key, lines_by_key.get(key, [])) for key in self.edge_lines),
+                [
+                    FoldCandidate(angle_radians, lines)
+                    for angle_radians, lines in tile_folds.get(tile, {}).items()
+                ],
+                polygon_offsets=offsets,
+                polygon_points=points,
+                build_profile=self.build_profile,
+                has_edge_data=self.has_edge_data,
+                has_polygon_data=self.has_polygon_data,
+            )
+        self._udim_tiles[margin] = tiles
+        _profile_log("mesh udim tiles {} tiles={}".format(self.mesh_name, len(tiles)), started_at)
+        return tiles
+
     def get_edge_lines(self, fold_angle):
         # type: (float) -> Dict[Text, List[EdgeLine]]
         if not self.has_edge_data:
@@ -181,31 +568,77 @@ class MeshTopologySnapshot(object):
             )
         return mapped
 
-    def get_polygon_buffers(self, umin=0.0, umax=1.0, vmin=0.0, vmax=1.0):
-        # type: (float, float, float, float) -> Tuple[List[int], List[float]]
+    def _get_uv_bounds(self):
+        # type: () -> Tuple[float, float, float, float]
+        """(u_min, u_max, v_min, v_max) over every polygon point and edge line."""
+        if self._uv_bounds is not None:
+            return self._uv_bounds
+
+        us = self.polygon_points[0::2]
+        vs = self.polygon_points[1::2]
+        for lines in self.edge_lines.values():
+            for line in lines:
+                us.extend((line.uv1[0], line.uv2[0]))
+                vs.extend((line.uv1[1], line.uv2[1]))
+        if us:
+            self._uv_bounds = (min(us), max(us), min(vs), max(vs))
+        else:
+            self._uv_bounds = (0.0, 0.0, 0.0, 0.0)
+        return self._uv_bounds
+
+    def _get_cull_rect(self, umin, umax, vmin, vmax, cull_margin):
+        # type: (float, float, float, float, Optional[Tuple[float, float]]) -> Optional[Tuple[float, float, float, float]]
+        """Output UV range grown by cull_margin (in output units), or None when nothing would be culled."""
+        if cull_margin is None:
+            return None
+
+        margin_u = cull_margin[0] * (umax - umin)
+        margin_v = cull_margin[1] * (vmax - vmin)
+        rect = (umin - margin_u, umax + margin_u, vmin - margin_v, vmax + margin_v)
+        bounds = self._get_uv_bounds()
+        if rect[0] <= bounds[0] and bounds[1] <= rect[1] and rect[2] <= bounds[2] and bounds[3] <= rect[3]:
+            return None
+        return rect
+
+    def get_polygon_buffers(self, umin=0.0, umax=1.0, vmin=0.0, vmax=1.0, cull_margin=None):
+        # type: (float, float, float, float, Optional[Tuple[float, float]]) -> Tuple[List[int], List[float]]
+        """Flat polygon buffers mapped into the output range.
+
+        With cull_margin, polygons whose bounds miss the output range grown by
+        that margin (in output units) are skipped. Culling drops single
+        polygons, which can split an island, so leave it off when island
+        fill is drawn.
+        """
         if not self.has_polygon_data:
             return [0], []
 
         to_be_map_uv = (umin != 0.0 or vmin != 0.0 or umax != 1.0 or vmax != 1.0)
+        cull_rect = self._get_cull_rect(umin, umax, vmin, vmax, cull_margin)
+        if cull_rect is not None:
+            offsets, points = _cull_polygon_buffers(self.polygon_offsets, self.polygon_points, cull_rect)
+        else:
+            offsets, points = self.polygon_offsets, self.polygon_points
+
         if not to_be_map_uv:
-            return self.polygon_offsets, self.polygon_points
+            return offsets, points
 
         mapped_points = []
-        for point_index in range(0, len(self.polygon_points), 2):
+        for point_index in range(0, len(points), 2):
             mapped_u, mapped_v = map_uv_into_range(
-                (self.polygon_points[point_index], self.polygon_points[point_index + 1]),
+                (points[point_index], points[point_index + 1]),
                 umin,
                 umax,
                 vmin,
                 vmax,
             )
             mapped_points.extend([mapped_u, mapped_v])
-        return list(self.polygon_offsets), mapped_points
+        return list(offsets), mapped_points
 
-    def get_draw_info(self, config, umin=0.0, umax=1.0, vmin=0.0, vmax=1.0):
-        # type: (EdgeLineDrawerConfig, float, float, float, float) -> Dict[Text, EdgeLineDrawInfo]
+    def get_draw_info(self, config, umin=0.0, umax=1.0, vmin=0.0, vmax=1.0, cull_margin=None):
+        # type: (EdgeLineDrawerConfig, float, float, float, float, Optional[Tuple[float, float]]) -> Dict[Text, EdgeLineDrawInfo]
         to_be_map_uv = (umin != 0.0 or vmin != 0.0 or umax != 1.0 or vmax != 1.0)
         edge_lines = self.get_edge_lines(config.get_setting("fold")["fold_angle"])
+        cull_rect = self._get_cull_rect(umin, umax, vmin, vmax, cull_margin)
 
         result = {}
         for key, setting in config.settings.items():
@@ -217,6 +650,8 @@ class MeshTopologySnapshot(object):
             internal_width = setting["internal_width"]
             outline_width = setting["outline_width"]
             lines = edge_lines[key]
+            if cull_rect is not None:
+                lines = _cull_edge_lines(lines, cull_rect)
             if to_be_map_uv:
                 lines = [EdgeLine(
                     line.edge_id,
@@ -523,8 +958,9 @@ class DrawerPayloadBuffers(object):
         padding_warning,
         island_fill,
         json_fallback_edges,
+        antialias=True,
     ):
-        # type: (List[int], List[float], List[float], List[float], List[int], List[int], List[bool], List[bool], List[int], List[float], Optional[Dict[Text, Any]], Optional[Dict[Text, Any]], List[EdgeLineDrawInfo]) -> None
+        # type: (List[int], List[float], List[float], List[float], List[int], List[int], List[bool], List[bool], List[int], List[float], Optional[Dict[Text, Any]], Optional[Dict[Text, Any]], List[EdgeLineDrawInfo], bool) -> None
         self.group_line_offsets = group_line_offsets
         self.line_points = line_points
         self.group_internal_widths = group_internal_widths
@@ -537,6 +973,7 @@ class DrawerPayloadBuffers(object):
         self.polygon_points = polygon_points
         self.padding_warning = padding_warning
         self.island_fill = island_fill
+        self.antialias = antialias
         self._json_fallback_edges = json_fallback_edges
         self._json_string = None
 
@@ -551,9 +988,53 @@ class DrawerPayloadBuffers(object):
                 payload["padding_warning"] = self.padding_warning
             if self.island_fill is not None:
                 payload["island_fill"] = self.island_fill
+            if not self.antialias:
+                payload["antialias"] = False
             self._json_string = edges_to_json_string(payload)
         return self._json_string
 
+    def scaled(self, width_scale):
+        # type: (float) -> DrawerPayloadBuffers
+        """Copy with stroke widths and paddings scaled like the native batch render."""
+        if width_scale == 1.0:
+            return self
+
+        padding_warning = None
+        if self.padding_warning is not None:
+            padding_warning = dict(self.padding_warning)
+            padding_warning["padding_pixels"] = max(1.0, float(padding_warning.get("padding_pixels", 8.0)) * width_scale)
+            padding_warning["warning_width"] = max(
+                1.0, float(padding_warning.get("warning_width", DEFAULT_PADDING_WARNING_WIDTH)) * width_scale
+            )
+        island_fill = None
+        if self.island_fill is not None:
+            island_fill = dict(self.island_fill)
+            island_fill["padding_pixels"] = max(0.0, float(island_fill.get("padding_pixels", 0.0)) * width_scale)
+
+        json_fallback_edges = []
+        for group in self._json_fallback_edges:
+            scaled = copy.copy(group)
+            scaled.internal_width = group.internal_width * width_scale
+            scaled.outline_width = group.outline_width * width_scale
+            json_fallback_edges.append(scaled)
+
+        return DrawerPayloadBuffers(
+            group_line_offsets=self.group_line_offsets,
+            line_points=self.line_points,
+            group_internal_widths=[width * width_scale for width in self.group_internal_widths],
+            group_outline_widths=[width * width_scale for width in self.group_outline_widths],
+            group_internal_colors=self.group_internal_colors,
+            group_outline_colors=self.group_outline_colors,
+            group_draw_outline=self.group_draw_outline,
+            group_draw_internal=self.group_draw_internal,
+            polygon_offsets=self.polygon_offsets,
+            polygon_points=self.polygon_points,
+            padding_warning=padding_warning,
+            island_fill=island_fill,
+            json_fallback_edges=json_fallback_edges,
+            antialias=self.antialias,
+        )
+
 
 def _canonical_line_key(line):
     # type: (EdgeLine) -> Tuple[Tuple[float, float], Tuple[float, float]]
@@ -852,6 +1333,343 @@ def _build_polygon_only_snapshot(fn_mesh):
     return snapshot
 
 
+def lod_cells_per_uv(pixels_per_uv):
+    # type: (Optional[float]) -> Optional[int]
+    """Pyramid level (grid cells per UV unit) for an output density, or None for full detail."""
+    if not pixels_per_uv or pixels_per_uv <= 0.0:
+        return None
+    cells_per_uv = pixels_per_uv * LOD_CELLS_PER_PIXEL
+    if cells_per_uv > LOD_MAX_CELLS_PER_UV:
+        return None
+    level = int(math.ceil(math.log(max(cells_per_uv, 1.0), 2)))
+    return max(LOD_MIN_CELLS_PER_UV, 2 ** level)
+
+
+def _polygon_edge_counts(polygon_offsets, polygon_points):
+    # type: (List[int], List[float]) -> Dict[Tuple[Tuple[float, float], Tuple[float, float]], int]
+    """Number of polygons using each undirected polygon edge, keyed by its sorted endpoints."""
+    edge_counts = {}  # type: Dict[Tuple[Tuple[float, float], Tuple[float, float]], int]
+    for polygon_index in range(len(polygon_offsets) - 1):
+        start = polygon_offsets[polygon_index]
+        end = polygon_offsets[polygon_index + 1]
+        previous = (polygon_points[end * 2 - 2], polygon_points[end * 2 - 1])
+        for point_index in range(start * 2, end * 2, 2):
+            point = (polygon_points[point_index], polygon_points[point_index + 1])
+            key = (previous, point) if previous <= point else (point, previous)
+            edge_counts[key] = edge_counts.get(key, 0) + 1
+            previous = point
+    return edge_counts
+
+
+def _cluster_lod_points(pinned, islands, polygon_edges, scale):
+    # type: (Dict[Tuple[float, float], Tuple[float, float]], Dict[Tuple[float, float], int], List[Tuple[Tuple[float, float], Tuple[float, float]]], float) -> Dict[Tuple[float, float], Tuple[float, float]]
+    """Snap of every clustered interior point to the first point of its cluster."""
+    floor = math.floor
+    cells = {}  # type: Dict[Tuple[float, float], Tuple[int, int, int]]
+    for point, island in islands.items():
+        if point not in pinned:
+            cells[point] = (island, floor(point[0] * scale), floor(point[1] * scale))
+
+    parents = {point: point for point in cells}
+
+    def find(point):
+        root = point
+        while parents[root] != root:
+            root = parents[root]
+        while parents[point] != root:
+            parents[point], point = root, parents[point]
+        return root
+
+    cell_of = cells.get
+    for start, end in polygon_edges:
+        cell = cell_of(start)
+        if cell is not None and cell == cell_of(end):
+            start_root = find(start)
+            end_root = find(end)
+            if start_root != end_root:
+                parents[end_root] = start_root
+
+    representatives = {}
+    moved = {}  # type: Dict[Tuple[float, float], Tuple[float, float]]
+    for point in cells:
+        representative = representatives.setdefault(find(point), point)
+        if representative is not point:
+            moved[point] = representative
+    return moved
+
+
+def _snap_lod_lines(lines, snap):
+    # type: (List[EdgeLine], Callable[[Tuple[float, float], Tuple[float, float]], Tuple[float, float]]) -> List[EdgeLine]
+    """Move line endpoints by snap, dropping lines that collapse or duplicate another."""
+    seen = set()  # type: Set[Tuple[Tuple[float, float], Tuple[float, float]]]
+    level_lines = []
+    for line in lines:
+        start = (line.uv1[0], line.uv1[1])
+        end = (line.uv2[0], line.uv2[1])
+        snapped_start = snap(start, start)
+        snapped_end = snap(end, end)
+        if snapped_start == snapped_end:
+            continue
+        line_key = (snapped_start, snapped_end) if snapped_start <= snapped_end else (snapped_end, snapped_start)
+        if line_key in seen:
+            continue
+        seen.add(line_key)
+        if snapped_start is not start or snapped_end is not end:
+            line = EdgeLine(line.edge_id, snapped_start, snapped_end)
+        level_lines.append(line)
+    return level_lines
+
+
+def _snap_polygon_buffers(polygon_offsets, polygon_points, moved):
+    # type: (List[int], List[float], Dict[Tuple[float, float], Tuple[float, float]]) -> Tuple[List[int], List[float]]
+    """Polygon buffers with moved points snapped, dropping polygons that collapse."""
+    snap = moved.get
+    level_offsets = [0]
+    level_points = []  # type: List[float]
+    for polygon_index in range(len(polygon_offsets) - 1):
+        us = []
+        vs = []
+        for index in range(polygon_offsets[polygon_index] * 2, polygon_offsets[polygon_index + 1] * 2, 2):
+            point = (polygon_points[index], polygon_points[index + 1])
+            point = snap(point, point)
+            us.append(point[0])
+            vs.append(point[1])
+        append_deduped_uv_polygon(us, vs, level_offsets, level_points)
+    return level_offsets, level_points
+
+
+def _lod_cells(start, end, scale):
+    # type: (Tuple[float, float], Tuple[float, float], float) -> Iterable[Tuple[int, int]]
+    """LOD grid cells overlapped by the bounds of segment start-end."""
+    floor = math.floor
+    for column in range(floor(min(start[0], end[0]) * scale), floor(max(start[0], end[0]) * scale) + 1):
+        for row in range(floor(min(start[1], end[1]) * scale), floor(max(start[1], end[1]) * scale) + 1):
+            yield column, row
+
+
+def _undo_crossing_snaps(moved, edges, barriers, scale):
+    # type: (Dict[Tuple[float, float], Tuple[float, float]], List[Tuple[Tuple[float, float], Tuple[float, float]]], List[Tuple[Tuple[float, float], Tuple[float, float]]], float) -> None
+    """Remove snaps from moved until no snapped edge crosses or touches a barrier edge.
+
+    Barriers are bucketed on the LOD grid, so each snapped edge is only
+    tested against barriers in the cells its bounds overlap. Undoing a snap
+    changes the other edges of that vertex, so those are checked again.
+    The native build_lod_level visits edges in the same order.
+    """
+    grid = {}  # type: Dict[Tuple[int, int], List[int]]
+    for index, (start, end) in enumerate(barriers):
+        for cell in _lod_cells(start, end, scale):
+            grid.setdefault(cell, []).append(index)
+
+    pending = [edge for edge in edges if edge[0] in moved or edge[1] in moved]
+    point_edges = None  # type: Optional[Dict[Tuple[float, float], List[Tuple[Tuple[float, float], Tuple[float, float]]]]]
+    snap = moved.get
+    while pending:
+        edge = pending.pop()
+        start = snap(edge[0], edge[0])
+        end = snap(edge[1], edge[1])
+        if start == end or (start is edge[0] and end is edge[1]):
+            continue
+        if not _snapped_edge_meets_barrier(start, end, grid, barriers, scale):
+            continue
+        if point_edges is None:
+            point_edges = _moved_point_edges(moved, edges)
+        for point in edge:
+            if moved.pop(point, None) is not None:
+                pending.extend(point_edges[point])
+
+
+def _snapped_edge_meets_barrier(start, end, grid, barriers, scale):
+    # type: (Tuple[float, float], Tuple[float, float], Dict[Tuple[int, int], List[int]], List[Tuple[Tuple[float, float], Tuple[float, float]]], float) -> bool
+    candidates = set()  # type: Set[int]
+    for cell in _lod_cells(start, end, scale):
+        candidates.update(grid.get(cell, ()))
+    return any(_segment_meets_barrier(start, end, *barriers[index]) for index in candidates)
+
+
+def _moved_point_edges(moved, edges):
+    # type: (Dict[Tuple[float, float], Tuple[float, float]], List[Tuple[Tuple[float, float], Tuple[float, float]]]) -> Dict[Tuple[float, float], List[Tuple[Tuple[float, float], Tuple[float, float]]]]
+    """Edges touching each moved point, in edge order."""
+    point_edges = {}  # type: Dict[Tuple[float, float], List[Tuple[Tuple[float, float], Tuple[float, float]]]]
+    for edge in edges:
+        for point in edge:
+            if point in moved:
+                point_edges.setdefault(point, []).append(edge)
+    return point_edges
+
+
+def _segment_meets_barrier(start, end, barrier_start, barrier_end):
+    # type: (Tuple[float, float], Tuple[float, float], Tuple[float, float], Tuple[float, float]) -> bool
+    """True when segment start-end crosses the barrier or passes through one of its endpoints.
+
+    Barriers sharing an endpoint with the segment are attached to it, not crossed.
+    """
+    if barrier_start in (start, end) or barrier_end in (start, end):
+        return False
+
+    def orientation(point):
+        return (end[0] - start[0]) * (point[1] - start[1]) - (end[1] - start[1]) * (point[0] - start[0])
+
+    def within(point):
+        return min(start[0], end[0]) <= point[0] <= max(start[0], end[0]) and min(start[1], end[1]) <= point[1] <= max(start[1], end[1])
+
+    side_start = orientation(barrier_start)
+    side_end = orientation(barrier_end)
+    if (side_start == 0.0 and within(barrier_start)) or (side_end == 0.0 and within(barrier_end)):
+        return True
+    if (side_start > 0.0) == (side_end > 0.0) or side_start == 0.0 or side_end == 0.0:
+        return False
+    barrier_x = barrier_end[0] - barrier_start[0]
+    barrier_y = barrier_end[1] - barrier_start[1]
+    side_a = barrier_x * (start[1] - barrier_start[1]) - barrier_y * (start[0] - barrier_start[0])
+    side_b = barrier_x * (end[1] - barrier_start[1]) - barrier_y * (end[0] - barrier_start[0])
+    return (side_a > 0.0) != (side_b > 0.0) and side_a != 0.0 and side_b != 0.0
+
+
+def udim_tile_number(u_index, v_index):
+    # type: (int, int) -> int
+    """UDIM number of the tile whose lower-left corner is (u_index, v_index)."""
+    return UDIM_FIRST_TILE + u_index + v_index * UDIM_TILES_PER_ROW
+
+
+def udim_tile_range(tile):
+    # type: (int) -> Tuple[float, float, float, float]
+    """(u_min, u_max, v_min, v_max) covered by a UDIM tile."""
+    v_index, u_index = divmod(tile - UDIM_FIRST_TILE, UDIM_TILES_PER_ROW)
+    return float(u_index), float(u_index + 1), float(v_index), float(v_index + 1)
+
+
+def udim_output_path(image_path, tile):
+    # type: (Text, int) -> Text
+    """Insert the UDIM number before the extension: name.png -> name.1001.png."""
+    root, ext = os.path.splitext(_normalize_output_path(image_path))
+    return "{}.{}{}".format(root, tile, ext)
+
+
+def _udim_tiles_touching(u_values, v_values, margin):
+    # type: (Sequence[float], Sequence[float], float) -> List[int]
+    """UDIM tiles whose area overlaps the bounds of the given coordinates grown by margin.
+
+    Bounds that end exactly on a tile border do not reach into the next tile.
+    Coordinates outside the 10-column UDIM grid are ignored.
+    """
+    u_min = min(u_values) - margin
+    u_max = max(u_values) + margin
+    v_min = min(v_values) - margin
+    v_max = max(v_values) + margin
+    first_u = max(0, int(math.floor(u_min)))
+    last_u = min(UDIM_TILES_PER_ROW - 1, max(int(math.floor(u_min)), int(math.ceil(u_max)) - 1))
+    first_v = max(0, int(math.floor(v_min)))
+    last_v = max(int(math.floor(v_min)), int(math.ceil(v_max)) - 1)
+    return [
+        udim_tile_number(u_index, v_index)
+        for v_index in range(first_v, last_v + 1)
+        for u_index in range(first_u, last_u + 1)
+    ]
+
+
+def _udim_item_tiles(u_values, v_values, margin, occupied):
+    # type: (Sequence[float], Sequence[float], float, Set[int]) -> List[int]
+    """Tiles one line or polygon is copied into; the tiles it lies inside are added to occupied."""
+    occupied.update(_udim_tiles_touching(u_values, v_values, 0.0))
+    return _udim_tiles_touching(u_values, v_values, margin)
+
+
+def _bucket_udim_lines(grouped_lines, margin, occupied):
+    # type: (Iterable[Tuple[Any, List[EdgeLine]]], float, Set[int]) -> Dict[int, Dict[Any, List[EdgeLine]]]
+    """Bucket (key, lines) groups into {tile: {key: lines}}."""
+    tile_lines = {}  # type: Dict[int, Dict[Any, List[EdgeLine]]]
+    for key, lines in grouped_lines:
+        for line in lines:
+            u_values = (line.uv1[0], line.uv2[0])
+            v_values = (line.uv1[1], line.uv2[1])
+            for tile in _udim_item_tiles(u_values, v_values, margin, occupied):
+                tile_lines.setdefault(tile, {}).setdefault(key, []).append(line)
+    return tile_lines
+
+
+def _bucket_udim_polygons(polygon_offsets, polygon_points, margin, occupied):
+    # type: (List[int], List[float], float, Set[int]) -> Dict[int, Tuple[List[int], List[float]]]
+    """Bucket flat polygon buffers into {tile: (offsets, points)}."""
+    tile_polygons = {}  # type: Dict[int, Tuple[List[int], List[float]]]
+    for polygon_index in range(len(polygon_offsets) - 1):
+        start = polygon_offsets[polygon_index] * 2
+        end = polygon_offsets[polygon_index + 1] * 2
+        if start == end:
+            continue
+        u_values = polygon_points[start:end:2]
+        v_values = polygon_points[start + 1:end:2]
+        for tile in _udim_item_tiles(u_values, v_values, margin, occupied):
+            offsets, points = tile_polygons.setdefault(tile, ([0], []))
+            points.extend(polygon_points[start:end])
+            offsets.append(offsets[-1] + (end - start) // 2)
+    return tile_polygons
+
+
+def _cull_edge_lines(lines, rect):
+    # type: (List[EdgeLine], Tuple[float, float, float, float]) -> List[EdgeLine]
+    """Keep lines whose bounds touch the (u_min, u_max, v_min, v_max) rect."""
+    u_min, u_max, v_min, v_max = rect
+    return [
+        line for line in lines
+        if min(line.uv1[0], line.uv2[0]) <= u_max
+        and max(line.uv1[0], line.uv2[0]) >= u_min
+        and min(line.uv1[1], line.uv2[1]) <= v_max
+        and max(line.uv1[1], line.uv2[1]) >= v_min
+    ]
+
+
+def _cull_polygon_buffers(polygon_offsets, polygon_points, rect):
+    # type: (List[int], List[float], Tuple[float, float, float, float]) -> Tuple[List[int], List[float]]
+    """Keep polygons whose bounds touch the (u_min, u_max, v_min, v_max) rect."""
+    u_min, u_max, v_min, v_max = rect
+    offsets = [0]
+    points = []  # type: List[float]
+    for polygon_index in range(len(polygon_offsets) - 1):
+        start = polygon_offsets[polygon_index] * 2
+        end = polygon_offsets[polygon_index + 1] * 2
+        us = polygon_points[start:end:2]
+        vs = polygon_points[start + 1:end:2]
+        if min(us) > u_max or max(us) < u_min or min(vs) > v_max or max(vs) < v_min:
+            continue
+        points.extend(polygon_points[start:end])
+        offsets.append(offsets[-1] + (end - start) // 2)
+    return offsets, points
+
+
+def _polygon_point_islands(polygon_offsets, polygon_points):
+    # type: (List[int], List[float]) -> Dict[Tuple[float, float], int]
+    """Map each polygon UV point to an island id; polygons sharing a point share an island."""
+    parents = {}  # type: Dict[Tuple[float, float], Tuple[float, float]]
+
+    def find(point):
+        root = point
+        while parents[root] != root:
+            root = parents[root]
+        while parents[point] != root:
+            parents[point], point = root, parents[point]
+        return root
+
+    for polygon_index in range(len(polygon_offsets) - 1):
+        start = polygon_offsets[polygon_index]
+        end = polygon_offsets[polygon_index + 1]
+        first_root = None
+        for point_index in range(start * 2, end * 2, 2):
+            point = (polygon_points[point_index], polygon_points[point_index + 1])
+            parents.setdefault(point, point)
+            root = find(point)
+            if first_root is None:
+                first_root = root
+            elif root != first_root:
+                parents[root] = first_root
+
+    island_ids = {}  # type: Dict[Tuple[float, float], int]
+    islands = {}
+    for point in parents:
+        island_ids[point] = islands.setdefault(find(point), len(islands))
+    return island_ids
+
+
 def _polygon_offsets_from_polygons(polygons):
     # type: (List[UVPolygon]) -> List[int]
     polygon_offsets = [0]
@@ -960,6 +1778,7 @@ def build_drawer_payload_buffers(payload):
         padding_warning=padding_warning,
         island_fill=island_fill,
         json_fallback_edges=merged_groups,
+        antialias=bool(payload.get("antialias", True)),
     )
 
 
@@ -1162,6 +1981,7 @@ def clear_mesh_topology_cache():
             pass
     _MESH_DIRTY_CALLBACKS.clear()
     _MESH_TOPOLOGY_CACHE.clear()
+    clear_native_geometry_cache()
 
 
 def start_mesh_topology_build_session(meshlike, include_edges=True, include_polygons=True):
@@ -1205,60 +2025,390 @@ def get_uv_face_polygons(meshlike, umin=0.0, umax=1.0, vmin=0.0, vmax=1.0):
     ).get_polygons(umin, umax, vmin, vmax)
 
 
-def render_payload_to_path(image_path, width, height, payload_data):
-    # type: (Text, int, int, Any) -> Text
-    """Render payload data to a path without any UI side effects."""
+def set_native_worker_threads(count):
+    # type: (int) -> bool
+    """Set the native drawer worker thread count. 0 restores the default."""
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+
+        if hasattr(_edge_drawer, "set_worker_threads"):
+            _edge_drawer.set_worker_threads(max(0, int(count)))
+            return True
+    except (ImportError, AttributeError, RuntimeError, TypeError, ValueError):
+        pass
+    return False
+
+
+def set_native_svg_precision(digits=None):
+    # type: (Optional[int]) -> bool
+    """Set the decimals the native drawer writes for SVG coordinates. None restores the default."""
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+
+        if hasattr(_edge_drawer, "set_svg_precision"):
+            _edge_drawer.set_svg_precision(None if digits is None else max(0, int(digits)))
+            return True
+    except (ImportError, AttributeError, RuntimeError, TypeError, ValueError):
+        pass
+    return False
+
+
+def clear_native_geometry_cache():
+    # type: () -> None
+    """Drop arrangements the native drawer keeps for re-rendering at other sizes."""
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+
+        if hasattr(_edge_drawer, "clear_geometry_cache"):
+            _edge_drawer.clear_geometry_cache()
+    except (ImportError, AttributeError, RuntimeError):
+        pass
+
+
+def start_native_profile_capture():
+    # type: () -> bool
+    """Start recording native phase timings and counters.
+
+    False when the module lacks profiling or a capture is already running,
+    in which case the running capture is left to record what follows.
+    """
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+
+        if hasattr(_edge_drawer, "start_profile_capture"):
+            return _edge_drawer.start_profile_capture() is not False
+    except (ImportError, AttributeError, RuntimeError):
+        pass
+    return False
+
+
+def finish_native_profile_capture():
+    # type: () -> Optional[Dict[Text, Any]]
+    """Stop the native capture and return its phases and counters."""
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+
+        if hasattr(_edge_drawer, "finish_profile_capture"):
+            return json.loads(_edge_drawer.finish_profile_capture())
+    except (ImportError, AttributeError, RuntimeError, ValueError):
+        pass
+    return None
+
+
+def run_profiled(report, render, label="render"):
+    # type: (ProfileReport, Callable[[], Any], Text) -> Any
+    """Run render and add its wall time, plus the native phases and counters it recorded, to report.
+
+    The native capture is process-wide, so renders running at the same time
+    on other threads are recorded too. Captures do not nest: inside another
+    run_profiled only the wall time is added here, and the native phases go
+    to the outer capture.
+    """
+    capturing = start_native_profile_capture()
+    started_at = time.perf_counter()
+    try:
+        return render()
+    finally:
+        start = report.add_phase(label, time.perf_counter() - started_at)
+        native_report = finish_native_profile_capture() if capturing else None
+        if native_report is not None:
+            report.merge_native(native_report, start)
+
+
+def emit_profile_report(report):
+    # type: (ProfileReport) -> None
+    """Print the report as one JSON line and write PROFILE_TRACE_PATH when set."""
+    if not PROFILE_ENABLED:
+        return
+    print("uv_snapshot_edge_drawer: profile {}".format(json.dumps(report.as_dict(), sort_keys=True)))
+    if PROFILE_TRACE_PATH:
+        try:
+            report.write_chrome_trace(PROFILE_TRACE_PATH)
+        except (IOError, OSError) as exc:
+            print("uv_snapshot_edge_drawer: could not write profile trace: {}".format(exc))
+
+
+def _buffered_payload_args(payload_data):
+    # type: (DrawerPayloadBuffers) -> List[Any]
+    """Positional buffer arguments shared by the native draw_edges_buffered* functions."""
+    warning = payload_data.padding_warning or {}
+    warning_color = warning.get("warning_color", DEFAULT_PADDING_WARNING_COLOR)
+    island_fill = payload_data.island_fill or {}
+    return [
+        payload_data.group_line_offsets,
+        payload_data.line_points,
+        payload_data.group_internal_widths,
+        payload_data.group_outline_widths,
+        payload_data.group_internal_colors,
+        payload_data.group_outline_colors,
+        payload_data.group_draw_outline,
+        payload_data.group_draw_internal,
+        payload_data.polygon_offsets,
+        payload_data.polygon_points,
+        bool(warning.get("enabled", False)),
+        float(warning.get("padding_pixels", 8.0)),
+        float(warning.get("warning_width", DEFAULT_PADDING_WARNING_WIDTH)),
+        [int(value) for value in warning_color],
+        bool(island_fill.get("enabled", False)),
+        float(island_fill.get("opacity", DEFAULT_ISLAND_FILL_OPACITY)),
+        float(island_fill.get("padding_pixels", DEFAULT_ISLAND_FILL_PADDING_PIXELS)),
+    ]
+
+
+def _normalize_png_compression(png_compression):
+    # type: (Optional[Text]) -> Text
+    level = (png_compression or "default").lower()
+    if level not in PNG_COMPRESSION_LEVELS:
+        raise ValueError("unsupported png compression: {}".format(png_compression))
+    return level
+
+
+def _png_compression_kwargs(png_compression):
+    # type: (Text) -> Dict[Text, Text]
+    """Only pass the keyword when needed so older native builds keep working."""
+    if png_compression == "default":
+        return {}
+    return {"png_compression": png_compression}
+
+
+def _buffered_payload_kwargs(payload_data, png_compression):
+    # type: (DrawerPayloadBuffers, Text) -> Dict[Text, Any]
+    """Keyword arguments for the native draw_edges_buffered* functions."""
+    kwargs = _png_compression_kwargs(png_compression)
+    warning = payload_data.padding_warning or {}
+    padding_mode = warning.get("mode", "exact")
+    if padding_mode != "exact":
+        kwargs["padding_mode"] = padding_mode
+    if not payload_data.antialias:
+        kwargs["antialias"] = False
+    return kwargs
+
+
+def render_payload_to_path(image_path, width, height, payload_data, png_compression="default"):
+    # type: (Text, int, int, Any, Text) -> Text
+    """Render payload data to a path without any UI side effects.
+
+    The output format follows the extension (png, svg, tga, bmp or rgba);
+    png_compression is one of PNG_COMPRESSION_LEVELS.
+    """
     image_path = _normalize_output_path(image_path)
+    png_compression = _normalize_png_compression(png_compression)
+    kwargs = _png_compression_kwargs(png_compression)
 
     if sys.version_info > (3, 0):
         try:
             from uv_snapshot_edge_drawer import _edge_drawer
             if isinstance(payload_data, DrawerPayloadBuffers) and hasattr(_edge_drawer, "draw_edges_buffered"):
-                warning = payload_data.padding_warning or {}
-                warning_color = warning.get("warning_color", DEFAULT_PADDING_WARNING_COLOR)
-                island_fill = payload_data.island_fill or {}
                 _edge_drawer.draw_edges_buffered(
                     image_path,
                     width,
                     height,
-                    payload_data.group_line_offsets,
-                    payload_data.line_points,
-                    payload_data.group_internal_widths,
-                    payload_data.group_outline_widths,
-                    payload_data.group_internal_colors,
-                    payload_data.group_outline_colors,
-                    payload_data.group_draw_outline,
-                    payload_data.group_draw_internal,
-                    payload_data.polygon_offsets,
-                    payload_data.polygon_points,
-                    bool(warning.get("enabled", False)),
-                    float(warning.get("padding_pixels", 8.0)),
-                    float(warning.get("warning_width", DEFAULT_PADDING_WARNING_WIDTH)),
-                    [int(value) for value in warning_color],
-                    bool(island_fill.get("enabled", False)),
-                    float(island_fill.get("opacity", DEFAULT_ISLAND_FILL_OPACITY)),
-                    float(island_fill.get("padding_pixels", DEFAULT_ISLAND_FILL_PADDING_PIXELS)),
+                    *_buffered_payload_args(payload_data),
+                    **_buffered_payload_kwargs(payload_data, png_compression)
                 )
             else:
                 json_data = payload_data.as_json_string() if isinstance(payload_data, DrawerPayloadBuffers) else payload_data
-                _edge_drawer.draw_edges(image_path, width, height, json_data)
+                _edge_drawer.draw_edges(image_path, width, height, json_data, **kwargs)
         except Exception as exc:
-            _execute_drawer_cli(image_path, width, height, payload_data, native_error=exc)
+            _execute_drawer_cli(image_path, width, height, payload_data, native_error=exc, png_compression=png_compression)
     else:
-        _execute_drawer_cli(image_path, width, height, payload_data)
+        _execute_drawer_cli(image_path, width, height, payload_data, png_compression=png_compression)
 
     return image_path
 
 
-def execute_drawer(image_path, width, height, payload_data, open_after_save=True):
-    # type: (Text, int, int, Any, bool) -> None
+def _render_payload_natively(width, height, payload_data, format, png_compression="default"):
+    # type: (int, int, Any, Text, Text) -> Optional[bytes]
+    """Render through the in-memory native entry points, or None when they are unavailable."""
+    if sys.version_info < (3, 0):
+        return None
+
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+    except ImportError:
+        return None
+
+    kwargs = _png_compression_kwargs(png_compression)
+    if isinstance(payload_data, DrawerPayloadBuffers) and hasattr(_edge_drawer, "draw_edges_buffered_to_bytes"):
+        return _edge_drawer.draw_edges_buffered_to_bytes(
+            format,
+            width,
+            height,
+            *_buffered_payload_args(payload_data),
+            **_buffered_payload_kwargs(payload_data, png_compression)
+        )
+
+    if hasattr(_edge_drawer, "draw_edges_to_bytes"):
+        json_data = payload_data.as_json_string() if isinstance(payload_data, DrawerPayloadBuffers) else payload_data
+        return _edge_drawer.draw_edges_to_bytes(format, width, height, json_data, **kwargs)
+
+    return None
+
+
+def render_payload_to_bytes(width, height, payload_data, format="png", png_compression="default"):
+    # type: (int, int, Any, Text, Text) -> bytes
+    """Render payload data to encoded image bytes without touching the filesystem.
+
+    format is one of IN_MEMORY_OUTPUT_FORMATS. Falls back to a temporary file
+    through render_payload_to_path when the native module is missing or lacks
+    the in-memory entry points.
+    """
+    format = format.lower()
+    if format not in IN_MEMORY_OUTPUT_FORMATS:
+        raise ValueError("unsupported output format: {}".format(format))
+    png_compression = _normalize_png_compression(png_compression)
+
+    try:
+        data = _render_payload_natively(width, height, payload_data, format, png_compression)
+    except (AttributeError, RuntimeError, TypeError, ValueError) as exc:
+        print("native edge drawer failed: {}".format(exc))
+        data = None
+    if data is not None:
+        return data
+
+    with tempfile.NamedTemporaryFile(suffix="." + format, delete=False) as temp_file:
+        temp_path = temp_file.name
+    try:
+        render_payload_to_path(temp_path, width, height, payload_data, png_compression)
+        with open(temp_path, "rb") as image_file:
+            return image_file.read()
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def render_payload_to_rgba(width, height, payload_data):
+    # type: (int, int, Any) -> bytes
+    """Render payload data to raw, non-premultiplied RGBA8 rows (top row first).
+
+    Requires the native module; there is no CLI fallback for raw pixels.
+    """
+    data = _render_payload_natively(width, height, payload_data, "rgba")
+    if data is None:
+        raise RuntimeError("native edge drawer with in-memory rendering is not available")
+    return data
+
+
+def execute_drawer(image_path, width, height, payload_data, open_after_save=True, png_compression="default"):
+    # type: (Text, int, int, Any, bool, Text) -> None
     """Execute the native drawer when available, otherwise fallback to edge_drawer.exe"""
 
-    image_path = render_payload_to_path(image_path, width, height, payload_data)
+    image_path = render_payload_to_path(image_path, width, height, payload_data, png_compression)
     if open_after_save:
         os.startfile(image_path)
 
 
+def _normalize_output_spec(output):
+    # type: (Dict[Text, Any]) -> Tuple[Text, int, int, float, Text]
+    """Turn a render_payload_to_paths output dict into the native spec tuple."""
+    image_path = _normalize_output_path(output["path"])
+    format = output.get("format")
+    if format:
+        format = format.lower()
+        if format not in IN_MEMORY_OUTPUT_FORMATS:
+            raise ValueError("unsupported output format: {}".format(format))
+        image_path = os.path.splitext(image_path)[0] + "." + format
+    return (
+        image_path,
+        int(output["width"]),
+        int(output["height"]),
+        float(output.get("width_scale", 1.0)),
+        _normalize_png_compression(output.get("png_compression", "default")),
+    )
+
+
+def render_payload_to_paths(outputs, payload_data):
+    # type: (List[Dict[Text, Any]], Any) -> List[Text]
+    """Render one payload to several images and return their paths.
+
+    Each output is a dict with path, width and height, and optionally format
+    (replaces the path extension), png_compression and width_scale (multiplies
+    stroke widths and paddings). The native drawer prepares the geometry once
+    and renders the outputs in parallel; otherwise they are rendered one by one.
+    """
+    specs = [_normalize_output_spec(output) for output in outputs]
+    if specs and not _render_payload_to_paths_natively(specs, payload_data):
+        _render_payload_to_paths_one_by_one(specs, payload_data)
+    return [spec[0] for spec in specs]
+
+
+def _render_payload_to_paths_natively(specs, payload_data):
+    # type: (List[Tuple[Text, int, int, float, Text]], Any) -> bool
+    """Render all specs in one native batch call; False when unavailable."""
+    if sys.version_info < (3, 0):
+        return False
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer
+        if isinstance(payload_data, DrawerPayloadBuffers):
+            if not hasattr(_edge_drawer, "draw_edges_buffered_to_paths"):
+                return False
+            kwargs = _buffered_payload_kwargs(payload_data, "default")
+            _edge_drawer.draw_edges_buffered_to_paths(specs, *_buffered_payload_args(payload_data), **kwargs)
+            return True
+        if not hasattr(_edge_drawer, "draw_edges_to_paths"):
+            return False
+        _edge_drawer.draw_edges_to_paths(specs, payload_data)
+        return True
+    except ImportError:
+        pass
+    except (AttributeError, RuntimeError, TypeError, ValueError) as exc:
+        print("native batch render failed: {}".format(exc))
+    return False
+
+
+def _render_payload_to_paths_one_by_one(specs, payload_data):
+    # type: (List[Tuple[Text, int, int, float, Text]], Any) -> None
+    """Render each spec through render_payload_to_path, scaling buffered payloads."""
+    for image_path, width, height, width_scale, png_compression in specs:
+        scaled_payload = payload_data
+        if isinstance(payload_data, DrawerPayloadBuffers):
+            scaled_payload = payload_data.scaled(width_scale)
+        elif width_scale != 1.0:
+            raise ValueError("width_scale requires DrawerPayloadBuffers without the native batch renderer")
+        render_payload_to_path(image_path, width, height, scaled_payload, png_compression)
+
+
+def _buffered_batch_job(specs, payload_data):
+    # type: (List[Tuple[Text, int, int, float, Text]], DrawerPayloadBuffers) -> Tuple[Any, ...]
+    """One job tuple for the native draw_edges_buffered_batch_to_paths."""
+    args = _buffered_payload_args(payload_data)
+    warning = payload_data.padding_warning or {}
+    return (
+        specs,
+        tuple(args[0:8]),
+        tuple(args[8:10]),
+        tuple(args[10:14]) + (warning.get("mode", "exact"),),
+        tuple(args[14:17]),
+        bool(payload_data.antialias),
+    )
+
+
+def render_payloads_to_paths(jobs):
+    # type: (List[Tuple[List[Dict[Text, Any]], Any]]) -> List[List[Text]]
+    """Render several payloads, each to its own outputs, and return the paths per payload.
+
+    Each job pairs a render_payload_to_paths output list with its payload
+    data. The native drawer takes buffered payloads in one call and renders
+    them on its own threads with the GIL released; otherwise each job goes
+    through render_payload_to_paths in turn.
+    """
+    specs = [[_normalize_output_spec(output) for output in outputs] for outputs, _ in jobs]
+    if sys.version_info > (3, 0) and all(isinstance(payload_data, DrawerPayloadBuffers) for _, payload_data in jobs):
+        try:
+            from uv_snapshot_edge_drawer import _edge_drawer
+            if hasattr(_edge_drawer, "draw_edges_buffered_batch_to_paths"):
+                _edge_drawer.draw_edges_buffered_batch_to_paths(
+                    [_buffered_batch_job(job_specs, payload_data) for job_specs, (_, payload_data) in zip(specs, jobs)]
+                )
+                return [[spec[0] for spec in job_specs] for job_specs in specs]
+        except ImportError:
+            pass
+        except (AttributeError, RuntimeError, TypeError, ValueError) as exc:
+            print("native batch render failed: {}".format(exc))
+
+    return [render_payload_to_paths(outputs, payload_data) for outputs, payload_data in jobs]
+
+
 def _normalize_output_path(image_path):
     # type: (Text) -> Text
     """Default to PNG when no output extension is provided."""
@@ -1302,8 +2452,8 @@ def _prepare_cli_json_arg(json_data):
         return temp_file.name, temp_file.name
 
 
-def _run_drawer_cli_once(image_path, width, height, json_data, native_error=None):
-    # type: (Text, int, int, Text, Optional[Exception]) -> None
+def _run_drawer_cli_once(image_path, width, height, json_data, native_error=None, png_compression="default"):
+    # type: (Text, int, int, Text, Optional[Exception], Text) -> None
     """Execute one edge_drawer CLI attempt."""
 
     json_arg, temp_path = _prepare_cli_json_arg(json_data)
@@ -1315,6 +2465,8 @@ def _run_drawer_cli_once(image_path, width, height, json_data, native_error=None
             str(height),
             json_arg,
         ]
+        if png_compression != "default":
+            args.extend(["--png-compression", png_compression])
 
         if sys.version_info > (3, 0):
             result = subprocess.run(args, capture_output=True, text=True)
@@ -1336,13 +2488,15 @@ def _run_drawer_cli_once(image_path, width, height, json_data, native_error=None
             os.unlink(temp_path)
 
 
-def _execute_drawer_cli(image_path, width, height, payload_data, native_error=None):
-    # type: (Text, int, int, Any, Optional[Exception]) -> None
+def _execute_drawer_cli(image_path, width, height, payload_data, native_error=None, png_compression="default"):
+    # type: (Text, int, int, Any, Optional[Exception], Text) -> None
     """Execute the CLI fallback."""
 
     try:
         json_data = payload_data.as_json_string() if isinstance(payload_data, DrawerPayloadBuffers) else payload_data
-        _run_drawer_cli_once(image_path, width, height, json_data, native_error=native_error)
+        _run_drawer_cli_once(
+            image_path, width, height, json_data, native_error=native_error, png_compression=png_compression
+        )
     except RuntimeError as exc:
         legacy_json = _legacy_cli_json_payload(payload_data)
         if legacy_json is None:
@@ -1352,7 +2506,9 @@ def _execute_drawer_cli(image_path, width, height, payload_data, native_error=No
         if "Expected 'edges' to be an array" not in error_text and "contain 'edges'" not in error_text:
             raise
 
-        _run_drawer_cli_once(image_path, width, height, legacy_json, native_error=native_error)
+        _run_drawer_cli_once(
+            image_path, width, height, legacy_json, native_error=native_error, png_compression=png_compression
+        )
 
 
 ##############################################################################
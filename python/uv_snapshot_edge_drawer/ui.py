@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """ Draw edge lines on UV Snapshot images"""
 import json
+import math
 import os
 import sys
 import tempfile
@@ -65,6 +66,18 @@ ISLAND_FILL_PADDING = 0
 PREVIEW_DEBOUNCE_MS = 150
 PREVIEW_RENDER_WORKERS = 1
 PREVIEW_FRAME_LABEL = "Preview"
+PNG_COMPRESSION_LABELS = ("Default", "Fast", "None", "Best")
+PADDING_WARNING_MODE_LABELS = ("Exact", "Raster")
+# Smallest culling margin in output units; matches the native geometry cull.
+CULL_MIN_MARGIN = 1.0 / 16.0
+# Payload profile_phases in the order they run; the rest are totals or nested.
+PAYLOAD_PROFILE_PHASES = (
+    "collect_snapshots",
+    "get_lod_snapshot",
+    "get_draw_info",
+    "get_polygons",
+    "build_drawer_payload_buffers",
+)
 
 
 try:
@@ -84,6 +97,7 @@ except Exception:
 _preview_display_scale = PREVIEW_DEFAULT_DISPLAY_SCALE
 _preview_image_size = (PREVIEW_MAX_DIMENSION, PREVIEW_MAX_DIMENSION)
 _preview_image_path = None
+_preview_image = None
 _preview_image_label = None
 _preview_wheel_filter = None
 _preview_source_pixmap = None
@@ -181,15 +195,14 @@ class AsyncPreviewController(object):
         if self._closed or not cmds.window("settingsWindow", exists=True):
             return
 
-        if self._running_future is not None:
-            self._schedule_main_tick()
-            return
-
+        # Native renders release the GIL, so warmup slices keep stepping on the
+        # main thread while a preview is rendering.
         if self._warmup_sessions:
             self._step_warmup_sessions()
-            if self._warmup_sessions:
-                self._schedule_main_tick()
-                return
+
+        if self._running_future is not None or self._warmup_sessions:
+            self._schedule_main_tick()
+            return
 
         if self._pending_request is not None:
             self._maybe_start_render()
@@ -253,7 +266,6 @@ class AsyncPreviewController(object):
         self._pending_request = None
         self._running_generation = request["generation"]
         preview_path = _get_preview_path(request["generation"])
-        self._preview_paths.add(preview_path)
         _set_preview_busy("Rendering preview...")
         if self._executor is None:
             try:
@@ -261,9 +273,7 @@ class AsyncPreviewController(object):
             except Exception as exc:
                 _set_preview_busy("Preview failed: {}".format(exc))
                 return
-            self._latest_installed_generation = result["generation"]
-            _set_preview_image(result["image_path"], result["width"], result["height"])
-            self._cleanup_stale_preview_paths(result["image_path"])
+            self._install_preview_result(result)
             return
 
         self._running_future = self._executor.submit(_render_preview_job, request, preview_path)
@@ -285,15 +295,31 @@ class AsyncPreviewController(object):
 
         if result["generation"] != self._request_generation or self._closed:
             _delete_preview_path(result["image_path"])
-            self._preview_paths.discard(result["image_path"])
             return
 
+        self._install_preview_result(result)
+
+    def _install_preview_result(self, result):
+        # type: (Dict[Text, Any]) -> None
         self._latest_installed_generation = result["generation"]
-        _set_preview_image(result["image_path"], result["width"], result["height"])
-        self._cleanup_stale_preview_paths(result["image_path"])
+        image_path = _set_preview_image(
+            result["image_path"],
+            result["width"],
+            result["height"],
+            image=result["image"],
+            fallback_path=result["fallback_path"],
+        )
+        self._track_preview_path(image_path)
+        self._cleanup_stale_preview_paths(image_path)
+
+    def _track_preview_path(self, image_path):
+        # type: (Optional[Text]) -> None
+        # In-memory previews have no file to clean up later.
+        if image_path:
+            self._preview_paths.add(image_path)
 
     def _cleanup_stale_preview_paths(self, keep_path):
-        # type: (Text) -> None
+        # type: (Optional[Text]) -> None
         stale_paths = [path for path in self._preview_paths if path != keep_path]
         for path in stale_paths:
             _delete_preview_path(path)
@@ -351,13 +377,14 @@ def _process_async_preview_controller():
 def _close_async_preview_controller():
     # type: () -> None
     global _preview_refresh_controller, _preview_wheel_filter, _preview_image_label, _preview_image_path
-    global _preview_source_pixmap, _preview_source_pixmap_path, _preview_pixmap_refresh_generation
+    global _preview_image, _preview_source_pixmap, _preview_source_pixmap_path, _preview_pixmap_refresh_generation
     if _preview_refresh_controller is not None:
         _preview_refresh_controller.close()
         _preview_refresh_controller = None
     _preview_wheel_filter = None
     _preview_image_label = None
     _preview_image_path = None
+    _preview_image = None
     _preview_source_pixmap = None
     _preview_source_pixmap_path = None
     _preview_pixmap_refresh_generation += 1
@@ -705,14 +732,18 @@ def _collect_snapshot_settings():
         "x_resolution": cmds.intSliderGrp("resoX", query=True, value=True),
         "y_resolution": cmds.intSliderGrp("resoY", query=True, value=True),
         "output_mode": cmds.radioButtonGrp("outputModeCtrl", query=True, select=True),
+        "png_compression": cmds.optionMenuGrp("pngCompressionCtrl", query=True, value=True).lower(),
+        "udim_export": cmds.checkBoxGrp("udimExportCtrl", query=True, value1=True),
         "fold_angle": cmds.intSliderGrp("foldAngle", query=True, value=True),
         "padding_warning_enabled": cmds.checkBox("paddingWarningEnabled", query=True, value=True),
         "padding_pixels": cmds.intField("paddingPixelsField", query=True, value=True),
+        "padding_mode": cmds.optionMenuGrp("paddingModeCtrl", query=True, value=True).lower(),
         "padding_warning_color": _get_warning_color(),
         "padding_warning_width": cmds.intField("paddingWarningEdgeWidthField", query=True, value=True),
         "island_fill_enabled": cmds.checkBox("islandFillEnabled", query=True, value=True),
         "island_fill_opacity": cmds.intField("islandFillOpacityField", query=True, value=True) / 100.0,
         "island_fill_padding": cmds.intField("islandFillPaddingField", query=True, value=True),
+        "preview_antialias": cmds.checkBox("previewAntialiasEnabled", query=True, value=True),
         "soft_internal_color": _get_edge_color("soft", "Internal"),
         "hard_internal_color": _get_edge_color("hard", "Internal"),
         "border_internal_color": _get_edge_color("border", "Internal"),
@@ -832,6 +863,7 @@ def _build_padding_warning_settings(settings, width_scale=1.0):
         "enabled": True,
         "padding_pixels": padding_pixels,
         "warning_width": max(1.0, float(settings["padding_warning_width"]) * width_scale),
+        "mode": settings.get("padding_mode", "exact"),
         "warning_color": [
             int(settings["padding_warning_color"][0] * 255),
             int(settings["padding_warning_color"][1] * 255),
@@ -853,40 +885,102 @@ def _build_island_fill_settings(settings, width_scale=1.0):
     }
 
 
-def _build_payload_from_snapshots(settings, snapshots, width_scale=1.0):
-    # type: (Dict[Text, Any], List[Any], float) -> Any
-    started_at = time.time()
+def _cull_margin(settings, width_scale=1.0):
+    # type: (Dict[Text, Any], float) -> Tuple[float, float]
+    """Culling margin in output units: the widest reach of strokes, padding checks and fill padding.
+
+    Each margin is rounded up to a power of two of at least
+    CULL_MIN_MARGIN, so previews, final renders and padding changes build
+    the same payload and share the native geometry cache.
+    """
+    reach_pixels = max(
+        float(settings[key + "_" + kind + "_width"])
+        for key, _, _, _ in EDGE_APPEARANCE_SPECS
+        for kind in ("internal", "outline")
+    )
+    if settings["padding_warning_enabled"]:
+        reach_pixels = max(reach_pixels, float(settings["padding_pixels"]) + float(settings["padding_warning_width"]))
+    if settings["island_fill_enabled"]:
+        reach_pixels = max(reach_pixels, float(settings["island_fill_padding"]))
+
+    margin_pixels = reach_pixels * width_scale + 2.0
+    return (
+        _round_cull_margin(margin_pixels / max(1.0, settings["x_resolution"] * width_scale)),
+        _round_cull_margin(margin_pixels / max(1.0, settings["y_resolution"] * width_scale)),
+    )
+
+
+def _round_cull_margin(margin):
+    # type: (float) -> float
+    return 2.0 ** math.ceil(math.log(max(margin, CULL_MIN_MARGIN), 2))
+
+
+def _concat_polygon_buffers(parts):
+    # type: (List[Tuple[List[int], List[float]]]) -> Tuple[List[int], List[float]]
+    """Join per-snapshot polygon buffers, reusing a lone snapshot's buffers as they are."""
+    if not parts:
+        return [0], []
+    if len(parts) == 1:
+        return parts[0]
+    polygon_offsets = list(parts[0][0])
+    polygon_points = list(parts[0][1])
+    for snapshot_polygon_offsets, snapshot_polygon_points in parts[1:]:
+        base_point_count = polygon_offsets[-1]
+        polygon_offsets.extend(base_point_count + offset for offset in snapshot_polygon_offsets[1:])
+        polygon_points.extend(snapshot_polygon_points)
+    return polygon_offsets, polygon_points
+
+
+def _collect_snapshot_geometry(settings, snapshots, width_scale, pixels_per_uv, memory):
+    # type: (Dict[Text, Any], List[Any], float, Optional[float], Any) -> Tuple[List[Any], List[int], List[float], Dict[Text, float]]
+    """Edge draw groups and joined polygon buffers of every snapshot, with the time spent per phase."""
     config = _build_drawer_config(settings, width_scale=width_scale)
     needs_edge_data = _settings_need_edge_data(settings)
     u_min, u_max, v_min, v_max = settings["uv_min_max"]
-    tmp_json = []
-    polygon_offsets = None
-    polygon_points = None
-    draw_info_elapsed = 0.0
-    polygons_elapsed = 0.0
-    for snapshot_index, snapshot in enumerate(snapshots):
+    cull_margin = _cull_margin(settings, width_scale)
+    # Island fill colours are numbered over the whole polygon set, and the
+    # native drawer culls whole islands after numbering them, so polygons
+    # are only culled here when no fill is drawn.
+    polygon_cull_margin = None if settings["island_fill_enabled"] else cull_margin
+    edges = []
+    polygon_parts = []
+    elapsed = {"get_lod_snapshot": 0.0, "get_draw_info": 0.0, "get_polygons": 0.0}
+    for snapshot in snapshots:
+        if pixels_per_uv is not None:
+            phase_started = time.perf_counter()
+            phase_memory = memory.start_phase()
+            snapshot = snapshot.get_lod_snapshot(pixels_per_uv)
+            memory.finish_phase("get_lod_snapshot", phase_memory)
+            elapsed["get_lod_snapshot"] += time.perf_counter() - phase_started
         if needs_edge_data:
             phase_started = time.perf_counter()
-            draw_info = snapshot.get_draw_info(config, u_min, u_max, v_min, v_max)
-            draw_info_elapsed += time.perf_counter() - phase_started
-            tmp_json.extend(list(draw_info.values()))
+            phase_memory = memory.start_phase()
+            draw_info = snapshot.get_draw_info(config, u_min, u_max, v_min, v_max, cull_margin=cull_margin)
+            memory.finish_phase("get_draw_info", phase_memory)
+            elapsed["get_draw_info"] += time.perf_counter() - phase_started
+            edges.extend(list(draw_info.values()))
         phase_started = time.perf_counter()
-        snapshot_polygon_offsets, snapshot_polygon_points = snapshot.get_polygon_buffers(u_min, u_max, v_min, v_max)
-        if snapshot_index == 0:
-            polygon_offsets = snapshot_polygon_offsets
-            polygon_points = snapshot_polygon_points
-        else:
-            if snapshot_index == 1:
-                polygon_offsets = list(polygon_offsets)
-                polygon_points = list(polygon_points)
-            base_point_count = polygon_offsets[-1]
-            polygon_offsets.extend(base_point_count + offset for offset in snapshot_polygon_offsets[1:])
-            polygon_points.extend(snapshot_polygon_points)
-        polygons_elapsed += time.perf_counter() - phase_started
-
-    if polygon_offsets is None:
-        polygon_offsets = [0]
-        polygon_points = []
+        phase_memory = memory.start_phase()
+        polygon_parts.append(
+            snapshot.get_polygon_buffers(u_min, u_max, v_min, v_max, cull_margin=polygon_cull_margin)
+        )
+        memory.finish_phase("get_polygons", phase_memory)
+        elapsed["get_polygons"] += time.perf_counter() - phase_started
+
+    phase_started = time.perf_counter()
+    polygon_offsets, polygon_points = _concat_polygon_buffers(polygon_parts)
+    elapsed["get_polygons"] += time.perf_counter() - phase_started
+    return edges, polygon_offsets, polygon_points, elapsed
+
+
+def _build_payload_from_snapshots(settings, snapshots, width_scale=1.0, pixels_per_uv=None, antialias=True):
+    # type: (Dict[Text, Any], List[Any], float, Optional[float], bool) -> Any
+    """Build drawer payload buffers; pixels_per_uv selects a geometry LOD level (None = full detail)."""
+    started_at = time.time()
+    memory = drawer.PhaseMemoryTracker()
+    tmp_json, polygon_offsets, polygon_points, profile_phases = _collect_snapshot_geometry(
+        settings, snapshots, width_scale, pixels_per_uv, memory
+    )
 
     padding_warning = _build_padding_warning_settings(settings, width_scale=width_scale)
     payload = {
@@ -899,18 +993,22 @@ def _build_payload_from_snapshots(settings, snapshots, width_scale=1.0):
     island_fill = _build_island_fill_settings(settings, width_scale=width_scale)
     if island_fill is not None:
         payload["island_fill"] = island_fill
+    if not antialias:
+        payload["antialias"] = False
 
     phase_started = time.perf_counter()
+    phase_memory = memory.start_phase()
     payload_data = drawer.build_drawer_payload_buffers(payload)
-    buffer_build_elapsed = time.perf_counter() - phase_started
-    profile_phases = {
-        "get_draw_info": draw_info_elapsed,
-        "get_polygons": polygons_elapsed,
-        "build_drawer_payload_buffers": buffer_build_elapsed,
-        "total": draw_info_elapsed + polygons_elapsed + buffer_build_elapsed,
-    }
+    memory.finish_phase("build_drawer_payload_buffers", phase_memory)
+    profile_phases["build_drawer_payload_buffers"] = time.perf_counter() - phase_started
+    profile_phases["total"] = sum(profile_phases.values())
+    profile_peak_bytes = memory.stop()
     if hasattr(payload_data, "__dict__"):
         payload_data.profile_phases = profile_phases
+        if memory.enabled:
+            payload_data.profile_peak_bytes = profile_peak_bytes
+            payload_data.profile_snapshot_bytes = {snapshot.mesh_name: snapshot.estimated_bytes() for snapshot in snapshots}
+        payload_data.profile_memory_unavailable = memory.unavailable
     if drawer.PROFILE_ENABLED:
         print("uv_snapshot_edge_drawer: payload phases {}".format(json.dumps(profile_phases, sort_keys=True)))
         print("uv_snapshot_edge_drawer: build snapshot payload {:.4f}s".format(time.time() - started_at))
@@ -952,6 +1050,44 @@ def _build_snapshot_json(settings, width_scale=1.0):
     return payload_data, None
 
 
+def _payload_profile_report(label, payload_data):
+    # type: (Text, Any) -> Any
+    """Start a profile report from the payload's profile phases and memory.
+
+    The per-phase mesh topology timings are summed over meshes, so they go
+    on their own thread, starting with collect_snapshots.
+    """
+    report = drawer.ProfileReport(label)
+    profile_phases = getattr(payload_data, "profile_phases", None) or {}
+    for name in PAYLOAD_PROFILE_PHASES:
+        if name not in profile_phases:
+            continue
+        start = report.add_phase(name, profile_phases[name])
+        if name != "collect_snapshots":
+            continue
+        for key in sorted(profile_phases):
+            if key.startswith("collect_snapshots_"):
+                report.add_phase(key, profile_phases[key], start=start, thread="python-topology")
+                start += profile_phases[key]
+    for name, peak_bytes in (getattr(payload_data, "profile_peak_bytes", None) or {}).items():
+        report.add_peak_bytes(name, peak_bytes)
+    report.snapshot_bytes.update(getattr(payload_data, "profile_snapshot_bytes", None) or {})
+    report.memory_unavailable = getattr(payload_data, "profile_memory_unavailable", None)
+    return report
+
+
+def _render_profiled(label, payload_data, render):
+    # type: (Text, Any, Callable[[], Any]) -> Any
+    """Call render; when profiling, emit one report of the payload and render phases."""
+    if not drawer.PROFILE_ENABLED:
+        return render()
+    report = _payload_profile_report(label, payload_data)
+    try:
+        return drawer.run_profiled(report, render)
+    finally:
+        drawer.emit_profile_report(report)
+
+
 def _capture_preview_request(generation):
     # type: (int) -> Tuple[Optional[Dict[Text, Any]], Optional[Text], List[Text]]
     settings = _collect_snapshot_settings()
@@ -987,6 +1123,15 @@ def _capture_preview_request(generation):
     }, None, missing_meshes
 
 
+def _output_pixels_per_uv(settings, width, height):
+    # type: (Dict[Text, Any], int, int) -> float
+    u_min, u_max, v_min, v_max = settings["uv_min_max"]
+    return max(
+        float(width) / max(u_max - u_min, 1e-6),
+        float(height) / max(v_max - v_min, 1e-6),
+    )
+
+
 def _get_preview_dimensions(settings):
     # type: (Dict[Text, Any]) -> Tuple[int, int]
     width = max(1, int(settings["x_resolution"]))
@@ -1158,7 +1303,13 @@ def _flush_qt_preview_pixmap_refresh(generation):
 def _get_preview_source_pixmap():
     # type: () -> Any
     global _preview_source_pixmap, _preview_source_pixmap_path
-    if not _preview_image_path or QtGui is None:
+    if QtGui is None:
+        return None
+    if _preview_image is not None:
+        if _preview_source_pixmap is None:
+            _preview_source_pixmap = QtGui.QPixmap.fromImage(_preview_image)
+        return _preview_source_pixmap
+    if not _preview_image_path:
         return None
     if _preview_source_pixmap_path != _preview_image_path or _preview_source_pixmap is None:
         pixmap = QtGui.QPixmap(_preview_image_path)
@@ -1173,7 +1324,7 @@ def _get_preview_source_pixmap():
 
 def _refresh_qt_preview_pixmap():
     # type: () -> bool
-    if not _preview_image_path or QtGui is None:
+    if (not _preview_image_path and _preview_image is None) or QtGui is None:
         return False
     label = _ensure_preview_image_label()
     if label is None:
@@ -1206,21 +1357,34 @@ def _refresh_qt_preview_pixmap():
     return True
 
 
-def _set_preview_image(image_path, width, height):
-    # type: (Text, int, int) -> None
-    global _preview_image_size, _preview_image_path, _preview_source_pixmap, _preview_source_pixmap_path
+def _set_preview_image(image_path, width, height, image=None, fallback_path=None):
+    # type: (Optional[Text], int, int, Any, Optional[Text]) -> Optional[Text]
+    """Shows the preview and returns the temp PNG it is displayed from, if any.
+
+    In-memory images go straight to the Qt label. When that label cannot be
+    used, the image is written to ``fallback_path`` and shown through
+    ``cmds.image`` like file-based previews.
+    """
+    global _preview_image_size, _preview_image_path, _preview_image, _preview_source_pixmap, _preview_source_pixmap_path
     _preview_image_size = (max(1, int(width)), max(1, int(height)))
-    if image_path != _preview_image_path:
+    if image is not None or image_path != _preview_image_path:
         _preview_source_pixmap = None
         _preview_source_pixmap_path = None
     _preview_image_path = image_path
+    _preview_image = image
     display_width, display_height = _preview_display_dimensions()
     cmds.frameLayout("previewFrame", edit=True, label=PREVIEW_FRAME_LABEL)
     cmds.text("previewStatus", edit=True, visible=False)
     _apply_preview_display_size(refresh_pixmap=False)
     if _refresh_qt_preview_pixmap():
         cmds.image("previewImage", edit=True, visible=False, image="")
-        return
+        return image_path
+
+    if not image_path and image is not None and fallback_path and image.save(fallback_path, "PNG"):
+        image_path = fallback_path
+    if not image_path:
+        _set_preview_busy("Preview display is not available")
+        return None
 
     cmds.image(
         "previewImage",
@@ -1230,6 +1394,30 @@ def _set_preview_image(image_path, width, height):
         width=display_width,
         height=display_height,
     )
+    return image_path
+
+
+def _qt_rgba8888_format():
+    # type: () -> Any
+    return getattr(getattr(QtGui.QImage, "Format", QtGui.QImage), "Format_RGBA8888")
+
+
+def _render_preview_image(payload_data, width, height):
+    # type: (Any, int, int) -> Any
+    """Render the preview straight into a detached QImage, or None when unavailable.
+
+    QImage (unlike QPixmap) is safe to build on the worker thread, so the main
+    thread only has to convert it to a pixmap.
+    """
+    if QtGui is None:
+        return None
+    try:
+        rgba = drawer.render_payload_to_rgba(width, height, payload_data)
+    except (AttributeError, RuntimeError, TypeError, ValueError):
+        return None
+    image = QtGui.QImage(rgba, width, height, width * 4, _qt_rgba8888_format())
+    # The QImage only borrows the Python buffer; copy so it owns its pixels.
+    return image.copy()
 
 
 def _render_preview_job(request, preview_path):
@@ -1239,18 +1427,36 @@ def _render_preview_job(request, preview_path):
         request["settings"],
         request["snapshots"],
         width_scale=request["width_scale"],
+        pixels_per_uv=_output_pixels_per_uv(
+            request["settings"],
+            request["preview_width"],
+            request["preview_height"],
+        ),
+        antialias=request["settings"].get("preview_antialias", True),
     )
-    drawer.render_payload_to_path(
-        preview_path,
-        request["preview_width"],
-        request["preview_height"],
-        payload_data,
-    )
+
+    def render():
+        # type: () -> Any
+        image = _render_preview_image(payload_data, request["preview_width"], request["preview_height"])
+        if image is None:
+            # Temp previews are decoded right away, so deflate effort is wasted.
+            drawer.render_payload_to_path(
+                preview_path,
+                request["preview_width"],
+                request["preview_height"],
+                payload_data,
+                png_compression="none",
+            )
+        return image
+
+    image = _render_profiled("preview", payload_data, render)
     if drawer.PROFILE_ENABLED:
         print("uv_snapshot_edge_drawer: refresh preview {:.4f}s".format(time.time() - started_at))
     return {
         "generation": request["generation"],
-        "image_path": preview_path,
+        "image_path": preview_path if image is None else None,
+        "fallback_path": preview_path,
+        "image": image,
         "width": request["preview_width"],
         "height": request["preview_height"],
     }
@@ -1288,8 +1494,8 @@ def _on_output_mode_changed(*args):
     update_controls()
 
 
-def _copy_image_to_clipboard(image_path):
-    # type: (Text) -> None
+def _copy_image_to_clipboard(png_bytes):
+    # type: (bytes) -> None
     try:
         from PySide6 import QtCore, QtGui, QtWidgets  # type: ignore
     except Exception:
@@ -1299,15 +1505,12 @@ def _copy_image_to_clipboard(image_path):
     if app is None:
         raise RuntimeError("Qt application is not available")
 
-    image = QtGui.QImage(image_path)
+    image = QtGui.QImage.fromData(QtCore.QByteArray(png_bytes), "PNG")
     if image.isNull():
         raise RuntimeError("Failed to load clipboard image")
 
     clipboard = app.clipboard()
     # Put the PNG bytes on the clipboard so downstream apps can preserve alpha.
-    with open(image_path, "rb") as image_file:
-        png_bytes = image_file.read()
-
     mime_data = QtCore.QMimeData()
     mime_data.setImageData(image)
     mime_data.setData("image/png", QtCore.QByteArray(png_bytes))
@@ -1315,23 +1518,15 @@ def _copy_image_to_clipboard(image_path):
 
 
 def _render_snapshot_to_clipboard(settings, json_data):
-    # type: (Dict[Text, Any], Text) -> None
-    temp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
-            temp_path = temp_file.name
-
-        drawer.execute_drawer(
-            temp_path,
-            settings["x_resolution"],
-            settings["y_resolution"],
-            json_data,
-            open_after_save=False,
-        )
-        _copy_image_to_clipboard(temp_path)
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+    # type: (Dict[Text, Any], Any) -> None
+    png_bytes = drawer.render_payload_to_bytes(
+        settings["x_resolution"],
+        settings["y_resolution"],
+        json_data,
+        format="png",
+        png_compression=settings["png_compression"],
+    )
+    _copy_image_to_clipboard(png_bytes)
 
 
 def _qt_widget_from_control(control_name):
@@ -1362,11 +1557,12 @@ def _install_preview_wheel_zoom_filter():
 def show_ui():
     # type: () -> None
     global _preview_display_scale, _preview_image_size, _preview_image_path, _preview_image_label
-    global _preview_source_pixmap, _preview_source_pixmap_path, _preview_pixmap_refresh_generation
+    global _preview_image, _preview_source_pixmap, _preview_source_pixmap_path, _preview_pixmap_refresh_generation
     global _previous_island_fill_enabled
     _preview_display_scale = PREVIEW_DEFAULT_DISPLAY_SCALE
     _preview_image_size = (PREVIEW_MAX_DIMENSION, PREVIEW_MAX_DIMENSION)
     _preview_image_path = None
+    _preview_image = None
     _preview_image_label = None
     _preview_source_pixmap = None
     _preview_source_pixmap_path = None
@@ -1404,10 +1600,10 @@ def show_ui():
                 okCaption='Select',
                 dialogStyle=2,
                 startingDirectory=sd,
-                fileFilter='Image Files PNG or SVG(*.png *.svg)'
+                fileFilter='Image Files (*.png *.svg *.tga *.bmp);;Raw RGBA (*.rgba)'
             )
             if res:
-                if not res[0].endswith(".png") and not res[0].endswith(".svg"):
+                if not res[0].lower().endswith((".png", ".svg", ".tga", ".bmp", ".rgba")):
                     res[0] += ".png"
                 cmds.optionVar(sv=('uvSnapshotFileName', res[0]))
                 cmds.textFieldButtonGrp("filenameField", edit=True, text=res[0])
@@ -1421,6 +1617,15 @@ def show_ui():
         select=1,
         changeCommand=_on_output_mode_changed,
     )
+    cmds.optionMenuGrp("pngCompressionCtrl", label="PNG Compression:")
+    for label in PNG_COMPRESSION_LABELS:
+        cmds.menuItem(label=label)
+    cmds.checkBoxGrp(
+        "udimExportCtrl",
+        label="UDIM Tiles:",
+        label1="One image per occupied tile",
+        value1=False,
+    )
     
     # Size controls
     cmds.intSliderGrp("resoX", label="Size X (px):", field=True, min=1, max=4096, value=2048)  # noqa: E501
@@ -1452,6 +1657,7 @@ def show_ui():
         minValue=1,
         maxValue=4096,
         value=8,
+        dragCommand=lambda *_args: schedule_preview_refresh(immediate=False),
         changeCommand=lambda *_args: schedule_preview_refresh(immediate=True),
     )
     cmds.button(
@@ -1480,6 +1686,14 @@ def show_ui():
         changeCommand=lambda value, key="paddingWarning": _sync_width_from_slider(key, "", value),
     )
     cmds.setParent("..")
+    cmds.optionMenuGrp(
+        "paddingModeCtrl",
+        label="Padding Check:",
+        annotation="Raster measures gaps at output resolution; faster on very dense layouts.",
+        changeCommand=lambda *_args: schedule_preview_refresh(immediate=True),
+    )
+    for label in PADDING_WARNING_MODE_LABELS:
+        cmds.menuItem(label=label)
 
     slider_width = gOptionBoxTemplateTextColumnWidth + gOptionBoxTemplateSliderWidgetWidth + 72
 
@@ -1700,6 +1914,12 @@ def show_ui():
     cmds.setParent("..")
     cmds.setParent("..")
     cmds.setParent("..")
+    cmds.checkBox(
+        "previewAntialiasEnabled",
+        label="Antialias Preview Lines",
+        value=True,
+        changeCommand=lambda *_args: schedule_preview_refresh(immediate=True),
+    )
     cmds.setParent("..")
 
     # Buttons at the bottom
@@ -1742,6 +1962,7 @@ def update_controls(*args):
     cmds.intSliderGrp("foldAngle", edit=True, enable=fold_enabled)
     file_mode = cmds.radioButtonGrp("outputModeCtrl", query=True, select=True) == 1
     cmds.textFieldButtonGrp("filenameField", edit=True, enable=file_mode)
+    cmds.checkBoxGrp("udimExportCtrl", edit=True, enable=file_mode)
     cmds.button(
         "snapshotActionButton",
         edit=True,
@@ -1758,6 +1979,7 @@ def _update_padding_warning_controls():
     cmds.button("paddingWarningColorSwatch", edit=True, enable=enabled)
     cmds.intField("paddingWarningEdgeWidthField", edit=True, enable=enabled)
     cmds.intSlider("paddingWarningEdgeWidthSlider", edit=True, enable=enabled)
+    cmds.optionMenuGrp("paddingModeCtrl", edit=True, enable=enabled)
 
 
 def _update_island_fill_controls():
@@ -1800,8 +2022,79 @@ def uv_snapchot_ctrl_changed(*args):
     cmds.floatSliderGrp("uvSnapshotVMaxCtrl", edit=True, enable=not uv_range)
 
 
+def _udim_tile_job(settings, tile, snapshots):
+    # type: (Dict[Text, Any], int, List[Any]) -> Tuple[List[Dict[Text, Any]], Any]
+    tile_settings = dict(settings)
+    tile_settings["uv_min_max"] = drawer.udim_tile_range(tile)
+    output = {
+        "path": drawer.udim_output_path(settings["file_path"], tile),
+        "width": settings["x_resolution"],
+        "height": settings["y_resolution"],
+        "png_compression": settings["png_compression"],
+    }
+    return [output], _build_payload_from_snapshots(tile_settings, snapshots)
+
+
+def _export_udim_tiles(settings):
+    # type: (Dict[Text, Any]) -> Tuple[List[Text], Optional[Text]]
+    """Render every occupied UDIM tile of the selection to name.<UDIM>.ext.
+
+    Each snapshot is bucketed per tile once and every tile payload is built
+    up front; the tiles then render in one native batch call, which spreads
+    them over its own threads with the GIL released.
+    """
+    mesh_names = _collect_selected_meshes()
+    if not mesh_names:
+        return [], "Select some mesh"
+
+    started_at = time.time()
+    needs_edge_data = _settings_need_edge_data(settings)
+    cull_margin = _cull_margin(settings)
+    margin = max(cull_margin)
+    snapshots_by_tile = {}  # type: Dict[int, List[Any]]
+    for mesh_name in mesh_names:
+        snapshot = drawer.get_mesh_topology_snapshot(
+            mesh_name,
+            include_edges=needs_edge_data,
+            include_polygons=True,
+        )
+        for tile, tile_snapshot in snapshot.get_udim_tile_snapshots(margin).items():
+            snapshots_by_tile.setdefault(tile, []).append(tile_snapshot)
+    if not snapshots_by_tile:
+        return [], "No UVs inside the UDIM range"
+
+    tiles = sorted(snapshots_by_tile)
+    jobs = [_udim_tile_job(settings, tile, snapshots_by_tile[tile]) for tile in tiles]
+
+    def render_tiles():
+        # type: () -> List[Text]
+        return [paths[0] for paths in drawer.render_payloads_to_paths(jobs)]
+
+    # Each tile payload carries its own phases, so only the native side is broken down.
+    image_paths = _render_profiled("udim_export", None, render_tiles)
+    if drawer.PROFILE_ENABLED:
+        print("uv_snapshot_edge_drawer: udim export tiles={} {:.4f}s".format(len(tiles), time.time() - started_at))
+    return image_paths, None
+
+
 def snapshot():
     settings = _collect_snapshot_settings()
+    if settings["output_mode"] == 1 and settings["udim_export"]:
+        image_paths, error_message = _export_udim_tiles(settings)
+        if error_message:
+            cmds.warning(error_message)
+            return
+        schedule_preview_refresh(immediate=True)
+        cmds.inViewMessage(
+            amg="Exported {} UDIM tiles: {}".format(len(image_paths), ", ".join(os.path.basename(path) for path in image_paths)),
+            pos="topCenter",
+            fade=True,
+            alpha=0.9,
+            fadeStayTime=10000,
+            fadeOutTime=1000
+        )
+        return
+
     json_data, error_message = _build_snapshot_json(settings)
     if error_message:
         cmds.warning("Select some mesh")
@@ -1809,14 +2102,15 @@ def snapshot():
         return
 
     if settings["output_mode"] == 1:
-        drawer.execute_drawer(
+        _render_profiled("snapshot", json_data, lambda: drawer.execute_drawer(
             settings["file_path"],
             settings["x_resolution"],
             settings["y_resolution"],
             json_data,
-        )
+            png_compression=settings["png_compression"],
+        ))
     else:
-        _render_snapshot_to_clipboard(settings, json_data)
+        _render_profiled("clipboard", json_data, lambda: _render_snapshot_to_clipboard(settings, json_data))
     schedule_preview_refresh(immediate=True)
     if settings["output_mode"] == 1:
         message = "Exported: {}".format(settings["file_path"])
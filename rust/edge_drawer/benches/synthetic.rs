@@ -0,0 +1,495 @@
+//! Times `edge_drawer` on synthetic UV layouts and prints one JSON object per
+//! case and resolution, so runs from different commits can be diffed.
+//!
+//! cargo bench --bench synthetic -- [FILTER] [--quick] [--stress]
+//!     [--iterations N] [--resolutions 1024,2048,4096]
+//!     [--warning-mode exact|raster] [--threads 1,0] [--output results.jsonl]
+//!
+//! `--threads` repeats every case per worker count (`0` is the default pool),
+//! so e.g. `-- grid_sheet --threads 1,0` compares the serial and parallel
+//! `classification` phase on the same layout.
+
+use std::collections::BTreeMap;
+use std::fmt::Write as _;
+use std::fs::File;
+use std::io::{self, Write};
+use std::time::Instant;
+
+use edge_drawer::{
+    capture_profile, clear_geometry_cache, draw_to_bytes_from_payload, parse_drawer_payload,
+    set_worker_threads, worker_threads, DrawerPayload, PngCompression,
+};
+
+const DEFAULT_RESOLUTIONS: [u32; 3] = [1024, 2048, 4096];
+const DEFAULT_ITERATIONS: usize = 3;
+const SHELL_MARGIN: f32 = 0.05;
+const REPORTED_PHASES: [&str; 6] = [
+    "arrangement",
+    "classification",
+    "warning",
+    "island_fill",
+    "path_build",
+    "prepare_total",
+];
+
+struct Options {
+    filter: Option<String>,
+    quick: bool,
+    stress: bool,
+    iterations: usize,
+    resolutions: Vec<u32>,
+    warning_mode: String,
+    threads: Vec<usize>,
+    output: Option<String>,
+}
+
+/// Collects shells as separate edge groups plus their polygons and writes
+/// them out in the JSON form `parse_drawer_payload` reads.
+#[derive(Default)]
+struct LayoutBuilder {
+    groups: Vec<Vec<[[f32; 2]; 2]>>,
+    polygons: Vec<Vec<[f32; 2]>>,
+}
+
+struct Case {
+    name: String,
+    layout: LayoutBuilder,
+}
+
+impl LayoutBuilder {
+    /// Adds an `columns` x `rows` quad grid covering `origin..origin + size`
+    /// as one shell.
+    fn add_grid(&mut self, origin: [f32; 2], size: [f32; 2], columns: usize, rows: usize) {
+        let point = |column: usize, row: usize| {
+            [
+                origin[0] + size[0] * column as f32 / columns as f32,
+                origin[1] + size[1] * row as f32 / rows as f32,
+            ]
+        };
+
+        let mut lines = Vec::with_capacity(2 * columns * rows + columns + rows);
+        for row in 0..=rows {
+            for column in 0..=columns {
+                if column < columns {
+                    lines.push([point(column, row), point(column + 1, row)]);
+                }
+                if row < rows {
+                    lines.push([point(column, row), point(column, row + 1)]);
+                }
+            }
+        }
+        self.groups.push(lines);
+
+        for row in 0..rows {
+            for column in 0..columns {
+                self.polygons.push(vec![
+                    point(column, row),
+                    point(column + 1, row),
+                    point(column + 1, row + 1),
+                    point(column, row + 1),
+                ]);
+            }
+        }
+    }
+
+    /// Adds a triangle fan disc with `sides` segments as one shell, the way
+    /// a cylinder cap unfolds.
+    fn add_disc(&mut self, center: [f32; 2], radius: f32, sides: usize) {
+        let rim = |index: usize| {
+            let angle = std::f32::consts::TAU * (index % sides) as f32 / sides as f32;
+            [
+                center[0] + radius * angle.cos(),
+                center[1] + radius * angle.sin(),
+            ]
+        };
+
+        let mut lines = Vec::with_capacity(2 * sides);
+        for index in 0..sides {
+            lines.push([rim(index), rim(index + 1)]);
+            lines.push([center, rim(index)]);
+            self.polygons.push(vec![center, rim(index), rim(index + 1)]);
+        }
+        self.groups.push(lines);
+    }
+
+    fn polygon_count(&self) -> usize {
+        self.polygons.len()
+    }
+
+    fn line_count(&self) -> usize {
+        self.groups.iter().map(Vec::len).sum()
+    }
+
+    fn to_payload_json(&self, warning_mode: &str) -> String {
+        let mut json = String::with_capacity(64 * (self.line_count() + self.polygon_count()));
+        json.push_str("{\"edges\":[");
+        for (group_index, lines) in self.groups.iter().enumerate() {
+            if group_index > 0 {
+                json.push(',');
+            }
+            json.push_str(
+                "{\"internal_width\":1.0,\"outline_width\":3.0,\
+                 \"internal_color\":[255,255,255,160],\
+                 \"outline_color\":[255,255,255,255],\"lines\":[",
+            );
+            for (line_index, [uv1, uv2]) in lines.iter().enumerate() {
+                if line_index > 0 {
+                    json.push(',');
+                }
+                let _ = write!(
+                    json,
+                    "{{\"uv1\":[{},{}],\"uv2\":[{},{}]}}",
+                    uv1[0], uv1[1], uv2[0], uv2[1]
+                );
+            }
+            json.push_str("]}");
+        }
+        json.push_str("],\"polygons\":[");
+        for (polygon_index, points) in self.polygons.iter().enumerate() {
+            if polygon_index > 0 {
+                json.push(',');
+            }
+            json.push_str("{\"points\":[");
+            for (point_index, point) in points.iter().enumerate() {
+                if point_index > 0 {
+                    json.push(',');
+                }
+                let _ = write!(json, "[{},{}]", point[0], point[1]);
+            }
+            json.push_str("]}");
+        }
+        let _ = write!(
+            json,
+            "],\"padding_warning\":{{\"enabled\":true,\"padding_pixels\":8.0,\"mode\":\"{}\"}},\
+             \"island_fill\":{{\"enabled\":true}}}}",
+            warning_mode
+        );
+        json
+    }
+}
+
+/// One shell filling the 0-1 tile.
+fn grid_sheet(cells: usize) -> LayoutBuilder {
+    let mut layout = LayoutBuilder::default();
+    let size = 1.0 - 2.0 * SHELL_MARGIN;
+    layout.add_grid([SHELL_MARGIN; 2], [size; 2], cells, cells);
+    layout
+}
+
+/// A cylinder cut along one seam: the side unfolds into a strip and the two
+/// caps into fans beside it.
+fn cylinder(sides: usize, rings: usize) -> LayoutBuilder {
+    let mut layout = LayoutBuilder::default();
+    layout.add_grid([SHELL_MARGIN, 0.45], [0.9, 0.5], sides, rings);
+    layout.add_disc([0.27, 0.22], 0.17, sides);
+    layout.add_disc([0.73, 0.22], 0.17, sides);
+    layout
+}
+
+/// `per_side` x `per_side` separate 2x2 quad shells, as from scattered props.
+fn small_shells(per_side: usize) -> LayoutBuilder {
+    let mut layout = LayoutBuilder::default();
+    let pitch = (1.0 - 2.0 * SHELL_MARGIN) / per_side as f32;
+    for row in 0..per_side {
+        for column in 0..per_side {
+            let origin = [
+                SHELL_MARGIN + pitch * column as f32,
+                SHELL_MARGIN + pitch * row as f32,
+            ];
+            layout.add_grid(origin, [pitch * 0.7; 2], 2, 2);
+        }
+    }
+    layout
+}
+
+/// `layers` copies of one grid shell, each shifted slightly so every layer
+/// crosses the ones below it, as with mirrored or instanced UVs.
+fn stacked_shells(layers: usize, cells: usize) -> LayoutBuilder {
+    let mut layout = LayoutBuilder::default();
+    let size = 0.6;
+    for layer in 0..layers {
+        // Golden ratio steps keep the layers' grid lines from coinciding.
+        let step = layer as f32 * 0.618_034;
+        let origin = [
+            SHELL_MARGIN + 0.3 * step.fract(),
+            SHELL_MARGIN + 0.3 * (step * 0.618_034).fract(),
+        ];
+        layout.add_grid(origin, [size; 2], cells, cells);
+    }
+    layout
+}
+
+/// One grid shell in each of the first `tiles` UDIM tiles. Only tile 1001
+/// lies inside the rendered 0-1 range, so this measures culling.
+fn udim_spread(tiles: usize, cells: usize) -> LayoutBuilder {
+    let mut layout = LayoutBuilder::default();
+    let size = 1.0 - 2.0 * SHELL_MARGIN;
+    for tile in 0..tiles {
+        let origin = [
+            (tile % 10) as f32 + SHELL_MARGIN,
+            (tile / 10) as f32 + SHELL_MARGIN,
+        ];
+        layout.add_grid(origin, [size; 2], cells, cells);
+    }
+    layout
+}
+
+fn cases(options: &Options) -> Vec<Case> {
+    let scale = if options.quick { 4 } else { 1 };
+    let mut cases = vec![
+        Case {
+            name: format!("grid_sheet_{}", 256 / scale),
+            layout: grid_sheet(256 / scale),
+        },
+        Case {
+            name: format!("cylinder_{}x{}", 512 / scale, 64 / scale),
+            layout: cylinder(512 / scale, 64 / scale),
+        },
+        Case {
+            name: format!("small_shells_{}", (64 / scale) * (64 / scale)),
+            layout: small_shells(64 / scale),
+        },
+        Case {
+            name: format!("stacked_shells_8x{}", 64 / scale),
+            layout: stacked_shells(8, 64 / scale),
+        },
+        Case {
+            name: format!("udim_spread_10x{}", 128 / scale),
+            layout: udim_spread(10, 128 / scale),
+        },
+    ];
+    let stress_requested = options
+        .filter
+        .as_deref()
+        .is_some_and(|filter| filter.contains("stress"));
+    if options.stress || stress_requested {
+        cases.push(Case {
+            name: "stress_1m".to_string(),
+            layout: grid_sheet(1_000),
+        });
+    }
+    cases
+        .into_iter()
+        .filter(|case| {
+            options
+                .filter
+                .as_deref()
+                .map_or(true, |filter| case.name.contains(filter))
+        })
+        .collect()
+}
+
+fn parse_options() -> Result<Options, String> {
+    let mut options = Options {
+        filter: None,
+        quick: false,
+        stress: false,
+        iterations: DEFAULT_ITERATIONS,
+        resolutions: DEFAULT_RESOLUTIONS.to_vec(),
+        warning_mode: "exact".to_string(),
+        threads: vec![0],
+        output: None,
+    };
+
+    let mut args = std::env::args().skip(1);
+    while let Some(arg) = args.next() {
+        let mut value = |name: &str| args.next().ok_or(format!("{} expects a value", name));
+        match arg.as_str() {
+            // Passed by `cargo bench` to every bench target.
+            "--bench" => {}
+            "--quick" => options.quick = true,
+            "--stress" => options.stress = true,
+            "--iterations" => {
+                options.iterations = value(&arg)?
+                    .parse::<usize>()
+                    .map_err(|_| "Invalid --iterations".to_string())?
+                    .max(1);
+            }
+            "--resolutions" => {
+                options.resolutions = value(&arg)?
+                    .split(',')
+                    .map(|size| size.trim().parse::<u32>())
+                    .collect::<Result<_, _>>()
+                    .map_err(|_| "Invalid --resolutions".to_string())?;
+            }
+            "--warning-mode" => options.warning_mode = value(&arg)?,
+            "--threads" => {
+                options.threads = value(&arg)?
+                    .split(',')
+                    .map(|count| count.trim().parse::<usize>())
+                    .collect::<Result<_, _>>()
+                    .map_err(|_| "Invalid --threads".to_string())?;
+            }
+            "--output" => options.output = Some(value(&arg)?),
+            _ if arg.starts_with("--") => return Err(format!("Unknown option {}", arg)),
+            _ => options.filter = Some(arg),
+        }
+    }
+    Ok(options)
+}
+
+fn median(mut samples: Vec<f64>) -> f64 {
+    samples.sort_by(f64::total_cmp);
+    samples[samples.len() / 2]
+}
+
+/// Renders `payload` at `resolution` once to PNG from a cold geometry cache,
+/// then once to SVG, and returns the recorded seconds per phase, the work
+/// counters and heap peaks of the cold pass and the encoded sizes. The SVG
+/// pass reuses the cached arrangement, so only its `render_svg` numbers are
+/// kept.
+fn run_once(payload: &DrawerPayload, resolution: u32) -> Result<RunResult, String> {
+    clear_geometry_cache();
+    let (png, png_report) = capture_profile(|| {
+        draw_to_bytes_from_payload(
+            "png",
+            resolution,
+            resolution,
+            payload,
+            PngCompression::Default,
+        )
+    });
+    let png = png.map_err(|error| error.to_string())?;
+    let (svg, svg_report) = capture_profile(|| {
+        draw_to_bytes_from_payload(
+            "svg",
+            resolution,
+            resolution,
+            payload,
+            PngCompression::Default,
+        )
+    });
+    let svg = svg.map_err(|error| error.to_string())?;
+
+    let mut phases = BTreeMap::new();
+    for phase in png_report.phases {
+        let label = match phase.name.as_str() {
+            "render_raster" => "raster",
+            "encode" => "png_encode",
+            label if REPORTED_PHASES.contains(&label) => label,
+            _ => continue,
+        };
+        *phases.entry(label.to_string()).or_insert(0.0) += phase.seconds;
+    }
+    phases.insert("svg".to_string(), svg_report.phase_seconds("render_svg"));
+    Ok(RunResult {
+        phases,
+        counters: png_report.counters.into_iter().collect(),
+        peak_bytes: png_report
+            .peak_bytes
+            .into_iter()
+            .chain(
+                svg_report
+                    .peak_bytes
+                    .into_iter()
+                    .filter(|(phase, _)| phase == "render_svg"),
+            )
+            .collect(),
+        png_bytes: png.len(),
+        svg_bytes: svg.len(),
+    })
+}
+
+struct RunResult {
+    phases: BTreeMap<String, f64>,
+    counters: BTreeMap<String, usize>,
+    peak_bytes: BTreeMap<String, usize>,
+    png_bytes: usize,
+    svg_bytes: usize,
+}
+
+fn run_case(case: &Case, options: &Options, out: &mut dyn Write) -> Result<(), String> {
+    let build_started_at = Instant::now();
+    let json = case.layout.to_payload_json(&options.warning_mode);
+    let payload = parse_drawer_payload(&json).map_err(|error| error.to_string())?;
+    drop(json);
+    eprintln!(
+        "edge_drawer_bench: {} polygons={} lines={} build {:.2}s",
+        case.name,
+        case.layout.polygon_count(),
+        case.layout.line_count(),
+        build_started_at.elapsed().as_secs_f64()
+    );
+
+    for &threads in &options.threads {
+        set_worker_threads(threads);
+        for &resolution in &options.resolutions {
+            run_resolution(case, options, &payload, resolution, out)?;
+        }
+    }
+    set_worker_threads(0);
+    Ok(())
+}
+
+fn run_resolution(
+    case: &Case,
+    options: &Options,
+    payload: &DrawerPayload,
+    resolution: u32,
+    out: &mut dyn Write,
+) -> Result<(), String> {
+    let mut samples: BTreeMap<String, Vec<f64>> = BTreeMap::new();
+    let mut last = None;
+    for _ in 0..options.iterations {
+        let run = run_once(payload, resolution)?;
+        for (label, seconds) in &run.phases {
+            samples.entry(label.clone()).or_default().push(*seconds);
+        }
+        last = Some(run);
+    }
+    let last = last.ok_or("No iterations ran")?;
+
+    let phases = samples
+        .iter()
+        .map(|(label, seconds)| (label.clone(), median(seconds.clone())))
+        .collect::<BTreeMap<_, _>>();
+    let phases_min = samples
+        .iter()
+        .map(|(label, seconds)| {
+            (
+                label.clone(),
+                seconds.iter().copied().fold(f64::MAX, f64::min),
+            )
+        })
+        .collect::<BTreeMap<_, _>>();
+    let record = serde_json::json!({
+        "case": case.name,
+        "resolution": resolution,
+        "polygons": case.layout.polygon_count(),
+        "lines": case.layout.line_count(),
+        "groups": case.layout.groups.len(),
+        "warning_mode": options.warning_mode,
+        "threads": worker_threads(),
+        "iterations": options.iterations,
+        "phases": phases,
+        "phases_min": phases_min,
+        "counters": last.counters,
+        "peak_bytes": last.peak_bytes,
+        "png_bytes": last.png_bytes,
+        "svg_bytes": last.svg_bytes,
+    });
+    writeln!(out, "{}", record).map_err(|error| error.to_string())?;
+    out.flush().map_err(|error| error.to_string())?;
+    Ok(())
+}
+
+fn main() {
+    let options = match parse_options() {
+        Ok(options) => options,
+        Err(message) => {
+            eprintln!("edge_drawer_bench: {}", message);
+            std::process::exit(2);
+        }
+    };
+
+    let mut out: Box<dyn Write> = match &options.output {
+        Some(path) => Box::new(File::create(path).expect("Failed to create output file")),
+        None => Box::new(io::stdout()),
+    };
+    for case in cases(&options) {
+        if let Err(message) = run_case(&case, &options, &mut out) {
+            eprintln!("edge_drawer_bench: {} failed: {}", case.name, message);
+            std::process::exit(1);
+        }
+    }
+}
@@ -1,8 +1,15 @@
+use std::alloc::{GlobalAlloc, Layout, System};
+use std::collections::hash_map::{DefaultHasher, RandomState};
 use std::collections::{HashMap, HashSet, VecDeque};
 use std::error::Error;
 use std::fs;
+use std::hash::{BuildHasher, Hash, Hasher};
+use std::io::{BufWriter, Write};
+use std::ops::Range;
 use std::path::{Path, PathBuf};
-use std::sync::Arc;
+use std::sync::atomic::{AtomicBool, AtomicIsize, AtomicUsize, Ordering};
+use std::sync::{Arc, Mutex, OnceLock};
+use std::thread;
 use std::time::Instant;
 
 use i_overlay::core::fill_rule::FillRule as OverlayFillRule;
@@ -10,10 +17,8 @@ use i_overlay::core::overlay_rule::OverlayRule;
 use i_overlay::float::overlay::FloatOverlay;
 use pyo3::exceptions::PyRuntimeError;
 use pyo3::prelude::*;
+use pyo3::types::PyBytes;
 use serde::Deserialize;
-use svg::node::element::path::Data;
-use svg::node::element::Path as SvgPath;
-use svg::Document;
 use tiny_skia::{
     Color, FillRule, LineCap, LineJoin, Paint, PathBuilder, Pixmap, PremultipliedColorU8, Stroke,
     Transform,
@@ -34,6 +39,49 @@ const DEFAULT_WARNING_COLOR: [u8; 4] = [255, 64, 64, 255];
 const DEFAULT_WARNING_WIDTH: f32 = 4.0;
 const DEFAULT_ISLAND_FILL_OPACITY: f32 = 0.25;
 const DEFAULT_ISLAND_FILL_PADDING_PIXELS: f32 = 0.0;
+const PARALLEL_MIN_SEGMENTS_PER_WORKER: usize = 4_096;
+const CANDIDATE_PAIR_BLOCK_SEGMENTS: usize = 1_024;
+const TILED_RASTER_MIN_PIXELS: u64 = 4_096 * 4_096;
+const TILED_RASTER_BAND_ROWS: u32 = 256;
+/// Output rows the raster padding warning transforms at a time. Bands grow
+/// to twice the threshold so the window margins stay at most half the work.
+const RASTER_WARNING_BAND_ROWS: u32 = 64;
+// Conservative extra rows/columns around a stroke or fill, covering
+// antialiasing and rounding of the rasterizer's own bounds.
+const TILED_RASTER_MARGIN_PIXELS: f32 = 2.0;
+// Rows each band pixmap extends past its band, so paths clipped at the band
+// pixmap edge are clipped outside the rows that are kept.
+const TILED_RASTER_BAND_MARGIN_ROWS: u32 = 2;
+// Chains of one opaque style are stroked as combined paths of at most this
+// many points, binned by the canvas band their top falls in.
+const STROKE_BATCH_POINTS: usize = 16_384;
+const STROKE_BATCH_BAND_ROWS: u32 = 256;
+// Strokes up to this width are drawn by the thin-line kernel instead of
+// tiny-skia's stroker: coverage-scaled one-pixel lines up to one pixel wide,
+// round-capped capsules above that.
+const THIN_LINE_MAX_WIDTH: f32 = 2.0;
+const CULL_MARGIN_PIXELS: f32 = 2.0;
+// The cached arrangement is culled with the output margins rounded up to a
+// power of two of at least this many UV units, so renders of one layout at
+// different sizes share a cull rect and a cache entry.
+const GEOMETRY_CULL_MIN_MARGIN: f32 = 1.0 / 16.0;
+const GEOMETRY_CACHE_ENTRIES: usize = 2;
+// Island fill padding owners are searched per square tile of this many
+// pixels, among the contour segments that can reach the tile.
+const ISLAND_FILL_TILE_PIXELS: u32 = 16;
+// Pixels of rounding allowed for when ruling segments out of a tile.
+const ISLAND_FILL_DISTANCE_SLACK: f64 = 1e-6;
+const PADDING_INDEX_MIN_RADIUS_PIXELS: f32 = 16.0;
+const PADDING_INDEX_RADIUS_SCALE: f32 = 2.0;
+// Padding indexes kept per geometry, one per output size, e.g. the preview
+// and the final render.
+const PADDING_INDEX_ENTRIES: usize = 4;
+const MEMORY_TARGET_INPUT_RATIO: f64 = 8.0;
+/// Below this input size fixed per-call overheads dominate the ratio.
+const MEMORY_TARGET_MIN_INPUT_BYTES: usize = 1 << 20;
+const SVG_DEFAULT_PRECISION: usize = 2;
+const SVG_MAX_PRECISION: usize = 6;
+const SVG_STYLE_PRECISION: usize = 3;
 const ISLAND_FILL_PALETTE: [[u8; 3]; 12] = [
     [94, 176, 255],
     [255, 173, 77],
@@ -49,6 +97,42 @@ const ISLAND_FILL_PALETTE: [[u8; 3]; 12] = [
     [103, 190, 231],
 ];
 
+static WORKER_THREADS_OVERRIDE: AtomicUsize = AtomicUsize::new(0);
+/// Stores the SVG coordinate precision plus one, so `0` means "not set".
+static SVG_PRECISION_OVERRIDE: AtomicUsize = AtomicUsize::new(0);
+static GEOMETRY_CACHE: GeometryCache = GeometryCache::new();
+static ALLOCATION_TRACKING: AtomicBool = AtomicBool::new(false);
+static ALLOCATED_BYTES: AtomicIsize = AtomicIsize::new(0);
+static PEAK_ALLOCATED_BYTES: AtomicIsize = AtomicIsize::new(0);
+/// Phases currently measuring their heap peak; tracking runs while nonzero.
+static MEMORY_PHASES: Mutex<usize> = Mutex::new(0);
+static PROFILE_CAPTURE_ACTIVE: AtomicBool = AtomicBool::new(false);
+static PROFILE_CAPTURE: Mutex<Option<ProfileCapture>> = Mutex::new(None);
+static PROFILE_THREAD_COUNT: AtomicUsize = AtomicUsize::new(0);
+
+thread_local! {
+    /// Small per-thread number used to lay captured phases out by thread.
+    static PROFILE_THREAD_ID: usize = PROFILE_THREAD_COUNT.fetch_add(1, Ordering::Relaxed);
+}
+
+#[cfg(test)]
+thread_local! {
+    /// Arrangements `prepare_geometry` built on this thread, so tests can
+    /// count rebuilds without the process-wide profile capture.
+    static ARRANGEMENT_BUILDS: std::cell::Cell<usize> = const { std::cell::Cell::new(0) };
+}
+
+#[global_allocator]
+static ALLOCATOR: TrackingAllocator = TrackingAllocator;
+
+/// Counts the net heap bytes allocated while a phase is measuring its peak
+/// (see `phase_memory_start`), and only forwards to `System` otherwise. The
+/// count restarts from zero whenever tracking starts, so blocks allocated or
+/// freed while it was off leave no drift behind; freeing an older block
+/// during a phase lowers the count as it lowers the live heap. Counters are
+/// process-wide, so phases measured concurrently share one peak.
+struct TrackingAllocator;
+
 fn default_true() -> bool {
     true
 }
@@ -71,6 +155,19 @@ pub struct PaddingWarningConfig {
     warning_width: f32,
     #[serde(default = "default_warning_color")]
     warning_color: [u8; 4],
+    #[serde(default)]
+    mode: PaddingWarningMode,
+}
+
+/// How padding warnings are measured. `Exact` compares outline segments
+/// pairwise; `Raster` runs a distance transform at output resolution, so its
+/// cost follows the pixel count instead of the segment count.
+#[derive(Debug, Clone, Copy, Default, Deserialize, PartialEq, Eq)]
+#[serde(rename_all = "lowercase")]
+pub enum PaddingWarningMode {
+    #[default]
+    Exact,
+    Raster,
 }
 
 #[derive(Debug, Clone)]
@@ -79,6 +176,19 @@ pub struct DrawerPayload {
     pub polygons: Vec<Polygon>,
     pub padding_warning: Option<PaddingWarningConfig>,
     pub island_fill: Option<IslandFillConfig>,
+    /// Antialiased lines; off trades quality for speed in previews.
+    pub antialias: bool,
+}
+
+/// One image of a batch render. The format follows the path extension and
+/// `width_scale` multiplies every stroke width and padding of the payload.
+#[derive(Debug, Clone)]
+pub struct OutputSpec {
+    pub path: PathBuf,
+    pub width: u32,
+    pub height: u32,
+    pub width_scale: f32,
+    pub png_compression: PngCompression,
 }
 
 #[derive(Debug, Clone, Deserialize, Default)]
@@ -120,7 +230,7 @@ pub struct Edge {
     uv2: [f32; 2],
 }
 
-#[derive(Debug, Clone, Deserialize)]
+#[derive(Debug, Clone, Deserialize, PartialEq)]
 pub struct Polygon {
     points: Vec<[f32; 2]>,
 }
@@ -160,6 +270,7 @@ struct PreparedGroup {
 struct PreparedDrawing {
     fills: Vec<PreparedFill>,
     groups: Vec<PreparedGroup>,
+    antialias: bool,
 }
 
 #[derive(Clone, Debug)]
@@ -169,6 +280,23 @@ struct PreparedFill {
     shapes: Vec<FillShape>,
 }
 
+/// Polygons split into groups that union independently: UV islands
+/// (polygons sharing a point) merged while their bounds touch, so no
+/// polygon of one group can overlap another group. Groups are in fill
+/// order and `color_base` counts the islands of every earlier group, so a
+/// group keeps its colours when other groups are culled.
+#[derive(Clone, Debug, Default)]
+struct PolygonFillGroups {
+    groups: Vec<PolygonFillGroup>,
+}
+
+#[derive(Clone, Debug)]
+struct PolygonFillGroup {
+    polygons: Vec<u32>,
+    bounds: UvRect,
+    color_base: usize,
+}
+
 #[derive(Clone, Copy, Debug)]
 struct OverlayBounds {
     min_x: f64,
@@ -177,6 +305,14 @@ struct OverlayBounds {
     max_y: f64,
 }
 
+/// Axis-aligned UV rectangle; payload UVs are already mapped so the output
+/// covers 0-1 on both axes.
+#[derive(Clone, Copy, Debug)]
+struct UvRect {
+    min: [f32; 2],
+    max: [f32; 2],
+}
+
 #[derive(Clone, Debug)]
 struct DrawStyle {
     internal_width: f32,
@@ -196,9 +332,74 @@ struct FaceLoop {
 
 #[derive(Clone, Debug)]
 struct SegmentArrangement {
+    /// Sorted by `(start, end)` and unique, so a segment's position doubles
+    /// as its dense id.
     segments: Vec<CanonicalSegment>,
     point_positions: PointPositionIndex,
-    group_segments: Vec<Vec<CanonicalSegment>>,
+    /// Per input group, ids into `segments` in drawing order.
+    group_segment_ids: Vec<Vec<u32>>,
+}
+
+/// Membership of arrangement segments by id, one bit per segment.
+#[derive(Clone, Debug, Default, PartialEq)]
+struct SegmentBitSet {
+    len: usize,
+    words: Vec<u64>,
+}
+
+/// The resolution-independent half of a prepared drawing. It depends only on
+/// the UV geometry, so a preview and a final render of the same snapshot
+/// share one instance through `GEOMETRY_CACHE`.
+#[derive(Debug)]
+struct PreparedGeometry {
+    arrangement: SegmentArrangement,
+    internal_segments: SegmentBitSet,
+    outline_segments: SegmentBitSet,
+    outline: OnceLock<OutlineTopology>,
+    /// Padding distance indexes by output size, most recently used last.
+    padding_indexes: Mutex<Vec<Arc<PaddingDistanceIndex>>>,
+    /// Fingerprint of the unculled inputs, set while the geometry is cached.
+    inputs: Option<GeometryInputs>,
+}
+
+/// Fingerprint of the unculled inputs and cull rect a cached geometry was
+/// prepared from: a second hash of them under an independent per-process
+/// key, plus their lengths. A cache hit compares it, so a key collision
+/// cannot return the arrangement of another layout unless both hashes and
+/// every length collide at once.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+struct GeometryInputs {
+    check: u64,
+    segments: usize,
+    group_segments: usize,
+    polygons: usize,
+    polygon_points: usize,
+}
+
+/// Most recently used geometries, newest last.
+struct GeometryCache {
+    entries: Mutex<Vec<(u64, Arc<PreparedGeometry>)>>,
+}
+
+/// Outline segments in sorted order with their arrangement id and the
+/// connected component of each.
+#[derive(Debug)]
+struct OutlineTopology {
+    segments: Vec<CanonicalSegment>,
+    segment_ids: Vec<u32>,
+    component_ids: Vec<u32>,
+    arrangement_len: usize,
+}
+
+/// Nearest cross-component distance of every outline segment, in pixels at
+/// one output size. Distances of `radius` or more are stored as infinity, so
+/// any padding threshold up to `radius` is answered by a plain filter.
+#[derive(Debug)]
+struct PaddingDistanceIndex {
+    width: u32,
+    height: u32,
+    radius: f32,
+    distances: Vec<f32>,
 }
 
 #[derive(Debug)]
@@ -219,6 +420,7 @@ struct CompactPayload {
     polygons: Vec<Polygon>,
     padding_warning: Option<PaddingWarningConfig>,
     island_fill: Option<IslandFillConfig>,
+    antialias: bool,
 }
 
 #[derive(Clone, Debug)]
@@ -233,11 +435,6 @@ struct SegmentBounds {
     max: [f32; 2],
 }
 
-#[derive(Clone, Debug)]
-struct UniformGridIndex {
-    cells: HashMap<(i32, i32), Vec<usize>>,
-}
-
 #[derive(Clone, Debug)]
 struct IndexedPolygon<'a> {
     points: &'a [[f32; 2]],
@@ -274,6 +471,103 @@ struct ClassificationStats {
     point_in_polygon_tests: usize,
 }
 
+impl ClassificationStats {
+    fn merge(&mut self, other: &ClassificationStats) {
+        self.sample_queries += other.sample_queries;
+        self.candidate_polygons += other.candidate_polygons;
+        self.bounds_checks += other.bounds_checks;
+        self.point_in_polygon_tests += other.point_in_polygon_tests;
+    }
+}
+
+#[derive(Clone, Copy, Default)]
+struct CandidatePairStats {
+    segment_cell_visits: usize,
+    dense_candidates: usize,
+    ordered_pair_candidates: usize,
+    duplicate_candidates: usize,
+    overlap_candidates: usize,
+}
+
+impl CandidatePairStats {
+    fn merge(&mut self, other: &CandidatePairStats) {
+        self.segment_cell_visits += other.segment_cell_visits;
+        self.dense_candidates += other.dense_candidates;
+        self.ordered_pair_candidates += other.ordered_pair_candidates;
+        self.duplicate_candidates += other.duplicate_candidates;
+        self.overlap_candidates += other.overlap_candidates;
+    }
+}
+
+struct CandidatePairScratch {
+    visited_marks: Vec<u32>,
+    current_mark: u32,
+}
+
+#[derive(Clone, Copy, Debug)]
+struct PairSplit {
+    segment_index: usize,
+    point: QPoint,
+    uv: [f32; 2],
+}
+
+#[derive(Clone, Debug)]
+enum RasterItemKind {
+    Fill(tiny_skia::Path),
+    Stroke(tiny_skia::Path, f32),
+    Thin(ThinLines),
+}
+
+#[derive(Clone, Debug)]
+struct RasterItem {
+    kind: RasterItemKind,
+    color: [u8; 4],
+    antialias: bool,
+    rows: Range<u32>,
+}
+
+/// Canvas-space polylines of one thin style, drawn by `draw_thin_lines`
+/// `line_width` wide, with the style's alpha scaled by `coverage` when that
+/// is below one pixel.
+#[derive(Clone, Debug, Default)]
+struct ThinLines {
+    points: Vec<[f32; 2]>,
+    chain_ends: Vec<usize>,
+    line_width: f32,
+    coverage: f32,
+    antialias: bool,
+}
+
+/// How a thin segment treats one of its end pixels: `Cap` ends the chain,
+/// `Joint` is shared with the next segment and drawn at full weight, and
+/// `Skip` was already drawn by the previous segment.
+#[derive(Clone, Copy, Debug, Eq, PartialEq)]
+enum ThinLineEnd {
+    Cap,
+    Joint,
+    Skip,
+}
+
+#[derive(Clone, Copy, Debug, Eq, PartialEq)]
+enum OutputFormat {
+    Png,
+    Svg,
+    Tga,
+    Bmp,
+    Rgba,
+}
+
+/// Deflate effort for PNG output. `Default` keeps the tiny-skia encoder;
+/// the other levels go through `encode_png_with_compression`.
+#[derive(Clone, Copy, Debug, Default, Eq, PartialEq)]
+pub enum PngCompression {
+    #[default]
+    Default,
+    Fast,
+    None,
+    Best,
+}
+
 #[derive(Clone, Copy, Debug, Eq, Hash, PartialEq)]
 enum BucketKind {
     Internal,
@@ -295,6 +589,157 @@ struct StyleBucket {
     segments: Vec<SegmentInfo>,
 }
 
+impl OutputFormat {
+    fn from_name(name: &str) -> Result<Self, BoxError> {
+        match name.to_ascii_lowercase().as_str() {
+            "png" => Ok(OutputFormat::Png),
+            "svg" => Ok(OutputFormat::Svg),
+            "tga" => Ok(OutputFormat::Tga),
+            "bmp" => Ok(OutputFormat::Bmp),
+            "rgba" | "raw" => Ok(OutputFormat::Rgba),
+            other => Err(format!("unsupported output format: {}", other).into()),
+        }
+    }
+
+    fn from_path(image_path: &Path) -> Self {
+        image_path
+            .extension()
+            .and_then(|s| s.to_str())
+            .and_then(|ext| OutputFormat::from_name(ext).ok())
+            .unwrap_or(OutputFormat::Png)
+    }
+}
+
+impl PngCompression {
+    pub fn from_name(name: &str) -> Result<Self, BoxError> {
+        match name.to_ascii_lowercase().as_str() {
+            "" | "default" => Ok(PngCompression::Default),
+            "fast" => Ok(PngCompression::Fast),
+            "none" => Ok(PngCompression::None),
+            "best" => Ok(PngCompression::Best),
+            other => Err(format!("unsupported png compression: {}", other).into()),
+        }
+    }
+}
+
+impl PaddingWarningMode {
+    pub fn from_name(name: &str) -> Result<Self, BoxError> {
+        match name.to_ascii_lowercase().as_str() {
+            "" | "exact" => Ok(PaddingWarningMode::Exact),
+            "raster" => Ok(PaddingWarningMode::Raster),
+            other => Err(format!("unsupported padding warning mode: {}", other).into()),
+        }
+    }
+}
+
+impl CompactPayload {
+    fn set_padding_warning_mode(&mut self, mode: PaddingWarningMode) {
+        if let Some(config) = self.padding_warning.as_mut() {
+            config.mode = mode;
+        }
+    }
+
+    /// Size of the geometry buffers the payload was built from; per-phase
+    /// memory is reported as a multiple of it.
+    fn input_bytes(&self) -> usize {
+        payload_input_bytes(
+            &self.arrangement_input_segments,
+            &self.point_positions,
+            &self.polygons,
+        )
+    }
+}
+
+impl SegmentBitSet {
+    fn new(len: usize) -> Self {
+        SegmentBitSet {
+            len,
+            words: vec![0; len.div_ceil(64)],
+        }
+    }
+
+    fn insert(&mut self, index: usize) {
+        debug_assert!(index < self.len);
+        self.words[index / 64] |= 1 << (index % 64);
+    }
+
+    fn contains(&self, index: usize) -> bool {
+        self.words
+            .get(index / 64)
+            .map_or(false, |word| word & (1 << (index % 64)) != 0)
+    }
+
+    fn count(&self) -> usize {
+        self.words
+            .iter()
+            .map(|word| word.count_ones() as usize)
+            .sum()
+    }
+
+    fn iter(&self) -> impl Iterator<Item = usize> + '_ {
+        self.words
+            .iter()
+            .enumerate()
+            .flat_map(|(word_index, &word)| {
+                let mut remaining = word;
+                std::iter::from_fn(move || {
+                    if remaining == 0 {
+                        return None;
+                    }
+                    let bit = remaining.trailing_zeros() as usize;
+                    remaining &= remaining - 1;
+                    Some(word_index * 64 + bit)
+                })
+            })
+    }
+
+    fn heap_bytes(&self) -> usize {
+        self.words.capacity() * std::mem::size_of::<u64>()
+    }
+}
+
+impl TrackingAllocator {
+    fn record(delta: isize) {
+        let current = ALLOCATED_BYTES.fetch_add(delta, Ordering::Relaxed) + delta;
+        if delta > 0 {
+            PEAK_ALLOCATED_BYTES.fetch_max(current, Ordering::Relaxed);
+        }
+    }
+}
+
+unsafe impl GlobalAlloc for TrackingAllocator {
+    unsafe fn alloc(&self, layout: Layout) -> *mut u8 {
+        let pointer = System.alloc(layout);
+        if !pointer.is_null() && ALLOCATION_TRACKING.load(Ordering::Relaxed) {
+            Self::record(layout.size() as isize);
+        }
+        pointer
+    }
+
+    unsafe fn alloc_zeroed(&self, layout: Layout) -> *mut u8 {
+        let pointer = System.alloc_zeroed(layout);
+        if !pointer.is_null() && ALLOCATION_TRACKING.load(Ordering::Relaxed) {
+            Self::record(layout.size() as isize);
+        }
+        pointer
+    }
+
+    unsafe fn dealloc(&self, pointer: *mut u8, layout: Layout) {
+        System.dealloc(pointer, layout);
+        if ALLOCATION_TRACKING.load(Ordering::Relaxed) {
+            Self::record(-(layout.size() as isize));
+        }
+    }
+
+    unsafe fn realloc(&self, pointer: *mut u8, layout: Layout, new_size: usize) -> *mut u8 {
+        let new_pointer = System.realloc(pointer, layout, new_size);
+        if !new_pointer.is_null() && ALLOCATION_TRACKING.load(Ordering::Relaxed) {
+            Self::record(new_size as isize - layout.size() as isize);
+        }
+        new_pointer
+    }
+}
+
 fn profile_enabled() -> bool {
     std::env::var("EDGE_DRAWER_PROFILE")
         .map(|value| value == "1")
@@ -326,143 +771,613 @@ fn classification_detail_profile_enabled() -> bool {
 }
 
 fn log_profile(label: &str, started_at: Instant) {
+    let capturing = profile_capturing();
+    if !capturing && !profile_enabled() {
+        return;
+    }
+
+    let seconds = started_at.elapsed().as_secs_f64();
     if profile_enabled() {
-        eprintln!(
-            "edge_drawer: {} {:.4}s",
-            label,
-            started_at.elapsed().as_secs_f64()
-        );
+        eprintln!("edge_drawer: {} {:.4}s", label, seconds);
+    }
+    if capturing {
+        if let Some(capture) = lock_profile_capture().as_mut() {
+            let start_seconds = started_at
+                .saturating_duration_since(capture.origin)
+                .as_secs_f64();
+            capture.report.phases.push(ProfilePhase {
+                name: label.to_string(),
+                start_seconds,
+                seconds,
+                thread: PROFILE_THREAD_ID.with(|id| *id),
+            });
+        }
     }
 }
 
-fn default_padding_pixels() -> f32 {
-    8.0
+/// A phase recorded by a profile capture. `start_seconds` is measured from
+/// the start of the capture and `thread` numbers the thread that ran it.
+#[derive(Debug, Clone, PartialEq)]
+pub struct ProfilePhase {
+    pub name: String,
+    pub start_seconds: f64,
+    pub seconds: f64,
+    pub thread: usize,
 }
 
-fn default_warning_color() -> [u8; 4] {
-    DEFAULT_WARNING_COLOR
+/// Phase timings, work counters and heap peaks recorded while a profile
+/// capture was active: the same numbers the `EDGE_DRAWER_*PROFILE` variables
+/// print. Counters recorded more than once are summed; a phase that runs more
+/// than once keeps its largest peak.
+#[derive(Debug, Clone, Default, PartialEq)]
+pub struct ProfileReport {
+    pub phases: Vec<ProfilePhase>,
+    pub counters: Vec<(String, usize)>,
+    pub peak_bytes: Vec<(String, usize)>,
 }
 
-fn default_warning_width() -> f32 {
-    DEFAULT_WARNING_WIDTH
+impl ProfileReport {
+    /// Total seconds of every phase with the given name.
+    pub fn phase_seconds(&self, name: &str) -> f64 {
+        self.phases
+            .iter()
+            .filter(|phase| phase.name == name)
+            .map(|phase| phase.seconds)
+            .sum()
+    }
+
+    pub fn counter(&self, name: &str) -> Option<usize> {
+        self.counters
+            .iter()
+            .find(|(counter, _)| counter == name)
+            .map(|(_, value)| *value)
+    }
+
+    /// Largest heap peak recorded for the phase, in bytes.
+    pub fn peak_bytes(&self, phase: &str) -> Option<usize> {
+        self.peak_bytes
+            .iter()
+            .find(|(name, _)| name == phase)
+            .map(|(_, bytes)| *bytes)
+    }
+
+    fn add_peak_bytes(&mut self, phase: &str, bytes: usize) {
+        match self.peak_bytes.iter_mut().find(|(name, _)| name == phase) {
+            Some((_, peak)) => *peak = (*peak).max(bytes),
+            None => self.peak_bytes.push((phase.to_string(), bytes)),
+        }
+    }
+
+    fn add_counter(&mut self, name: &str, value: usize) {
+        match self
+            .counters
+            .iter_mut()
+            .find(|(counter, _)| counter == name)
+        {
+            Some((_, total)) => *total += value,
+            None => self.counters.push((name.to_string(), value)),
+        }
+    }
+
+    /// `{"phases": [{"name", "start", "seconds", "thread"}], "counters": {},
+    /// "peak_bytes": {}}`
+    pub fn to_json(&self) -> String {
+        let phases = self
+            .phases
+            .iter()
+            .map(|phase| {
+                serde_json::json!({
+                    "name": phase.name,
+                    "start": phase.start_seconds,
+                    "seconds": phase.seconds,
+                    "thread": phase.thread,
+                })
+            })
+            .collect::<Vec<_>>();
+        let as_object = |values: &[(String, usize)]| {
+            values
+                .iter()
+                .map(|(name, value)| (name.clone(), serde_json::Value::from(*value)))
+                .collect::<serde_json::Map<_, _>>()
+        };
+        serde_json::json!({
+            "phases": phases,
+            "counters": as_object(&self.counters),
+            "peak_bytes": as_object(&self.peak_bytes),
+        })
+        .to_string()
+    }
 }
 
-fn default_island_fill_opacity() -> f32 {
-    DEFAULT_ISLAND_FILL_OPACITY
+struct ProfileCapture {
+    origin: Instant,
+    report: ProfileReport,
 }
 
-fn default_island_fill_padding_pixels() -> f32 {
-    DEFAULT_ISLAND_FILL_PADDING_PIXELS
+fn lock_profile_capture() -> std::sync::MutexGuard<'static, Option<ProfileCapture>> {
+    PROFILE_CAPTURE
+        .lock()
+        .unwrap_or_else(|poisoned| poisoned.into_inner())
 }
 
-pub fn parse_edges_json(edges_json: &str) -> Result<Vec<Edges>, BoxError> {
-    Ok(parse_drawer_payload(edges_json)?.edges)
+fn profile_capturing() -> bool {
+    PROFILE_CAPTURE_ACTIVE.load(Ordering::Relaxed)
 }
 
-pub fn parse_drawer_payload(edges_json: &str) -> Result<DrawerPayload, BoxError> {
-    let payload_value: serde_json::Value = serde_json::from_str(edges_json)?;
+fn record_profile_counter(name: &str, value: usize) {
+    if !profile_capturing() {
+        return;
+    }
+    if let Some(capture) = lock_profile_capture().as_mut() {
+        capture.report.add_counter(name, value);
+    }
+}
 
-    if payload_value.is_array() {
-        let edges = serde_json::from_value(payload_value)?;
-        return Ok(DrawerPayload {
-            edges,
-            polygons: Vec::new(),
-            padding_warning: None,
-            island_fill: None,
-        });
+/// Starts recording phase timings and counters. Captures do not nest: while
+/// one is running this returns `false` and leaves it untouched, so what
+/// follows is recorded into the running capture. The capture is
+/// process-wide, so renders running concurrently on other threads are
+/// recorded as well.
+pub fn start_profile_capture() -> bool {
+    let mut capture = lock_profile_capture();
+    if capture.is_some() {
+        return false;
     }
+    *capture = Some(ProfileCapture {
+        origin: Instant::now(),
+        report: ProfileReport::default(),
+    });
+    PROFILE_CAPTURE_ACTIVE.store(true, Ordering::Relaxed);
+    true
+}
 
-    let payload_object = payload_value
-        .as_object()
-        .ok_or_else(|| "Expected payload to be an array or object".to_string())?;
+/// Stops the capture and returns what it recorded; empty when none was
+/// running. Allocation tracking stops with the last phase still measuring.
+pub fn finish_profile_capture() -> ProfileReport {
+    PROFILE_CAPTURE_ACTIVE.store(false, Ordering::Relaxed);
+    stop_idle_allocation_tracking(&lock_memory_phases());
+    lock_profile_capture()
+        .take()
+        .map(|capture| capture.report)
+        .unwrap_or_default()
+}
 
-    let edges_value = payload_object
-        .get("edges")
-        .cloned()
-        .ok_or_else(|| "Expected object payload to contain 'edges'".to_string())?;
-    let edges = serde_json::from_value(edges_value)?;
-    let polygons = match payload_object.get("polygons").cloned() {
-        Some(value) => serde_json::from_value(value)?,
-        None => Vec::new(),
-    };
-    let padding_warning = match payload_object.get("padding_warning").cloned() {
-        Some(value) if !value.is_null() => Some(serde_json::from_value(value)?),
-        None => None,
-        _ => None,
-    };
-    let island_fill = match payload_object.get("island_fill").cloned() {
-        Some(value) if !value.is_null() => Some(serde_json::from_value(value)?),
-        None => None,
-        _ => None,
-    };
+/// Runs `run` inside a profile capture and returns what it recorded. These
+/// are the phases and counters the `EDGE_DRAWER_*PROFILE` variables print,
+/// recorded whether or not those variables are set. Inside another capture
+/// the report is empty and `run` is recorded by the outer one.
+pub fn capture_profile<R>(run: impl FnOnce() -> R) -> (R, ProfileReport) {
+    if !start_profile_capture() {
+        return (run(), ProfileReport::default());
+    }
+    let result = run();
+    (result, finish_profile_capture())
+}
 
-    Ok(DrawerPayload {
-        edges,
-        polygons,
-        padding_warning,
-        island_fill,
-    })
+/// A phase measuring its heap peak. Dropping it, on success or on an early
+/// return, ends the measurement.
+struct PhaseMemory {
+    baseline: isize,
 }
 
-pub fn load_edges_input(edges_arg: &str) -> Result<DrawerPayload, BoxError> {
-    if Path::new(edges_arg).exists() {
-        let file_contents = fs::read_to_string(edges_arg)?;
-        parse_drawer_payload(&file_contents)
-    } else {
-        parse_drawer_payload(edges_arg)
+impl Drop for PhaseMemory {
+    fn drop(&mut self) {
+        let mut active = lock_memory_phases();
+        *active = active.saturating_sub(1);
+        stop_idle_allocation_tracking(&active);
     }
 }
 
-pub fn draw_to_path(
-    image_path: &Path,
-    width: u32,
-    height: u32,
-    edges_json: &str,
-) -> Result<(), BoxError> {
-    let payload = parse_drawer_payload(edges_json)?;
-    draw_to_path_from_payload(image_path, width, height, &payload)
+fn lock_memory_phases() -> std::sync::MutexGuard<'static, usize> {
+    MEMORY_PHASES
+        .lock()
+        .unwrap_or_else(|poisoned| poisoned.into_inner())
 }
 
-pub fn draw_to_path_from_input(
-    image_path: &Path,
-    width: u32,
-    height: u32,
-    edges_input: &str,
-) -> Result<(), BoxError> {
-    let payload = load_edges_input(edges_input)?;
-    draw_to_path_from_payload(image_path, width, height, &payload)
+/// Turns allocation tracking off once no phase is measuring.
+fn stop_idle_allocation_tracking(active: &usize) {
+    if *active == 0 {
+        ALLOCATION_TRACKING.store(false, Ordering::Relaxed);
+    }
 }
 
-pub fn draw_to_path_from_payload(
-    image_path: &Path,
-    width: u32,
-    height: u32,
-    payload: &DrawerPayload,
-) -> Result<(), BoxError> {
-    let prepare_started_at = Instant::now();
-    let prepared = prepare_drawing(
-        &payload.edges,
-        &payload.polygons,
-        width,
-        height,
-        payload.padding_warning.as_ref(),
-        payload.island_fill.as_ref(),
-    );
-    log_profile("prepare_total", prepare_started_at);
+/// Starts measuring the heap peak of a phase, or returns `None` when
+/// profiling is off. The first phase to start resets the counters; later
+/// phases overlapping it keep the shared peak, so a peak is the highest live
+/// heap any concurrent phase reached since the oldest of them began,
+/// measured from this phase's own start.
+fn phase_memory_start() -> Option<PhaseMemory> {
+    if !profile_enabled() && !profile_capturing() {
+        return None;
+    }
+    Some(begin_phase_memory())
+}
 
-    if image_path.extension().and_then(|s| s.to_str()) == Some("svg") {
-        let render_started_at = Instant::now();
-        let document = draw_edges_svg(&prepared, width, height);
-        log_profile("render_svg", render_started_at);
-        save_svg(&document, image_path)?;
+fn begin_phase_memory() -> PhaseMemory {
+    let mut active = lock_memory_phases();
+    if *active == 0 {
+        ALLOCATED_BYTES.store(0, Ordering::Relaxed);
+        PEAK_ALLOCATED_BYTES.store(0, Ordering::Relaxed);
+        ALLOCATION_TRACKING.store(true, Ordering::Relaxed);
+    }
+    *active += 1;
+    PhaseMemory {
+        baseline: ALLOCATED_BYTES.load(Ordering::Relaxed),
+    }
+}
+
+/// Returns the heap peak reached since `phase_memory_start` and records it in
+/// the profile capture.
+fn finish_phase_memory(label: &str, phase: Option<PhaseMemory>) -> Option<usize> {
+    let phase = phase?;
+    let peak = (PEAK_ALLOCATED_BYTES.load(Ordering::Relaxed) - phase.baseline).max(0) as usize;
+    if profile_capturing() {
+        if let Some(capture) = lock_profile_capture().as_mut() {
+            capture.report.add_peak_bytes(label, peak);
+        }
+    }
+    Some(peak)
+}
+
+/// Logs the heap peak reached since `phase_memory_start`, in bytes and as a
+/// multiple of the payload geometry it was prepared from.
+fn log_phase_memory(label: &str, phase: Option<PhaseMemory>, input_bytes: usize) {
+    let Some(peak) = finish_phase_memory(label, phase) else {
+        return;
+    };
+    if !profile_enabled() {
+        return;
+    }
+    let ratio = peak as f64 / input_bytes.max(1) as f64;
+    eprintln!(
+        "edge_drawer: {}_peak_bytes={} input_bytes={} ratio={:.2}{}",
+        label,
+        peak,
+        input_bytes,
+        ratio,
+        if ratio > MEMORY_TARGET_INPUT_RATIO && input_bytes >= MEMORY_TARGET_MIN_INPUT_BYTES {
+            " over_target"
+        } else {
+            ""
+        }
+    );
+}
+
+/// Logs the heap peak of a render phase next to the size of a full RGBA
+/// canvas, which dominates raster output.
+fn log_render_memory(label: &str, phase: Option<PhaseMemory>, width: u32, height: u32) {
+    let Some(peak) = finish_phase_memory(label, phase) else {
+        return;
+    };
+    if profile_enabled() {
+        eprintln!(
+            "edge_drawer: {}_peak_bytes={} canvas_bytes={}",
+            label,
+            peak,
+            width as usize * height as usize * 4
+        );
+    }
+}
+
+/// Bytes of the payload geometry buffers: quantized segments, their exact
+/// UVs and the polygon rings.
+fn payload_input_bytes(
+    segments: &[CanonicalSegment],
+    point_positions: &HashMap<QPoint, [f32; 2]>,
+    polygons: &[Polygon],
+) -> usize {
+    segments.len() * std::mem::size_of::<CanonicalSegment>()
+        + point_positions.len() * std::mem::size_of::<(QPoint, [f32; 2])>()
+        + polygons
+            .iter()
+            .map(|polygon| polygon.points.len() * std::mem::size_of::<[f32; 2]>())
+            .sum::<usize>()
+}
+
+/// Overrides the native worker thread count. `0` restores the default, which
+/// honours `EDGE_DRAWER_THREADS` and otherwise uses the available parallelism.
+pub fn set_worker_threads(count: usize) {
+    WORKER_THREADS_OVERRIDE.store(count, Ordering::Relaxed);
+}
+
+/// Overrides the number of decimals written for SVG coordinates. `None`
+/// restores the default, which honours `EDGE_DRAWER_SVG_PRECISION`.
+pub fn set_svg_precision(digits: Option<usize>) {
+    let stored = digits.map_or(0, |digits| digits.min(SVG_MAX_PRECISION) + 1);
+    SVG_PRECISION_OVERRIDE.store(stored, Ordering::Relaxed);
+}
+
+pub fn svg_precision() -> usize {
+    let stored = SVG_PRECISION_OVERRIDE.load(Ordering::Relaxed);
+    if stored >= 1 {
+        return stored - 1;
+    }
+
+    std::env::var("EDGE_DRAWER_SVG_PRECISION")
+        .ok()
+        .and_then(|value| value.parse::<usize>().ok())
+        .map_or(SVG_DEFAULT_PRECISION, |digits| {
+            digits.min(SVG_MAX_PRECISION)
+        })
+}
+
+pub fn worker_threads() -> usize {
+    let override_count = WORKER_THREADS_OVERRIDE.load(Ordering::Relaxed);
+    if override_count >= 1 {
+        return override_count;
+    }
+
+    if let Ok(value) = std::env::var("EDGE_DRAWER_THREADS") {
+        if let Ok(parsed) = value.parse::<usize>() {
+            if parsed >= 1 {
+                return parsed;
+            }
+        }
+    }
+
+    thread::available_parallelism()
+        .map(|count| count.get())
+        .unwrap_or(1)
+}
+
+fn parallel_worker_count(item_count: usize, min_items_per_worker: usize) -> usize {
+    let max_workers = item_count / min_items_per_worker.max(1);
+    worker_threads().min(max_workers).max(1)
+}
+
+/// Runs `process` over contiguous chunks of `items` and returns the per-chunk
+/// results in input order, so callers can merge them deterministically.
+fn parallel_chunks<T, R, F>(items: &[T], workers: usize, process: F) -> Vec<R>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&[T]) -> R + Sync,
+{
+    if workers <= 1 || items.len() <= 1 {
+        return vec![process(items)];
+    }
+
+    let chunk_size = items.len().div_ceil(workers);
+    let process = &process;
+    thread::scope(|scope| {
+        let handles = items
+            .chunks(chunk_size)
+            .map(|chunk| scope.spawn(move || process(chunk)))
+            .collect::<Vec<_>>();
+        handles
+            .into_iter()
+            .map(|handle| handle.join().expect("edge_drawer worker thread panicked"))
+            .collect()
+    })
+}
+
+/// Hands `block_count` blocks out to worker threads on demand and returns the
+/// per-block results in block order. Each worker owns one `init()` state.
+fn parallel_blocks<S, R, I, F>(block_count: usize, workers: usize, init: I, process: F) -> Vec<R>
+where
+    R: Send,
+    I: Fn() -> S + Sync,
+    F: Fn(&mut S, usize) -> R + Sync,
+{
+    if workers <= 1 || block_count <= 1 {
+        let mut state = init();
+        return (0..block_count)
+            .map(|block| process(&mut state, block))
+            .collect();
+    }
+
+    let next_block = AtomicUsize::new(0);
+    let (init, process, next_block) = (&init, &process, &next_block);
+    let mut results = thread::scope(|scope| {
+        let handles = (0..workers.min(block_count))
+            .map(|_| {
+                scope.spawn(move || {
+                    let mut state = init();
+                    let mut results = Vec::new();
+                    loop {
+                        let block = next_block.fetch_add(1, Ordering::Relaxed);
+                        if block >= block_count {
+                            break;
+                        }
+                        results.push((block, process(&mut state, block)));
+                    }
+                    results
+                })
+            })
+            .collect::<Vec<_>>();
+        handles
+            .into_iter()
+            .flat_map(|handle| handle.join().expect("edge_drawer worker thread panicked"))
+            .collect::<Vec<_>>()
+    });
+    results.sort_unstable_by_key(|(block, _)| *block);
+    results.into_iter().map(|(_, result)| result).collect()
+}
+
+fn default_padding_pixels() -> f32 {
+    8.0
+}
+
+fn default_warning_color() -> [u8; 4] {
+    DEFAULT_WARNING_COLOR
+}
+
+fn default_warning_width() -> f32 {
+    DEFAULT_WARNING_WIDTH
+}
+
+fn default_island_fill_opacity() -> f32 {
+    DEFAULT_ISLAND_FILL_OPACITY
+}
+
+fn default_island_fill_padding_pixels() -> f32 {
+    DEFAULT_ISLAND_FILL_PADDING_PIXELS
+}
+
+pub fn parse_edges_json(edges_json: &str) -> Result<Vec<Edges>, BoxError> {
+    Ok(parse_drawer_payload(edges_json)?.edges)
+}
+
+pub fn parse_drawer_payload(edges_json: &str) -> Result<DrawerPayload, BoxError> {
+    let payload_value: serde_json::Value = serde_json::from_str(edges_json)?;
+
+    if payload_value.is_array() {
+        let edges = serde_json::from_value(payload_value)?;
+        return Ok(DrawerPayload {
+            edges,
+            polygons: Vec::new(),
+            padding_warning: None,
+            island_fill: None,
+            antialias: true,
+        });
+    }
+
+    let payload_object = payload_value
+        .as_object()
+        .ok_or_else(|| "Expected payload to be an array or object".to_string())?;
+
+    let edges_value = payload_object
+        .get("edges")
+        .cloned()
+        .ok_or_else(|| "Expected object payload to contain 'edges'".to_string())?;
+    let edges = serde_json::from_value(edges_value)?;
+    let polygons = match payload_object.get("polygons").cloned() {
+        Some(value) => serde_json::from_value(value)?,
+        None => Vec::new(),
+    };
+    let padding_warning = match payload_object.get("padding_warning").cloned() {
+        Some(value) if !value.is_null() => Some(serde_json::from_value(value)?),
+        None => None,
+        _ => None,
+    };
+    let island_fill = match payload_object.get("island_fill").cloned() {
+        Some(value) if !value.is_null() => Some(serde_json::from_value(value)?),
+        None => None,
+        _ => None,
+    };
+
+    let antialias = match payload_object.get("antialias") {
+        Some(value) if !value.is_null() => serde_json::from_value(value.clone())?,
+        _ => true,
+    };
+
+    Ok(DrawerPayload {
+        edges,
+        polygons,
+        padding_warning,
+        island_fill,
+        antialias,
+    })
+}
+
+pub fn load_edges_input(edges_arg: &str) -> Result<DrawerPayload, BoxError> {
+    if Path::new(edges_arg).exists() {
+        let file_contents = fs::read_to_string(edges_arg)?;
+        parse_drawer_payload(&file_contents)
     } else {
-        let render_started_at = Instant::now();
-        let pixmap = draw_edges_raster(&prepared, width, height)?;
-        log_profile("render_raster", render_started_at);
-        save_image(&pixmap, image_path)?;
+        parse_drawer_payload(edges_arg)
     }
+}
 
-    Ok(())
+pub fn draw_to_path(
+    image_path: &Path,
+    width: u32,
+    height: u32,
+    edges_json: &str,
+) -> Result<(), BoxError> {
+    draw_to_path_with_compression(
+        image_path,
+        width,
+        height,
+        edges_json,
+        PngCompression::Default,
+    )
+}
+
+pub fn draw_to_path_with_compression(
+    image_path: &Path,
+    width: u32,
+    height: u32,
+    edges_json: &str,
+    png_compression: PngCompression,
+) -> Result<(), BoxError> {
+    let payload = parse_drawer_payload(edges_json)?;
+    draw_to_path_from_payload(image_path, width, height, &payload, png_compression)
+}
+
+pub fn draw_to_path_from_input(
+    image_path: &Path,
+    width: u32,
+    height: u32,
+    edges_input: &str,
+    png_compression: PngCompression,
+) -> Result<(), BoxError> {
+    let payload = load_edges_input(edges_input)?;
+    draw_to_path_from_payload(image_path, width, height, &payload, png_compression)
+}
+
+pub fn draw_to_path_from_payload(
+    image_path: &Path,
+    width: u32,
+    height: u32,
+    payload: &DrawerPayload,
+    png_compression: PngCompression,
+) -> Result<(), BoxError> {
+    let prepare_started_at = Instant::now();
+    let mut prepared = prepare_drawing(
+        &payload.edges,
+        &payload.polygons,
+        width,
+        height,
+        payload.padding_warning.as_ref(),
+        payload.island_fill.as_ref(),
+    );
+    prepared.antialias = payload.antialias;
+    log_profile("prepare_total", prepare_started_at);
+
+    draw_prepared_to_path(&prepared, image_path, width, height, png_compression)
+}
+
+pub fn draw_to_bytes(
+    format: &str,
+    width: u32,
+    height: u32,
+    edges_json: &str,
+    png_compression: PngCompression,
+) -> Result<Vec<u8>, BoxError> {
+    let payload = parse_drawer_payload(edges_json)?;
+    draw_to_bytes_from_payload(format, width, height, &payload, png_compression)
+}
+
+pub fn draw_to_bytes_from_payload(
+    format: &str,
+    width: u32,
+    height: u32,
+    payload: &DrawerPayload,
+    png_compression: PngCompression,
+) -> Result<Vec<u8>, BoxError> {
+    let format = OutputFormat::from_name(format)?;
+    let prepare_started_at = Instant::now();
+    let mut prepared = prepare_drawing(
+        &payload.edges,
+        &payload.polygons,
+        width,
+        height,
+        payload.padding_warning.as_ref(),
+        payload.island_fill.as_ref(),
+    );
+    prepared.antialias = payload.antialias;
+    log_profile("prepare_total", prepare_started_at);
+
+    render_prepared_to_bytes(&prepared, width, height, format, png_compression)
+}
+
+/// Renders one payload to several outputs. The resolution-independent
+/// preparation is shared through the geometry cache and the outputs are
+/// rendered and encoded in parallel.
+pub fn draw_to_paths(edges_json: &str, outputs: &[OutputSpec]) -> Result<(), BoxError> {
+    let payload = parse_drawer_payload(edges_json)?;
+    draw_compact_payload_to_paths(&compact_payload_from_drawer_payload(&payload), outputs)
 }
 
 pub fn draw_to_path_from_edges(
@@ -480,67 +1395,247 @@ pub fn draw_to_path_from_edges(
             polygons: Vec::new(),
             padding_warning: None,
             island_fill: None,
+            antialias: true,
+        },
+        PngCompression::Default,
+    )
+}
+
+fn prepare_drawing(
+    edges: &[Edges],
+    polygons: &[Polygon],
+    width: u32,
+    height: u32,
+    padding_warning: Option<&PaddingWarningConfig>,
+    island_fill: Option<&IslandFillConfig>,
+) -> PreparedDrawing {
+    let arrangement_started_at = Instant::now();
+    let styles = draw_styles(edges);
+    let cull_rect = output_cull_rect(&styles, width, height, padding_warning, island_fill);
+    let inputs = collect_arrangement_inputs(edges);
+    let input_bytes =
+        payload_input_bytes(&inputs.original_segments, &inputs.point_positions, polygons);
+    let geometry = prepare_geometry(
+        &inputs.original_segments,
+        &inputs.point_positions,
+        &inputs.group_segments,
+        &inputs.group_segment_indices,
+        polygons,
+        &geometry_cull_rect(&cull_rect),
+        geometry_cache(),
+        arrangement_started_at,
+        input_bytes,
+    );
+    prepare_drawing_with_geometry(
+        &DrawingInputs {
+            styles: &styles,
+            polygons,
+            padding_warning,
+            island_fill,
+            antialias: true,
+            input_bytes,
+        },
+        &geometry,
+        width,
+        height,
+    )
+}
+
+fn prepare_drawing_from_compact(
+    payload: &CompactPayload,
+    width: u32,
+    height: u32,
+    width_scale: f32,
+) -> PreparedDrawing {
+    let arrangement_started_at = Instant::now();
+    let cull_rect = compact_output_cull_rect(payload, width, height, width_scale);
+    let geometry = prepare_compact_geometry(
+        payload,
+        &geometry_cull_rect(&cull_rect),
+        geometry_cache(),
+        arrangement_started_at,
+    );
+    prepare_compact_drawing(payload, &geometry, width, height, width_scale)
+}
+
+/// Prepares every output of a batch from one geometry, culled to the widest
+/// output's rect, so the arrangement is built at most once per batch
+/// whatever the cache holds.
+fn prepare_compact_outputs(
+    payload: &CompactPayload,
+    outputs: &[OutputSpec],
+    cache: Option<&GeometryCache>,
+) -> Vec<PreparedDrawing> {
+    let arrangement_started_at = Instant::now();
+    let Some(cull_rect) = outputs
+        .iter()
+        .map(|output| {
+            geometry_cull_rect(&compact_output_cull_rect(
+                payload,
+                output.width,
+                output.height,
+                output.width_scale,
+            ))
+        })
+        .reduce(|left, right| UvRect {
+            min: [left.min[0].min(right.min[0]), left.min[1].min(right.min[1])],
+            max: [left.max[0].max(right.max[0]), left.max[1].max(right.max[1])],
+        })
+    else {
+        return Vec::new();
+    };
+    let geometry = prepare_compact_geometry(payload, &cull_rect, cache, arrangement_started_at);
+    outputs
+        .iter()
+        .map(|output| {
+            prepare_compact_drawing(
+                payload,
+                &geometry,
+                output.width,
+                output.height,
+                output.width_scale,
+            )
+        })
+        .collect()
+}
+
+fn compact_output_cull_rect(
+    payload: &CompactPayload,
+    width: u32,
+    height: u32,
+    width_scale: f32,
+) -> UvRect {
+    let (styles, padding_warning, island_fill) = scaled_payload_style(payload, width_scale);
+    output_cull_rect(
+        &styles,
+        width,
+        height,
+        padding_warning.as_ref(),
+        island_fill.as_ref(),
+    )
+}
+
+fn prepare_compact_geometry(
+    payload: &CompactPayload,
+    cull_rect: &UvRect,
+    cache: Option<&GeometryCache>,
+    arrangement_started_at: Instant,
+) -> Arc<PreparedGeometry> {
+    prepare_geometry(
+        &payload.arrangement_input_segments,
+        &payload.point_positions,
+        &payload.arrangement_input_group_segments,
+        &payload.arrangement_input_group_segment_indices,
+        &payload.polygons,
+        cull_rect,
+        cache,
+        arrangement_started_at,
+        payload.input_bytes(),
+    )
+}
+
+/// Styles, polygons and output settings a drawing is prepared from,
+/// borrowed from a `DrawerPayload` or a width-scaled `CompactPayload`.
+struct DrawingInputs<'a> {
+    styles: &'a [DrawStyle],
+    polygons: &'a [Polygon],
+    padding_warning: Option<&'a PaddingWarningConfig>,
+    island_fill: Option<&'a IslandFillConfig>,
+    antialias: bool,
+    input_bytes: usize,
+}
+
+/// Prepares one output of `payload` at `width_scale` over `geometry`.
+fn prepare_compact_drawing(
+    payload: &CompactPayload,
+    geometry: &PreparedGeometry,
+    width: u32,
+    height: u32,
+    width_scale: f32,
+) -> PreparedDrawing {
+    let (styles, padding_warning, island_fill) = scaled_payload_style(payload, width_scale);
+    prepare_drawing_with_geometry(
+        &DrawingInputs {
+            styles: &styles,
+            polygons: &payload.polygons,
+            padding_warning: padding_warning.as_ref(),
+            island_fill: island_fill.as_ref(),
+            antialias: payload.antialias,
+            input_bytes: payload.input_bytes(),
         },
+        geometry,
+        width,
+        height,
     )
 }
 
-fn prepare_drawing(
-    edges: &[Edges],
-    polygons: &[Polygon],
+/// Styles, fills and warnings of one output over a geometry culled to a
+/// rect containing the output's own.
+fn prepare_drawing_with_geometry(
+    inputs: &DrawingInputs,
+    geometry: &PreparedGeometry,
     width: u32,
     height: u32,
-    padding_warning: Option<&PaddingWarningConfig>,
-    island_fill: Option<&IslandFillConfig>,
 ) -> PreparedDrawing {
-    let arrangement_started_at = Instant::now();
-    let styles = edges
-        .iter()
-        .map(|group| DrawStyle {
-            internal_width: group.effective_internal_width().max(0.0),
-            outline_width: group.effective_outline_width().max(0.0),
-            internal_color: group.effective_internal_color(),
-            outline_color: group.effective_outline_color(),
-            draw_outline: group.effective_draw_outline(),
-            draw_internal: group.effective_draw_internal(),
-        })
-        .collect::<Vec<_>>();
-    let arrangement = build_segment_arrangement(edges);
-    log_profile("arrangement", arrangement_started_at);
-
-    let classification_started_at = Instant::now();
-    let (internal_segments, outline_segments) = classify_segments(
-        &arrangement.segments,
-        &arrangement.point_positions,
+    let DrawingInputs {
+        styles,
         polygons,
-    );
-    log_profile("classification", classification_started_at);
+        padding_warning,
+        island_fill,
+        antialias,
+        input_bytes,
+    } = *inputs;
+    let cull_rect = output_cull_rect(styles, width, height, padding_warning, island_fill);
+    let fill_groups = island_fill_enabled(island_fill).then(|| polygon_fill_groups(polygons));
+    let culled_polygons = cull_polygons(polygons, &cull_rect, fill_groups.as_ref());
+    let (polygons, fill_groups) = match &culled_polygons {
+        Some((kept, kept_groups)) => (kept.as_slice(), kept_groups.as_ref()),
+        None => (polygons, fill_groups.as_ref()),
+    };
+    let arrangement = &geometry.arrangement;
+    let internal_segments = &geometry.internal_segments;
+    let outline_segments = &geometry.outline_segments;
 
     let warning_started_at = Instant::now();
-    let warning_segments = detect_padding_warning_segments(
-        &outline_segments,
-        &arrangement.point_positions,
-        width,
-        height,
-        padding_warning,
-    );
+    let warning_memory = phase_memory_start();
+    let warning_segments = match padding_warning {
+        Some(config) if config.enabled && config.mode == PaddingWarningMode::Raster => {
+            detect_padding_warning_segments_raster(
+                geometry.outline_topology(),
+                width,
+                height,
+                config,
+            )
+        }
+        Some(config) if config.enabled => {
+            let distances = geometry.padding_distances(width, height, config.padding_pixels);
+            detect_padding_warning_segments(geometry.outline_topology(), &distances, Some(config))
+        }
+        _ => SegmentBitSet::default(),
+    };
     log_profile("warning", warning_started_at);
+    log_phase_memory("warning", warning_memory, input_bytes);
 
     let fill_started_at = Instant::now();
-    let fills = build_island_fills(polygons, island_fill, width, height);
+    let fill_memory = phase_memory_start();
+    let fills = build_island_fills(polygons, fill_groups, island_fill, width, height);
     log_profile("island_fill", fill_started_at);
+    log_phase_memory("island_fill", fill_memory, input_bytes);
 
     let path_started_at = Instant::now();
+    let path_memory = phase_memory_start();
     let mut normal_bucket_order = Vec::new();
     let mut overlay_bucket_order = Vec::new();
     let mut normal_buckets = HashMap::new();
     let mut overlay_buckets = HashMap::new();
 
-    for (style, group_segments) in styles.iter().zip(arrangement.group_segments.iter()) {
+    for (style, group_segment_ids) in styles.iter().zip(arrangement.group_segment_ids.iter()) {
         append_bucket_segments(
             style,
-            group_segments,
-            &internal_segments,
-            &outline_segments,
+            group_segment_ids,
+            &arrangement.segments,
+            internal_segments,
+            outline_segments,
             &warning_segments,
             padding_warning,
             &mut normal_buckets,
@@ -556,80 +1651,574 @@ fn prepare_drawing(
         &mut overlay_buckets,
     ));
     log_profile("path_build", path_started_at);
+    log_phase_memory("path_build", path_memory, input_bytes);
 
-    PreparedDrawing { fills, groups }
+    PreparedDrawing {
+        fills,
+        groups,
+        antialias,
+    }
 }
 
-fn prepare_drawing_from_compact(
+fn draw_styles(edges: &[Edges]) -> Vec<DrawStyle> {
+    edges
+        .iter()
+        .map(|group| DrawStyle {
+            internal_width: group.effective_internal_width().max(0.0),
+            outline_width: group.effective_outline_width().max(0.0),
+            internal_color: group.effective_internal_color(),
+            outline_color: group.effective_outline_color(),
+            draw_outline: group.effective_draw_outline(),
+            draw_internal: group.effective_draw_internal(),
+        })
+        .collect()
+}
+
+/// Styles of `payload` with stroke widths and paddings multiplied by
+/// `width_scale`, floored the way the UI floors them for previews.
+fn scaled_payload_style(
     payload: &CompactPayload,
-    width: u32,
-    height: u32,
-) -> PreparedDrawing {
-    let arrangement_started_at = Instant::now();
+    width_scale: f32,
+) -> (
+    Vec<DrawStyle>,
+    Option<PaddingWarningConfig>,
+    Option<IslandFillConfig>,
+) {
+    let mut styles = payload.styles.clone();
+    let mut padding_warning = payload.padding_warning.clone();
+    let mut island_fill = payload.island_fill.clone();
+    if width_scale != 1.0 {
+        for style in &mut styles {
+            style.internal_width *= width_scale;
+            style.outline_width *= width_scale;
+        }
+        if let Some(config) = padding_warning.as_mut() {
+            config.padding_pixels = (config.padding_pixels * width_scale).max(1.0);
+            config.warning_width = (config.warning_width * width_scale).max(1.0);
+        }
+        if let Some(config) = island_fill.as_mut() {
+            config.padding_pixels = (config.padding_pixels * width_scale).max(0.0);
+        }
+    }
+    (styles, padding_warning, island_fill)
+}
+
+/// Returns the arrangement and classification for the given inputs, reusing
+/// a cached result when the same geometry was prepared before at any
+/// resolution. Inputs outside `cull_rect` are dropped before the arrangement
+/// is built; the cache is keyed on the unculled inputs and the rect.
+#[allow(clippy::too_many_arguments)]
+fn prepare_geometry(
+    segments: &[CanonicalSegment],
+    point_positions: &Arc<HashMap<QPoint, [f32; 2]>>,
+    group_segments: &[Vec<CanonicalSegment>],
+    group_segment_indices: &[Vec<usize>],
+    polygons: &[Polygon],
+    cull_rect: &UvRect,
+    cache: Option<&GeometryCache>,
+    arrangement_started_at: Instant,
+    input_bytes: usize,
+) -> Arc<PreparedGeometry> {
+    let (key, inputs) = if let Some(cache) = cache {
+        let key_started_at = Instant::now();
+        let (key, inputs) = geometry_cache_key(
+            segments,
+            point_positions,
+            group_segments,
+            polygons,
+            cull_rect,
+        );
+        let cached = cache.get(key, &inputs);
+        log_profile("geometry_key", key_started_at);
+        if let Some(geometry) = cached {
+            if profile_enabled() {
+                eprintln!("edge_drawer: geometry_cache hit");
+            }
+            record_profile_counter("geometry_cache_hits", 1);
+            return geometry;
+        }
+        (Some(key), Some(inputs))
+    } else {
+        (None, None)
+    };
+
+    let culled_inputs =
+        cull_arrangement_inputs(segments, point_positions, group_segments, cull_rect);
+    let (segments, group_segment_indices) = match &culled_inputs {
+        Some(culled) => (
+            culled.original_segments.as_slice(),
+            culled.group_segment_indices.as_slice(),
+        ),
+        None => (segments, group_segment_indices),
+    };
+    let culled_polygons = cull_polygons(polygons, cull_rect, None);
+    let polygons = match &culled_polygons {
+        Some((kept, _)) => kept.as_slice(),
+        None => polygons,
+    };
+
+    let arrangement_memory = phase_memory_start();
     let arrangement = build_segment_arrangement_from_parts(
-        payload.arrangement_input_segments.clone(),
-        Arc::clone(&payload.point_positions),
-        &payload.arrangement_input_group_segments,
-        &payload.arrangement_input_group_segment_indices,
+        segments.to_vec(),
+        Arc::clone(point_positions),
+        group_segment_indices,
     );
     log_profile("arrangement", arrangement_started_at);
+    log_phase_memory("arrangement", arrangement_memory, input_bytes);
+    #[cfg(test)]
+    ARRANGEMENT_BUILDS.with(|builds| builds.set(builds.get() + 1));
 
     let classification_started_at = Instant::now();
+    let classification_memory = phase_memory_start();
     let (internal_segments, outline_segments) = classify_segments(
         &arrangement.segments,
         &arrangement.point_positions,
-        &payload.polygons,
+        polygons,
     );
     log_profile("classification", classification_started_at);
+    log_phase_memory("classification", classification_memory, input_bytes);
+
+    let geometry = Arc::new(PreparedGeometry {
+        arrangement,
+        internal_segments,
+        outline_segments,
+        outline: OnceLock::new(),
+        padding_indexes: Mutex::new(Vec::new()),
+        inputs,
+    });
+    if profile_enabled() || profile_capturing() {
+        let geometry_bytes = geometry.heap_bytes();
+        let segment_count = geometry.arrangement.segments.len();
+        let internal_count = geometry.internal_segments.count();
+        let outline_count = geometry.outline_segments.count();
+        if profile_enabled() {
+            eprintln!(
+                "edge_drawer: geometry_bytes={} input_bytes={} segments={} internal={} outline={}",
+                geometry_bytes, input_bytes, segment_count, internal_count, outline_count,
+            );
+        }
+        record_profile_counter("geometry_bytes", geometry_bytes);
+        record_profile_counter("input_bytes", input_bytes);
+        record_profile_counter("arrangement_segments", segment_count);
+        record_profile_counter("internal_segments", internal_count);
+        record_profile_counter("outline_segments", outline_count);
+    }
+    if let (Some(key), Some(cache)) = (key, cache) {
+        cache.store(key, Arc::clone(&geometry));
+    }
+    geometry
+}
+
+impl PreparedGeometry {
+    /// Heap bytes this geometry keeps alive while cached. The base point
+    /// positions are shared with the payload and not counted.
+    fn heap_bytes(&self) -> usize {
+        let arrangement = &self.arrangement;
+        let mut bytes = arrangement.segments.capacity() * std::mem::size_of::<CanonicalSegment>()
+            + arrangement.point_positions.extra.capacity()
+                * std::mem::size_of::<(QPoint, [f32; 2])>()
+            + arrangement
+                .group_segment_ids
+                .iter()
+                .map(|ids| ids.capacity() * std::mem::size_of::<u32>())
+                .sum::<usize>()
+            + self.internal_segments.heap_bytes()
+            + self.outline_segments.heap_bytes();
+        if let Some(outline) = self.outline.get() {
+            bytes += outline.segments.capacity() * std::mem::size_of::<CanonicalSegment>()
+                + (outline.segment_ids.capacity() + outline.component_ids.capacity())
+                    * std::mem::size_of::<u32>();
+        }
+        bytes += self
+            .lock_padding_indexes()
+            .iter()
+            .map(|index| index.distances.capacity() * std::mem::size_of::<f32>())
+            .sum::<usize>();
+        bytes
+    }
+
+    fn outline_topology(&self) -> &OutlineTopology {
+        self.outline.get_or_init(|| {
+            let started_at = Instant::now();
+            let outline =
+                build_outline_topology(&self.outline_segments, &self.arrangement.segments);
+            log_profile("outline_topology", started_at);
+            outline
+        })
+    }
 
-    let warning_started_at = Instant::now();
-    let warning_segments = detect_padding_warning_segments(
-        &outline_segments,
-        &arrangement.point_positions,
-        width,
-        height,
-        payload.padding_warning.as_ref(),
-    );
-    log_profile("warning", warning_started_at);
+    /// Returns the padding distance index for this output size, rebuilding it
+    /// with a wider radius only when `padding_pixels` exceeds the stored one.
+    /// Each output size keeps its own index, so alternating between a
+    /// preview and a final render reuses both. The index is built without
+    /// holding the lock, so outputs of other sizes are not held up; when two
+    /// outputs of one size race, the wider of their indexes is kept.
+    fn padding_distances(
+        &self,
+        width: u32,
+        height: u32,
+        padding_pixels: f32,
+    ) -> Arc<PaddingDistanceIndex> {
+        if let Some(index) = self.cached_padding_distances(width, height, padding_pixels) {
+            return index;
+        }
 
-    let fill_started_at = Instant::now();
-    let fills = build_island_fills(
-        &payload.polygons,
-        payload.island_fill.as_ref(),
-        width,
-        height,
-    );
-    log_profile("island_fill", fill_started_at);
+        let started_at = Instant::now();
+        let radius =
+            (padding_pixels * PADDING_INDEX_RADIUS_SCALE).max(PADDING_INDEX_MIN_RADIUS_PIXELS);
+        let index = Arc::new(build_padding_distance_index(
+            self.outline_topology(),
+            width,
+            height,
+            radius,
+        ));
+        log_profile("padding_index", started_at);
 
-    let path_started_at = Instant::now();
-    let mut normal_bucket_order = Vec::new();
-    let mut overlay_bucket_order = Vec::new();
-    let mut normal_buckets = HashMap::new();
-    let mut overlay_buckets = HashMap::new();
+        let mut indexes = self.lock_padding_indexes();
+        if let Some(position) = indexes
+            .iter()
+            .position(|cached| cached.width == width && cached.height == height)
+        {
+            let cached = indexes.remove(position);
+            if cached.radius >= index.radius {
+                indexes.push(Arc::clone(&cached));
+                return cached;
+            }
+        }
+        if indexes.len() >= PADDING_INDEX_ENTRIES {
+            indexes.remove(0);
+        }
+        indexes.push(Arc::clone(&index));
+        index
+    }
+
+    /// The stored index for this output size when it covers
+    /// `padding_pixels`, marked most recently used.
+    fn cached_padding_distances(
+        &self,
+        width: u32,
+        height: u32,
+        padding_pixels: f32,
+    ) -> Option<Arc<PaddingDistanceIndex>> {
+        let mut indexes = self.lock_padding_indexes();
+        let position = indexes
+            .iter()
+            .position(|index| index.width == width && index.height == height)?;
+        let index = indexes.remove(position);
+        indexes.push(Arc::clone(&index));
+        (padding_pixels <= index.radius).then_some(index)
+    }
 
-    for (style, group_segments) in payload.styles.iter().zip(arrangement.group_segments.iter()) {
-        append_bucket_segments(
-            style,
-            group_segments,
-            &internal_segments,
-            &outline_segments,
-            &warning_segments,
-            payload.padding_warning.as_ref(),
-            &mut normal_buckets,
-            &mut normal_bucket_order,
-            &mut overlay_buckets,
-            &mut overlay_bucket_order,
+    fn lock_padding_indexes(&self) -> std::sync::MutexGuard<'_, Vec<Arc<PaddingDistanceIndex>>> {
+        self.padding_indexes
+            .lock()
+            .unwrap_or_else(|error| error.into_inner())
+    }
+}
+
+fn geometry_cache_enabled() -> bool {
+    std::env::var("EDGE_DRAWER_GEOMETRY_CACHE")
+        .map(|value| value != "0")
+        .unwrap_or(true)
+}
+
+/// The shared geometry cache, or `None` when `EDGE_DRAWER_GEOMETRY_CACHE=0`.
+fn geometry_cache() -> Option<&'static GeometryCache> {
+    geometry_cache_enabled().then_some(&GEOMETRY_CACHE)
+}
+
+fn rect_bits(rect: &UvRect) -> [u32; 4] {
+    [
+        rect.min[0].to_bits(),
+        rect.min[1].to_bits(),
+        rect.max[0].to_bits(),
+        rect.max[1].to_bits(),
+    ]
+}
+
+/// Hashes everything the arrangement and classification read: the quantized
+/// segments, the exact UVs of their endpoints, the per-group segment lists,
+/// the polygon rings and the cull rect applied to them. Returns the cache key
+/// and the fingerprint a hit is checked against, both from one pass.
+fn geometry_cache_key(
+    segments: &[CanonicalSegment],
+    point_positions: &HashMap<QPoint, [f32; 2]>,
+    group_segments: &[Vec<CanonicalSegment>],
+    polygons: &[Polygon],
+    cull_rect: &UvRect,
+) -> (u64, GeometryInputs) {
+    static CHECK_STATE: OnceLock<RandomState> = OnceLock::new();
+    let mut hasher = GeometryHasher {
+        key: DefaultHasher::new(),
+        check: CHECK_STATE.get_or_init(RandomState::new).build_hasher(),
+    };
+    rect_bits(cull_rect).hash(&mut hasher);
+    segments.hash(&mut hasher);
+    for segment in segments {
+        for point in [segment.start, segment.end] {
+            let uv = point_positions[&point];
+            (uv[0].to_bits(), uv[1].to_bits()).hash(&mut hasher);
+        }
+    }
+    group_segments.hash(&mut hasher);
+    polygons.len().hash(&mut hasher);
+    let mut polygon_points = 0;
+    for polygon in polygons {
+        polygon.points.len().hash(&mut hasher);
+        polygon_points += polygon.points.len();
+        for point in &polygon.points {
+            (point[0].to_bits(), point[1].to_bits()).hash(&mut hasher);
+        }
+    }
+    let inputs = GeometryInputs {
+        check: hasher.check.finish(),
+        segments: segments.len(),
+        group_segments: group_segments.iter().map(Vec::len).sum(),
+        polygons: polygons.len(),
+        polygon_points,
+    };
+    (hasher.key.finish(), inputs)
+}
+
+/// Feeds the geometry inputs to the cache key hasher and to the
+/// independently keyed check hasher at once.
+struct GeometryHasher {
+    key: DefaultHasher,
+    check: DefaultHasher,
+}
+
+impl Hasher for GeometryHasher {
+    fn write(&mut self, bytes: &[u8]) {
+        self.key.write(bytes);
+        self.check.write(bytes);
+    }
+
+    fn finish(&self) -> u64 {
+        self.key.finish()
+    }
+}
+
+impl GeometryCache {
+    const fn new() -> Self {
+        Self {
+            entries: Mutex::new(Vec::new()),
+        }
+    }
+
+    fn lock(&self) -> std::sync::MutexGuard<'_, Vec<(u64, Arc<PreparedGeometry>)>> {
+        self.entries
+            .lock()
+            .unwrap_or_else(|error| error.into_inner())
+    }
+
+    /// Returns the geometry stored under `key` when its input fingerprint
+    /// equals `inputs`, and marks it most recently used.
+    fn get(&self, key: u64, inputs: &GeometryInputs) -> Option<Arc<PreparedGeometry>> {
+        let mut entries = self.lock();
+        let index = entries.iter().position(|(cached_key, geometry)| {
+            *cached_key == key && geometry.inputs.as_ref() == Some(inputs)
+        })?;
+        let entry = entries.remove(index);
+        let geometry = Arc::clone(&entry.1);
+        entries.push(entry);
+        Some(geometry)
+    }
+
+    fn store(&self, key: u64, geometry: Arc<PreparedGeometry>) {
+        let mut entries = self.lock();
+        entries.retain(|(cached_key, _)| *cached_key != key);
+        if entries.len() >= GEOMETRY_CACHE_ENTRIES {
+            entries.remove(0);
+        }
+        entries.push((key, geometry));
+    }
+
+    fn clear(&self) {
+        self.lock().clear();
+    }
+}
+
+/// Drops every cached arrangement, e.g. once a snapshot session is closed.
+pub fn clear_geometry_cache() {
+    GEOMETRY_CACHE.clear();
+}
+
+impl UvRect {
+    fn touches(&self, min: [f32; 2], max: [f32; 2]) -> bool {
+        min[0] <= self.max[0]
+            && max[0] >= self.min[0]
+            && min[1] <= self.max[1]
+            && max[1] >= self.min[1]
+    }
+
+    fn touches_segment(&self, a: [f32; 2], b: [f32; 2]) -> bool {
+        self.touches(
+            [a[0].min(b[0]), a[1].min(b[1])],
+            [a[0].max(b[0]), a[1].max(b[1])],
+        )
+    }
+
+    fn touches_polygon(&self, polygon: &Polygon) -> bool {
+        let mut min = [f32::INFINITY; 2];
+        let mut max = [f32::NEG_INFINITY; 2];
+        for point in &polygon.points {
+            min = [min[0].min(point[0]), min[1].min(point[1])];
+            max = [max[0].max(point[0]), max[1].max(point[1])];
+        }
+        self.touches(min, max)
+    }
+}
+
+/// The output canvas grown by the farthest reach of any stroke, padding
+/// check or fill padding; geometry outside it cannot change a pixel.
+fn output_cull_rect(
+    styles: &[DrawStyle],
+    width: u32,
+    height: u32,
+    padding_warning: Option<&PaddingWarningConfig>,
+    island_fill: Option<&IslandFillConfig>,
+) -> UvRect {
+    let mut reach = styles
+        .iter()
+        .map(|style| style.internal_width.max(style.outline_width))
+        .fold(0.0f32, f32::max);
+    if let Some(config) = padding_warning.filter(|config| config.enabled) {
+        reach = reach.max(config.padding_pixels + config.warning_width);
+    }
+    if let Some(config) = island_fill.filter(|config| config.enabled) {
+        reach = reach.max(config.padding_pixels);
+    }
+
+    let margin = reach.max(0.0) + CULL_MARGIN_PIXELS;
+    let margin_u = margin / width.max(1) as f32;
+    let margin_v = margin / height.max(1) as f32;
+    UvRect {
+        min: [-margin_u, -margin_v],
+        max: [1.0 + margin_u, 1.0 + margin_v],
+    }
+}
+
+/// `output` with each margin rounded up to a power of two of at least
+/// `GEOMETRY_CULL_MIN_MARGIN`. It contains `output`, so culling with it
+/// keeps every visible segment and every padding neighbour. It does not
+/// change with output size or padding until a reach passes 1/16 UV, e.g.
+/// 256 px at 4K, so dragging the padding keeps the cached arrangement.
+fn geometry_cull_rect(output: &UvRect) -> UvRect {
+    let round = |margin: f32| {
+        let margin = margin.max(GEOMETRY_CULL_MIN_MARGIN);
+        2.0f32.powi(margin.log2().ceil() as i32)
+    };
+    let margin_u = round((-output.min[0]).max(output.max[0] - 1.0));
+    let margin_v = round((-output.min[1]).max(output.max[1] - 1.0));
+    UvRect {
+        min: [-margin_u, -margin_v],
+        max: [1.0 + margin_u, 1.0 + margin_v],
+    }
+}
+
+/// Drops segments whose bounds miss `rect`, or returns `None` when every
+/// segment is kept so callers can use their inputs unchanged.
+fn cull_arrangement_inputs(
+    segments: &[CanonicalSegment],
+    point_positions: &Arc<HashMap<QPoint, [f32; 2]>>,
+    group_segments: &[Vec<CanonicalSegment>],
+    rect: &UvRect,
+) -> Option<ArrangementInputs> {
+    let started_at = Instant::now();
+    let touches = |segment: &&CanonicalSegment| {
+        rect.touches_segment(
+            point_positions[&segment.start],
+            point_positions[&segment.end],
+        )
+    };
+    let kept = segments.iter().filter(touches).copied().collect::<Vec<_>>();
+    if kept.len() == segments.len() {
+        return None;
+    }
+
+    let group_segments = group_segments
+        .iter()
+        .map(|group| group.iter().filter(touches).copied().collect::<Vec<_>>())
+        .collect::<Vec<_>>();
+    let group_segment_indices = build_group_segment_indices(&kept, &group_segments);
+    if profile_enabled() {
+        eprintln!(
+            "edge_drawer: cull_segments kept={} of {}",
+            kept.len(),
+            segments.len()
         );
     }
+    record_profile_counter("cull_input_segments", segments.len());
+    record_profile_counter("cull_kept_segments", kept.len());
+    log_profile("cull_segments", started_at);
 
-    let mut groups = materialize_style_buckets(&normal_bucket_order, &mut normal_buckets);
-    groups.extend(materialize_style_buckets(
-        &overlay_bucket_order,
-        &mut overlay_buckets,
-    ));
-    log_profile("path_build", path_started_at);
+    Some(ArrangementInputs {
+        point_positions: Arc::clone(point_positions),
+        original_segments: kept,
+        group_segments,
+        group_segment_indices,
+    })
+}
+
+/// Drops polygons whose bounds miss `rect`, or returns `None` when every
+/// polygon is kept. With fill groups, whole groups are kept or dropped so an
+/// island reaching out of the rect is not cut apart, and the kept groups
+/// are returned re-indexed into the kept polygons.
+fn cull_polygons(
+    polygons: &[Polygon],
+    rect: &UvRect,
+    fill_groups: Option<&PolygonFillGroups>,
+) -> Option<(Vec<Polygon>, Option<PolygonFillGroups>)> {
+    let Some(fill_groups) = fill_groups else {
+        if polygons.iter().all(|polygon| rect.touches_polygon(polygon)) {
+            return None;
+        }
+        let kept = polygons
+            .iter()
+            .filter(|polygon| rect.touches_polygon(polygon))
+            .cloned()
+            .collect();
+        return Some((kept, None));
+    };
 
-    PreparedDrawing { fills, groups }
+    let grouped = fill_groups
+        .groups
+        .iter()
+        .map(|group| group.polygons.len())
+        .sum::<usize>();
+    if grouped == polygons.len()
+        && fill_groups
+            .groups
+            .iter()
+            .all(|group| rect.touches(group.bounds.min, group.bounds.max))
+    {
+        return None;
+    }
+    let mut kept = Vec::new();
+    let mut kept_groups = Vec::new();
+    for group in &fill_groups.groups {
+        if !rect.touches(group.bounds.min, group.bounds.max) {
+            continue;
+        }
+        let first = kept.len() as u32;
+        kept.extend(
+            group
+                .polygons
+                .iter()
+                .map(|&index| polygons[index as usize].clone()),
+        );
+        kept_groups.push(PolygonFillGroup {
+            polygons: (first..kept.len() as u32).collect(),
+            bounds: group.bounds,
+            color_base: group.color_base,
+        });
+    }
+    Some((
+        kept,
+        Some(PolygonFillGroups {
+            groups: kept_groups,
+        }),
+    ))
 }
 
 fn point_position(point_positions: &PointPositionIndex, point: QPoint) -> [f32; 2] {
@@ -648,6 +2237,7 @@ fn insert_point_position(point_positions: &mut PointPositionIndex, point: QPoint
     point_positions.extra.insert(point, uv);
 }
 
+#[cfg(test)]
 fn build_segment_arrangement(edges: &[Edges]) -> SegmentArrangement {
     let collect_started_at = Instant::now();
     let inputs = collect_arrangement_inputs(edges);
@@ -657,16 +2247,29 @@ fn build_segment_arrangement(edges: &[Edges]) -> SegmentArrangement {
     build_segment_arrangement_from_parts(
         inputs.original_segments,
         inputs.point_positions,
-        &inputs.group_segments,
         &inputs.group_segment_indices,
     )
 }
 
-fn build_segment_arrangement_from_parts(
+fn build_segment_arrangement_from_parts(
+    original_segments: Vec<CanonicalSegment>,
+    base_point_positions: Arc<HashMap<QPoint, [f32; 2]>>,
+    original_group_segment_indices: &[Vec<usize>],
+) -> SegmentArrangement {
+    let workers = parallel_worker_count(original_segments.len(), PARALLEL_MIN_SEGMENTS_PER_WORKER);
+    build_segment_arrangement_with_workers(
+        original_segments,
+        base_point_positions,
+        original_group_segment_indices,
+        workers,
+    )
+}
+
+fn build_segment_arrangement_with_workers(
     original_segments: Vec<CanonicalSegment>,
     base_point_positions: Arc<HashMap<QPoint, [f32; 2]>>,
-    original_group_segments: &[Vec<CanonicalSegment>],
     original_group_segment_indices: &[Vec<usize>],
+    workers: usize,
 ) -> SegmentArrangement {
     let detail_profile = arrangement_detail_profile_enabled();
     let mut point_positions = PointPositionIndex {
@@ -683,7 +2286,6 @@ fn build_segment_arrangement_from_parts(
             )
         })
         .collect::<Vec<_>>();
-    let mut split_points = vec![Vec::<QPoint>::new(); original_segments.len()];
     let segment_bounds = original_segments
         .iter()
         .zip(segment_uvs.iter())
@@ -697,52 +2299,82 @@ fn build_segment_arrangement_from_parts(
     }
 
     let pair_pass_started_at = Instant::now();
-    visit_candidate_pairs(&segment_bounds, 0.0, |left_index, right_index| {
-        let left = original_segments[left_index];
-        let right = original_segments[right_index];
-        let (left_start, left_end) = segment_uvs[left_index];
-        let (right_start, right_end) = segment_uvs[right_index];
-
-        register_pair_splits(
-            left,
-            right,
-            left_index,
-            right_index,
-            left_start,
-            left_end,
-            right_start,
-            right_end,
-            &mut point_positions,
-            split_points.as_mut_slice(),
-        );
-    });
+    let block_splits = visit_candidate_pairs(
+        &segment_bounds,
+        0.0,
+        workers,
+        |splits: &mut Vec<PairSplit>, left_index, right_index| {
+            let (left_start, left_end) = segment_uvs[left_index];
+            let (right_start, right_end) = segment_uvs[right_index];
+
+            register_pair_splits(
+                original_segments[left_index],
+                original_segments[right_index],
+                left_index,
+                right_index,
+                left_start,
+                left_end,
+                right_start,
+                right_end,
+                splits,
+            );
+        },
+    );
+    drop(segment_bounds);
+    drop(segment_uvs);
+
+    // Blocks come back in segment order, so merging them replays the exact
+    // registration order of a single-threaded pass. A stable sort then lays
+    // the split points of each segment out contiguously.
+    let mut splits = block_splits.into_iter().flatten().collect::<Vec<_>>();
+    for split in &splits {
+        insert_point_position(&mut point_positions, split.point, split.uv);
+    }
+    splits.sort_by_key(|split| split.segment_index);
+    let mut split_offsets = vec![0u32; original_segments.len() + 1];
+    for split in &splits {
+        split_offsets[split.segment_index + 1] += 1;
+    }
+    for index in 1..split_offsets.len() {
+        split_offsets[index] += split_offsets[index - 1];
+    }
+    let mut split_points = splits.iter().map(|split| split.point).collect::<Vec<_>>();
+    drop(splits);
     if arrangement_detail_profile_enabled() {
         log_profile("arrangement_pairs", pair_pass_started_at);
     }
 
-    log_split_point_profile(split_points.as_slice());
-    normalize_split_points(split_points.as_mut_slice());
+    log_split_point_profile(&split_offsets, &split_points);
+    normalize_split_points(&mut split_offsets, &mut split_points);
 
-    if split_points.iter().all(|points| points.is_empty()) {
+    if split_points.is_empty() {
         return SegmentArrangement {
-            segments: original_segments.clone(),
+            segments: original_segments,
             point_positions,
-            group_segments: original_group_segments.to_vec(),
+            group_segment_ids: original_group_segment_indices
+                .iter()
+                .map(|indices| indices.iter().map(|&index| index as u32).collect())
+                .collect(),
         };
     }
 
     let finalize_started_at = Instant::now();
     let split_materialize_started_at = Instant::now();
-    let mut split_segments_by_index = vec![None::<Vec<CanonicalSegment>>; original_segments.len()];
-    for (segment_index, points) in split_points.iter().enumerate() {
+    let mut piece_offsets = Vec::with_capacity(original_segments.len() + 1);
+    let mut pieces = Vec::with_capacity(original_segments.len() + split_points.len());
+    piece_offsets.push(0u32);
+    for (segment_index, &segment) in original_segments.iter().enumerate() {
+        let points = &split_points
+            [split_offsets[segment_index] as usize..split_offsets[segment_index + 1] as usize];
         if points.is_empty() {
-            continue;
+            pieces.push(segment);
+        } else {
+            pieces.extend(split_segment(segment, Some(points), &point_positions));
         }
-
-        let segment = original_segments[segment_index];
-        let parts = split_segment(segment, Some(points.as_slice()), &point_positions);
-        split_segments_by_index[segment_index] = Some(parts);
+        piece_offsets.push(pieces.len() as u32);
     }
+    drop(split_points);
+    drop(split_offsets);
     if detail_profile {
         log_profile(
             "arrangement_finalize_split_segments",
@@ -751,15 +2383,10 @@ fn build_segment_arrangement_from_parts(
     }
 
     let flatten_segments_started_at = Instant::now();
-    let mut segments = Vec::with_capacity(original_segments.len());
-    for (segment_index, &original) in original_segments.iter().enumerate() {
-        if let Some(parts) = split_segments_by_index[segment_index].as_ref() {
-            segments.extend(parts.iter().copied());
-        } else {
-            segments.push(original);
-        }
-    }
+    let mut segments = pieces.clone();
+    segments.sort_unstable_by_key(|segment| (segment.start, segment.end));
     dedup_sorted_segments_in_place(&mut segments);
+    segments.shrink_to_fit();
     if detail_profile {
         log_profile(
             "arrangement_finalize_segments_rebuild",
@@ -768,29 +2395,25 @@ fn build_segment_arrangement_from_parts(
     }
 
     let rebuild_groups_started_at = Instant::now();
-    let mut group_segments = Vec::with_capacity(original_group_segments.len());
-    for (original_group, group_indices) in original_group_segments
-        .iter()
-        .zip(original_group_segment_indices.iter())
-    {
-        if !group_indices
-            .iter()
-            .any(|&segment_index| split_segments_by_index[segment_index].is_some())
-        {
-            group_segments.push(original_group.clone());
-            continue;
-        }
-
-        let mut parts = Vec::with_capacity(original_group.len());
+    let mut group_segment_ids = Vec::with_capacity(original_group_segment_indices.len());
+    let mut parts = Vec::new();
+    for group_indices in original_group_segment_indices {
+        parts.clear();
         for &segment_index in group_indices {
-            if let Some(split_parts) = split_segments_by_index[segment_index].as_ref() {
-                parts.extend(split_parts.iter().copied());
-            } else {
-                parts.push(original_segments[segment_index]);
-            }
+            parts.extend_from_slice(
+                &pieces[piece_offsets[segment_index] as usize
+                    ..piece_offsets[segment_index + 1] as usize],
+            );
         }
         dedup_sorted_segments_in_place(&mut parts);
-        group_segments.push(parts);
+        group_segment_ids.push(
+            parts
+                .iter()
+                .map(|&segment| {
+                    segment_id(&segments, segment).expect("group segment must be in arrangement")
+                })
+                .collect::<Vec<_>>(),
+        );
     }
     if detail_profile {
         log_profile(
@@ -803,10 +2426,20 @@ fn build_segment_arrangement_from_parts(
     SegmentArrangement {
         segments,
         point_positions,
-        group_segments,
+        group_segment_ids,
     }
 }
 
+/// Dense id of `segment` in the sorted arrangement segments.
+fn segment_id(segments: &[CanonicalSegment], segment: CanonicalSegment) -> Option<u32> {
+    segments
+        .binary_search_by_key(&(segment.start, segment.end), |candidate| {
+            (candidate.start, candidate.end)
+        })
+        .ok()
+        .map(|index| index as u32)
+}
+
 fn register_pair_splits(
     left: CanonicalSegment,
     right: CanonicalSegment,
@@ -816,8 +2449,7 @@ fn register_pair_splits(
     left_end: [f32; 2],
     right_start: [f32; 2],
     right_end: [f32; 2],
-    point_positions: &mut PointPositionIndex,
-    split_points: &mut [Vec<QPoint>],
+    splits: &mut Vec<PairSplit>,
 ) {
     let o1 = orientation(left_start, left_end, right_start);
     let o2 = orientation(left_start, left_end, right_end);
@@ -839,8 +2471,7 @@ fn register_pair_splits(
             left_end,
             right_start,
             right_end,
-            point_positions,
-            split_points,
+            splits,
         );
         return;
     }
@@ -864,13 +2495,8 @@ fn register_pair_splits(
     ) else {
         return;
     };
-    register_split_point_for_segment(&mut split_points[left_index], point_positions, left, point);
-    register_split_point_for_segment(
-        &mut split_points[right_index],
-        point_positions,
-        right,
-        point,
-    );
+    register_split_point_for_segment(splits, left_index, left, point);
+    register_split_point_for_segment(splits, right_index, right, point);
 }
 
 fn register_colinear_overlap_splits(
@@ -882,34 +2508,23 @@ fn register_colinear_overlap_splits(
     left_end: [f32; 2],
     right_start: [f32; 2],
     right_end: [f32; 2],
-    point_positions: &mut PointPositionIndex,
-    split_points: &mut [Vec<QPoint>],
+    splits: &mut Vec<PairSplit>,
 ) {
     for point in [left_start, left_end] {
         if point_on_segment(point, right_start, right_end) {
-            register_split_point_for_segment(
-                &mut split_points[right_index],
-                point_positions,
-                right,
-                point,
-            );
+            register_split_point_for_segment(splits, right_index, right, point);
         }
     }
     for point in [right_start, right_end] {
         if point_on_segment(point, left_start, left_end) {
-            register_split_point_for_segment(
-                &mut split_points[left_index],
-                point_positions,
-                left,
-                point,
-            );
+            register_split_point_for_segment(splits, left_index, left, point);
         }
     }
 }
 
 fn register_split_point_for_segment(
-    split_points: &mut Vec<QPoint>,
-    point_positions: &mut PointPositionIndex,
+    splits: &mut Vec<PairSplit>,
+    segment_index: usize,
     segment: CanonicalSegment,
     point: [f32; 2],
 ) {
@@ -917,12 +2532,16 @@ fn register_split_point_for_segment(
     if is_segment_endpoint(segment, quantized) {
         return;
     }
-    split_points.push(quantized);
-    insert_point_position(point_positions, quantized, point);
+    splits.push(PairSplit {
+        segment_index,
+        point: quantized,
+        uv: point,
+    });
 }
 
-fn log_split_point_profile(split_points: &[Vec<QPoint>]) {
-    if !split_profile_enabled() {
+fn log_split_point_profile(split_offsets: &[u32], split_points: &[QPoint]) {
+    let print = split_profile_enabled();
+    if !print && !profile_capturing() {
         return;
     }
 
@@ -932,7 +2551,8 @@ fn log_split_point_profile(split_points: &[Vec<QPoint>]) {
     let mut duplicate_total = 0usize;
     let mut max_raw_len = 0usize;
 
-    for points in split_points {
+    for bounds in split_offsets.windows(2) {
+        let points = &split_points[bounds[0] as usize..bounds[1] as usize];
         if points.is_empty() {
             continue;
         }
@@ -943,7 +2563,7 @@ fn log_split_point_profile(split_points: &[Vec<QPoint>]) {
         let unique_len = if points.len() <= 1 {
             points.len()
         } else {
-            let mut unique_points = points.clone();
+            let mut unique_points = points.to_vec();
             unique_points.sort_unstable();
             unique_points.dedup();
             unique_points.len()
@@ -952,24 +2572,43 @@ fn log_split_point_profile(split_points: &[Vec<QPoint>]) {
         duplicate_total += points.len() - unique_len;
     }
 
-    eprintln!(
-        "edge_drawer: split_stats segments={} raw_points={} unique_points={} duplicates={} max_points_per_segment={}",
-        non_empty_segments,
-        raw_total,
-        unique_total,
-        duplicate_total,
-        max_raw_len,
-    );
-}
-
-fn normalize_split_points(split_points: &mut [Vec<QPoint>]) {
-    for points in split_points {
-        if points.len() <= 1 {
-            continue;
+    if print {
+        eprintln!(
+            "edge_drawer: split_stats segments={} raw_points={} unique_points={} duplicates={} max_points_per_segment={}",
+            non_empty_segments,
+            raw_total,
+            unique_total,
+            duplicate_total,
+            max_raw_len,
+        );
+    }
+    record_profile_counter("split_segments", non_empty_segments);
+    record_profile_counter("split_points", raw_total);
+    record_profile_counter("split_unique_points", unique_total);
+    record_profile_counter("split_duplicate_points", duplicate_total);
+}
+
+/// Sorts and dedups the split points of every segment, compacting the flat
+/// `split_points` buffer and its `split_offsets` in place.
+fn normalize_split_points(split_offsets: &mut [u32], split_points: &mut Vec<QPoint>) {
+    let mut write_index = 0usize;
+    let mut start = 0usize;
+    for segment_index in 0..split_offsets.len() - 1 {
+        let end = split_offsets[segment_index + 1] as usize;
+        split_points[start..end].sort_unstable();
+        split_offsets[segment_index] = write_index as u32;
+        for read_index in start..end {
+            if read_index == start || split_points[read_index] != split_points[read_index - 1] {
+                split_points[write_index] = split_points[read_index];
+                write_index += 1;
+            }
         }
-        points.sort_unstable();
-        points.dedup();
+        start = end;
+    }
+    if let Some(last) = split_offsets.last_mut() {
+        *last = write_index as u32;
     }
+    split_points.truncate(write_index);
 }
 
 fn is_segment_endpoint(segment: CanonicalSegment, point: QPoint) -> bool {
@@ -1049,14 +2688,15 @@ fn classify_visible_segments(edges: &[Edges]) -> HashSet<CanonicalSegment> {
         classify_segments(&arrangement.segments, &arrangement.point_positions, &[]);
     let mut visible = HashSet::new();
 
-    for (group, group_segments) in edges.iter().zip(arrangement.group_segments.iter()) {
-        for &segment in group_segments {
-            if internal_segments.contains(&segment) {
+    for (group, group_segment_ids) in edges.iter().zip(arrangement.group_segment_ids.iter()) {
+        for &segment_id in group_segment_ids {
+            let id = segment_id as usize;
+            if internal_segments.contains(id) {
                 if group.effective_draw_internal() {
-                    visible.insert(segment);
+                    visible.insert(arrangement.segments[id]);
                 }
-            } else if outline_segments.contains(&segment) && group.effective_draw_outline() {
-                visible.insert(segment);
+            } else if outline_segments.contains(id) && group.effective_draw_outline() {
+                visible.insert(arrangement.segments[id]);
             }
         }
     }
@@ -1074,26 +2714,31 @@ fn classify_warning_segments(
     let arrangement = build_segment_arrangement(edges);
     let (_internal_segments, outline_segments) =
         classify_segments(&arrangement.segments, &arrangement.point_positions, &[]);
+    let outline = build_outline_topology(&outline_segments, &arrangement.segments);
+    let distances = build_padding_distance_index(&outline, width, height, padding_pixels);
     detect_padding_warning_segments(
-        &outline_segments,
-        &arrangement.point_positions,
-        width,
-        height,
+        &outline,
+        &distances,
         Some(&PaddingWarningConfig {
             enabled: true,
             padding_pixels,
             warning_width: DEFAULT_WARNING_WIDTH,
             warning_color: DEFAULT_WARNING_COLOR,
+            mode: PaddingWarningMode::Exact,
         }),
     )
+    .iter()
+    .map(|id| arrangement.segments[id])
+    .collect()
 }
 
 fn append_bucket_segments(
     style: &DrawStyle,
-    group_segments: &[CanonicalSegment],
-    internal_segments: &HashSet<CanonicalSegment>,
-    outline_segments_set: &HashSet<CanonicalSegment>,
-    warning_segments: &HashSet<CanonicalSegment>,
+    group_segment_ids: &[u32],
+    segments: &[CanonicalSegment],
+    internal_segments: &SegmentBitSet,
+    outline_segments_set: &SegmentBitSet,
+    warning_segments: &SegmentBitSet,
     padding_warning: Option<&PaddingWarningConfig>,
     normal_buckets: &mut HashMap<StyleBucketKey, StyleBucket>,
     normal_bucket_order: &mut Vec<StyleBucketKey>,
@@ -1101,19 +2746,19 @@ fn append_bucket_segments(
     overlay_bucket_order: &mut Vec<StyleBucketKey>,
 ) {
     let mut outline_segments = Vec::new();
+    let mut outline_segment_ids = Vec::new();
     let mut internal_only_segments = Vec::new();
 
-    for &canonical in group_segments {
-        let segment = SegmentInfo {
-            a: canonical.start,
-            b: canonical.end,
-        };
-        if internal_segments.contains(&canonical) {
+    for &segment_id in group_segment_ids {
+        let id = segment_id as usize;
+        let segment = segment_from_canonical(segments[id]);
+        if internal_segments.contains(id) {
             if style.draw_internal {
                 internal_only_segments.push(segment);
             }
-        } else if outline_segments_set.contains(&canonical) && style.draw_outline {
+        } else if outline_segments_set.contains(id) && style.draw_outline {
             outline_segments.push(segment);
+            outline_segment_ids.push(segment_id);
         }
     }
 
@@ -1146,12 +2791,9 @@ fn append_bucket_segments(
         {
             let warned_outline_segments = outline_segments
                 .iter()
-                .copied()
-                .filter(|segment| {
-                    canonical_segment(segment.a, segment.b)
-                        .map(|canonical| warning_segments.contains(&canonical))
-                        .unwrap_or(false)
-                })
+                .zip(outline_segment_ids.iter())
+                .filter(|(_, &segment_id)| warning_segments.contains(segment_id as usize))
+                .map(|(segment, _)| *segment)
                 .collect::<Vec<_>>();
 
             if !warned_outline_segments.is_empty() {
@@ -1221,8 +2863,153 @@ fn materialize_style_buckets(
     groups
 }
 
+fn island_fill_enabled(island_fill: Option<&IslandFillConfig>) -> bool {
+    island_fill.is_some_and(|config| config.enabled)
+}
+
+/// Groups `polygons` for island fill. Islands are found on exact UV points,
+/// then merged by a sweep over their bounds; empty polygons join no group.
+fn polygon_fill_groups(polygons: &[Polygon]) -> PolygonFillGroups {
+    fn find(parents: &mut [u32], mut index: u32) -> u32 {
+        while parents[index as usize] != index {
+            let grandparent = parents[parents[index as usize] as usize];
+            parents[index as usize] = grandparent;
+            index = grandparent;
+        }
+        index
+    }
+    fn union(parents: &mut [u32], left: u32, right: u32) {
+        let left = find(parents, left);
+        let right = find(parents, right);
+        if left != right {
+            parents[left.max(right) as usize] = left.min(right);
+        }
+    }
+
+    let started_at = Instant::now();
+    let mut parents = (0..polygons.len() as u32).collect::<Vec<_>>();
+    let mut point_owners = HashMap::<[u32; 2], u32>::new();
+    for (index, polygon) in polygons.iter().enumerate() {
+        for point in &polygon.points {
+            let key = [point[0].to_bits(), point[1].to_bits()];
+            match point_owners.get(&key) {
+                Some(&owner) => union(&mut parents, owner, index as u32),
+                None => {
+                    point_owners.insert(key, index as u32);
+                }
+            }
+        }
+    }
+    drop(point_owners);
+
+    // Island bounds, in the order of each island's first polygon.
+    let mut island_of_root = HashMap::<u32, usize>::new();
+    let mut island_bounds = Vec::<UvRect>::new();
+    let mut polygon_islands = vec![usize::MAX; polygons.len()];
+    for (index, polygon) in polygons.iter().enumerate() {
+        if polygon.points.is_empty() {
+            continue;
+        }
+        let root = find(&mut parents, index as u32);
+        let island = *island_of_root.entry(root).or_insert_with(|| {
+            island_bounds.push(UvRect {
+                min: [f32::INFINITY; 2],
+                max: [f32::NEG_INFINITY; 2],
+            });
+            island_bounds.len() - 1
+        });
+        polygon_islands[index] = island;
+        let bounds = &mut island_bounds[island];
+        for point in &polygon.points {
+            bounds.min = [bounds.min[0].min(point[0]), bounds.min[1].min(point[1])];
+            bounds.max = [bounds.max[0].max(point[0]), bounds.max[1].max(point[1])];
+        }
+    }
+
+    let mut island_parents = (0..island_bounds.len() as u32).collect::<Vec<_>>();
+    let mut order = (0..island_bounds.len() as u32).collect::<Vec<_>>();
+    order.sort_by(|&left, &right| {
+        island_bounds[left as usize].min[0].total_cmp(&island_bounds[right as usize].min[0])
+    });
+    let mut active = Vec::<u32>::new();
+    for &island in &order {
+        let bounds = island_bounds[island as usize];
+        active.retain(|&other| island_bounds[other as usize].max[0] >= bounds.min[0]);
+        for &other in &active {
+            if bounds.touches(
+                island_bounds[other as usize].min,
+                island_bounds[other as usize].max,
+            ) {
+                union(&mut island_parents, island, other);
+            }
+        }
+        active.push(island);
+    }
+
+    let mut group_of_root = HashMap::<u32, usize>::new();
+    let mut groups = Vec::<PolygonFillGroup>::new();
+    let mut group_islands = Vec::<usize>::new();
+    for island in 0..island_bounds.len() as u32 {
+        let root = find(&mut island_parents, island);
+        let group = *group_of_root.entry(root).or_insert_with(|| {
+            groups.push(PolygonFillGroup {
+                polygons: Vec::new(),
+                bounds: island_bounds[island as usize],
+                color_base: 0,
+            });
+            group_islands.push(0);
+            groups.len() - 1
+        });
+        let bounds = &mut groups[group].bounds;
+        let island_bounds = island_bounds[island as usize];
+        bounds.min = [
+            bounds.min[0].min(island_bounds.min[0]),
+            bounds.min[1].min(island_bounds.min[1]),
+        ];
+        bounds.max = [
+            bounds.max[0].max(island_bounds.max[0]),
+            bounds.max[1].max(island_bounds.max[1]),
+        ];
+        group_islands[group] += 1;
+    }
+    let island_groups = (0..island_bounds.len() as u32)
+        .map(|island| group_of_root[&find(&mut island_parents, island)])
+        .collect::<Vec<_>>();
+    for (index, &island) in polygon_islands.iter().enumerate() {
+        if island != usize::MAX {
+            groups[island_groups[island]].polygons.push(index as u32);
+        }
+    }
+
+    // Same order as the canvas-space shape sort: top edge first, then left.
+    let mut group_order = (0..groups.len()).collect::<Vec<_>>();
+    group_order.sort_by(|&left, &right| {
+        let left = groups[left].bounds;
+        let right = groups[right].bounds;
+        right.max[1]
+            .total_cmp(&left.max[1])
+            .then_with(|| left.min[0].total_cmp(&right.min[0]))
+            .then_with(|| right.min[1].total_cmp(&left.min[1]))
+            .then_with(|| left.max[0].total_cmp(&right.max[0]))
+    });
+    let mut color_base = 0;
+    let mut slots = groups.into_iter().map(Some).collect::<Vec<_>>();
+    let groups = group_order
+        .into_iter()
+        .map(|index| {
+            let mut group = slots[index].take().expect("group is taken once");
+            group.color_base = color_base;
+            color_base += group_islands[index];
+            group
+        })
+        .collect();
+    log_profile("fill_groups", started_at);
+    PolygonFillGroups { groups }
+}
+
 fn build_island_fills(
     polygons: &[Polygon],
+    fill_groups: Option<&PolygonFillGroups>,
     island_fill: Option<&IslandFillConfig>,
     width: u32,
     height: u32,
@@ -1241,55 +3028,76 @@ fn build_island_fills(
     let alpha = (opacity * 255.0).round() as u8;
     let padding_pixels = island_fill.padding_pixels.max(0.0);
 
-    build_island_fills_from_polygons(polygons, alpha, padding_pixels, width, height)
+    match fill_groups {
+        Some(fill_groups) => build_island_fills_from_polygons(
+            polygons,
+            fill_groups,
+            alpha,
+            padding_pixels,
+            width,
+            height,
+        ),
+        None => build_island_fills_from_polygons(
+            polygons,
+            &polygon_fill_groups(polygons),
+            alpha,
+            padding_pixels,
+            width,
+            height,
+        ),
+    }
 }
 
+/// Unions each fill group on its own. Shapes of a group are sorted by
+/// bounds and coloured from the group's `color_base`, so colours do not
+/// depend on which other groups are present.
 fn build_island_fills_from_polygons(
     polygons: &[Polygon],
+    fill_groups: &PolygonFillGroups,
     alpha: u8,
     padding_pixels: f32,
     width: u32,
     height: u32,
 ) -> Vec<PreparedFill> {
-    let overlay_shapes = polygons_to_overlay_shapes(polygons, width, height);
-    if overlay_shapes.is_empty() {
-        return Vec::new();
-    }
-
-    let mut overlay = FloatOverlay::with_subj(&overlay_shapes);
-    let mut union_shapes = overlay.overlay(OverlayRule::Subject, OverlayFillRule::NonZero);
-    union_shapes.sort_by(|left, right| {
-        let left_bounds = overlay_shape_bounds(left);
-        let right_bounds = overlay_shape_bounds(right);
-        compare_overlay_shape_bounds(left_bounds, right_bounds)
-    });
-
-    let mut fills = Vec::with_capacity(union_shapes.len());
-    for shape in union_shapes {
-        let Some(fill_shape) = overlay_shape_to_fill_shape(&shape, width, height) else {
-            continue;
-        };
-        if fill_shape.is_empty() {
+    let mut fills = Vec::new();
+    for group in &fill_groups.groups {
+        let overlay_shapes = group
+            .polygons
+            .iter()
+            .filter_map(|&index| polygon_to_overlay_shape(&polygons[index as usize], width, height))
+            .collect::<OverlayShapes>();
+        if overlay_shapes.is_empty() {
             continue;
         }
-        let fill_index = fills.len();
-        fills.push(PreparedFill {
-            fill_color: island_fill_color(fill_index, alpha),
-            padding_pixels,
-            shapes: vec![fill_shape],
+
+        let mut overlay = FloatOverlay::with_subj(&overlay_shapes);
+        let mut union_shapes = overlay.overlay(OverlayRule::Subject, OverlayFillRule::NonZero);
+        union_shapes.sort_by(|left, right| {
+            let left_bounds = overlay_shape_bounds(left);
+            let right_bounds = overlay_shape_bounds(right);
+            compare_overlay_shape_bounds(left_bounds, right_bounds)
         });
+
+        let mut shape_index = 0;
+        for shape in union_shapes {
+            let Some(fill_shape) = overlay_shape_to_fill_shape(&shape, width, height) else {
+                continue;
+            };
+            if fill_shape.is_empty() {
+                continue;
+            }
+            fills.push(PreparedFill {
+                fill_color: island_fill_color(group.color_base + shape_index, alpha),
+                padding_pixels,
+                shapes: vec![fill_shape],
+            });
+            shape_index += 1;
+        }
     }
 
     fills
 }
 
-fn polygons_to_overlay_shapes(polygons: &[Polygon], width: u32, height: u32) -> OverlayShapes {
-    polygons
-        .iter()
-        .filter_map(|polygon| polygon_to_overlay_shape(polygon, width, height))
-        .collect()
-}
-
 fn polygon_to_overlay_shape(polygon: &Polygon, width: u32, height: u32) -> Option<OverlayShape> {
     let contour = polygon_to_overlay_contour(polygon, width, height)?;
     Some(vec![contour])
@@ -1736,36 +3544,109 @@ fn build_arrangement_grid(
     }
 }
 
-fn visit_candidate_pairs<F>(bounds: &[SegmentBounds], expand: f32, mut visitor: F)
+/// Visits every overlapping bounds pair `(left, right)` with `left < right`
+/// exactly once. Segments are processed in fixed-size blocks spread across
+/// `workers` threads; each block accumulates into its own `R`, and the block
+/// results are returned in segment order.
+fn visit_candidate_pairs<R, F>(
+    bounds: &[SegmentBounds],
+    expand: f32,
+    workers: usize,
+    visitor: F,
+) -> Vec<R>
 where
-    F: FnMut(usize, usize),
+    R: Default + Send,
+    F: Fn(&mut R, usize, usize) + Sync,
 {
     if bounds.len() < 2 {
-        return;
+        return Vec::new();
     }
 
     let resolution = candidate_pair_grid_resolution(bounds.len());
     let grid = build_arrangement_grid(bounds, expand, resolution);
-    let mut visited_marks = vec![0u32; bounds.len()];
-    let mut current_mark = 1u32;
-    let pair_profile = pair_profile_enabled();
-    let mut segment_cell_visits = 0usize;
-    let mut dense_candidates = 0usize;
-    let mut duplicate_candidates = 0usize;
-    let mut ordered_pair_candidates = 0usize;
-    let mut overlap_candidates = 0usize;
+    let print_pair_stats = pair_profile_enabled();
+    let pair_profile = print_pair_stats || profile_capturing();
+    let block_count = bounds.len().div_ceil(CANDIDATE_PAIR_BLOCK_SEGMENTS);
+    let block_results = parallel_blocks(
+        block_count,
+        workers,
+        || CandidatePairScratch {
+            visited_marks: vec![0u32; bounds.len()],
+            current_mark: 1,
+        },
+        |scratch, block| {
+            let start = block * CANDIDATE_PAIR_BLOCK_SEGMENTS;
+            let end = (start + CANDIDATE_PAIR_BLOCK_SEGMENTS).min(bounds.len());
+            let mut result = R::default();
+            let mut stats = CandidatePairStats::default();
+            visit_candidate_pairs_in_range(
+                bounds,
+                expand,
+                &grid,
+                start..end,
+                scratch,
+                pair_profile.then_some(&mut stats),
+                |left, right| visitor(&mut result, left, right),
+            );
+            (result, stats)
+        },
+    );
+
+    let mut stats = CandidatePairStats::default();
+    let results = block_results
+        .into_iter()
+        .map(|(result, block_stats)| {
+            stats.merge(&block_stats);
+            result
+        })
+        .collect();
+
+    if print_pair_stats {
+        eprintln!(
+            "edge_drawer: pair_stats resolution={} workers={} cells={} dense_candidates={} ordered_candidates={} duplicates={} overlaps={}",
+            resolution,
+            workers,
+            stats.segment_cell_visits,
+            stats.dense_candidates,
+            stats.ordered_pair_candidates,
+            stats.duplicate_candidates,
+            stats.overlap_candidates,
+        );
+    }
+    if pair_profile {
+        record_profile_counter("candidate_pair_cell_visits", stats.segment_cell_visits);
+        record_profile_counter("candidate_pairs_dense", stats.dense_candidates);
+        record_profile_counter("candidate_pairs", stats.ordered_pair_candidates);
+        record_profile_counter("candidate_pairs_duplicate", stats.duplicate_candidates);
+        record_profile_counter("candidate_pairs_overlapping", stats.overlap_candidates);
+    }
 
-    for current in 0..bounds.len() {
-        if current_mark == u32::MAX {
-            visited_marks.fill(0);
-            current_mark = 1;
+    results
+}
+
+fn visit_candidate_pairs_in_range<F>(
+    bounds: &[SegmentBounds],
+    expand: f32,
+    grid: &ArrangementGridIndex,
+    segments: Range<usize>,
+    scratch: &mut CandidatePairScratch,
+    mut stats: Option<&mut CandidatePairStats>,
+    mut visitor: F,
+) where
+    F: FnMut(usize, usize),
+{
+    for current in segments {
+        if scratch.current_mark == u32::MAX {
+            scratch.visited_marks.fill(0);
+            scratch.current_mark = 1;
         }
+        let current_mark = scratch.current_mark;
 
         let current_bounds = bounds[current];
         let cell_start = grid.segment_cell_starts[current];
         let cell_end = grid.segment_cell_starts[current + 1];
-        if pair_profile {
-            segment_cell_visits += cell_end - cell_start;
+        if let Some(stats) = stats.as_mut() {
+            stats.segment_cell_visits += cell_end - cell_start;
         }
 
         for &cell_index in &grid.segment_cells[cell_start..cell_end] {
@@ -1775,42 +3656,28 @@ where
             let first_higher = candidates.partition_point(|&candidate| candidate <= current);
 
             for &candidate in &candidates[first_higher..] {
-                if pair_profile {
-                    dense_candidates += 1;
-                }
-                if pair_profile {
-                    ordered_pair_candidates += 1;
+                if let Some(stats) = stats.as_mut() {
+                    stats.dense_candidates += 1;
+                    stats.ordered_pair_candidates += 1;
                 }
-                if visited_marks[candidate] == current_mark {
-                    if pair_profile {
-                        duplicate_candidates += 1;
+                if scratch.visited_marks[candidate] == current_mark {
+                    if let Some(stats) = stats.as_mut() {
+                        stats.duplicate_candidates += 1;
                     }
                     continue;
                 }
-                visited_marks[candidate] = current_mark;
+                scratch.visited_marks[candidate] = current_mark;
 
                 if bounds_overlap(current_bounds, bounds[candidate], expand) {
-                    if pair_profile {
-                        overlap_candidates += 1;
+                    if let Some(stats) = stats.as_mut() {
+                        stats.overlap_candidates += 1;
                     }
                     visitor(current, candidate);
                 }
             }
         }
 
-        current_mark += 1;
-    }
-
-    if pair_profile {
-        eprintln!(
-            "edge_drawer: pair_stats resolution={} cells={} dense_candidates={} ordered_candidates={} duplicates={} overlaps={}",
-            resolution,
-            segment_cell_visits,
-            dense_candidates,
-            ordered_pair_candidates,
-            duplicate_candidates,
-            overlap_candidates,
-        );
+        scratch.current_mark += 1;
     }
 }
 
@@ -1844,136 +3711,430 @@ fn segment_bounds_canvas(segment: CanonicalSegment, width: u32, height: u32) ->
     }
 }
 
-fn build_canvas_grid(
-    segments: &[CanonicalSegment],
+/// Groups the outline segments into connected components with a union-find
+/// over dense vertex indices, so no per-point hash maps are built.
+fn build_outline_topology(
+    outline_segments: &SegmentBitSet,
+    arrangement_segments: &[CanonicalSegment],
+) -> OutlineTopology {
+    let segment_ids = outline_segments
+        .iter()
+        .map(|index| index as u32)
+        .collect::<Vec<_>>();
+    let segments = segment_ids
+        .iter()
+        .map(|&id| arrangement_segments[id as usize])
+        .collect::<Vec<_>>();
+
+    let mut vertices = Vec::with_capacity(segments.len() * 2);
+    for segment in &segments {
+        vertices.push(segment.start);
+        vertices.push(segment.end);
+    }
+    vertices.sort_unstable();
+    vertices.dedup();
+    let vertex_index = |point: QPoint| {
+        vertices
+            .binary_search(&point)
+            .expect("outline vertex must be indexed") as u32
+    };
+
+    let mut parents = (0..vertices.len() as u32).collect::<Vec<_>>();
+    let find = |parents: &mut Vec<u32>, mut vertex: u32| {
+        while parents[vertex as usize] != vertex {
+            let grandparent = parents[parents[vertex as usize] as usize];
+            parents[vertex as usize] = grandparent;
+            vertex = grandparent;
+        }
+        vertex
+    };
+    let segment_vertices = segments
+        .iter()
+        .map(|segment| (vertex_index(segment.start), vertex_index(segment.end)))
+        .collect::<Vec<_>>();
+    for &(start, end) in &segment_vertices {
+        let start_root = find(&mut parents, start);
+        let end_root = find(&mut parents, end);
+        if start_root != end_root {
+            parents[start_root.max(end_root) as usize] = start_root.min(end_root);
+        }
+    }
+    let component_ids = segment_vertices
+        .iter()
+        .map(|&(start, _)| find(&mut parents, start))
+        .collect();
+
+    OutlineTopology {
+        segments,
+        segment_ids,
+        component_ids,
+        arrangement_len: arrangement_segments.len(),
+    }
+}
+
+fn build_padding_distance_index(
+    outline: &OutlineTopology,
     width: u32,
     height: u32,
-    expand_pixels: f32,
-) -> UniformGridIndex {
-    let resolution = default_grid_resolution(segments.len());
-    let width_f = width.max(1) as f32;
-    let height_f = height.max(1) as f32;
-    let cell_size = [width_f / resolution as f32, height_f / resolution as f32];
-    let mut cells: HashMap<(i32, i32), Vec<usize>> = HashMap::new();
-
-    for (idx, segment) in segments.iter().enumerate() {
-        let bounds = segment_bounds_canvas(*segment, width, height);
-        let min_x = cell_coord(
-            (bounds.min[0] - expand_pixels).max(0.0),
-            0.0,
-            cell_size[0],
-            resolution,
-        );
-        let max_x = cell_coord(
-            (bounds.max[0] + expand_pixels).min(width_f),
-            0.0,
-            cell_size[0],
-            resolution,
-        );
-        let min_y = cell_coord(
-            (bounds.min[1] - expand_pixels).max(0.0),
-            0.0,
-            cell_size[1],
-            resolution,
-        );
-        let max_y = cell_coord(
-            (bounds.max[1] + expand_pixels).min(height_f),
-            0.0,
-            cell_size[1],
-            resolution,
-        );
+    radius: f32,
+) -> PaddingDistanceIndex {
+    let workers = parallel_worker_count(outline.segments.len(), PARALLEL_MIN_SEGMENTS_PER_WORKER);
+    build_padding_distance_index_with_workers(outline, width, height, radius, workers)
+}
 
-        for x in min_x..=max_x {
-            for y in min_y..=max_y {
-                cells.entry((x, y)).or_default().push(idx);
+fn build_padding_distance_index_with_workers(
+    outline: &OutlineTopology,
+    width: u32,
+    height: u32,
+    radius: f32,
+    workers: usize,
+) -> PaddingDistanceIndex {
+    let outline_segments = &outline.segments;
+    let segment_component_ids = &outline.component_ids;
+    let mut distances = vec![f32::INFINITY; outline_segments.len()];
+
+    let canvas_bounds = outline_segments
+        .iter()
+        .map(|segment| segment_bounds_canvas(*segment, width, height))
+        .collect::<Vec<_>>();
+    // Each side is expanded by half the radius so bounds within `radius` of
+    // each other overlap; the extra half pixel keeps borderline pairs whose
+    // exact distance is just under it.
+    let expand = radius * 0.5 + 0.5;
+    let block_distances = visit_candidate_pairs(
+        &canvas_bounds,
+        expand,
+        workers,
+        |near: &mut Vec<(usize, f32)>, left_index, right_index| {
+            if segment_component_ids[left_index] == segment_component_ids[right_index] {
+                return;
             }
-        }
+            let left = outline_segments[left_index];
+            let right = outline_segments[right_index];
+            let distance = segment_distance_pixels(left, right, width, height);
+            if distance < radius {
+                near.push((left_index, distance));
+                near.push((right_index, distance));
+            }
+        },
+    );
+
+    for (segment_index, distance) in block_distances.into_iter().flatten() {
+        let nearest = &mut distances[segment_index];
+        *nearest = nearest.min(distance);
     }
 
-    UniformGridIndex { cells }
+    PaddingDistanceIndex {
+        width,
+        height,
+        radius,
+        distances,
+    }
 }
 
+/// Flags outline segments closer than the padding threshold to the canvas
+/// border or to another component, by arrangement id. `distances` must have
+/// been built with a radius of at least the threshold.
 fn detect_padding_warning_segments(
-    outline_segments: &HashSet<CanonicalSegment>,
-    point_positions: &PointPositionIndex,
-    width: u32,
-    height: u32,
+    outline: &OutlineTopology,
+    distances: &PaddingDistanceIndex,
     padding_warning: Option<&PaddingWarningConfig>,
-) -> HashSet<CanonicalSegment> {
+) -> SegmentBitSet {
+    let mut warnings = SegmentBitSet::new(outline.arrangement_len);
     let Some(padding_warning) = padding_warning else {
-        return HashSet::new();
+        return warnings;
     };
     if !padding_warning.enabled {
-        return HashSet::new();
+        return warnings;
+    }
+    debug_assert!(padding_warning.padding_pixels <= distances.radius);
+
+    for ((segment, &segment_id), nearest) in outline
+        .segments
+        .iter()
+        .zip(outline.segment_ids.iter())
+        .zip(distances.distances.iter())
+    {
+        if *nearest < padding_warning.padding_pixels
+            || segment_border_distance_pixels(*segment, distances.width, distances.height)
+                < padding_warning.padding_pixels
+        {
+            warnings.insert(segment_id as usize);
+        }
+    }
+    warnings
+}
+
+/// Raster counterpart of `detect_padding_warning_segments`. Outline segments
+/// are drawn into a segment-id mask at output resolution and a nearest-seed
+/// transform assigns every pixel its closest outline pixel. Wherever two
+/// neighbouring pixels resolve to different components, the two outline
+/// pixels they point at straddle a gap; both segments are flagged when that
+/// gap is under the threshold. Distances are measured between pixel centres.
+///
+/// The canvas is processed a band of rows at a time. Each band draws and
+/// transforms only a window reaching one threshold past it on either side,
+/// which holds every outline pixel closer than the threshold to the band, so
+/// scratch memory follows the band size rather than the canvas.
+fn detect_padding_warning_segments_raster(
+    outline: &OutlineTopology,
+    width: u32,
+    height: u32,
+    padding_warning: &PaddingWarningConfig,
+) -> SegmentBitSet {
+    let padding_pixels = padding_warning.padding_pixels;
+    let segment_count = outline.segments.len();
+    let mut flagged = vec![false; segment_count];
+    for (index, segment) in outline.segments.iter().enumerate() {
+        flagged[index] = segment_border_distance_pixels(*segment, width, height) < padding_pixels;
+    }
+
+    let pixel_count = width as usize * height as usize;
+    if segment_count == 0 || pixel_count == 0 {
+        return SegmentBitSet::new(outline.arrangement_len);
+    }
+
+    let started_at = Instant::now();
+    let reach = (padding_pixels.max(0.0).ceil() as u32).saturating_add(1);
+    let band_rows = RASTER_WARNING_BAND_ROWS.max(reach.saturating_mul(2));
+    let band_count = height.div_ceil(band_rows) as usize;
+    let mut band_segments = vec![Vec::new(); band_count];
+    for (index, segment) in outline.segments.iter().enumerate() {
+        let start = to_canvas_point(segment.start, width, height);
+        let end = to_canvas_point(segment.end, width, height);
+        let top = start[1].min(end[1]).floor().max(0.0) as u32;
+        let bottom = start[1].max(end[1]).floor();
+        if bottom < 0.0 || top >= height {
+            continue;
+        }
+        let bottom = (bottom as u32).min(height - 1);
+        let first_band = top.saturating_sub(reach + 1) / band_rows;
+        let last_band = ((bottom + reach) / band_rows).min(band_count as u32 - 1);
+        for band in first_band..=last_band {
+            band_segments[band as usize].push(index as u32);
+        }
+    }
+
+    let threshold_squared = f64::from(padding_pixels) * f64::from(padding_pixels);
+    let workers = parallel_worker_count(pixel_count, PARALLEL_MIN_SEGMENTS_PER_WORKER * 64);
+    let band_flags = parallel_blocks(
+        band_count,
+        workers,
+        RasterWarningScratch::default,
+        |scratch, band| {
+            let rows = band as u32 * band_rows..((band as u32 + 1) * band_rows).min(height);
+            let window = rows.start.saturating_sub(reach)..(rows.end + reach + 1).min(height);
+            let mut pairs = Vec::new();
+            draw_raster_warning_window(
+                outline,
+                &band_segments[band],
+                width,
+                height,
+                &rows,
+                &window,
+                &mut scratch.owners,
+                &mut pairs,
+            );
+            nearest_seed_transform(
+                width,
+                window.len() as u32,
+                &scratch.owners,
+                &mut scratch.column_rows,
+                &mut scratch.nearest,
+            );
+
+            let owners = &scratch.owners;
+            let nearest = &scratch.nearest;
+            let component_ids = &outline.component_ids;
+            let mut check = |left: u32, right: u32| {
+                if left == right {
+                    return;
+                }
+                let left_owner = owners[left as usize] as usize;
+                let right_owner = owners[right as usize] as usize;
+                if component_ids[left_owner] == component_ids[right_owner] {
+                    return;
+                }
+                let dx = f64::from(left % width) - f64::from(right % width);
+                let dy = f64::from(left / width) - f64::from(right / width);
+                if dx * dx + dy * dy < threshold_squared {
+                    pairs.push(left_owner);
+                    pairs.push(right_owner);
+                }
+            };
+            for y in rows.clone() {
+                let local_y = y - window.start;
+                for x in 0..width {
+                    let site = nearest[pixel_index(x, local_y, width)];
+                    if x + 1 < width {
+                        check(site, nearest[pixel_index(x + 1, local_y, width)]);
+                    }
+                    if y + 1 < height {
+                        check(site, nearest[pixel_index(x, local_y + 1, width)]);
+                    }
+                }
+            }
+            pairs
+        },
+    );
+    for segment_index in band_flags.into_iter().flatten() {
+        flagged[segment_index] = true;
+    }
+    log_profile("warning_raster", started_at);
+
+    let mut warnings = SegmentBitSet::new(outline.arrangement_len);
+    for (&segment_id, flagged) in outline.segment_ids.iter().zip(flagged) {
+        if flagged {
+            warnings.insert(segment_id as usize);
+        }
+    }
+    warnings
+}
+
+/// Per-worker buffers of the raster padding warning, sized to one window.
+#[derive(Default)]
+struct RasterWarningScratch {
+    owners: Vec<u32>,
+    column_rows: Vec<u32>,
+    nearest: Vec<u32>,
+}
+
+/// Draws `segments` into `owners`, a segment-id mask of the canvas rows in
+/// `window`, in segment order. Pixels of `rows` shared by two components
+/// flag both segments through `pairs`, as shells sharing a pixel are closer
+/// than any threshold.
+#[allow(clippy::too_many_arguments)]
+fn draw_raster_warning_window(
+    outline: &OutlineTopology,
+    segments: &[u32],
+    width: u32,
+    height: u32,
+    rows: &Range<u32>,
+    window: &Range<u32>,
+    owners: &mut Vec<u32>,
+    pairs: &mut Vec<usize>,
+) {
+    let component_ids = &outline.component_ids;
+    owners.clear();
+    owners.resize(width as usize * window.len(), u32::MAX);
+    for &index in segments {
+        let segment = outline.segments[index as usize];
+        let start = to_canvas_point(segment.start, width, height);
+        let end = to_canvas_point(segment.end, width, height);
+        let length = (end[0] - start[0]).abs().max((end[1] - start[1]).abs());
+        let steps = (length * 2.0).ceil().max(1.0) as usize;
+        for step in 0..=steps {
+            let t = step as f32 / steps as f32;
+            let x = (start[0] + (end[0] - start[0]) * t).floor();
+            let y = (start[1] + (end[1] - start[1]) * t).floor();
+            if x < 0.0 || x >= width as f32 || y < window.start as f32 || y >= window.end as f32 {
+                continue;
+            }
+            let pixel = pixel_index(x as u32, y as u32 - window.start, width);
+            let previous = owners[pixel];
+            if previous != u32::MAX
+                && rows.contains(&(y as u32))
+                && component_ids[previous as usize] != component_ids[index as usize]
+            {
+                pairs.push(previous as usize);
+                pairs.push(index as usize);
+            }
+            owners[pixel] = index;
+        }
     }
+}
 
-    if outline_segments.is_empty() {
-        return HashSet::new();
+/// Exact Euclidean feature transform: writes to `nearest` the pixel index of
+/// the nearest seed for every pixel, or `u32::MAX` when there are no seeds.
+/// Seeds are the pixels of `owners` holding a segment. Two separable passes in
+/// the style of Felzenszwalb and Huttenlocher, linear in the pixel count.
+fn nearest_seed_transform(
+    width: u32,
+    height: u32,
+    owners: &[u32],
+    column_rows: &mut Vec<u32>,
+    nearest: &mut Vec<u32>,
+) {
+    let width_usize = width as usize;
+    let pixel_count = width_usize * height as usize;
+    debug_assert_eq!(owners.len(), pixel_count);
+
+    // Column pass: the row of the nearest seed in the same column.
+    column_rows.clear();
+    column_rows.resize(pixel_count, u32::MAX);
+    for y in 0..height {
+        let row = y as usize * width_usize;
+        for x in 0..width_usize {
+            column_rows[row + x] = if owners[row + x] != u32::MAX {
+                y
+            } else if y > 0 {
+                column_rows[row - width_usize + x]
+            } else {
+                u32::MAX
+            };
+        }
     }
-
-    let outline_segments = {
-        let mut segments = outline_segments.iter().copied().collect::<Vec<_>>();
-        segments.sort_by_key(|segment| (segment.start, segment.end));
-        segments
-    };
-
-    let outline_adjacency = build_adjacency(&outline_segments, point_positions);
-    let outline_components = compute_components(&outline_adjacency);
-    let mut warning_segments = HashSet::new();
-
-    for segment in &outline_segments {
-        if segment_border_distance_pixels(*segment, width, height) < padding_warning.padding_pixels
-        {
-            warning_segments.insert(*segment);
+    for y in (0..height.saturating_sub(1)).rev() {
+        let row = y as usize * width_usize;
+        for x in 0..width_usize {
+            let below = column_rows[row + width_usize + x];
+            if below == u32::MAX {
+                continue;
+            }
+            let current = column_rows[row + x];
+            if current == u32::MAX || below.abs_diff(y) < current.abs_diff(y) {
+                column_rows[row + x] = below;
+            }
         }
     }
 
-    let segment_component_ids = outline_segments
-        .iter()
-        .map(|segment| {
-            outline_components
-                .get(&segment.start)
-                .copied()
-                .unwrap_or_default()
-        })
-        .collect::<Vec<_>>();
-    let canvas_grid = build_canvas_grid(
-        &outline_segments,
-        width,
-        height,
-        padding_warning.padding_pixels,
-    );
-    let mut candidate_pairs = HashSet::new();
+    // Row pass: lower envelope of the parabolas rooted at each column's
+    // nearest seed.
+    nearest.clear();
+    nearest.resize(pixel_count, u32::MAX);
+    let mut sites = Vec::with_capacity(width_usize);
+    let mut starts = Vec::with_capacity(width_usize);
+    for y in 0..height {
+        let row = &column_rows[y as usize * width_usize..(y as usize + 1) * width_usize];
+        let cost = |x: usize| {
+            let dy = f64::from(row[x].abs_diff(y));
+            dy * dy + (x * x) as f64
+        };
 
-    for indices in canvas_grid.cells.values() {
-        for left_index in 0..indices.len() {
-            for right_index in (left_index + 1)..indices.len() {
-                let pair = if indices[left_index] < indices[right_index] {
-                    (indices[left_index], indices[right_index])
+        sites.clear();
+        starts.clear();
+        for x in 0..width_usize {
+            if row[x] == u32::MAX {
+                continue;
+            }
+            let mut start = f64::NEG_INFINITY;
+            while let Some(&site) = sites.last() {
+                start = (cost(x) - cost(site)) / (2.0 * (x - site) as f64);
+                if start <= *starts.last().unwrap() {
+                    sites.pop();
+                    starts.pop();
+                    start = f64::NEG_INFINITY;
                 } else {
-                    (indices[right_index], indices[left_index])
-                };
-                candidate_pairs.insert(pair);
+                    break;
+                }
             }
+            sites.push(x);
+            starts.push(start);
         }
-    }
-
-    let mut candidate_pairs = candidate_pairs.into_iter().collect::<Vec<_>>();
-    candidate_pairs.sort_unstable();
-
-    for (left_index, right_index) in candidate_pairs {
-        if segment_component_ids[left_index] == segment_component_ids[right_index] {
+        if sites.is_empty() {
             continue;
         }
-        let left = outline_segments[left_index];
-        let right = outline_segments[right_index];
-        if segment_distance_pixels(left, right, width, height) < padding_warning.padding_pixels {
-            warning_segments.insert(left);
-            warning_segments.insert(right);
+
+        let output = &mut nearest[y as usize * width_usize..(y as usize + 1) * width_usize];
+        let mut current = 0;
+        for (x, value) in output.iter_mut().enumerate() {
+            while current + 1 < sites.len() && starts[current + 1] < x as f64 {
+                current += 1;
+            }
+            let site = sites[current];
+            *value = row[site] * width + site as u32;
         }
     }
-
-    warning_segments
 }
 
 fn segment_border_distance_pixels(segment: CanonicalSegment, width: u32, height: u32) -> f32 {
@@ -2116,42 +4277,76 @@ fn classify_segments(
     unique_segments: &[CanonicalSegment],
     point_positions: &PointPositionIndex,
     polygons: &[Polygon],
-) -> (HashSet<CanonicalSegment>, HashSet<CanonicalSegment>) {
+) -> (SegmentBitSet, SegmentBitSet) {
+    let workers = parallel_worker_count(unique_segments.len(), PARALLEL_MIN_SEGMENTS_PER_WORKER);
+    classify_segments_with_workers(unique_segments, point_positions, polygons, workers)
+}
+
+fn classify_segments_with_workers(
+    unique_segments: &[CanonicalSegment],
+    point_positions: &PointPositionIndex,
+    polygons: &[Polygon],
+    workers: usize,
+) -> (SegmentBitSet, SegmentBitSet) {
     if polygons.is_empty() {
         return classify_segments_from_graph(unique_segments, point_positions);
     }
 
     let polygon_index = build_polygon_index(polygons);
-    let mut stats = classification_detail_profile_enabled().then(ClassificationStats::default);
-    let mut internal_segments = HashSet::with_capacity(unique_segments.len());
-    let mut outline_segments = HashSet::with_capacity(unique_segments.len());
-
-    for &segment in unique_segments {
-        let (left_inside, right_inside) = segment_side_states_with_polygons(
-            segment,
-            &polygon_index,
-            point_positions,
-            stats.as_mut(),
-        );
+    let print_stats = classification_detail_profile_enabled();
+    let collect_stats = print_stats || profile_capturing();
+    let chunk_results = parallel_chunks(unique_segments, workers, |chunk| {
+        let mut stats = collect_stats.then(ClassificationStats::default);
+        let states = chunk
+            .iter()
+            .map(|&segment| {
+                segment_side_states_with_polygons(
+                    segment,
+                    &polygon_index,
+                    point_positions,
+                    stats.as_mut(),
+                )
+            })
+            .collect::<Vec<_>>();
+        (states, stats)
+    });
+
+    let mut stats = collect_stats.then(ClassificationStats::default);
+    let mut internal_segments = SegmentBitSet::new(unique_segments.len());
+    let mut outline_segments = SegmentBitSet::new(unique_segments.len());
+    let side_states = chunk_results.iter().flat_map(|(states, chunk_stats)| {
+        if let (Some(stats), Some(chunk_stats)) = (stats.as_mut(), chunk_stats.as_ref()) {
+            stats.merge(chunk_stats);
+        }
+        states.iter().copied()
+    });
+
+    for (segment_index, (left_inside, right_inside)) in side_states.enumerate() {
         match (left_inside, right_inside) {
-            (true, true) => {
-                internal_segments.insert(segment);
-            }
-            (true, false) | (false, true) => {
-                outline_segments.insert(segment);
-            }
+            (true, true) => internal_segments.insert(segment_index),
+            (true, false) | (false, true) => outline_segments.insert(segment_index),
             (false, false) => {}
         }
     }
 
     if let Some(stats) = stats {
-        eprintln!(
-            "edge_drawer: classification_stats sample_queries={} candidate_polygons={} bounds_checks={} point_tests={}",
-            stats.sample_queries,
+        if print_stats {
+            eprintln!(
+                "edge_drawer: classification_stats workers={} sample_queries={} candidate_polygons={} bounds_checks={} point_tests={}",
+                workers,
+                stats.sample_queries,
+                stats.candidate_polygons,
+                stats.bounds_checks,
+                stats.point_in_polygon_tests,
+            );
+        }
+        record_profile_counter("classification_sample_queries", stats.sample_queries);
+        record_profile_counter(
+            "classification_candidate_polygons",
             stats.candidate_polygons,
-            stats.bounds_checks,
-            stats.point_in_polygon_tests,
         );
+        record_profile_counter("classification_bounds_checks", stats.bounds_checks);
+        record_profile_counter("point_in_polygon_tests", stats.point_in_polygon_tests);
     }
 
     (internal_segments, outline_segments)
@@ -2160,7 +4355,7 @@ fn classify_segments(
 fn classify_segments_from_graph(
     unique_segments: &[CanonicalSegment],
     point_positions: &PointPositionIndex,
-) -> (HashSet<CanonicalSegment>, HashSet<CanonicalSegment>) {
+) -> (SegmentBitSet, SegmentBitSet) {
     let adjacency = build_adjacency(unique_segments, point_positions);
     let component_map = compute_components(&adjacency);
     let faces = extract_filled_faces(unique_segments, &adjacency, &component_map, point_positions);
@@ -2169,27 +4364,23 @@ fn classify_segments_from_graph(
         components_with_faces.insert(face.component_id);
     }
 
-    let mut internal_segments = HashSet::new();
-    let mut outline_segments = HashSet::new();
+    let mut internal_segments = SegmentBitSet::new(unique_segments.len());
+    let mut outline_segments = SegmentBitSet::new(unique_segments.len());
 
-    for &segment in unique_segments {
+    for (segment_index, &segment) in unique_segments.iter().enumerate() {
         let component_id = component_map
             .get(&segment.start)
             .copied()
             .unwrap_or_default();
         if !components_with_faces.contains(&component_id) {
-            outline_segments.insert(segment);
+            outline_segments.insert(segment_index);
             continue;
         }
 
         let (left_inside, right_inside) = segment_side_states(segment, &faces, point_positions);
         match (left_inside, right_inside) {
-            (true, true) => {
-                internal_segments.insert(segment);
-            }
-            (true, false) | (false, true) => {
-                outline_segments.insert(segment);
-            }
+            (true, true) => internal_segments.insert(segment_index),
+            (true, false) | (false, true) => outline_segments.insert(segment_index),
             (false, false) => {}
         }
     }
@@ -2837,8 +5028,24 @@ fn trace_path(
     path
 }
 
-fn draw_edges_svg(prepared: &PreparedDrawing, width: u32, height: u32) -> Document {
-    let mut document = Document::new().set("viewBox", (0, 0, width, height));
+/// Streams the drawing as SVG. Consecutive paths sharing a style are grouped
+/// under one `<g>` carrying the style attributes, so each path only writes its
+/// `d` data, with coordinates rounded to `precision` decimals.
+fn write_edges_svg<W: Write>(
+    prepared: &PreparedDrawing,
+    width: u32,
+    height: u32,
+    precision: usize,
+    out: &mut W,
+) -> std::io::Result<()> {
+    writeln!(
+        out,
+        r#"<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {} {}">"#,
+        width, height
+    )?;
+
+    let mut open_style: Option<String> = None;
+    let mut data = String::new();
 
     for fill in &prepared.fills {
         if fill.shapes.is_empty() {
@@ -2849,24 +5056,18 @@ fn draw_edges_svg(prepared: &PreparedDrawing, width: u32, height: u32) -> Docume
             "rgb({}, {}, {})",
             fill.fill_color[0], fill.fill_color[1], fill.fill_color[2]
         );
-        let opacity = fill.fill_color[3] as f32 / 255.0;
+        let opacity = svg_number(fill.fill_color[3] as f32 / 255.0, SVG_STYLE_PRECISION);
+        let style = format!(
+            r#"fill="{color}" fill-opacity="{opacity}" stroke="{color}" stroke-opacity="{opacity}" stroke-width="{}" stroke-linecap="round" stroke-linejoin="round""#,
+            svg_number(fill.padding_pixels * 2.0, SVG_STYLE_PRECISION)
+        );
 
         for shape in &fill.shapes {
-            let Some(data) = svg_shape_data(shape, width, height) else {
+            data.clear();
+            if !svg_shape_data(&mut data, shape, width, height, precision) {
                 continue;
-            };
-
-            let svg_path = SvgPath::new()
-                .set("fill", color.clone())
-                .set("fill-opacity", opacity)
-                .set("stroke", color.clone())
-                .set("stroke-opacity", opacity)
-                .set("stroke-width", fill.padding_pixels * 2.0)
-                .set("stroke-linecap", "round")
-                .set("stroke-linejoin", "round")
-                .set("d", data);
-
-            document = document.add(svg_path);
+            }
+            write_svg_path(out, &mut open_style, &style, &data)?;
         }
     }
 
@@ -2875,149 +5076,770 @@ fn draw_edges_svg(prepared: &PreparedDrawing, width: u32, height: u32) -> Docume
             continue;
         }
 
-        let color = format!(
-            "rgb({}, {}, {})",
-            group.line_color[0], group.line_color[1], group.line_color[2]
+        let style = format!(
+            r#"fill="none" stroke="rgb({}, {}, {})" stroke-width="{}" stroke-linecap="round" stroke-linejoin="round""#,
+            group.line_color[0],
+            group.line_color[1],
+            group.line_color[2],
+            svg_number(group.line_width, SVG_STYLE_PRECISION)
         );
 
         for path in &group.paths {
-            let Some(data) = svg_path_data(path, width, height) else {
+            data.clear();
+            if !svg_path_data(&mut data, path, width, height, precision) {
                 continue;
-            };
+            }
+            write_svg_path(out, &mut open_style, &style, &data)?;
+        }
+    }
 
-            let svg_path = SvgPath::new()
-                .set("fill", "none")
-                .set("stroke", color.clone())
-                .set("stroke-width", group.line_width)
-                .set("stroke-linecap", "round")
-                .set("stroke-linejoin", "round")
-                .set("d", data);
+    if open_style.is_some() {
+        writeln!(out, "</g>")?;
+    }
+    writeln!(out, "</svg>")
+}
 
-            document = document.add(svg_path);
+fn write_svg_path<W: Write>(
+    out: &mut W,
+    open_style: &mut Option<String>,
+    style: &str,
+    data: &str,
+) -> std::io::Result<()> {
+    if open_style.as_deref() != Some(style) {
+        if open_style.is_some() {
+            writeln!(out, "</g>")?;
         }
+        writeln!(out, "<g {}>", style)?;
+        *open_style = Some(style.to_string());
+    }
+    writeln!(out, r#"<path d="{}"/>"#, data)
+}
+
+/// Formats `value` with at most `precision` decimals, dropping trailing zeros.
+fn svg_number(value: f32, precision: usize) -> String {
+    let mut text = format!("{:.*}", precision, value);
+    if text.contains('.') {
+        let trimmed = text.trim_end_matches('0').trim_end_matches('.').len();
+        text.truncate(trimmed);
     }
+    if text == "-0" {
+        text.remove(0);
+    }
+    text
+}
 
-    document
+fn push_svg_point(data: &mut String, command: char, point: [f32; 2], precision: usize) {
+    data.push(command);
+    data.push_str(&svg_number(point[0], precision));
+    data.push(',');
+    data.push_str(&svg_number(point[1], precision));
 }
 
-fn svg_shape_data(shape: &FillShape, width: u32, height: u32) -> Option<Data> {
-    let mut data = Data::new();
+fn svg_shape_data(
+    data: &mut String,
+    shape: &FillShape,
+    width: u32,
+    height: u32,
+    precision: usize,
+) -> bool {
     let mut has_contour = false;
 
     for contour in shape {
         let Some(first) = contour.first() else {
             continue;
         };
-        let first_point = to_canvas_point(*first, width, height);
-        data = data.move_to((first_point[0] as f64, first_point[1] as f64));
+        push_svg_point(data, 'M', to_canvas_point(*first, width, height), precision);
 
         for point in &contour[1..] {
-            let canvas = to_canvas_point(*point, width, height);
-            data = data.line_to((canvas[0] as f64, canvas[1] as f64));
+            push_svg_point(data, 'L', to_canvas_point(*point, width, height), precision);
+        }
+
+        if contour.len() >= 3 && contour.first() == contour.last() {
+            data.push('Z');
+        }
+        has_contour = true;
+    }
+
+    has_contour
+}
+
+fn svg_path_data(
+    data: &mut String,
+    path: &[QPoint],
+    width: u32,
+    height: u32,
+    precision: usize,
+) -> bool {
+    let Some(first) = path.first() else {
+        return false;
+    };
+    push_svg_point(data, 'M', to_canvas_point(*first, width, height), precision);
+
+    for point in &path[1..] {
+        push_svg_point(data, 'L', to_canvas_point(*point, width, height), precision);
+    }
+
+    if path.len() >= 3 && path.first() == path.last() {
+        data.push('Z');
+    }
+
+    true
+}
+
+fn draw_edges_raster(
+    prepared: &PreparedDrawing,
+    width: u32,
+    height: u32,
+) -> Result<Pixmap, BoxError> {
+    if width as u64 * height as u64 >= TILED_RASTER_MIN_PIXELS {
+        return draw_edges_raster_tiled(
+            prepared,
+            width,
+            height,
+            worker_threads(),
+            TILED_RASTER_BAND_ROWS,
+        );
+    }
+
+    let mut pixmap =
+        Pixmap::new(width, height).ok_or_else(|| "failed to allocate raster pixmap".to_string())?;
+
+    let use_distance_field_fill = prepared.fills.iter().any(|fill| fill.padding_pixels > 0.0);
+    if use_distance_field_fill {
+        draw_island_fill_distance_field_raster(&mut pixmap, &prepared.fills, width, height);
+    }
+
+    for fill in &prepared.fills {
+        if use_distance_field_fill && fill.padding_pixels > 0.0 {
+            continue;
+        }
+        if fill.shapes.is_empty() {
+            continue;
+        }
+
+        let mut paint = Paint::default();
+        paint.set_color(Color::from_rgba8(
+            fill.fill_color[0],
+            fill.fill_color[1],
+            fill.fill_color[2],
+            fill.fill_color[3],
+        ));
+
+        for shape in &fill.shapes {
+            let Some(sk_path) = build_skia_shape(shape, width, height) else {
+                continue;
+            };
+            pixmap.fill_path(
+                &sk_path,
+                &paint,
+                FillRule::Winding,
+                Transform::identity(),
+                None,
+            );
+        }
+    }
+
+    for group in &prepared.groups {
+        if group.paths.is_empty() {
+            continue;
+        }
+        visit_group_strokes(group, width, height, prepared.antialias, |kind| {
+            draw_raster_kind(&mut pixmap, &kind, group.line_color, prepared.antialias, 0);
+        });
+    }
+
+    Ok(pixmap)
+}
+
+/// Renders the drawing in horizontal bands on worker threads and stitches the
+/// band rows into one pixmap.
+///
+/// Each band pixmap holds the band plus `TILED_RASTER_BAND_MARGIN_ROWS` on
+/// either side, whatever the paths touching it, so a worker never holds more
+/// than one band's worth of pixels. Paths are translated by whole rows and
+/// the rasterizer clips them to the band pixmap. Clipping can move an
+/// antialiased edge by a rounding step against the full-canvas render, but
+/// the bands are fixed by `band_rows` alone, so the output does not depend
+/// on the worker count. Large canvases therefore always render in bands.
+fn draw_edges_raster_tiled(
+    prepared: &PreparedDrawing,
+    width: u32,
+    height: u32,
+    workers: usize,
+    band_rows: u32,
+) -> Result<Pixmap, BoxError> {
+    let mut pixmap =
+        Pixmap::new(width, height).ok_or_else(|| "failed to allocate raster pixmap".to_string())?;
+    let band_rows = band_rows.max(1);
+    let band_count = height.div_ceil(band_rows) as usize;
+
+    let use_distance_field_fill = prepared.fills.iter().any(|fill| fill.padding_pixels > 0.0);
+    let fill_owners =
+        use_distance_field_fill.then(|| IslandFillOwners::new(&prepared.fills, width, height));
+    let items = build_raster_items(prepared, width, height, use_distance_field_fill);
+    let mut band_items = vec![Vec::<usize>::new(); band_count];
+    for (item_index, item) in items.iter().enumerate() {
+        if item.rows.is_empty() {
+            continue;
+        }
+        let first_band = (item.rows.start / band_rows) as usize;
+        let last_band = ((item.rows.end - 1) / band_rows) as usize;
+        for items in &mut band_items[first_band..=last_band.min(band_count - 1)] {
+            items.push(item_index);
+        }
+    }
+
+    let band_slots = pixmap
+        .pixels_mut()
+        .chunks_mut(band_rows as usize * width as usize)
+        .map(Mutex::new)
+        .collect::<Vec<_>>();
+    let results = parallel_blocks(
+        band_count,
+        workers,
+        Vec::new,
+        |band_owners, band_index| -> Result<(), BoxError> {
+            let band_start = band_index as u32 * band_rows;
+            let band_end = (band_start + band_rows).min(height);
+            let band_item_indices = &band_items[band_index];
+
+            let pixmap_rows = raster_band_pixmap_rows(band_start, band_end, height);
+            let top = pixmap_rows.start;
+            let mut band = Pixmap::new(width, pixmap_rows.len() as u32)
+                .ok_or_else(|| "failed to allocate raster band pixmap".to_string())?;
+            let band_offset = (band_start - top) as usize * width as usize;
+            let band_len = (band_end - band_start) as usize * width as usize;
+            if let Some(fill_owners) = &fill_owners {
+                fill_owners.owner_rows(band_start..band_end, band_owners);
+                composite_island_fill_owners(
+                    &mut band.pixels_mut()[band_offset..band_offset + band_len],
+                    &prepared.fills,
+                    band_owners,
+                );
+            }
+
+            for &item_index in band_item_indices {
+                let item = &items[item_index];
+                draw_raster_kind(&mut band, &item.kind, item.color, item.antialias, top);
+            }
+
+            let mut slot = band_slots[band_index]
+                .lock()
+                .expect("raster band slot poisoned");
+            slot.copy_from_slice(&band.pixels()[band_offset..band_offset + band_len]);
+            Ok(())
+        },
+    );
+    drop(band_slots);
+    results.into_iter().collect::<Result<(), BoxError>>()?;
+
+    Ok(pixmap)
+}
+
+/// Canvas rows of the pixmap a band is drawn in.
+fn raster_band_pixmap_rows(band_start: u32, band_end: u32, height: u32) -> Range<u32> {
+    band_start.saturating_sub(TILED_RASTER_BAND_MARGIN_ROWS)
+        ..band_end
+            .saturating_add(TILED_RASTER_BAND_MARGIN_ROWS)
+            .min(height)
+}
+
+/// Builds the fills and strokes of `draw_edges_raster` in draw order, with
+/// conservative canvas row extents for band binning.
+fn build_raster_items(
+    prepared: &PreparedDrawing,
+    width: u32,
+    height: u32,
+    use_distance_field_fill: bool,
+) -> Vec<RasterItem> {
+    let mut items = Vec::new();
+
+    for fill in &prepared.fills {
+        if use_distance_field_fill && fill.padding_pixels > 0.0 {
+            continue;
+        }
+        for shape in &fill.shapes {
+            let Some(path) = build_skia_shape(shape, width, height) else {
+                continue;
+            };
+            items.push(raster_item(
+                RasterItemKind::Fill(path),
+                fill.fill_color,
+                true,
+                height,
+            ));
+        }
+    }
+
+    for group in &prepared.groups {
+        visit_group_strokes(group, width, height, prepared.antialias, |kind| {
+            items.push(raster_item(
+                kind,
+                group.line_color,
+                prepared.antialias,
+                height,
+            ));
+        });
+    }
+
+    items
+}
+
+/// Calls `visit` with the draws of `group`'s lines. Groups up to
+/// `THIN_LINE_MAX_WIDTH` go to the thin-line kernel; wider ones are stroked
+/// by tiny-skia. A stroke covers the union of its contours, so overlapping
+/// chains blend once instead of once per chain; that only matches stroking
+/// them one by one when the colour is opaque. Opaque groups are therefore
+/// combined by `batch_skia_paths`, and translucent ones keep one path per
+/// chain.
+fn visit_group_strokes(
+    group: &PreparedGroup,
+    width: u32,
+    height: u32,
+    antialias: bool,
+    mut visit: impl FnMut(RasterItemKind),
+) {
+    if group.line_width <= THIN_LINE_MAX_WIDTH {
+        for lines in thin_line_batches(group, width, height, antialias) {
+            visit(RasterItemKind::Thin(lines));
+        }
+        record_profile_counter("thin_lines", group.paths.len());
+        return;
+    }
+
+    let stroke_width = group.line_width;
+    let mut stroke_calls = 0usize;
+    if group.line_color[3] == u8::MAX {
+        for path in batch_skia_paths(&group.paths, width, height) {
+            stroke_calls += 1;
+            visit(RasterItemKind::Stroke(path, stroke_width));
+        }
+    } else {
+        for path in &group.paths {
+            if let Some(path) = build_skia_path(path, width, height) {
+                stroke_calls += 1;
+                visit(RasterItemKind::Stroke(path, stroke_width));
+            }
+        }
+    }
+    record_profile_counter("stroke_paths", group.paths.len());
+    record_profile_counter("stroke_calls", stroke_calls);
+}
+
+/// Combines `paths` into paths of at most `STROKE_BATCH_POINTS` points, so
+/// tiny-skia's per-call setup is paid per batch instead of per chain while
+/// the stroked outline it builds stays bounded.
+fn batch_skia_paths(paths: &[Vec<QPoint>], width: u32, height: u32) -> Vec<tiny_skia::Path> {
+    band_batches(paths, width, height)
+        .into_iter()
+        .filter_map(|batch| {
+            let mut builder = PathBuilder::new();
+            for index in batch {
+                append_skia_path(&mut builder, &paths[index], width, height);
+            }
+            builder.finish()
+        })
+        .collect()
+}
+
+/// The chains of a thin group in canvas space, batched like
+/// `batch_skia_paths`. Widths below one pixel scale the line's alpha, the
+/// way tiny-skia draws hairline-thin strokes.
+fn thin_line_batches(
+    group: &PreparedGroup,
+    width: u32,
+    height: u32,
+    antialias: bool,
+) -> Vec<ThinLines> {
+    let coverage = group.line_width.clamp(0.5, 1.0);
+    band_batches(&group.paths, width, height)
+        .into_iter()
+        .map(|batch| {
+            let mut lines = ThinLines {
+                line_width: group.line_width,
+                coverage,
+                antialias,
+                ..ThinLines::default()
+            };
+            for index in batch {
+                lines.points.extend(
+                    group.paths[index]
+                        .iter()
+                        .map(|point| to_canvas_point(*point, width, height)),
+                );
+                lines.chain_ends.push(lines.points.len());
+            }
+            lines
+        })
+        .collect()
+}
+
+/// Splits the indices of the drawable `paths` into batches of at most
+/// `STROKE_BATCH_POINTS` points. Paths are binned by the first and last
+/// `STROKE_BATCH_BAND_ROWS` band their rows cover and batches never span
+/// bins, so a chain crossing many bands never drags the short chains of its
+/// top band into every band it reaches, and each batch stays as local for
+/// band-tiled rendering as its longest chain allows. Chains are not split at
+/// band boundaries, which would turn their joins there into caps. The
+/// binning does not depend on the tile size, so tiled and full-canvas
+/// rendering draw the same batches.
+fn band_batches(paths: &[Vec<QPoint>], width: u32, height: u32) -> Vec<Vec<usize>> {
+    let band = |row: f32| (row.max(0.0) as u32) / STROKE_BATCH_BAND_ROWS;
+    let mut order = paths
+        .iter()
+        .enumerate()
+        .filter(|(_, path)| path.len() >= 2)
+        .map(|(index, path)| {
+            let (top, bottom) = path
+                .iter()
+                .map(|point| to_canvas_point(*point, width, height)[1])
+                .fold((f32::MAX, f32::MIN), |(top, bottom), row| {
+                    (top.min(row), bottom.max(row))
+                });
+            ((band(top), band(bottom)), index)
+        })
+        .collect::<Vec<_>>();
+    order.sort_by_key(|(bands, _)| *bands);
+
+    let mut batches = Vec::new();
+    let mut batch = Vec::new();
+    let mut batch_points = 0usize;
+    let mut batch_band = (0u32, 0u32);
+    for (band, index) in order {
+        let path_len = paths[index].len();
+        if batch_points > 0 && (band != batch_band || batch_points + path_len > STROKE_BATCH_POINTS)
+        {
+            batches.push(std::mem::take(&mut batch));
+            batch_points = 0;
         }
+        batch.push(index);
+        batch_points += path_len;
+        batch_band = band;
+    }
+    if !batch.is_empty() {
+        batches.push(batch);
+    }
+    batches
+}
 
-        if contour.len() >= 3 && contour.first() == contour.last() {
-            data = data.close();
+fn raster_item(kind: RasterItemKind, color: [u8; 4], antialias: bool, height: u32) -> RasterItem {
+    let path_bounds = |path: &tiny_skia::Path| {
+        let bounds = path.bounds();
+        SegmentBounds {
+            min: [bounds.left(), bounds.top()],
+            max: [bounds.right(), bounds.bottom()],
         }
-        has_contour = true;
+    };
+    let (bounds, outset) = match &kind {
+        RasterItemKind::Fill(path) => (path_bounds(path), 0.0),
+        RasterItemKind::Stroke(path, stroke_width) => (path_bounds(path), stroke_width * 0.5),
+        RasterItemKind::Thin(lines) => (lines.bounds(), lines.line_width.max(1.0) * 0.5),
+    };
+    let margin = outset + TILED_RASTER_MARGIN_PIXELS;
+    let top = (bounds.min[1] - margin).floor().clamp(0.0, height as f32) as u32;
+    let bottom = (bounds.max[1] + margin).ceil().clamp(0.0, height as f32) as u32;
+    RasterItem {
+        kind,
+        color,
+        antialias,
+        rows: top..bottom,
     }
+}
 
-    if has_contour {
-        Some(data)
+/// Draws one raster item into `pixmap`, whose first row is canvas row `top`.
+fn draw_raster_kind(
+    pixmap: &mut Pixmap,
+    kind: &RasterItemKind,
+    color: [u8; 4],
+    antialias: bool,
+    top: u32,
+) {
+    let mut paint = Paint::default();
+    paint.set_color(Color::from_rgba8(color[0], color[1], color[2], color[3]));
+    let transform = if top == 0 {
+        Transform::identity()
     } else {
-        None
+        Transform::from_translate(0.0, -(top as f32))
+    };
+
+    match kind {
+        RasterItemKind::Fill(path) => {
+            pixmap.fill_path(path, &paint, FillRule::Winding, transform, None);
+        }
+        RasterItemKind::Stroke(path, stroke_width) => {
+            paint.anti_alias = antialias;
+            let stroke = Stroke {
+                width: *stroke_width,
+                line_cap: LineCap::Round,
+                line_join: LineJoin::Round,
+                ..Stroke::default()
+            };
+            pixmap.stroke_path(path, &paint, &stroke, transform, None);
+        }
+        RasterItemKind::Thin(lines) => draw_thin_lines(pixmap, lines, color, top),
     }
 }
 
-fn svg_path_data(path: &[QPoint], width: u32, height: u32) -> Option<Data> {
-    let first = path.first()?;
-    let first_point = to_canvas_point(*first, width, height);
-    let mut data = Data::new().move_to((first_point[0] as f64, first_point[1] as f64));
-
-    for point in &path[1..] {
-        let canvas = to_canvas_point(*point, width, height);
-        data = data.line_to((canvas[0] as f64, canvas[1] as f64));
+impl ThinLines {
+    fn bounds(&self) -> SegmentBounds {
+        let mut bounds = SegmentBounds {
+            min: [f32::MAX; 2],
+            max: [f32::MIN; 2],
+        };
+        for point in &self.points {
+            bounds.min = [bounds.min[0].min(point[0]), bounds.min[1].min(point[1])];
+            bounds.max = [bounds.max[0].max(point[0]), bounds.max[1].max(point[1])];
+        }
+        bounds
     }
+}
 
-    if path.len() >= 3 && path.first() == path.last() {
-        data = data.close();
+/// Blends `lines` into `pixmap`, whose first row is canvas row `top`. Chains
+/// draw each shared vertex once, so joints do not darken.
+fn draw_thin_lines(pixmap: &mut Pixmap, lines: &ThinLines, color: [u8; 4], top: u32) {
+    if lines.line_width > 1.0 {
+        draw_wide_thin_lines(pixmap, lines, color, top);
+        return;
     }
+    let width = pixmap.width() as i64;
+    let bottom = top as i64 + pixmap.height() as i64;
+    let mut target = ThinLineTarget {
+        pixels: pixmap.pixels_mut(),
+        width,
+        top: top as i64,
+        bottom,
+        color,
+        alpha: color[3] as f32 * lines.coverage,
+    };
 
-    Some(data)
+    let mut chain_start = 0;
+    for &chain_end in &lines.chain_ends {
+        let chain = &lines.points[chain_start..chain_end];
+        chain_start = chain_end;
+        let closed = chain.len() >= 3 && chain.first() == chain.last();
+        let last_segment = chain.len().saturating_sub(2);
+        for (index, segment) in chain.windows(2).enumerate() {
+            let start = if index > 0 || closed {
+                ThinLineEnd::Skip
+            } else {
+                ThinLineEnd::Cap
+            };
+            let end = if index < last_segment || closed {
+                ThinLineEnd::Joint
+            } else {
+                ThinLineEnd::Cap
+            };
+            target.draw_segment(segment[0], segment[1], start, end, lines.antialias);
+        }
+    }
 }
 
-fn draw_edges_raster(
-    prepared: &PreparedDrawing,
-    width: u32,
-    height: u32,
-) -> Result<Pixmap, BoxError> {
-    let mut pixmap =
-        Pixmap::new(width, height).ok_or_else(|| "failed to allocate raster pixmap".to_string())?;
+/// Blends `lines` wider than one pixel into `pixmap`, whose first row is
+/// canvas row `top`, as round-capped capsules: the stroke tiny-skia would
+/// draw. Antialiased, a pixel is covered by how far its centre lies inside
+/// the capsule's edge, clamped to one pixel; otherwise when its centre is
+/// inside. Each chain keeps the largest coverage per pixel and blends once,
+/// so joints and runs of sub-pixel segments do not darken. Coverage is kept
+/// only for the pixels within reach of the batch, not the whole pixmap.
+fn draw_wide_thin_lines(pixmap: &mut Pixmap, lines: &ThinLines, color: [u8; 4], top: u32) {
+    let width = pixmap.width() as i64;
+    let rows = top as i64..top as i64 + pixmap.height() as i64;
+    let radius = lines.line_width * 0.5;
+    let reach = radius + 0.5;
+    let bounds = lines.bounds();
+    let area_x = ((bounds.min[0] - reach).floor() as i64).max(0)
+        ..((bounds.max[0] + reach).ceil() as i64 + 1).min(width);
+    let area_y = ((bounds.min[1] - reach).floor() as i64).max(rows.start)
+        ..((bounds.max[1] + reach).ceil() as i64 + 1).min(rows.end);
+    if area_x.is_empty() || area_y.is_empty() {
+        return;
+    }
+    let area_width = area_x.end - area_x.start;
+    let pixels = pixmap.pixels_mut();
+    let mut coverage = vec![0u8; (area_width * (area_y.end - area_y.start)) as usize];
+    let mut covered = Vec::new();
+
+    let mut chain_start = 0;
+    for &chain_end in &lines.chain_ends {
+        let chain = &lines.points[chain_start..chain_end];
+        chain_start = chain_end;
+        for segment in chain.windows(2) {
+            let (from, to) = (segment[0], segment[1]);
+            let min_x = ((from[0].min(to[0]) - reach).floor() as i64).max(0);
+            let max_x = ((from[0].max(to[0]) + reach).ceil() as i64).min(width - 1);
+            let dx = to[0] - from[0];
+            let gradient = if dx != 0.0 {
+                (to[1] - from[1]) / dx
+            } else {
+                0.0
+            };
+            for x in min_x..=max_x {
+                // The rows the segment reaches within `reach` of this
+                // column's centre, widened by `reach` on either side.
+                let (near, far) = if dx != 0.0 {
+                    let column = |x: f32| x.clamp(from[0].min(to[0]), from[0].max(to[0]));
+                    let row = |x: f32| from[1] + gradient * (column(x) - from[0]);
+                    let center = x as f32 + 0.5;
+                    (row(center - reach), row(center + reach))
+                } else {
+                    (from[1], to[1])
+                };
+                let min_y = ((near.min(far) - reach).floor() as i64).max(rows.start);
+                let max_y = ((near.max(far) + reach).ceil() as i64).min(rows.end - 1);
+                for y in min_y..=max_y {
+                    let center = [x as f64 + 0.5, y as f64 + 0.5];
+                    let distance = distance_to_segment_squared(
+                        center,
+                        [from[0] as f64, from[1] as f64],
+                        [to[0] as f64, to[1] as f64],
+                    )
+                    .sqrt() as f32;
+                    let weight = if lines.antialias {
+                        (reach - distance).clamp(0.0, 1.0)
+                    } else if distance <= radius {
+                        1.0
+                    } else {
+                        0.0
+                    };
+                    let weight = (weight * 255.0).round() as u8;
+                    let index = ((y - area_y.start) * area_width + x - area_x.start) as usize;
+                    if weight > coverage[index] {
+                        if coverage[index] == 0 {
+                            covered.push((index, ((y - rows.start) * width + x) as usize));
+                        }
+                        coverage[index] = weight;
+                    }
+                }
+            }
+        }
 
-    let use_distance_field_fill = prepared.fills.iter().any(|fill| fill.padding_pixels > 0.0);
-    if use_distance_field_fill {
-        draw_island_fill_distance_field_raster(&mut pixmap, &prepared.fills, width, height);
+        for (index, pixel) in covered.drain(..) {
+            let alpha = (color[3] as u32 * coverage[index] as u32 + 127) / 255;
+            coverage[index] = 0;
+            if alpha > 0 {
+                source_over_pixel(
+                    &mut pixels[pixel],
+                    [color[0], color[1], color[2], alpha as u8],
+                );
+            }
+        }
     }
+}
 
-    for fill in &prepared.fills {
-        if use_distance_field_fill && fill.padding_pixels > 0.0 {
-            continue;
+/// Rows `top..bottom` of the canvas with the colour thin lines blend in.
+struct ThinLineTarget<'a> {
+    pixels: &'a mut [PremultipliedColorU8],
+    width: i64,
+    top: i64,
+    bottom: i64,
+    color: [u8; 4],
+    alpha: f32,
+}
+
+impl ThinLineTarget<'_> {
+    /// Draws the segment one pixel column (or row, for steep segments) at a
+    /// time along its major axis. Antialiased, this is Xiaolin Wu's line:
+    /// each step splits its weight between the two pixels straddling the
+    /// line, and `Cap` ends are weighted by how far the segment covers their
+    /// pixel. Otherwise it is Bresenham's line: each step takes the pixel
+    /// nearest the line at full weight. Positions are computed from the
+    /// endpoints and clipping only limits the steps, so a band pixmap gets
+    /// exactly the pixels of the full canvas.
+    fn draw_segment(
+        &mut self,
+        from: [f32; 2],
+        to: [f32; 2],
+        start: ThinLineEnd,
+        end: ThinLineEnd,
+        antialias: bool,
+    ) {
+        // Pixel centres sit on whole numbers from here on.
+        let (mut x0, mut y0) = (from[0] - 0.5, from[1] - 0.5);
+        let (mut x1, mut y1) = (to[0] - 0.5, to[1] - 0.5);
+        let steep = (y1 - y0).abs() > (x1 - x0).abs();
+        if steep {
+            std::mem::swap(&mut x0, &mut y0);
+            std::mem::swap(&mut x1, &mut y1);
         }
-        if fill.shapes.is_empty() {
-            continue;
+        let (mut start, mut end) = (start, end);
+        if x0 > x1 {
+            std::mem::swap(&mut x0, &mut x1);
+            std::mem::swap(&mut y0, &mut y1);
+            std::mem::swap(&mut start, &mut end);
         }
 
-        let mut paint = Paint::default();
-        paint.set_color(Color::from_rgba8(
-            fill.fill_color[0],
-            fill.fill_color[1],
-            fill.fill_color[2],
-            fill.fill_color[3],
-        ));
+        let dx = x1 - x0;
+        let gradient = if dx > 0.0 { (y1 - y0) / dx } else { 0.0 };
+        let first = x0.round() as i64;
+        let last = x1.round() as i64;
+        let start_weight = match start {
+            ThinLineEnd::Cap if antialias => first as f32 + 0.5 - x0,
+            _ => 1.0,
+        };
+        let end_weight = match end {
+            ThinLineEnd::Cap if antialias => x1 - (last as f32 - 0.5),
+            _ => 1.0,
+        };
 
-        for shape in &fill.shapes {
-            let Some(sk_path) = build_skia_shape(shape, width, height) else {
-                continue;
+        let (min_major, max_major) = if steep {
+            (self.top - 1, self.bottom)
+        } else {
+            (-1, self.width)
+        };
+        for major in first.max(min_major)..=last.min(max_major) {
+            let weight = if first == last {
+                if start == ThinLineEnd::Skip {
+                    continue;
+                }
+                (start_weight + end_weight - 1.0).clamp(0.0, 1.0)
+            } else if major == first {
+                if start == ThinLineEnd::Skip {
+                    continue;
+                }
+                start_weight
+            } else if major == last {
+                if end == ThinLineEnd::Skip {
+                    continue;
+                }
+                end_weight
+            } else {
+                1.0
             };
-            pixmap.fill_path(
-                &sk_path,
-                &paint,
-                FillRule::Winding,
-                Transform::identity(),
-                None,
-            );
+
+            let minor = y0 + gradient * (major as f32 - x0);
+            if antialias {
+                let below = minor.floor();
+                let fraction = minor - below;
+                self.plot_major(steep, major, below as i64, weight * (1.0 - fraction));
+                self.plot_major(steep, major, below as i64 + 1, weight * fraction);
+            } else {
+                self.plot_major(steep, major, minor.round() as i64, weight);
+            }
         }
     }
 
-    for group in &prepared.groups {
-        if group.paths.is_empty() {
-            continue;
+    fn plot_major(&mut self, steep: bool, major: i64, minor: i64, weight: f32) {
+        if steep {
+            self.plot(minor, major, weight);
+        } else {
+            self.plot(major, minor, weight);
         }
+    }
 
-        let mut paint = Paint::default();
-        paint.set_color(Color::from_rgba8(
-            group.line_color[0],
-            group.line_color[1],
-            group.line_color[2],
-            group.line_color[3],
-        ));
-
-        let stroke = Stroke {
-            width: group.line_width.max(0.5),
-            line_cap: LineCap::Round,
-            line_join: LineJoin::Round,
-            ..Stroke::default()
-        };
-
-        for path in &group.paths {
-            let Some(sk_path) = build_skia_path(path, width, height) else {
-                continue;
-            };
-            pixmap.stroke_path(&sk_path, &paint, &stroke, Transform::identity(), None);
+    fn plot(&mut self, x: i64, y: i64, weight: f32) {
+        if x < 0 || x >= self.width || y < self.top || y >= self.bottom {
+            return;
         }
+        let alpha = (self.alpha * weight).round().min(255.0);
+        if alpha < 1.0 {
+            return;
+        }
+        let index = ((y - self.top) * self.width + x) as usize;
+        source_over_pixel(
+            &mut self.pixels[index],
+            [self.color[0], self.color[1], self.color[2], alpha as u8],
+        );
     }
-
-    Ok(pixmap)
 }
 
 fn draw_island_fill_distance_field_raster(
@@ -3033,78 +5855,340 @@ fn draw_island_fill_distance_field_raster(
         return;
     }
 
-    let fill_shapes = fills
-        .iter()
-        .map(|fill| fill_shapes_to_overlay_shapes(&fill.shapes, width, height))
-        .collect::<Vec<_>>();
-    let fill_bounds = fill_shapes
-        .iter()
-        .map(|shapes| overlay_shapes_bounds(shapes))
+    let owners = IslandFillOwners::new(fills, width, height);
+    let owner_started_at = Instant::now();
+    let band_rows = ISLAND_FILL_TILE_PIXELS;
+    let band_count = height.div_ceil(band_rows) as usize;
+    let workers = parallel_worker_count(
+        width as usize * height as usize,
+        PARALLEL_MIN_SEGMENTS_PER_WORKER * 64,
+    );
+    let band_slots = pixmap
+        .pixels_mut()
+        .chunks_mut(band_rows as usize * width as usize)
+        .map(Mutex::new)
         .collect::<Vec<_>>();
-    let pixel_count = (width as usize).saturating_mul(height as usize);
-    let mut body_mask = vec![false; pixel_count];
-    let mut owner_distances = vec![f64::INFINITY; pixel_count];
-    let mut owner_indices = vec![usize::MAX; pixel_count];
+    parallel_blocks(band_count, workers, Vec::new, |band_owners, band_index| {
+        let band_start = band_index as u32 * band_rows;
+        let band_end = (band_start + band_rows).min(height);
+        owners.owner_rows(band_start..band_end, band_owners);
+        let mut slot = band_slots[band_index]
+            .lock()
+            .expect("island fill band slot poisoned");
+        composite_island_fill_owners(&mut slot, fills, band_owners);
+    });
+    log_profile("island_fill_owner", owner_started_at);
+}
+
+/// Island fill owners, resolved a band of rows at a time. Pixels whose
+/// centre lies inside an island take that island; the others take the
+/// island whose contour segment is nearest, among the segments within their
+/// island's padding, ties going to the earlier segment. Segments are binned
+/// by the canvas tiles they can pad into and each tile keeps only those that
+/// can be nearest for one of its pixels, so the search is exact and no
+/// full-canvas buffer is needed. This is not a linear-time distance
+/// transform: each pixel still scans its tile's candidates, nearest first
+/// and stopping at the first whose lower bound is beyond the best found, so
+/// the cost follows the local contour density (dense, finely tessellated
+/// outlines near a tile cost more) rather than the padding radius.
+struct IslandFillOwners {
+    shapes: Vec<(OverlayShapes, Option<OverlayBounds>)>,
+    segments: Vec<IslandFillSegment>,
+    padding_squared: Vec<f64>,
+    width: u32,
+    height: u32,
+    tile_columns: usize,
+    tile_offsets: Vec<u32>,
+    tile_segments: Vec<u32>,
+    /// Squared distance lower bound between each `tile_segments` entry and
+    /// its tile, ascending within each tile.
+    tile_lower_bounds: Vec<f64>,
+}
 
-    for (fill_index, shapes) in fill_shapes.iter().enumerate() {
-        let Some(bounds) = fill_bounds[fill_index] else {
-            continue;
-        };
-        rasterize_overlay_shapes_body(
-            shapes,
-            bounds,
-            fill_index,
-            width,
-            height,
-            &mut body_mask,
-            &mut owner_distances,
-            &mut owner_indices,
-        );
-    }
+struct IslandFillSegment {
+    start: OverlayPoint,
+    end: OverlayPoint,
+    bounds: OverlayBounds,
+    fill_index: u32,
+}
 
-    for (fill_index, fill) in fills.iter().enumerate() {
-        let padding_pixels = fill.padding_pixels.max(0.0) as f64;
-        if padding_pixels <= 0.0 {
-            continue;
-        }
-        let padding_squared = padding_pixels * padding_pixels;
-        for shape in &fill_shapes[fill_index] {
-            for contour in shape {
+impl IslandFillOwners {
+    fn new(fills: &[PreparedFill], width: u32, height: u32) -> Self {
+        let index_started_at = Instant::now();
+        let shapes = fills
+            .iter()
+            .map(|fill| {
+                let shapes = fill_shapes_to_overlay_shapes(&fill.shapes, width, height);
+                let bounds = overlay_shapes_bounds(&shapes);
+                (shapes, bounds)
+            })
+            .collect::<Vec<_>>();
+        let padding_squared = fills
+            .iter()
+            .map(|fill| {
+                let padding_pixels = fill.padding_pixels.max(0.0) as f64;
+                padding_pixels * padding_pixels
+            })
+            .collect::<Vec<_>>();
+
+        let tile = ISLAND_FILL_TILE_PIXELS;
+        let tile_columns = width.div_ceil(tile);
+        let tile_rows = height.div_ceil(tile);
+        let mut segments = Vec::new();
+        let mut tile_pairs = Vec::<(u32, u32)>::new();
+        for (fill_index, (fill, (fill_shapes, _bounds))) in fills.iter().zip(&shapes).enumerate() {
+            let padding_pixels = fill.padding_pixels.max(0.0) as f64;
+            if padding_pixels <= 0.0 {
+                continue;
+            }
+            for contour in fill_shapes.iter().flatten() {
                 for segment_index in 0..contour.len() {
                     let start = contour[segment_index];
                     let end = contour[(segment_index + 1) % contour.len()];
-                    let bounds = segment_bounds(start, end);
+                    let bounds = OverlayBounds {
+                        min_x: start[0].min(end[0]),
+                        min_y: start[1].min(end[1]),
+                        max_x: start[0].max(end[0]),
+                        max_y: start[1].max(end[1]),
+                    };
                     let (min_x, max_x, min_y, max_y) =
                         pixel_range_for_bounds(bounds, padding_pixels, width, height);
-
-                    for y in min_y..=max_y {
-                        for x in min_x..=max_x {
-                            let index = pixel_index(x, y, width);
-                            if body_mask[index] {
-                                continue;
-                            }
-                            let point = pixel_center(x, y);
-                            let distance = distance_to_segment_squared(point, start, end);
-                            if distance <= padding_squared && distance < owner_distances[index] {
-                                owner_distances[index] = distance;
-                                owner_indices[index] = fill_index;
+                    if min_x > max_x || min_y > max_y {
+                        continue;
+                    }
+                    let segment = segments.len() as u32;
+                    for tile_y in min_y / tile..=max_y / tile {
+                        for tile_x in min_x / tile..=max_x / tile {
+                            let rect = island_fill_tile_rect(tile_x, tile_y, width, height);
+                            if segment_rect_distance_lower_bound(start, end, bounds, rect)
+                                <= padding_pixels
+                            {
+                                tile_pairs.push((tile_y * tile_columns + tile_x, segment));
                             }
                         }
                     }
+                    segments.push(IslandFillSegment {
+                        start,
+                        end,
+                        bounds,
+                        fill_index: fill_index as u32,
+                    });
+                }
+            }
+        }
+        tile_pairs.sort_unstable();
+
+        let tile_count = tile_columns as usize * tile_rows as usize;
+        let mut tile_offsets = Vec::with_capacity(tile_count + 1);
+        let mut tile_segments = Vec::with_capacity(tile_pairs.len());
+        let mut tile_lower_bounds = Vec::with_capacity(tile_pairs.len());
+        let mut pairs = tile_pairs.as_slice();
+        let mut nearby = Vec::new();
+        tile_offsets.push(0);
+        for tile_index in 0..tile_count as u32 {
+            let count = pairs
+                .iter()
+                .take_while(|(pair_tile, _)| *pair_tile == tile_index)
+                .count();
+            let (tile_pairs, rest) = pairs.split_at(count);
+            pairs = rest;
+            let rect = island_fill_tile_rect(
+                tile_index % tile_columns,
+                tile_index / tile_columns,
+                width,
+                height,
+            );
+
+            // A segment within its island's padding of every pixel of the
+            // tile bounds the nearest owner distance for the whole tile, so
+            // segments farther than that from the tile can never own a pixel.
+            let corners = [
+                [rect.min_x, rect.min_y],
+                [rect.max_x, rect.min_y],
+                [rect.min_x, rect.max_y],
+                [rect.max_x, rect.max_y],
+            ];
+            let mut reach = f64::INFINITY;
+            for &(_, segment) in tile_pairs {
+                let segment = &segments[segment as usize];
+                let farthest = corners
+                    .iter()
+                    .map(|&corner| distance_to_segment_squared(corner, segment.start, segment.end))
+                    .fold(0.0, f64::max)
+                    .sqrt()
+                    + ISLAND_FILL_DISTANCE_SLACK;
+                if farthest * farthest <= padding_squared[segment.fill_index as usize] {
+                    reach = reach.min(farthest);
+                }
+            }
+            nearby.clear();
+            for &(_, segment_index) in tile_pairs {
+                let segment = &segments[segment_index as usize];
+                let lower_bound = segment_rect_distance_lower_bound(
+                    segment.start,
+                    segment.end,
+                    segment.bounds,
+                    rect,
+                );
+                if lower_bound <= reach {
+                    nearby.push((lower_bound, segment_index));
+                }
+            }
+            // Nearest first, so the search narrows quickly.
+            nearby.sort_unstable_by(|left, right| left.0.total_cmp(&right.0));
+            tile_segments.extend(nearby.iter().map(|&(_, segment_index)| segment_index));
+            tile_lower_bounds.extend(nearby.iter().map(|&(lower_bound, _)| {
+                let lower_bound = lower_bound.max(0.0);
+                lower_bound * lower_bound
+            }));
+            tile_offsets.push(tile_segments.len() as u32);
+        }
+        log_profile("island_fill_index", index_started_at);
+
+        Self {
+            shapes,
+            segments,
+            padding_squared,
+            width,
+            height,
+            tile_columns: tile_columns as usize,
+            tile_offsets,
+            tile_segments,
+            tile_lower_bounds,
+        }
+    }
+
+    /// Fills `owners` with the owner of every pixel of `rows`, `u32::MAX`
+    /// for none.
+    fn owner_rows(&self, rows: Range<u32>, owners: &mut Vec<u32>) {
+        let width = self.width;
+        owners.clear();
+        owners.resize(rows.len() * width as usize, u32::MAX);
+        for (fill_index, (shapes, bounds)) in self.shapes.iter().enumerate() {
+            let Some(bounds) = *bounds else {
+                continue;
+            };
+            rasterize_overlay_shapes_body(
+                shapes,
+                bounds,
+                fill_index as u32,
+                width,
+                self.height,
+                &rows,
+                owners,
+            );
+        }
+
+        let tile = ISLAND_FILL_TILE_PIXELS;
+        for y in rows.clone() {
+            let tile_row = (y / tile) as usize * self.tile_columns;
+            for tile_x in 0..self.tile_columns {
+                let tile_index = tile_row + tile_x;
+                let range = self.tile_offsets[tile_index] as usize
+                    ..self.tile_offsets[tile_index + 1] as usize;
+                let candidates = &self.tile_segments[range.clone()];
+                let lower_bounds = &self.tile_lower_bounds[range];
+                if candidates.is_empty() {
+                    continue;
+                }
+                let tile_start = tile_x as u32 * tile;
+                for x in tile_start..(tile_start + tile).min(width) {
+                    let index = pixel_index(x, y - rows.start, width);
+                    if owners[index] != u32::MAX {
+                        continue;
+                    }
+                    owners[index] =
+                        self.nearest_owner(pixel_center(x, y), candidates, lower_bounds);
                 }
             }
         }
     }
 
-    let pixels = pixmap.pixels_mut();
-    for (index, owner_index) in owner_indices.into_iter().enumerate() {
-        if owner_index == usize::MAX {
-            continue;
+    /// `lower_bounds` holds the squared tile lower bound of each candidate,
+    /// ascending, so the scan stops once no later candidate can be nearer.
+    fn nearest_owner(&self, point: OverlayPoint, candidates: &[u32], lower_bounds: &[f64]) -> u32 {
+        let mut best = (f64::INFINITY, u32::MAX);
+        for (&segment_index, &lower_bound) in candidates.iter().zip(lower_bounds) {
+            if lower_bound > best.0 {
+                break;
+            }
+            let segment = &self.segments[segment_index as usize];
+            let gap_x = (segment.bounds.min_x - point[0])
+                .max(point[0] - segment.bounds.max_x)
+                .max(0.0);
+            let gap_y = (segment.bounds.min_y - point[1])
+                .max(point[1] - segment.bounds.max_y)
+                .max(0.0);
+            if gap_x * gap_x + gap_y * gap_y > best.0 {
+                continue;
+            }
+            let distance = distance_to_segment_squared(point, segment.start, segment.end);
+            if distance <= self.padding_squared[segment.fill_index as usize]
+                && (distance, segment_index) < best
+            {
+                best = (distance, segment_index);
+            }
+        }
+        self.segments
+            .get(best.1 as usize)
+            .map_or(u32::MAX, |segment| segment.fill_index)
+    }
+}
+
+/// Pixel centres covered by one island fill tile.
+fn island_fill_tile_rect(tile_x: u32, tile_y: u32, width: u32, height: u32) -> OverlayBounds {
+    let tile = ISLAND_FILL_TILE_PIXELS;
+    OverlayBounds {
+        min_x: (tile_x * tile) as f64 + 0.5,
+        min_y: (tile_y * tile) as f64 + 0.5,
+        max_x: ((tile_x + 1) * tile).min(width) as f64 - 0.5,
+        max_y: ((tile_y + 1) * tile).min(height) as f64 - 0.5,
+    }
+}
+
+/// A distance no larger than the one between the segment and `rect`: the
+/// larger of the gap between their bounds and the distance to the rect's
+/// centre less its half diagonal, which stays tight for long diagonals,
+/// less `ISLAND_FILL_DISTANCE_SLACK` for rounding.
+fn segment_rect_distance_lower_bound(
+    start: OverlayPoint,
+    end: OverlayPoint,
+    bounds: OverlayBounds,
+    rect: OverlayBounds,
+) -> f64 {
+    let gap_x = (rect.min_x - bounds.max_x)
+        .max(bounds.min_x - rect.max_x)
+        .max(0.0);
+    let gap_y = (rect.min_y - bounds.max_y)
+        .max(bounds.min_y - rect.max_y)
+        .max(0.0);
+    let center = [
+        (rect.min_x + rect.max_x) * 0.5,
+        (rect.min_y + rect.max_y) * 0.5,
+    ];
+    let half_diagonal = (rect.max_x - rect.min_x).hypot(rect.max_y - rect.min_y) * 0.5;
+    let center_gap = distance_to_segment_squared(center, start, end).sqrt() - half_diagonal;
+    gap_x.hypot(gap_y).max(center_gap) - ISLAND_FILL_DISTANCE_SLACK
+}
+
+fn composite_island_fill_owners(
+    pixels: &mut [PremultipliedColorU8],
+    fills: &[PreparedFill],
+    owners: &[u32],
+) {
+    for (pixel, &owner) in pixels.iter_mut().zip(owners) {
+        if owner != u32::MAX {
+            source_over_pixel(pixel, fills[owner as usize].fill_color);
         }
-        source_over_pixel(&mut pixels[index], fills[owner_index].fill_color);
     }
 }
 
+fn clamp_row_span(min_y: u32, max_y: u32, rows: &Range<u32>) -> Option<Range<u32>> {
+    let start = min_y.max(rows.start);
+    let end = max_y.saturating_add(1).min(rows.end);
+    (start < end).then_some(start..end)
+}
+
 fn pixel_range_for_bounds(
     bounds: OverlayBounds,
     expand: f64,
@@ -3131,17 +6215,19 @@ fn pixel_index(x: u32, y: u32, width: u32) -> usize {
 fn rasterize_overlay_shapes_body(
     shapes: &OverlayShapes,
     bounds: OverlayBounds,
-    fill_index: usize,
+    fill_index: u32,
     width: u32,
     height: u32,
-    body_mask: &mut [bool],
-    owner_distances: &mut [f64],
-    owner_indices: &mut [usize],
+    rows: &Range<u32>,
+    owner_indices: &mut [u32],
 ) {
     let (_min_x, _max_x, min_y, max_y) = pixel_range_for_bounds(bounds, 0.0, width, height);
+    let Some(row_span) = clamp_row_span(min_y, max_y, rows) else {
+        return;
+    };
     let mut intersections = Vec::new();
 
-    for y in min_y..=max_y {
+    for y in row_span {
         let y_center = y as f64 + 0.5;
         intersections.clear();
 
@@ -3166,10 +6252,7 @@ fn rasterize_overlay_shapes_body(
             let start = ((left - 0.5).ceil()).clamp(0.0, width as f64) as u32;
             let end = ((right - 0.5).ceil()).clamp(0.0, width as f64) as u32;
             for x in start..end {
-                let index = pixel_index(x, y, width);
-                body_mask[index] = true;
-                owner_distances[index] = -1.0;
-                owner_indices[index] = fill_index;
+                owner_indices[pixel_index(x, y - rows.start, width)] = fill_index;
             }
         }
     }
@@ -3191,15 +6274,6 @@ fn collect_scanline_intersections(contour: &OverlayContour, y: f64, intersection
     }
 }
 
-fn segment_bounds(start: OverlayPoint, end: OverlayPoint) -> OverlayBounds {
-    OverlayBounds {
-        min_x: start[0].min(end[0]),
-        min_y: start[1].min(end[1]),
-        max_x: start[0].max(end[0]),
-        max_y: start[1].max(end[1]),
-    }
-}
-
 fn distance_to_segment_squared(point: OverlayPoint, start: OverlayPoint, end: OverlayPoint) -> f64 {
     let dx = end[0] - start[0];
     let dy = end[1] - start[1];
@@ -3274,12 +6348,24 @@ fn build_skia_shape(shape: &FillShape, width: u32, height: u32) -> Option<tiny_s
 }
 
 fn build_skia_path(path: &[QPoint], width: u32, height: u32) -> Option<tiny_skia::Path> {
-    let first = *path.first()?;
-    let first_point = to_canvas_point(first, width, height);
     let mut builder = PathBuilder::new();
+    append_skia_path(&mut builder, path, width, height);
+    builder.finish()
+}
+
+/// Appends `path` to `builder` as one contour. Paths with fewer than two
+/// points draw nothing and are skipped.
+fn append_skia_path(builder: &mut PathBuilder, path: &[QPoint], width: u32, height: u32) {
+    let [first, rest @ ..] = path else {
+        return;
+    };
+    if rest.is_empty() {
+        return;
+    }
+    let first_point = to_canvas_point(*first, width, height);
     builder.move_to(first_point[0], first_point[1]);
 
-    for point in &path[1..] {
+    for point in rest {
         let canvas = to_canvas_point(*point, width, height);
         builder.line_to(canvas[0], canvas[1]);
     }
@@ -3287,18 +6373,240 @@ fn build_skia_path(path: &[QPoint], width: u32, height: u32) -> Option<tiny_skia
     if path.len() >= 3 && path.first() == path.last() {
         builder.close();
     }
+}
 
-    builder.finish()
+fn save_image(
+    pixmap: &Pixmap,
+    image_path: &Path,
+    png_compression: PngCompression,
+) -> Result<(), BoxError> {
+    let format = OutputFormat::from_path(image_path);
+    if format == OutputFormat::Png && png_compression == PngCompression::Default {
+        pixmap.save_png(image_path)?;
+        return Ok(());
+    }
+    fs::write(image_path, encode_pixmap(pixmap, format, png_compression)?)?;
+    Ok(())
+}
+
+fn save_svg(
+    prepared: &PreparedDrawing,
+    image_path: &Path,
+    width: u32,
+    height: u32,
+) -> Result<(), BoxError> {
+    let mut out = BufWriter::new(fs::File::create(image_path)?);
+    write_edges_svg(prepared, width, height, svg_precision(), &mut out)?;
+    out.flush()?;
+    Ok(())
+}
+
+fn encode_pixmap(
+    pixmap: &Pixmap,
+    format: OutputFormat,
+    png_compression: PngCompression,
+) -> Result<Vec<u8>, BoxError> {
+    match format {
+        OutputFormat::Png => encode_png_with_compression(pixmap, png_compression),
+        OutputFormat::Tga => encode_tga(pixmap),
+        OutputFormat::Bmp => Ok(encode_bmp(pixmap)),
+        OutputFormat::Rgba => Ok(pixmap_to_rgba(pixmap)),
+        OutputFormat::Svg => Err("svg output cannot be encoded from a raster".into()),
+    }
+}
+
+fn pixmap_to_rgba(pixmap: &Pixmap) -> Vec<u8> {
+    let mut rgba = Vec::with_capacity(pixmap.pixels().len() * 4);
+    for pixel in pixmap.pixels() {
+        let color = pixel.demultiply();
+        rgba.extend_from_slice(&[color.red(), color.green(), color.blue(), color.alpha()]);
+    }
+    rgba
 }
 
-fn save_image(pixmap: &Pixmap, image_path: &Path) -> Result<(), BoxError> {
-    pixmap.save_png(image_path)?;
-    Ok(())
+fn pixmap_to_bgra(pixmap: &Pixmap) -> Vec<u8> {
+    let mut bgra = Vec::with_capacity(pixmap.pixels().len() * 4);
+    for pixel in pixmap.pixels() {
+        let color = pixel.demultiply();
+        bgra.extend_from_slice(&[color.blue(), color.green(), color.red(), color.alpha()]);
+    }
+    bgra
+}
+
+/// Writes an 8-bit RGBA PNG with an explicit deflate level. `None` and
+/// `Fast` skip row filtering entirely; `Best` picks a filter per row.
+fn encode_png_with_compression(
+    pixmap: &Pixmap,
+    png_compression: PngCompression,
+) -> Result<Vec<u8>, BoxError> {
+    let level = match png_compression {
+        PngCompression::Default => return Ok(pixmap.encode_png()?),
+        PngCompression::None => flate2::Compression::none(),
+        PngCompression::Fast => flate2::Compression::fast(),
+        PngCompression::Best => flate2::Compression::best(),
+    };
+
+    let rgba = pixmap_to_rgba(pixmap);
+    let stride = pixmap.width() as usize * 4;
+    let mut filtered = Vec::with_capacity((stride + 1) * pixmap.height() as usize);
+    let mut previous_row: &[u8] = &[];
+    for row in rgba.chunks_exact(stride) {
+        if png_compression == PngCompression::Best {
+            append_adaptive_filtered_row(&mut filtered, row, previous_row);
+        } else {
+            filtered.push(0);
+            filtered.extend_from_slice(row);
+        }
+        previous_row = row;
+    }
+
+    let mut encoder =
+        flate2::write::ZlibEncoder::new(Vec::with_capacity(filtered.len() / 2 + 64), level);
+    encoder.write_all(&filtered)?;
+    let image_data = encoder.finish()?;
+
+    let mut ihdr = Vec::with_capacity(13);
+    ihdr.extend_from_slice(&pixmap.width().to_be_bytes());
+    ihdr.extend_from_slice(&pixmap.height().to_be_bytes());
+    // 8-bit depth, RGBA colour, deflate, adaptive filtering, no interlace.
+    ihdr.extend_from_slice(&[8, 6, 0, 0, 0]);
+
+    let mut png = Vec::with_capacity(image_data.len() + 64);
+    png.extend_from_slice(b"\x89PNG\r\n\x1a\n");
+    push_png_chunk(&mut png, b"IHDR", &ihdr);
+    push_png_chunk(&mut png, b"IDAT", &image_data);
+    push_png_chunk(&mut png, b"IEND", &[]);
+    Ok(png)
+}
+
+fn push_png_chunk(png: &mut Vec<u8>, kind: &[u8; 4], data: &[u8]) {
+    png.extend_from_slice(&(data.len() as u32).to_be_bytes());
+    png.extend_from_slice(kind);
+    png.extend_from_slice(data);
+    let mut hasher = crc32fast::Hasher::new();
+    hasher.update(kind);
+    hasher.update(data);
+    png.extend_from_slice(&hasher.finalize().to_be_bytes());
+}
+
+/// Appends the row using whichever PNG filter gives the smallest sum of
+/// absolute residuals, the usual heuristic for good deflate input.
+fn append_adaptive_filtered_row(output: &mut Vec<u8>, row: &[u8], previous_row: &[u8]) {
+    const BYTES_PER_PIXEL: usize = 4;
+    let above = |index: usize| previous_row.get(index).copied().unwrap_or(0);
+    let left = |index: usize| {
+        if index >= BYTES_PER_PIXEL {
+            row[index - BYTES_PER_PIXEL]
+        } else {
+            0
+        }
+    };
+    let upper_left = |index: usize| {
+        if index >= BYTES_PER_PIXEL {
+            above(index - BYTES_PER_PIXEL)
+        } else {
+            0
+        }
+    };
+    let predict = |filter: u8, index: usize| -> u8 {
+        match filter {
+            1 => left(index),
+            2 => above(index),
+            3 => ((left(index) as u16 + above(index) as u16) / 2) as u8,
+            4 => paeth_predictor(left(index), above(index), upper_left(index)),
+            _ => 0,
+        }
+    };
+
+    let mut best_filter = 0;
+    let mut best_cost = u64::MAX;
+    for filter in 0..5u8 {
+        let cost = row
+            .iter()
+            .enumerate()
+            .map(|(index, &value)| {
+                (value.wrapping_sub(predict(filter, index)) as i8).unsigned_abs() as u64
+            })
+            .sum::<u64>();
+        if cost < best_cost {
+            best_cost = cost;
+            best_filter = filter;
+        }
+    }
+
+    output.push(best_filter);
+    output.extend(
+        row.iter()
+            .enumerate()
+            .map(|(index, &value)| value.wrapping_sub(predict(best_filter, index))),
+    );
 }
 
-fn save_svg(document: &Document, image_path: &Path) -> Result<(), BoxError> {
-    svg::save(image_path, document)?;
-    Ok(())
+fn paeth_predictor(left: u8, above: u8, upper_left: u8) -> u8 {
+    let estimate = left as i16 + above as i16 - upper_left as i16;
+    let distance_left = (estimate - left as i16).abs();
+    let distance_above = (estimate - above as i16).abs();
+    let distance_upper_left = (estimate - upper_left as i16).abs();
+    if distance_left <= distance_above && distance_left <= distance_upper_left {
+        left
+    } else if distance_above <= distance_upper_left {
+        above
+    } else {
+        upper_left
+    }
+}
+
+/// Uncompressed 32-bit TGA with a top-left origin.
+fn encode_tga(pixmap: &Pixmap) -> Result<Vec<u8>, BoxError> {
+    let width = u16::try_from(pixmap.width()).map_err(|_| "tga width exceeds 65535")?;
+    let height = u16::try_from(pixmap.height()).map_err(|_| "tga height exceeds 65535")?;
+
+    let mut tga = Vec::with_capacity(18 + pixmap.pixels().len() * 4);
+    // No image id or colour map, uncompressed true-colour.
+    tga.extend_from_slice(&[0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0]);
+    tga.extend_from_slice(&width.to_le_bytes());
+    tga.extend_from_slice(&height.to_le_bytes());
+    // 32 bits per pixel; 8 alpha bits with a top-left origin.
+    tga.extend_from_slice(&[32, 0x28]);
+    tga.extend_from_slice(&pixmap_to_bgra(pixmap));
+    Ok(tga)
+}
+
+/// Top-down 32-bit BMP with a BITMAPV4HEADER so the alpha mask is kept.
+fn encode_bmp(pixmap: &Pixmap) -> Vec<u8> {
+    const FILE_HEADER_SIZE: u32 = 14;
+    const INFO_HEADER_SIZE: u32 = 108;
+    let pixel_bytes = pixmap.pixels().len() as u32 * 4;
+    let pixel_offset = FILE_HEADER_SIZE + INFO_HEADER_SIZE;
+
+    let mut bmp = Vec::with_capacity((pixel_offset + pixel_bytes) as usize);
+    bmp.extend_from_slice(b"BM");
+    bmp.extend_from_slice(&(pixel_offset + pixel_bytes).to_le_bytes());
+    bmp.extend_from_slice(&[0, 0, 0, 0]);
+    bmp.extend_from_slice(&pixel_offset.to_le_bytes());
+
+    bmp.extend_from_slice(&INFO_HEADER_SIZE.to_le_bytes());
+    bmp.extend_from_slice(&(pixmap.width() as i32).to_le_bytes());
+    // A negative height stores rows top-down.
+    bmp.extend_from_slice(&(-(pixmap.height() as i32)).to_le_bytes());
+    bmp.extend_from_slice(&1u16.to_le_bytes());
+    bmp.extend_from_slice(&32u16.to_le_bytes());
+    // BI_BITFIELDS with explicit BGRA channel masks.
+    bmp.extend_from_slice(&3u32.to_le_bytes());
+    bmp.extend_from_slice(&pixel_bytes.to_le_bytes());
+    bmp.extend_from_slice(&2835i32.to_le_bytes());
+    bmp.extend_from_slice(&2835i32.to_le_bytes());
+    bmp.extend_from_slice(&0u32.to_le_bytes());
+    bmp.extend_from_slice(&0u32.to_le_bytes());
+    for mask in [0x00ff_0000u32, 0x0000_ff00, 0x0000_00ff, 0xff00_0000] {
+        bmp.extend_from_slice(&mask.to_le_bytes());
+    }
+    // LCS_sRGB, followed by unused colour endpoints and gamma.
+    bmp.extend_from_slice(&0x7352_4742u32.to_le_bytes());
+    bmp.extend_from_slice(&[0; 48]);
+
+    bmp.extend_from_slice(&pixmap_to_bgra(pixmap));
+    bmp
 }
 
 fn quantize_point(point: [f32; 2]) -> QPoint {
@@ -3501,6 +6809,7 @@ fn compact_payload_from_buffers(
                 warning_color[2],
                 warning_color[3],
             ],
+            mode: PaddingWarningMode::Exact,
         })
     } else {
         None
@@ -3526,9 +6835,25 @@ fn compact_payload_from_buffers(
         polygons,
         padding_warning,
         island_fill,
+        antialias: true,
     })
 }
 
+fn compact_payload_from_drawer_payload(payload: &DrawerPayload) -> CompactPayload {
+    let inputs = collect_arrangement_inputs(&payload.edges);
+    CompactPayload {
+        styles: draw_styles(&payload.edges),
+        arrangement_input_segments: inputs.original_segments,
+        arrangement_input_group_segments: inputs.group_segments,
+        arrangement_input_group_segment_indices: inputs.group_segment_indices,
+        point_positions: inputs.point_positions,
+        polygons: payload.polygons.clone(),
+        padding_warning: payload.padding_warning.clone(),
+        island_fill: payload.island_fill.clone(),
+        antialias: payload.antialias,
+    }
+}
+
 fn build_polygon_buffers_from_indexed_uvs(
     face_uv_counts: &[usize],
     face_uv_ids: &[usize],
@@ -3608,15 +6933,495 @@ fn build_polygon_buffers_from_indexed_uvs(
     Ok((polygon_offsets, polygon_points))
 }
 
+/// Polygon topology a geometry LOD level is built from. Points are unique
+/// UV coordinates numbered in order of first use, edges are the undirected
+/// polygon edges in order of first use with their endpoints sorted by
+/// coordinate, and barriers are the outline edges plus any border lines.
+struct LodTopology {
+    points: Vec<[f64; 2]>,
+    corners: Vec<u32>,
+    islands: Vec<u32>,
+    edges: Vec<[u32; 2]>,
+    pinned: Vec<bool>,
+    barriers: Vec<[[f64; 2]; 2]>,
+}
+
+impl LodTopology {
+    fn new(
+        polygon_offsets: &[usize],
+        polygon_points: &[f64],
+        barrier_points: &[f64],
+    ) -> Result<Self, BoxError> {
+        if polygon_points.len() % 2 != 0 || barrier_points.len() % 4 != 0 {
+            return Err("LOD point buffers must hold whole points and segments".into());
+        }
+        if polygon_offsets
+            .windows(2)
+            .any(|pair| pair[0] > pair[1] || pair[1] * 2 > polygon_points.len())
+        {
+            return Err("polygon_offsets exceed polygon_points length".into());
+        }
+
+        let mut point_ids = HashMap::with_capacity(polygon_points.len() / 4);
+        let mut points = Vec::new();
+        let corners = polygon_points
+            .chunks_exact(2)
+            .map(|point| {
+                let point = [point[0], point[1]];
+                *point_ids.entry(lod_point_key(point)).or_insert_with(|| {
+                    points.push(point);
+                    (points.len() - 1) as u32
+                })
+            })
+            .collect::<Vec<u32>>();
+
+        let mut island_parents = (0..points.len() as u32).collect::<Vec<u32>>();
+        let mut edge_ids = HashMap::with_capacity(corners.len());
+        let mut edges = Vec::new();
+        let mut edge_counts = Vec::new();
+        for polygon in polygon_offsets.windows(2) {
+            let ring = &corners[polygon[0]..polygon[1]];
+            let Some(&last) = ring.last() else {
+                continue;
+            };
+            let mut previous = last;
+            for &point in ring {
+                let first_root = lod_find_root(&mut island_parents, ring[0]);
+                let root = lod_find_root(&mut island_parents, point);
+                island_parents[root as usize] = first_root;
+
+                let edge = if points[previous as usize] <= points[point as usize] {
+                    [previous, point]
+                } else {
+                    [point, previous]
+                };
+                let index = *edge_ids.entry(edge).or_insert_with(|| {
+                    edges.push(edge);
+                    edge_counts.push(0u32);
+                    edges.len() - 1
+                });
+                edge_counts[index] += 1;
+                previous = point;
+            }
+        }
+        let islands = (0..points.len() as u32)
+            .map(|point| lod_find_root(&mut island_parents, point))
+            .collect();
+
+        let mut pinned = vec![false; points.len()];
+        let mut barriers = Vec::new();
+        for (edge, _) in edges
+            .iter()
+            .zip(&edge_counts)
+            .filter(|(_, &count)| count == 1)
+        {
+            pinned[edge[0] as usize] = true;
+            pinned[edge[1] as usize] = true;
+            barriers.push([points[edge[0] as usize], points[edge[1] as usize]]);
+        }
+        for segment in barrier_points.chunks_exact(4) {
+            let segment = [[segment[0], segment[1]], [segment[2], segment[3]]];
+            for point in segment {
+                if let Some(&id) = point_ids.get(&lod_point_key(point)) {
+                    pinned[id as usize] = true;
+                }
+            }
+            barriers.push(segment);
+        }
+
+        Ok(Self {
+            points,
+            corners,
+            islands,
+            edges,
+            pinned,
+            barriers,
+        })
+    }
+
+    /// Target point of every point after vertex clustering on a grid of
+    /// `scale` cells per UV. Unpinned points of one island and cell that are
+    /// joined by polygon edges inside the cell move to the point of their
+    /// cluster used first.
+    fn cluster_snaps(&self, scale: f64) -> Vec<u32> {
+        let cells = self
+            .points
+            .iter()
+            .zip(&self.islands)
+            .map(|(point, &island)| {
+                (
+                    island,
+                    (point[0] * scale).floor() as i64,
+                    (point[1] * scale).floor() as i64,
+                )
+            })
+            .collect::<Vec<_>>();
+        let mut snaps = (0..self.points.len() as u32).collect::<Vec<u32>>();
+        for &[start, end] in &self.edges {
+            let (start, end) = (start as usize, end as usize);
+            if self.pinned[start] || self.pinned[end] || cells[start] != cells[end] {
+                continue;
+            }
+            let start_root = lod_find_root(&mut snaps, start as u32);
+            let end_root = lod_find_root(&mut snaps, end as u32);
+            snaps[start_root.max(end_root) as usize] = start_root.min(end_root);
+        }
+        for point in 0..self.points.len() as u32 {
+            lod_find_root(&mut snaps, point);
+        }
+        snaps
+    }
+
+    /// Undoes snaps until no snapped polygon edge crosses or touches a
+    /// barrier. Edges are checked in the same order as the Python fallback,
+    /// so both build the same level.
+    fn undo_crossing_snaps(&self, snaps: &mut [u32], scale: f64) {
+        let cell_range = |start: [f64; 2], end: [f64; 2]| {
+            let columns = (start[0].min(end[0]) * scale).floor() as i64
+                ..=(start[0].max(end[0]) * scale).floor() as i64;
+            let rows = (start[1].min(end[1]) * scale).floor() as i64
+                ..=(start[1].max(end[1]) * scale).floor() as i64;
+            columns.flat_map(move |column| rows.clone().map(move |row| (column, row)))
+        };
+        let mut grid = HashMap::<(i64, i64), Vec<u32>>::new();
+        for (index, barrier) in self.barriers.iter().enumerate() {
+            for cell in cell_range(barrier[0], barrier[1]) {
+                grid.entry(cell).or_default().push(index as u32);
+            }
+        }
+
+        let moved = |snaps: &[u32], point: u32| snaps[point as usize] != point;
+        let mut pending = (0..self.edges.len() as u32)
+            .filter(|&index| {
+                let [start, end] = self.edges[index as usize];
+                moved(snaps, start) || moved(snaps, end)
+            })
+            .collect::<Vec<u32>>();
+        let mut point_edges: Option<Vec<Vec<u32>>> = None;
+        while let Some(index) = pending.pop() {
+            let edge = self.edges[index as usize];
+            let start = snaps[edge[0] as usize];
+            let end = snaps[edge[1] as usize];
+            if start == end || (start == edge[0] && end == edge[1]) {
+                continue;
+            }
+            let start = self.points[start as usize];
+            let end = self.points[end as usize];
+            let crosses = cell_range(start, end).any(|cell| {
+                grid.get(&cell).is_some_and(|barriers| {
+                    barriers.iter().any(|&barrier| {
+                        lod_segment_meets_barrier(start, end, self.barriers[barrier as usize])
+                    })
+                })
+            });
+            if !crosses {
+                continue;
+            }
+            let point_edges = point_edges.get_or_insert_with(|| {
+                let mut point_edges = vec![Vec::new(); self.points.len()];
+                for (other, &[start, end]) in self.edges.iter().enumerate() {
+                    for point in [start, end] {
+                        if moved(snaps, point) {
+                            point_edges[point as usize].push(other as u32);
+                        }
+                    }
+                }
+                point_edges
+            });
+            for point in edge {
+                if moved(snaps, point) {
+                    snaps[point as usize] = point;
+                    pending.extend_from_slice(&point_edges[point as usize]);
+                }
+            }
+        }
+    }
+}
+
+fn lod_point_key(point: [f64; 2]) -> (u64, u64) {
+    // Adding zero folds -0.0 into 0.0, which compare equal as UV coordinates.
+    ((point[0] + 0.0).to_bits(), (point[1] + 0.0).to_bits())
+}
+
+fn lod_find_root(parents: &mut [u32], point: u32) -> u32 {
+    let mut root = point;
+    while parents[root as usize] != root {
+        root = parents[root as usize];
+    }
+    let mut point = point;
+    while parents[point as usize] != root {
+        let next = parents[point as usize];
+        parents[point as usize] = root;
+        point = next;
+    }
+    root
+}
+
+/// True when segment `start`-`end` crosses `barrier` or passes through one of
+/// its endpoints. Barriers sharing an endpoint with the segment are attached
+/// to it, not crossed.
+fn lod_segment_meets_barrier(start: [f64; 2], end: [f64; 2], barrier: [[f64; 2]; 2]) -> bool {
+    let [barrier_start, barrier_end] = barrier;
+    if [barrier_start, barrier_end]
+        .iter()
+        .any(|point| *point == start || *point == end)
+    {
+        return false;
+    }
+    let orientation = |point: [f64; 2]| {
+        (end[0] - start[0]) * (point[1] - start[1]) - (end[1] - start[1]) * (point[0] - start[0])
+    };
+    let within = |point: [f64; 2]| {
+        start[0].min(end[0]) <= point[0]
+            && point[0] <= start[0].max(end[0])
+            && start[1].min(end[1]) <= point[1]
+            && point[1] <= start[1].max(end[1])
+    };
+
+    let side_start = orientation(barrier_start);
+    let side_end = orientation(barrier_end);
+    if (side_start == 0.0 && within(barrier_start)) || (side_end == 0.0 && within(barrier_end)) {
+        return true;
+    }
+    if (side_start > 0.0) == (side_end > 0.0) || side_start == 0.0 || side_end == 0.0 {
+        return false;
+    }
+    let barrier_x = barrier_end[0] - barrier_start[0];
+    let barrier_y = barrier_end[1] - barrier_start[1];
+    let side_a =
+        barrier_x * (start[1] - barrier_start[1]) - barrier_y * (start[0] - barrier_start[0]);
+    let side_b = barrier_x * (end[1] - barrier_start[1]) - barrier_y * (end[0] - barrier_start[0]);
+    (side_a > 0.0) != (side_b > 0.0) && side_a != 0.0 && side_b != 0.0
+}
+
+/// Builds one geometry LOD level: vertex-clusters interior points onto a grid
+/// of `cells_per_uv` cells per UV, keeping outline and border points fixed,
+/// and returns the simplified polygon buffers plus flat
+/// `(from_u, from_v, to_u, to_v)` records of every moved point so callers can
+/// snap edge lines the same way. Matches the Python fallback in
+/// `MeshTopologySnapshot._build_lod_level`.
+pub fn build_lod_level(
+    polygon_offsets: &[usize],
+    polygon_points: &[f64],
+    barrier_points: &[f64],
+    cells_per_uv: f64,
+) -> Result<(Vec<usize>, Vec<f64>, Vec<f64>), BoxError> {
+    let topology = LodTopology::new(polygon_offsets, polygon_points, barrier_points)?;
+    let mut snaps = topology.cluster_snaps(cells_per_uv);
+    topology.undo_crossing_snaps(&mut snaps, cells_per_uv);
+
+    let mut level_offsets = vec![0];
+    let mut level_points = Vec::with_capacity(polygon_points.len());
+    for polygon in polygon_offsets.windows(2) {
+        let start_len = level_points.len();
+        let mut count = 0usize;
+        for corner in polygon[0]..polygon[1] {
+            let point = topology.corners[corner];
+            let target = snaps[point as usize];
+            let [u, v] = if target == point {
+                [polygon_points[corner * 2], polygon_points[corner * 2 + 1]]
+            } else {
+                topology.points[target as usize]
+            };
+            if count > 0 && level_points[level_points.len() - 2..] == [u, v] {
+                continue;
+            }
+            level_points.extend_from_slice(&[u, v]);
+            count += 1;
+        }
+        if count >= 3
+            && level_points[start_len..start_len + 2] == level_points[level_points.len() - 2..]
+        {
+            level_points.truncate(level_points.len() - 2);
+            count -= 1;
+        }
+        if count < 3 {
+            level_points.truncate(start_len);
+        } else {
+            level_offsets.push(level_offsets[level_offsets.len() - 1] + count);
+        }
+    }
+
+    let moved_points = snaps
+        .iter()
+        .enumerate()
+        .filter(|&(point, &target)| point as u32 != target)
+        .flat_map(|(point, &target)| {
+            let [from_u, from_v] = topology.points[point];
+            let [to_u, to_v] = topology.points[target as usize];
+            [from_u, from_v, to_u, to_v]
+        })
+        .collect();
+    Ok((level_offsets, level_points, moved_points))
+}
+
+fn draw_compact_payload_to_path(
+    image_path: &Path,
+    width: u32,
+    height: u32,
+    payload: &CompactPayload,
+    png_compression: PngCompression,
+) -> Result<(), BoxError> {
+    let prepare_started_at = Instant::now();
+    let prepared = prepare_drawing_from_compact(payload, width, height, 1.0);
+    log_profile("prepare_total", prepare_started_at);
+
+    draw_prepared_to_path(&prepared, image_path, width, height, png_compression)
+}
+
+fn draw_compact_payload_to_paths(
+    payload: &CompactPayload,
+    outputs: &[OutputSpec],
+) -> Result<(), BoxError> {
+    let prepare_started_at = Instant::now();
+    let prepared = prepare_compact_outputs(payload, outputs, geometry_cache());
+    log_profile("prepare_total", prepare_started_at);
+
+    let workers = worker_threads().min(outputs.len()).max(1);
+    parallel_blocks(
+        outputs.len(),
+        workers,
+        || (),
+        |_, index| {
+            let output = &outputs[index];
+            draw_prepared_to_path(
+                &prepared[index],
+                &output.path,
+                output.width,
+                output.height,
+                output.png_compression,
+            )
+        },
+    )
+    .into_iter()
+    .collect()
+}
+
+/// Renders every payload to its own outputs, the payloads spread over worker
+/// threads. Each payload is prepared once for all of its outputs.
+fn draw_compact_payloads_to_paths(
+    jobs: &[(CompactPayload, Vec<OutputSpec>)],
+) -> Result<(), BoxError> {
+    let workers = worker_threads().min(jobs.len()).max(1);
+    parallel_blocks(
+        jobs.len(),
+        workers,
+        || (),
+        |_, index| {
+            let (payload, outputs) = &jobs[index];
+            draw_compact_payload_to_paths(payload, outputs)
+        },
+    )
+    .into_iter()
+    .collect()
+}
+
+fn draw_compact_payload_to_bytes(
+    format: OutputFormat,
+    width: u32,
+    height: u32,
+    payload: &CompactPayload,
+    png_compression: PngCompression,
+) -> Result<Vec<u8>, BoxError> {
+    let prepare_started_at = Instant::now();
+    let prepared = prepare_drawing_from_compact(payload, width, height, 1.0);
+    log_profile("prepare_total", prepare_started_at);
+
+    render_prepared_to_bytes(&prepared, width, height, format, png_compression)
+}
+
+fn draw_prepared_to_path(
+    prepared: &PreparedDrawing,
+    image_path: &Path,
+    width: u32,
+    height: u32,
+    png_compression: PngCompression,
+) -> Result<(), BoxError> {
+    if OutputFormat::from_path(image_path) == OutputFormat::Svg {
+        let render_started_at = Instant::now();
+        let render_memory = phase_memory_start();
+        save_svg(prepared, image_path, width, height)?;
+        log_profile("render_svg", render_started_at);
+        log_render_memory("render_svg", render_memory, width, height);
+        Ok(())
+    } else {
+        let render_started_at = Instant::now();
+        let render_memory = phase_memory_start();
+        let pixmap = draw_edges_raster(prepared, width, height)?;
+        log_profile("render_raster", render_started_at);
+        log_render_memory("render_raster", render_memory, width, height);
+        let encode_started_at = Instant::now();
+        let encode_memory = phase_memory_start();
+        save_image(&pixmap, image_path, png_compression)?;
+        log_profile("encode", encode_started_at);
+        log_render_memory("encode", encode_memory, width, height);
+        Ok(())
+    }
+}
+
+/// Encodes the drawing in memory. `Rgba` returns the raw raster as
+/// non-premultiplied RGBA rows, top row first.
+fn render_prepared_to_bytes(
+    prepared: &PreparedDrawing,
+    width: u32,
+    height: u32,
+    format: OutputFormat,
+    png_compression: PngCompression,
+) -> Result<Vec<u8>, BoxError> {
+    if format == OutputFormat::Svg {
+        let render_started_at = Instant::now();
+        let render_memory = phase_memory_start();
+        let mut bytes = Vec::new();
+        write_edges_svg(prepared, width, height, svg_precision(), &mut bytes)?;
+        log_profile("render_svg", render_started_at);
+        log_render_memory("render_svg", render_memory, width, height);
+        return Ok(bytes);
+    }
+
+    let render_started_at = Instant::now();
+    let render_memory = phase_memory_start();
+    let pixmap = draw_edges_raster(prepared, width, height)?;
+    log_profile("render_raster", render_started_at);
+    log_render_memory("render_raster", render_memory, width, height);
+
+    let encode_started_at = Instant::now();
+    let encode_memory = phase_memory_start();
+    let bytes = encode_pixmap(&pixmap, format, png_compression)?;
+    log_profile("encode", encode_started_at);
+    log_render_memory("encode", encode_memory, width, height);
+    Ok(bytes)
+}
+
 #[pyfunction(name = "draw_edges")]
-fn draw_edges_py(image_path: &str, width: u32, height: u32, edges_json: &str) -> PyResult<()> {
-    draw_to_path(Path::new(image_path), width, height, edges_json)
-        .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+#[pyo3(signature = (image_path, width, height, edges_json, png_compression = "default"))]
+fn draw_edges_py(
+    py: Python<'_>,
+    image_path: &str,
+    width: u32,
+    height: u32,
+    edges_json: &str,
+    png_compression: &str,
+) -> PyResult<()> {
+    py.allow_threads(|| {
+        let png_compression = PngCompression::from_name(png_compression)?;
+        draw_to_path_with_compression(
+            Path::new(image_path),
+            width,
+            height,
+            edges_json,
+            png_compression,
+        )
+    })
+    .map_err(|err| PyRuntimeError::new_err(err.to_string()))
 }
 
+/// Buffers are extracted from Python before the call; preparation, rendering
+/// and encoding then run with the GIL released.
 #[allow(clippy::too_many_arguments)]
 #[pyfunction(name = "draw_edges_buffered")]
+#[pyo3(signature = (image_path, width, height, group_line_offsets, line_points, group_internal_widths, group_outline_widths, group_internal_colors, group_outline_colors, group_draw_outline, group_draw_internal, polygon_offsets, polygon_points, warning_enabled, padding_pixels, warning_width, warning_color, island_fill_enabled, island_fill_opacity, island_fill_padding_pixels, png_compression = "default", padding_mode = "exact", antialias = true))]
 fn draw_edges_buffered_py(
+    py: Python<'_>,
     image_path: &str,
     width: u32,
     height: u32,
@@ -3637,63 +7442,370 @@ fn draw_edges_buffered_py(
     island_fill_enabled: bool,
     island_fill_opacity: f32,
     island_fill_padding_pixels: f32,
+    png_compression: &str,
+    padding_mode: &str,
+    antialias: bool,
 ) -> PyResult<()> {
-    let payload = compact_payload_from_buffers(
-        group_line_offsets,
-        line_points,
-        group_internal_widths,
-        group_outline_widths,
-        group_internal_colors,
-        group_outline_colors,
-        group_draw_outline,
-        group_draw_internal,
-        polygon_offsets,
-        polygon_points,
-        warning_enabled,
-        padding_pixels,
-        warning_width,
-        warning_color,
-        island_fill_enabled,
-        island_fill_opacity,
-        island_fill_padding_pixels,
-    )
-    .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
-    let prepare_started_at = Instant::now();
-    let prepared = prepare_drawing_from_compact(&payload, width, height);
-    log_profile("prepare_total", prepare_started_at);
+    py.allow_threads(move || {
+        let png_compression = PngCompression::from_name(png_compression)?;
+        let padding_mode = PaddingWarningMode::from_name(padding_mode)?;
+        let mut payload = compact_payload_from_buffers(
+            group_line_offsets,
+            line_points,
+            group_internal_widths,
+            group_outline_widths,
+            group_internal_colors,
+            group_outline_colors,
+            group_draw_outline,
+            group_draw_internal,
+            polygon_offsets,
+            polygon_points,
+            warning_enabled,
+            padding_pixels,
+            warning_width,
+            warning_color,
+            island_fill_enabled,
+            island_fill_opacity,
+            island_fill_padding_pixels,
+        )?;
+        payload.set_padding_warning_mode(padding_mode);
+        payload.antialias = antialias;
+        draw_compact_payload_to_path(
+            Path::new(image_path),
+            width,
+            height,
+            &payload,
+            png_compression,
+        )
+    })
+    .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+}
+
+/// Same as `draw_edges`, but returns the encoded image instead of writing it.
+/// `format` is one of `png`, `svg`, `tga`, `bmp` or `rgba`.
+#[pyfunction(name = "draw_edges_to_bytes")]
+#[pyo3(signature = (format, width, height, edges_json, png_compression = "default"))]
+fn draw_edges_to_bytes_py<'py>(
+    py: Python<'py>,
+    format: &str,
+    width: u32,
+    height: u32,
+    edges_json: &str,
+    png_compression: &str,
+) -> PyResult<Bound<'py, PyBytes>> {
+    let bytes = py
+        .allow_threads(|| {
+            let png_compression = PngCompression::from_name(png_compression)?;
+            draw_to_bytes(format, width, height, edges_json, png_compression)
+        })
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+    Ok(PyBytes::new_bound(py, &bytes))
+}
+
+/// Same as `draw_edges_buffered`, but returns the encoded image instead of
+/// writing it. `format` is one of `png`, `svg`, `tga`, `bmp` or `rgba`.
+#[allow(clippy::too_many_arguments)]
+#[pyfunction(name = "draw_edges_buffered_to_bytes")]
+#[pyo3(signature = (format, width, height, group_line_offsets, line_points, group_internal_widths, group_outline_widths, group_internal_colors, group_outline_colors, group_draw_outline, group_draw_internal, polygon_offsets, polygon_points, warning_enabled, padding_pixels, warning_width, warning_color, island_fill_enabled, island_fill_opacity, island_fill_padding_pixels, png_compression = "default", padding_mode = "exact", antialias = true))]
+fn draw_edges_buffered_to_bytes_py<'py>(
+    py: Python<'py>,
+    format: &str,
+    width: u32,
+    height: u32,
+    group_line_offsets: Vec<usize>,
+    line_points: Vec<f32>,
+    group_internal_widths: Vec<f32>,
+    group_outline_widths: Vec<f32>,
+    group_internal_colors: Vec<u8>,
+    group_outline_colors: Vec<u8>,
+    group_draw_outline: Vec<bool>,
+    group_draw_internal: Vec<bool>,
+    polygon_offsets: Vec<usize>,
+    polygon_points: Vec<f32>,
+    warning_enabled: bool,
+    padding_pixels: f32,
+    warning_width: f32,
+    warning_color: Vec<u8>,
+    island_fill_enabled: bool,
+    island_fill_opacity: f32,
+    island_fill_padding_pixels: f32,
+    png_compression: &str,
+    padding_mode: &str,
+    antialias: bool,
+) -> PyResult<Bound<'py, PyBytes>> {
+    let bytes = py
+        .allow_threads(move || {
+            let format = OutputFormat::from_name(format)?;
+            let png_compression = PngCompression::from_name(png_compression)?;
+            let padding_mode = PaddingWarningMode::from_name(padding_mode)?;
+            let mut payload = compact_payload_from_buffers(
+                group_line_offsets,
+                line_points,
+                group_internal_widths,
+                group_outline_widths,
+                group_internal_colors,
+                group_outline_colors,
+                group_draw_outline,
+                group_draw_internal,
+                polygon_offsets,
+                polygon_points,
+                warning_enabled,
+                padding_pixels,
+                warning_width,
+                warning_color,
+                island_fill_enabled,
+                island_fill_opacity,
+                island_fill_padding_pixels,
+            )?;
+            payload.set_padding_warning_mode(padding_mode);
+            payload.antialias = antialias;
+            draw_compact_payload_to_bytes(format, width, height, &payload, png_compression)
+        })
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
+    Ok(PyBytes::new_bound(py, &bytes))
+}
+
+/// `(path, width, height, width_scale, png_compression)`.
+type PyOutputSpec = (String, u32, u32, f32, String);
+/// `(group_line_offsets, line_points, group_internal_widths,
+/// group_outline_widths, group_internal_colors, group_outline_colors,
+/// group_draw_outline, group_draw_internal)`.
+type PyGroupBuffers = (
+    Vec<usize>,
+    Vec<f32>,
+    Vec<f32>,
+    Vec<f32>,
+    Vec<u8>,
+    Vec<u8>,
+    Vec<bool>,
+    Vec<bool>,
+);
+/// `(enabled, padding_pixels, warning_width, warning_color, mode)`.
+type PyPaddingWarning = (bool, f32, f32, Vec<u8>, String);
+/// `(enabled, opacity, padding_pixels)`.
+type PyIslandFill = (bool, f32, f32);
+/// One payload of a batch: its outputs, group buffers, `(polygon_offsets,
+/// polygon_points)`, padding warning, island fill and antialias flag.
+type PyBufferedJob = (
+    Vec<PyOutputSpec>,
+    PyGroupBuffers,
+    (Vec<usize>, Vec<f32>),
+    PyPaddingWarning,
+    PyIslandFill,
+    bool,
+);
+
+fn output_specs_from_py(outputs: Vec<PyOutputSpec>) -> Result<Vec<OutputSpec>, BoxError> {
+    outputs
+        .into_iter()
+        .map(|(path, width, height, width_scale, png_compression)| {
+            Ok(OutputSpec {
+                path: PathBuf::from(path),
+                width,
+                height,
+                width_scale,
+                png_compression: PngCompression::from_name(&png_compression)?,
+            })
+        })
+        .collect()
+}
+
+/// Renders one JSON payload to every `(path, width, height, width_scale,
+/// png_compression)` output, sharing the preparation between them.
+#[pyfunction(name = "draw_edges_to_paths")]
+fn draw_edges_to_paths_py(
+    py: Python<'_>,
+    outputs: Vec<PyOutputSpec>,
+    edges_json: &str,
+) -> PyResult<()> {
+    py.allow_threads(|| draw_to_paths(edges_json, &output_specs_from_py(outputs)?))
+        .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+}
+
+/// Buffered counterpart of `draw_edges_to_paths`.
+#[allow(clippy::too_many_arguments)]
+#[pyfunction(name = "draw_edges_buffered_to_paths")]
+#[pyo3(signature = (outputs, group_line_offsets, line_points, group_internal_widths, group_outline_widths, group_internal_colors, group_outline_colors, group_draw_outline, group_draw_internal, polygon_offsets, polygon_points, warning_enabled, padding_pixels, warning_width, warning_color, island_fill_enabled, island_fill_opacity, island_fill_padding_pixels, padding_mode = "exact", antialias = true))]
+fn draw_edges_buffered_to_paths_py(
+    py: Python<'_>,
+    outputs: Vec<PyOutputSpec>,
+    group_line_offsets: Vec<usize>,
+    line_points: Vec<f32>,
+    group_internal_widths: Vec<f32>,
+    group_outline_widths: Vec<f32>,
+    group_internal_colors: Vec<u8>,
+    group_outline_colors: Vec<u8>,
+    group_draw_outline: Vec<bool>,
+    group_draw_internal: Vec<bool>,
+    polygon_offsets: Vec<usize>,
+    polygon_points: Vec<f32>,
+    warning_enabled: bool,
+    padding_pixels: f32,
+    warning_width: f32,
+    warning_color: Vec<u8>,
+    island_fill_enabled: bool,
+    island_fill_opacity: f32,
+    island_fill_padding_pixels: f32,
+    padding_mode: &str,
+    antialias: bool,
+) -> PyResult<()> {
+    py.allow_threads(move || {
+        let outputs = output_specs_from_py(outputs)?;
+        let padding_mode = PaddingWarningMode::from_name(padding_mode)?;
+        let mut payload = compact_payload_from_buffers(
+            group_line_offsets,
+            line_points,
+            group_internal_widths,
+            group_outline_widths,
+            group_internal_colors,
+            group_outline_colors,
+            group_draw_outline,
+            group_draw_internal,
+            polygon_offsets,
+            polygon_points,
+            warning_enabled,
+            padding_pixels,
+            warning_width,
+            warning_color,
+            island_fill_enabled,
+            island_fill_opacity,
+            island_fill_padding_pixels,
+        )?;
+        payload.set_padding_warning_mode(padding_mode);
+        payload.antialias = antialias;
+        draw_compact_payload_to_paths(&payload, &outputs)
+    })
+    .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+}
+
+/// Renders several buffered payloads, each to its own outputs, in one call:
+/// the buffers are extracted up front and the payloads are then prepared
+/// and rendered on worker threads with the GIL released.
+#[pyfunction(name = "draw_edges_buffered_batch_to_paths")]
+fn draw_edges_buffered_batch_to_paths_py(py: Python<'_>, jobs: Vec<PyBufferedJob>) -> PyResult<()> {
+    py.allow_threads(move || {
+        let jobs = jobs
+            .into_iter()
+            .map(
+                |(outputs, groups, polygons, warning, island_fill, antialias)| {
+                    let outputs = output_specs_from_py(outputs)?;
+                    let padding_mode = PaddingWarningMode::from_name(&warning.4)?;
+                    let mut payload = compact_payload_from_buffers(
+                        groups.0,
+                        groups.1,
+                        groups.2,
+                        groups.3,
+                        groups.4,
+                        groups.5,
+                        groups.6,
+                        groups.7,
+                        polygons.0,
+                        polygons.1,
+                        warning.0,
+                        warning.1,
+                        warning.2,
+                        warning.3,
+                        island_fill.0,
+                        island_fill.1,
+                        island_fill.2,
+                    )?;
+                    payload.set_padding_warning_mode(padding_mode);
+                    payload.antialias = antialias;
+                    Ok((payload, outputs))
+                },
+            )
+            .collect::<Result<Vec<_>, BoxError>>()?;
+        draw_compact_payloads_to_paths(&jobs)
+    })
+    .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+}
+
+#[pyfunction(name = "build_polygon_buffers")]
+fn build_polygon_buffers_py(
+    py: Python<'_>,
+    face_uv_counts: Vec<usize>,
+    face_uv_ids: Vec<usize>,
+    all_us: Vec<f32>,
+    all_vs: Vec<f32>,
+) -> PyResult<(Vec<usize>, Vec<f32>)> {
+    py.allow_threads(|| {
+        build_polygon_buffers_from_indexed_uvs(&face_uv_counts, &face_uv_ids, &all_us, &all_vs)
+    })
+    .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+}
+
+#[pyfunction(name = "build_lod_level")]
+fn build_lod_level_py(
+    py: Python<'_>,
+    polygon_offsets: Vec<usize>,
+    polygon_points: Vec<f64>,
+    barrier_points: Vec<f64>,
+    cells_per_uv: f64,
+) -> PyResult<(Vec<usize>, Vec<f64>, Vec<f64>)> {
+    py.allow_threads(|| {
+        build_lod_level(
+            &polygon_offsets,
+            &polygon_points,
+            &barrier_points,
+            cells_per_uv,
+        )
+    })
+    .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+}
+
+#[pyfunction(name = "set_worker_threads")]
+fn set_worker_threads_py(count: usize) {
+    set_worker_threads(count);
+}
+
+#[pyfunction(name = "worker_threads")]
+fn worker_threads_py() -> usize {
+    worker_threads()
+}
+
+#[pyfunction(name = "set_svg_precision")]
+#[pyo3(signature = (digits = None))]
+fn set_svg_precision_py(digits: Option<usize>) {
+    set_svg_precision(digits);
+}
+
+#[pyfunction(name = "clear_geometry_cache")]
+fn clear_geometry_cache_py() {
+    clear_geometry_cache();
+}
 
-    if Path::new(image_path).extension().and_then(|s| s.to_str()) == Some("svg") {
-        let render_started_at = Instant::now();
-        let document = draw_edges_svg(&prepared, width, height);
-        log_profile("render_svg", render_started_at);
-        save_svg(&document, Path::new(image_path))
-            .map_err(|err| PyRuntimeError::new_err(err.to_string()))
-    } else {
-        let render_started_at = Instant::now();
-        let pixmap = draw_edges_raster(&prepared, width, height)
-            .map_err(|err| PyRuntimeError::new_err(err.to_string()))?;
-        log_profile("render_raster", render_started_at);
-        save_image(&pixmap, Path::new(image_path))
-            .map_err(|err| PyRuntimeError::new_err(err.to_string()))
-    }
+/// Returns `False` without touching it when a capture is already running.
+#[pyfunction(name = "start_profile_capture")]
+fn start_profile_capture_py() -> bool {
+    start_profile_capture()
 }
 
-#[pyfunction(name = "build_polygon_buffers")]
-fn build_polygon_buffers_py(
-    face_uv_counts: Vec<usize>,
-    face_uv_ids: Vec<usize>,
-    all_us: Vec<f32>,
-    all_vs: Vec<f32>,
-) -> PyResult<(Vec<usize>, Vec<f32>)> {
-    build_polygon_buffers_from_indexed_uvs(&face_uv_counts, &face_uv_ids, &all_us, &all_vs)
-        .map_err(|err| PyRuntimeError::new_err(err.to_string()))
+/// Returns the capture as `ProfileReport::to_json` text.
+#[pyfunction(name = "finish_profile_capture")]
+fn finish_profile_capture_py() -> String {
+    finish_profile_capture().to_json()
 }
 
 #[pymodule(name = "_edge_drawer")]
 fn _edge_drawer(_py: Python<'_>, module: &Bound<'_, PyModule>) -> PyResult<()> {
     module.add_function(wrap_pyfunction!(draw_edges_py, module)?)?;
     module.add_function(wrap_pyfunction!(draw_edges_buffered_py, module)?)?;
+    module.add_function(wrap_pyfunction!(draw_edges_to_bytes_py, module)?)?;
+    module.add_function(wrap_pyfunction!(draw_edges_buffered_to_bytes_py, module)?)?;
+    module.add_function(wrap_pyfunction!(draw_edges_to_paths_py, module)?)?;
+    module.add_function(wrap_pyfunction!(draw_edges_buffered_to_paths_py, module)?)?;
+    module.add_function(wrap_pyfunction!(
+        draw_edges_buffered_batch_to_paths_py,
+        module
+    )?)?;
     module.add_function(wrap_pyfunction!(build_polygon_buffers_py, module)?)?;
+    module.add_function(wrap_pyfunction!(build_lod_level_py, module)?)?;
+    module.add_function(wrap_pyfunction!(set_worker_threads_py, module)?)?;
+    module.add_function(wrap_pyfunction!(worker_threads_py, module)?)?;
+    module.add_function(wrap_pyfunction!(set_svg_precision_py, module)?)?;
+    module.add_function(wrap_pyfunction!(clear_geometry_cache_py, module)?)?;
+    module.add_function(wrap_pyfunction!(start_profile_capture_py, module)?)?;
+    module.add_function(wrap_pyfunction!(finish_profile_capture_py, module)?)?;
     Ok(())
 }
 
@@ -3977,6 +8089,7 @@ mod tests {
         assert_eq!(payload.polygons.len(), 1);
         assert!(payload.padding_warning.is_some());
         assert!(payload.island_fill.is_none());
+        assert!(payload.antialias);
         let warning = payload.padding_warning.unwrap();
         assert!(warning.enabled);
         assert_eq!(warning.padding_pixels, 8.0);
@@ -4009,6 +8122,13 @@ mod tests {
         assert!(payload.island_fill.is_none());
     }
 
+    #[test]
+    fn test_parse_drawer_payload_antialias() {
+        let payload = parse_drawer_payload(r#"{"edges": [], "antialias": false}"#).unwrap();
+        assert!(!payload.antialias);
+        assert!(compact_payload_from_drawer_payload(&payload).antialias == payload.antialias);
+    }
+
     #[test]
     fn test_parse_edges_json_defaults_draw_modes() {
         let edges = parse_edges_json(
@@ -4143,6 +8263,7 @@ mod tests {
         ];
         let fills = build_island_fills(
             &polygons,
+            None,
             Some(&IslandFillConfig {
                 enabled: true,
                 opacity: 0.25,
@@ -4173,6 +8294,7 @@ mod tests {
         ];
         let fills = build_island_fills(
             &polygons,
+            None,
             Some(&IslandFillConfig {
                 enabled: true,
                 opacity: 0.25,
@@ -4204,6 +8326,7 @@ mod tests {
         ];
         let fills = build_island_fills(
             &polygons,
+            None,
             Some(&IslandFillConfig {
                 enabled: true,
                 opacity: 0.25,
@@ -4226,6 +8349,7 @@ mod tests {
         }];
         let fills = build_island_fills(
             &polygons,
+            None,
             Some(&IslandFillConfig {
                 enabled: true,
                 opacity: 0.25,
@@ -4244,6 +8368,65 @@ mod tests {
         assert_eq!(max_y, quantize_point([0.4, 0.4]).y);
     }
 
+    /// A U-shaped island whose base lies below the canvas, plus a separate
+    /// island above the canvas that sorts first in fill order.
+    fn culled_island_fill_polygons() -> Vec<Polygon> {
+        vec![
+            Polygon {
+                points: vec![[0.3, 1.5], [0.5, 1.5], [0.5, 1.7], [0.3, 1.7]],
+            },
+            Polygon {
+                points: vec![[0.1, -0.5], [0.3, -0.5], [0.3, 0.8], [0.1, 0.8]],
+            },
+            Polygon {
+                points: vec![[0.3, -0.5], [0.7, -0.5], [0.7, -0.3], [0.3, -0.3]],
+            },
+            Polygon {
+                points: vec![[0.7, -0.5], [0.9, -0.5], [0.9, 0.8], [0.7, 0.8]],
+            },
+        ]
+    }
+
+    #[test]
+    fn test_cull_polygons_keeps_whole_fill_groups() {
+        let polygons = culled_island_fill_polygons();
+        let groups = polygon_fill_groups(&polygons);
+        assert_eq!(groups.groups.len(), 2);
+        assert_eq!(groups.groups[0].polygons, vec![0]);
+        assert_eq!(groups.groups[1].polygons, vec![1, 2, 3]);
+        assert_eq!(groups.groups[1].color_base, 1);
+
+        let rect = output_cull_rect(&[], 100, 100, None, None);
+        let (kept, kept_groups) = cull_polygons(&polygons, &rect, Some(&groups)).unwrap();
+        let kept_groups = kept_groups.unwrap();
+        assert_eq!(kept, polygons[1..].to_vec());
+        assert_eq!(kept_groups.groups.len(), 1);
+        assert_eq!(kept_groups.groups[0].polygons, vec![0, 1, 2]);
+        assert_eq!(kept_groups.groups[0].color_base, 1);
+
+        let (kept, kept_groups) = cull_polygons(&polygons, &rect, None).unwrap();
+        assert!(kept_groups.is_none());
+        assert_eq!(kept, vec![polygons[1].clone(), polygons[3].clone()]);
+    }
+
+    #[test]
+    fn test_island_fill_colors_survive_culling() {
+        let island_fill = IslandFillConfig {
+            enabled: true,
+            opacity: 0.25,
+            padding_pixels: 0.0,
+        };
+        let polygons = culled_island_fill_polygons();
+        let prepared = prepare_drawing(&[], &polygons, 100, 100, None, Some(&island_fill));
+        let unculled = build_island_fills(&polygons, None, Some(&island_fill), 100, 100);
+
+        assert_eq!(unculled.len(), 2);
+        assert_eq!(prepared.fills.len(), 1);
+        assert_eq!(prepared.fills[0].fill_color, unculled[1].fill_color);
+        assert_eq!(prepared.fills[0].shapes, unculled[1].shapes);
+        assert!(point_in_fill_shapes([0.5, -0.4], &prepared.fills[0].shapes));
+    }
+
     #[test]
     fn test_raster_island_fill_padding_uses_nearest_island_owner() {
         let polygons = vec![
@@ -4273,6 +8456,516 @@ mod tests {
         assert_right_island_pixel(&pixmap, 45, 70);
     }
 
+    #[test]
+    fn test_island_fill_owners_match_bruteforce_nearest_contour() {
+        let polygons = vec![
+            Polygon {
+                points: vec![[0.1, 0.1], [0.35, 0.12], [0.3, 0.4], [0.12, 0.33]],
+            },
+            Polygon {
+                points: vec![[0.42, 0.1], [0.8, 0.15], [0.45, 0.3]],
+            },
+            Polygon {
+                points: vec![
+                    [0.2, 0.5],
+                    [0.6, 0.45],
+                    [0.9, 0.9],
+                    [0.5, 0.7],
+                    [0.15, 0.85],
+                ],
+            },
+            Polygon {
+                points: vec![[0.97, 0.2], [1.1, 0.2], [1.1, 0.6], [0.98, 0.6]],
+            },
+        ];
+        let (width, height) = (160, 128);
+        let padding_pixels = 14.0;
+        let fills = build_island_fills(
+            &polygons,
+            None,
+            Some(&IslandFillConfig {
+                enabled: true,
+                opacity: 0.25,
+                padding_pixels,
+            }),
+            width,
+            height,
+        );
+        assert_eq!(
+            island_fill_owners(&fills, width, height),
+            bruteforce_island_fill_owners(&fills, width, height)
+        );
+    }
+
+    #[test]
+    fn test_island_fill_owners_match_bruteforce_on_random_layouts() {
+        let mut state = 0x2545_f491_4f6c_dd1d_u64;
+        let mut random = move || {
+            state ^= state << 13;
+            state ^= state >> 7;
+            state ^= state << 17;
+            (state >> 11) as f32 / (1u64 << 53) as f32
+        };
+        for layout in 0..8 {
+            let polygons = (0..3 + layout % 4)
+                .map(|_| {
+                    let center = [random() * 1.4 - 0.2, random() * 1.4 - 0.2];
+                    let corners = 3 + (random() * 5.0) as usize;
+                    let radius = 0.03 + random() * 0.25;
+                    let points = (0..corners)
+                        .map(|corner| {
+                            let angle = (corner as f32 + random() * 0.8) * std::f32::consts::TAU
+                                / corners as f32;
+                            let reach = radius * (0.3 + random() * 0.7);
+                            [
+                                center[0] + reach * angle.cos(),
+                                center[1] + reach * angle.sin(),
+                            ]
+                        })
+                        .collect();
+                    Polygon { points }
+                })
+                .collect::<Vec<_>>();
+            let (width, height) = (61 + layout * 13, 45 + layout * 11);
+            for padding_pixels in [0.5, 1.0, 3.0, 7.5, 21.0, 70.0] {
+                let mut fills = build_island_fills(
+                    &polygons,
+                    None,
+                    Some(&IslandFillConfig {
+                        enabled: true,
+                        opacity: 0.25,
+                        padding_pixels,
+                    }),
+                    width,
+                    height,
+                );
+                // Uneven paddings, including none, so owners cross islands.
+                for (fill_index, fill) in fills.iter_mut().enumerate() {
+                    fill.padding_pixels *= [1.0, 0.0, 2.5, 0.4][fill_index % 4];
+                }
+                assert_eq!(
+                    island_fill_owners(&fills, width, height),
+                    bruteforce_island_fill_owners(&fills, width, height),
+                    "layout {layout} padding {padding_pixels}"
+                );
+            }
+        }
+    }
+
+    fn island_fill_owners(fills: &[PreparedFill], width: u32, height: u32) -> Vec<u32> {
+        let owners = IslandFillOwners::new(fills, width, height);
+        let mut pixels = Vec::new();
+        let mut band = Vec::new();
+        for band_start in (0..height).step_by(7) {
+            owners.owner_rows(band_start..(band_start + 7).min(height), &mut band);
+            pixels.extend_from_slice(&band);
+        }
+        pixels
+    }
+
+    /// Every pixel against every contour segment: inside the last island
+    /// containing its centre, else the earliest nearest segment within its
+    /// island's padding.
+    fn bruteforce_island_fill_owners(fills: &[PreparedFill], width: u32, height: u32) -> Vec<u32> {
+        let shapes = fills
+            .iter()
+            .map(|fill| fill_shapes_to_overlay_shapes(&fill.shapes, width, height))
+            .collect::<Vec<_>>();
+        let mut owners = Vec::new();
+        for y in 0..height {
+            for x in 0..width {
+                let point = pixel_center(x, y);
+                let inside = (0..fills.len()).rev().find(|&fill_index| {
+                    let mut intersections = Vec::new();
+                    for contour in shapes[fill_index].iter().flatten() {
+                        collect_scanline_intersections(contour, point[1], &mut intersections);
+                    }
+                    intersections.iter().filter(|&&hit| hit > point[0]).count() % 2 == 1
+                });
+                let owner = inside.or_else(|| {
+                    let mut best = (f64::INFINITY, None);
+                    for (fill_index, fill_shapes) in shapes.iter().enumerate() {
+                        let padding = f64::from(fills[fill_index].padding_pixels.max(0.0));
+                        for contour in fill_shapes.iter().flatten() {
+                            for segment_index in 0..contour.len() {
+                                let start = contour[segment_index];
+                                let end = contour[(segment_index + 1) % contour.len()];
+                                let distance = distance_to_segment_squared(point, start, end);
+                                if distance <= padding * padding && distance < best.0 {
+                                    best = (distance, Some(fill_index));
+                                }
+                            }
+                        }
+                    }
+                    best.1
+                });
+                owners.push(owner.map(|owner| owner as u32).unwrap_or(u32::MAX));
+            }
+        }
+        owners
+    }
+
+    #[test]
+    fn test_tiled_raster_matches_full_canvas_raster() {
+        let mut payload = parse_drawer_payload(&payload_with_island_fill_json()).unwrap();
+        payload.edges.extend(
+            parse_edges_json(
+                r#"[{
+                    "line_color": [32, 96, 255, 160],
+                    "line_width": 7.0,
+                    "lines": [
+                        {"uv1": [-0.2, 0.3], "uv2": [0.45, 0.95]},
+                        {"uv1": [0.45, 0.95], "uv2": [1.3, 0.02]},
+                        {"uv1": [0.2, 0.7], "uv2": [0.8, 0.72]}
+                    ]
+                }, {
+                    "line_color": [255, 200, 0, 255],
+                    "line_width": 0.75,
+                    "lines": [
+                        {"uv1": [0.05, -0.1], "uv2": [0.3, 1.1]},
+                        {"uv1": [0.1, 0.4], "uv2": [0.9, 0.45]},
+                        {"uv1": [0.9, 0.45], "uv2": [0.7, 0.9]}
+                    ]
+                }, {
+                    "line_color": [0, 160, 80, 200],
+                    "line_width": 1.75,
+                    "lines": [
+                        {"uv1": [0.6, -0.05], "uv2": [0.15, 0.6]},
+                        {"uv1": [0.15, 0.6], "uv2": [0.95, 0.98]}
+                    ]
+                }]"#,
+            )
+            .unwrap(),
+        );
+        let (width, height) = (160, 120);
+
+        for (padding_pixels, antialias) in [(0.0, true), (6.0, true), (6.0, false)] {
+            let island_fill = IslandFillConfig {
+                enabled: true,
+                opacity: 0.5,
+                padding_pixels,
+            };
+            let prepared = prepare_drawing(
+                &payload.edges,
+                &payload.polygons,
+                width,
+                height,
+                None,
+                Some(&island_fill),
+            );
+            let prepared = PreparedDrawing {
+                antialias,
+                ..prepared
+            };
+            let expected = draw_edges_raster(&prepared, width, height).unwrap();
+            for band_rows in [7, 16, 50] {
+                let tiled =
+                    draw_edges_raster_tiled(&prepared, width, height, 1, band_rows).unwrap();
+                assert_rasters_close(&tiled, &expected);
+                for workers in [3, 4] {
+                    let parallel =
+                        draw_edges_raster_tiled(&prepared, width, height, workers, band_rows)
+                            .unwrap();
+                    assert!(parallel.pixels() == tiled.pixels());
+                }
+            }
+        }
+    }
+
+    /// Band clipping may move an antialiased edge by one supersample step.
+    fn assert_rasters_close(actual: &Pixmap, expected: &Pixmap) {
+        for (actual, expected) in actual.pixels().iter().zip(expected.pixels()) {
+            let channels = |pixel: &PremultipliedColorU8| {
+                [pixel.red(), pixel.green(), pixel.blue(), pixel.alpha()]
+            };
+            for (a, e) in channels(actual).into_iter().zip(channels(expected)) {
+                assert!(a.abs_diff(e) <= 16, "{a} != {e}");
+            }
+        }
+    }
+
+    #[test]
+    fn test_raster_band_pixmaps_stay_bounded() {
+        let (height, band_rows) = (1_000, 256);
+        for band_start in (0..height).step_by(band_rows as usize) {
+            let band_end = (band_start + band_rows).min(height);
+            let rows = raster_band_pixmap_rows(band_start, band_end, height);
+            assert!(rows.start <= band_start && rows.end >= band_end);
+            assert!(rows.len() as u32 <= band_rows + 2 * TILED_RASTER_BAND_MARGIN_ROWS);
+        }
+
+        // Strokes crossing the canvas sides and every band are clipped per
+        // band instead of growing the band pixmaps.
+        let edges = parse_edges_json(
+            r#"[{
+                "line_color": [200, 40, 40, 255],
+                "line_width": 5.0,
+                "lines": [
+                    {"uv1": [-0.5, -0.2], "uv2": [1.5, 1.2]},
+                    {"uv1": [1.5, 1.2], "uv2": [0.5, -0.4]},
+                    {"uv1": [-0.3, 0.5], "uv2": [1.3, 0.52]}
+                ]
+            }]"#,
+        )
+        .unwrap();
+        let (width, height) = (96, 200);
+        let prepared = prepare_drawing(&edges, &[], width, height, None, None);
+        let expected = draw_edges_raster(&prepared, width, height).unwrap();
+        let tiled = draw_edges_raster_tiled(&prepared, width, height, 2, 16).unwrap();
+        assert_rasters_close(&tiled, &expected);
+    }
+
+    #[test]
+    fn test_batch_skia_paths_bounds_points_and_bands() {
+        let (width, height) = (1024, 1024);
+        let chain = |x: i64, y: i64| vec![QPoint { x, y }, QPoint { x: x + 3, y }];
+        let mut paths = (0..STROKE_BATCH_POINTS as i64)
+            .map(|index| chain(index % 900, 950))
+            .collect::<Vec<_>>();
+        paths.push(chain(10, 100));
+        paths.push(vec![QPoint { x: 5, y: 5 }]);
+
+        let batches = batch_skia_paths(&paths, width, height);
+        // Two points per chain: the top band needs two batches, the chain near
+        // the bottom of the canvas gets its own, and the single point is dropped.
+        assert_eq!(batches.len(), 3);
+        for batch in &batches {
+            let bounds = batch.bounds();
+            let top_band = (bounds.top().max(0.0) as u32) / STROKE_BATCH_BAND_ROWS;
+            let bottom_band = (bounds.bottom().max(0.0) as u32) / STROKE_BATCH_BAND_ROWS;
+            assert_eq!(top_band, bottom_band);
+        }
+    }
+
+    #[test]
+    fn test_band_batches_keep_chains_spanning_bands_apart() {
+        let (width, height) = (1024, 1024);
+        let band = STROKE_BATCH_BAND_ROWS as i64;
+        // Short chains in the top band, and chains from that band down
+        // through every band of the canvas.
+        let mut paths = (0..64)
+            .map(|index| {
+                vec![
+                    QPoint {
+                        x: index * 10,
+                        y: 990,
+                    },
+                    QPoint {
+                        x: index * 10 + 5,
+                        y: 990,
+                    },
+                ]
+            })
+            .collect::<Vec<_>>();
+        for x in [100, 400, 700] {
+            paths.push((1..=124).map(|step| QPoint { x, y: step * 8 }).collect());
+        }
+
+        let rows = |index: usize| {
+            let rows = paths[index]
+                .iter()
+                .map(|point| to_canvas_point(*point, width, height)[1] as i64)
+                .collect::<Vec<_>>();
+            (
+                rows.iter().min().unwrap() / band,
+                rows.iter().max().unwrap() / band,
+            )
+        };
+        let batches = band_batches(&paths, width, height);
+        assert_eq!(batches.len(), 2);
+        for batch in &batches {
+            let (top, bottom) = rows(batch[0]);
+            assert!(batch.iter().all(|&index| rows(index) == (top, bottom)));
+        }
+        let short = batches.iter().find(|batch| batch.contains(&0)).unwrap();
+        assert_eq!(short.len(), 64);
+        let (top, bottom) = rows(short[0]);
+        assert_eq!(top, bottom);
+        let long = batches.iter().find(|batch| batch.contains(&64)).unwrap();
+        assert_eq!(long, &vec![64, 65, 66]);
+        assert_eq!(rows(64), (0, height as i64 / band - 1));
+    }
+
+    #[test]
+    fn test_batched_strokes_match_per_chain_strokes() {
+        let payload = parse_drawer_payload(VALID_JSON).unwrap();
+        let (width, height) = (96, 96);
+        let mut prepared =
+            prepare_drawing(&payload.edges, &payload.polygons, width, height, None, None);
+        // Every group goes through the stroker, not the thin-line kernel.
+        for group in &mut prepared.groups {
+            group.line_width += THIN_LINE_MAX_WIDTH;
+        }
+        assert!(prepared.groups.iter().any(|group| {
+            group.line_color[3] == u8::MAX
+                && batch_skia_paths(&group.paths, width, height).len() < group.paths.len()
+        }));
+
+        let mut expected = Pixmap::new(width, height).unwrap();
+        for group in &prepared.groups {
+            let mut paint = Paint::default();
+            paint.set_color_rgba8(
+                group.line_color[0],
+                group.line_color[1],
+                group.line_color[2],
+                group.line_color[3],
+            );
+            let stroke = Stroke {
+                width: group.line_width.max(0.5),
+                line_cap: LineCap::Round,
+                line_join: LineJoin::Round,
+                ..Stroke::default()
+            };
+            for path in &group.paths {
+                if let Some(path) = build_skia_path(path, width, height) {
+                    expected.stroke_path(&path, &paint, &stroke, Transform::identity(), None);
+                }
+            }
+        }
+
+        let batched = draw_edges_raster(&prepared, width, height).unwrap();
+        assert!(batched.pixels() == expected.pixels());
+    }
+
+    #[test]
+    fn test_thin_lines_cover_each_pixel_once() {
+        // A horizontal one-pixel line through pixel centres, split at a joint.
+        let edges = parse_edges_json(
+            r#"[{
+                "line_color": [255, 0, 0, 128],
+                "line_width": 1.0,
+                "lines": [
+                    {"uv1": [0.1, 0.895], "uv2": [0.5, 0.895]},
+                    {"uv1": [0.5, 0.895], "uv2": [0.9, 0.895]}
+                ]
+            }]"#,
+        )
+        .unwrap();
+        let prepared = prepare_drawing(&edges, &[], 100, 100, None, None);
+        let pixmap = draw_edges_raster(&prepared, 100, 100).unwrap();
+        let alpha = |x: usize, y: usize| pixmap.pixels()[y * 100 + x].alpha();
+
+        for x in 10..90 {
+            assert_eq!(alpha(x, 10), 128, "column {x}");
+            assert_eq!(alpha(x, 9), 0);
+            assert_eq!(alpha(x, 11), 0);
+        }
+        assert_eq!(alpha(9, 10), 0);
+        assert_eq!(alpha(90, 10), 0);
+    }
+
+    #[test]
+    fn test_thin_lines_without_antialias_take_one_pixel_per_step() {
+        let edges = parse_edges_json(
+            r#"[{
+                "line_color": [0, 0, 255, 200],
+                "line_width": 1.0,
+                "lines": [{"uv1": [0.1, 0.9], "uv2": [0.6, 0.4]}]
+            }]"#,
+        )
+        .unwrap();
+        let mut prepared = prepare_drawing(&edges, &[], 100, 100, None, None);
+        prepared.antialias = false;
+        let pixmap = draw_edges_raster(&prepared, 100, 100).unwrap();
+
+        let drawn = pixmap
+            .pixels()
+            .iter()
+            .enumerate()
+            .filter(|(_, pixel)| pixel.alpha() != 0)
+            .map(|(index, pixel)| (index % 100, index / 100, pixel.alpha()))
+            .collect::<Vec<_>>();
+        assert_eq!(drawn.len(), 51);
+        for (x, y, alpha) in drawn {
+            assert_eq!(x, y);
+            assert_eq!(alpha, 200);
+        }
+    }
+
+    fn draw_test_thin_lines(
+        chains: &[&[[f32; 2]]],
+        line_width: f32,
+        antialias: bool,
+        color: [u8; 4],
+    ) -> Pixmap {
+        let mut lines = ThinLines {
+            line_width,
+            coverage: line_width.clamp(0.5, 1.0),
+            antialias,
+            ..ThinLines::default()
+        };
+        for chain in chains {
+            lines.points.extend_from_slice(chain);
+            lines.chain_ends.push(lines.points.len());
+        }
+        let mut pixmap = Pixmap::new(40, 40).unwrap();
+        draw_thin_lines(&mut pixmap, &lines, color, 0);
+        pixmap
+    }
+
+    #[test]
+    fn test_two_pixel_thin_lines_cover_their_width() {
+        let alpha = |pixmap: &Pixmap, x: usize, y: usize| pixmap.pixels()[y * 40 + x].alpha();
+        // Centred on a pixel row: that row is covered and half of each
+        // neighbour; between two rows: both are covered.
+        let on_centre =
+            draw_test_thin_lines(&[&[[5.0, 10.5], [30.0, 10.5]]], 2.0, true, [0, 0, 0, 255]);
+        let between =
+            draw_test_thin_lines(&[&[[5.0, 20.0], [30.0, 20.0]]], 2.0, true, [0, 0, 0, 255]);
+        for x in 8..28 {
+            assert_eq!(alpha(&on_centre, x, 10), 255);
+            assert_eq!(alpha(&on_centre, x, 9), 128);
+            assert_eq!(alpha(&on_centre, x, 11), 128);
+            assert_eq!(alpha(&on_centre, x, 8), 0);
+            assert_eq!(alpha(&between, x, 19), 255);
+            assert_eq!(alpha(&between, x, 20), 255);
+            assert_eq!(alpha(&between, x, 18), 0);
+            assert_eq!(alpha(&between, x, 21), 0);
+        }
+
+        // A diagonal covers its capsule's area: length by width plus the
+        // round caps.
+        let diagonal =
+            draw_test_thin_lines(&[&[[6.3, 4.1], [31.7, 35.2]]], 1.5, true, [0, 0, 0, 255]);
+        let covered = diagonal
+            .pixels()
+            .iter()
+            .map(|pixel| pixel.alpha() as f32 / 255.0)
+            .sum::<f32>();
+        let length = (31.7f32 - 6.3).hypot(35.2 - 4.1);
+        let area = length * 1.5 + std::f32::consts::PI * 0.75 * 0.75;
+        assert!((covered - area).abs() < area * 0.02, "{covered} != {area}");
+
+        // Without antialiasing a pixel is drawn when its centre is inside.
+        let aliased =
+            draw_test_thin_lines(&[&[[5.0, 10.5], [30.0, 10.5]]], 2.0, false, [0, 0, 0, 255]);
+        for x in 8..28 {
+            assert_eq!(alpha(&aliased, x, 10), 255);
+            assert_eq!(alpha(&aliased, x, 9), 255);
+            assert_eq!(alpha(&aliased, x, 11), 255);
+            assert_eq!(alpha(&aliased, x, 8), 0);
+        }
+    }
+
+    #[test]
+    fn test_two_pixel_thin_chains_blend_once() {
+        // A straight chain of sub-pixel segments, translucent, draws exactly
+        // like its single segment: joints never blend twice.
+        let color = [200, 30, 30, 120];
+        let single = draw_test_thin_lines(&[&[[3.2, 5.1], [36.4, 33.9]]], 2.0, true, color);
+        let points = (0..=80)
+            .map(|step| {
+                let t = step as f32 / 80.0;
+                [3.2 + (36.4 - 3.2) * t, 5.1 + (33.9 - 5.1) * t]
+            })
+            .collect::<Vec<_>>();
+        let split = draw_test_thin_lines(&[&points], 2.0, true, color);
+        for (left, right) in single.pixels().iter().zip(split.pixels()) {
+            assert!(left.alpha().abs_diff(right.alpha()) <= 1);
+        }
+        assert!(split.pixels().iter().all(|pixel| pixel.alpha() <= 120));
+    }
+
     fn fill_shapes_bounds(shapes: &[FillShape]) -> (i64, i64, i64, i64) {
         let mut min_x = i64::MAX;
         let mut max_x = i64::MIN;
@@ -4317,36 +9010,316 @@ mod tests {
         );
     }
 
-    fn assert_right_island_pixel(pixmap: &Pixmap, x: u32, y: u32) {
-        let color = pixel_color_u8(pixmap, x, y);
-        assert_eq!(color[3], 64);
-        assert!(
-            color[0] > color[2],
-            "expected orange island color, got {color:?}"
-        );
+    fn assert_right_island_pixel(pixmap: &Pixmap, x: u32, y: u32) {
+        let color = pixel_color_u8(pixmap, x, y);
+        assert_eq!(color[3], 64);
+        assert!(
+            color[0] > color[2],
+            "expected orange island color, got {color:?}"
+        );
+    }
+
+    fn pixel_color_u8(pixmap: &Pixmap, x: u32, y: u32) -> [u8; 4] {
+        let color = pixmap.pixels()[pixel_index(x, y, pixmap.width())].demultiply();
+        [color.red(), color.green(), color.blue(), color.alpha()]
+    }
+
+    #[test]
+    fn test_padding_warning_marks_border_close_outline() {
+        let edges = parse_edges_json(
+            r#"[{"outline_color":[255,255,255,255],"outline_width":4.0,"draw_outline":true,"draw_internal":false,"lines":[{"uv1":[0.01,0.2],"uv2":[0.01,0.8]}]}]"#,
+        )
+        .unwrap();
+        let warning_segments = classify_warning_segments(&edges, 100, 100, 2.0);
+        assert!(warning_segments.contains(&near_left_border_segment()));
+    }
+
+    #[test]
+    fn test_padding_warning_marks_close_outline_pairs() {
+        let edges = parse_edges_json(&two_outline_islands_json()).unwrap();
+        let warning_segments = classify_warning_segments(&edges, 100, 100, 3.0);
+        assert!(warning_segments.contains(&island_left_segment()));
+        assert!(warning_segments.contains(&island_right_segment()));
+    }
+
+    #[test]
+    fn test_raster_padding_warning_marks_close_outline_pairs() {
+        let edges = parse_edges_json(&two_outline_islands_json()).unwrap();
+        let arrangement = build_segment_arrangement(&edges);
+        let (_internal_segments, outline_segments) =
+            classify_segments(&arrangement.segments, &arrangement.point_positions, &[]);
+        let outline = build_outline_topology(&outline_segments, &arrangement.segments);
+        let config = |padding_pixels| PaddingWarningConfig {
+            enabled: true,
+            padding_pixels,
+            warning_width: DEFAULT_WARNING_WIDTH,
+            warning_color: DEFAULT_WARNING_COLOR,
+            mode: PaddingWarningMode::Raster,
+        };
+
+        // The islands are 4 px apart at 200 px and 20 px from the border.
+        let id = |segment| segment_id(&arrangement.segments, segment).unwrap() as usize;
+        let warnings = detect_padding_warning_segments_raster(&outline, 200, 200, &config(8.0));
+        assert!(warnings.contains(id(island_left_segment())));
+        assert!(warnings.contains(id(island_right_segment())));
+        let warnings = detect_padding_warning_segments_raster(&outline, 200, 200, &config(2.0));
+        assert_eq!(warnings.count(), 0);
+    }
+
+    #[test]
+    fn test_raster_padding_warning_matches_exact_at_threshold() {
+        // Two vertical and two horizontal outlines, each pair exactly 125 px
+        // apart at 1000 px and far from the border. The horizontal pair lies
+        // across the edge between the first two raster bands.
+        let arrangement = arrangement_from_segments(&[
+            ([0.25, 0.25], [0.25, 0.5]),
+            ([0.375, 0.25], [0.375, 0.5]),
+            ([0.625, 0.75], [0.75, 0.75]),
+            ([0.625, 0.625], [0.75, 0.625]),
+        ]);
+        let (_internal_segments, outline_segments) =
+            classify_segments(&arrangement.segments, &arrangement.point_positions, &[]);
+        let outline = build_outline_topology(&outline_segments, &arrangement.segments);
+        let (width, height) = (1000, 1000);
+
+        for padding_pixels in [124.5, 125.0, 125.5] {
+            let config = |mode| PaddingWarningConfig {
+                enabled: true,
+                padding_pixels,
+                warning_width: DEFAULT_WARNING_WIDTH,
+                warning_color: DEFAULT_WARNING_COLOR,
+                mode,
+            };
+            let distances = build_padding_distance_index(&outline, width, height, padding_pixels);
+            let exact = detect_padding_warning_segments(
+                &outline,
+                &distances,
+                Some(&config(PaddingWarningMode::Exact)),
+            );
+            let raster = detect_padding_warning_segments_raster(
+                &outline,
+                width,
+                height,
+                &config(PaddingWarningMode::Raster),
+            );
+            assert_eq!(
+                raster.iter().collect::<Vec<_>>(),
+                exact.iter().collect::<Vec<_>>(),
+                "padding {}",
+                padding_pixels
+            );
+            assert_eq!(exact.count(), if padding_pixels > 125.0 { 4 } else { 0 });
+        }
+    }
+
+    #[test]
+    fn test_nearest_seed_transform_matches_bruteforce() {
+        let (width, height) = (37u32, 23u32);
+        let seeds = (0..width * height)
+            .map(|pixel| pixel % 97 == 5 || pixel % 131 == 17)
+            .collect::<Vec<_>>();
+        let owners = seeds
+            .iter()
+            .map(|&seed| if seed { 0 } else { u32::MAX })
+            .collect::<Vec<_>>();
+        let (mut column_rows, mut nearest) = (Vec::new(), Vec::new());
+        nearest_seed_transform(width, height, &owners, &mut column_rows, &mut nearest);
+        let squared = |left: u32, right: u32| {
+            let dx = (left % width).abs_diff(right % width);
+            let dy = (left / width).abs_diff(right / width);
+            dx * dx + dy * dy
+        };
+        for pixel in 0..width * height {
+            let expected = (0..width * height)
+                .filter(|&seed| seeds[seed as usize])
+                .map(|seed| squared(pixel, seed))
+                .min()
+                .unwrap();
+            assert!(seeds[nearest[pixel as usize] as usize]);
+            assert_eq!(squared(pixel, nearest[pixel as usize]), expected);
+        }
+
+        nearest_seed_transform(4, 3, &[u32::MAX; 12], &mut column_rows, &mut nearest);
+        assert!(nearest.iter().all(|&pixel| pixel == u32::MAX));
     }
 
-    fn pixel_color_u8(pixmap: &Pixmap, x: u32, y: u32) -> [u8; 4] {
-        let color = pixmap.pixels()[pixel_index(x, y, pixmap.width())].demultiply();
-        [color.red(), color.green(), color.blue(), color.alpha()]
+    #[test]
+    fn test_parallel_padding_warning_matches_bruteforce() {
+        let mut segments = Vec::new();
+        for row in 0..8 {
+            for column in 0..8 {
+                let origin = [
+                    0.03 + column as f32 * 0.12 + (row % 3) as f32 * 0.01,
+                    0.03 + row as f32 * 0.12 + (column % 4) as f32 * 0.008,
+                ];
+                let (island_segments, _) = grid_layout(2, 2, origin, [0.09, 0.1]);
+                segments.extend(island_segments);
+            }
+        }
+        let arrangement = arrangement_from_segments(&segments);
+        let (_internal_segments, outline_segments) =
+            classify_segments(&arrangement.segments, &arrangement.point_positions, &[]);
+        let config = PaddingWarningConfig {
+            enabled: true,
+            padding_pixels: 24.0,
+            warning_width: DEFAULT_WARNING_WIDTH,
+            warning_color: DEFAULT_WARNING_COLOR,
+            mode: PaddingWarningMode::Exact,
+        };
+        let (width, height) = (1024, 1024);
+
+        let sorted_outline = outline_segments
+            .iter()
+            .map(|id| arrangement.segments[id])
+            .collect::<Vec<_>>();
+        let components = compute_components(&build_adjacency(
+            &sorted_outline,
+            &arrangement.point_positions,
+        ));
+        let mut expected = HashSet::new();
+        for (left_index, &left) in sorted_outline.iter().enumerate() {
+            if segment_border_distance_pixels(left, width, height) < config.padding_pixels {
+                expected.insert(left);
+            }
+            for &right in &sorted_outline[left_index + 1..] {
+                if components[&left.start] != components[&right.start]
+                    && segment_distance_pixels(left, right, width, height) < config.padding_pixels
+                {
+                    expected.insert(left);
+                    expected.insert(right);
+                }
+            }
+        }
+        assert!(!expected.is_empty());
+        assert!(expected.len() < sorted_outline.len());
+
+        let outline = build_outline_topology(&outline_segments, &arrangement.segments);
+        for workers in [1, 4] {
+            let distances =
+                build_padding_distance_index_with_workers(&outline, width, height, 64.0, workers);
+            let warnings = detect_padding_warning_segments(&outline, &distances, Some(&config))
+                .iter()
+                .map(|id| arrangement.segments[id])
+                .collect::<HashSet<_>>();
+            assert_eq!(warnings, expected);
+        }
     }
 
     #[test]
-    fn test_padding_warning_marks_border_close_outline() {
-        let edges = parse_edges_json(
-            r#"[{"outline_color":[255,255,255,255],"outline_width":4.0,"draw_outline":true,"draw_internal":false,"lines":[{"uv1":[0.01,0.2],"uv2":[0.01,0.8]}]}]"#,
-        )
-        .unwrap();
-        let warning_segments = classify_warning_segments(&edges, 100, 100, 2.0);
-        assert!(warning_segments.contains(&near_left_border_segment()));
+    fn test_padding_distance_index_answers_every_threshold_within_radius() {
+        let mut segments = Vec::new();
+        for row in 0..6 {
+            for column in 0..6 {
+                let origin = [
+                    0.02 + column as f32 * 0.16 + (row % 2) as f32 * 0.015,
+                    0.02 + row as f32 * 0.16 + (column % 3) as f32 * 0.01,
+                ];
+                let (island_segments, _) = grid_layout(2, 2, origin, [0.13, 0.12]);
+                segments.extend(island_segments);
+            }
+        }
+        let arrangement = arrangement_from_segments(&segments);
+        let (_internal_segments, outline_segments) =
+            classify_segments(&arrangement.segments, &arrangement.point_positions, &[]);
+        let outline = build_outline_topology(&outline_segments, &arrangement.segments);
+        let (width, height) = (512, 512);
+        let shared = build_padding_distance_index(&outline, width, height, 40.0);
+
+        let mut previous_count = 0;
+        for padding_pixels in [2.0, 6.0, 12.0, 20.0, 40.0] {
+            let config = PaddingWarningConfig {
+                enabled: true,
+                padding_pixels,
+                warning_width: DEFAULT_WARNING_WIDTH,
+                warning_color: DEFAULT_WARNING_COLOR,
+                mode: PaddingWarningMode::Exact,
+            };
+            let exact = build_padding_distance_index(&outline, width, height, padding_pixels);
+            let expected = detect_padding_warning_segments(&outline, &exact, Some(&config));
+            let warnings = detect_padding_warning_segments(&outline, &shared, Some(&config));
+            assert_eq!(warnings, expected);
+            assert!(warnings.count() >= previous_count);
+            previous_count = warnings.count();
+        }
+        assert!(previous_count > 0);
     }
 
     #[test]
-    fn test_padding_warning_marks_close_outline_pairs() {
-        let edges = parse_edges_json(&two_outline_islands_json()).unwrap();
-        let warning_segments = classify_warning_segments(&edges, 100, 100, 3.0);
-        assert!(warning_segments.contains(&island_left_segment()));
-        assert!(warning_segments.contains(&island_right_segment()));
+    fn test_padding_changes_reuse_geometry_and_per_size_indexes() {
+        let payload = compact_payload_from_drawer_payload(
+            &parse_drawer_payload(&square_with_diagonal_json(true, true)).unwrap(),
+        );
+        let cache = GeometryCache::new();
+        let prepare = |width: u32, padding_pixels: f32| {
+            let config = PaddingWarningConfig {
+                enabled: true,
+                padding_pixels,
+                warning_width: DEFAULT_WARNING_WIDTH,
+                warning_color: DEFAULT_WARNING_COLOR,
+                mode: PaddingWarningMode::Exact,
+            };
+            let output = output_cull_rect(&payload.styles, width, width, Some(&config), None);
+            prepare_geometry(
+                &payload.arrangement_input_segments,
+                &payload.point_positions,
+                &payload.arrangement_input_group_segments,
+                &payload.arrangement_input_group_segment_indices,
+                &payload.polygons,
+                &geometry_cull_rect(&output),
+                Some(&cache),
+                Instant::now(),
+                0,
+            )
+        };
+
+        let geometry = prepare(512, 1.0);
+        for padding_pixels in [2.0, 4.0, 8.0, 16.0, 24.0] {
+            assert!(Arc::ptr_eq(&geometry, &prepare(512, padding_pixels)));
+            assert!(Arc::ptr_eq(&geometry, &prepare(4096, padding_pixels * 8.0)));
+        }
+
+        let preview = geometry.padding_distances(512, 512, 4.0);
+        let final_render = geometry.padding_distances(4096, 4096, 32.0);
+        for padding_pixels in [2.0, 6.0, 8.0] {
+            assert!(Arc::ptr_eq(
+                &preview,
+                &geometry.padding_distances(512, 512, padding_pixels)
+            ));
+            assert!(Arc::ptr_eq(
+                &final_render,
+                &geometry.padding_distances(4096, 4096, padding_pixels * 8.0)
+            ));
+        }
+        let wider = geometry.padding_distances(512, 512, 40.0);
+        assert!(!Arc::ptr_eq(&preview, &wider));
+        assert!(wider.radius >= 40.0);
+        assert!(Arc::ptr_eq(
+            &final_render,
+            &geometry.padding_distances(4096, 4096, 32.0)
+        ));
+
+        // Outputs of one size building their index at once settle on one
+        // entry, and every caller gets an index covering its padding.
+        let raced = thread::scope(|scope| {
+            let builds = (0..4)
+                .map(|_| scope.spawn(|| geometry.padding_distances(2048, 2048, 16.0)))
+                .collect::<Vec<_>>();
+            builds
+                .into_iter()
+                .map(|build| build.join().unwrap())
+                .collect::<Vec<_>>()
+        });
+        assert!(raced.iter().all(|index| index.radius >= 16.0));
+        let cached = geometry.padding_distances(2048, 2048, 16.0);
+        assert!(raced.iter().any(|index| Arc::ptr_eq(index, &cached)));
+        assert_eq!(
+            geometry
+                .lock_padding_indexes()
+                .iter()
+                .filter(|index| index.width == 2048)
+                .count(),
+            1
+        );
     }
 
     #[test]
@@ -4439,12 +9412,21 @@ mod tests {
     }
 
     fn arrangement_from_segments(segments: &[([f32; 2], [f32; 2])]) -> SegmentArrangement {
-        let original_segments = segments
+        arrangement_from_segments_with_workers(segments, 1)
+    }
+
+    fn arrangement_from_segments_with_workers(
+        segments: &[([f32; 2], [f32; 2])],
+        workers: usize,
+    ) -> SegmentArrangement {
+        let mut original_segments = segments
             .iter()
             .map(|(start, end)| {
                 canonical_segment(quantize_point(*start), quantize_point(*end)).unwrap()
             })
             .collect::<Vec<_>>();
+        original_segments.sort_unstable_by_key(|segment| (segment.start, segment.end));
+        original_segments.dedup();
         let mut point_positions = HashMap::new();
         for (start, end) in segments {
             point_positions
@@ -4452,23 +9434,147 @@ mod tests {
                 .or_insert(*start);
             point_positions.entry(quantize_point(*end)).or_insert(*end);
         }
-        let group_segments = vec![original_segments.clone()];
         let group_segment_indices = vec![(0..original_segments.len()).collect::<Vec<_>>()];
-        build_segment_arrangement_from_parts(
+        build_segment_arrangement_with_workers(
             original_segments,
             Arc::new(point_positions),
-            &group_segments,
             &group_segment_indices,
+            workers,
         )
     }
 
+    #[test]
+    fn test_parallel_arrangement_matches_serial() {
+        let (mut segments, _) = grid_layout(20, 20, [0.05, 0.05], [0.6, 0.6]);
+        let (stacked_segments, _) = grid_layout(17, 17, [0.21, 0.23], [0.6, 0.6]);
+        segments.extend(stacked_segments);
+
+        let unique_inputs = segments
+            .iter()
+            .map(|(start, end)| {
+                canonical_segment(quantize_point(*start), quantize_point(*end)).unwrap()
+            })
+            .collect::<HashSet<_>>();
+        let serial = arrangement_from_segments_with_workers(&segments, 1);
+        assert!(serial.segments.len() > unique_inputs.len());
+        assert!(serial
+            .segments
+            .windows(2)
+            .all(|pair| (pair[0].start, pair[0].end) < (pair[1].start, pair[1].end)));
+        assert!(!serial.point_positions.extra.is_empty());
+        for workers in [2, 5] {
+            let parallel = arrangement_from_segments_with_workers(&segments, workers);
+            assert_eq!(parallel.segments, serial.segments);
+            assert_eq!(parallel.group_segment_ids, serial.group_segment_ids);
+            assert_eq!(parallel.point_positions.extra, serial.point_positions.extra);
+        }
+    }
+
+    fn grid_layout(
+        columns: usize,
+        rows: usize,
+        origin: [f32; 2],
+        size: [f32; 2],
+    ) -> (Vec<([f32; 2], [f32; 2])>, Vec<Polygon>) {
+        let cell = [size[0] / columns as f32, size[1] / rows as f32];
+        let point = |column: usize, row: usize| {
+            [
+                origin[0] + column as f32 * cell[0],
+                origin[1] + row as f32 * cell[1],
+            ]
+        };
+        let mut segments = Vec::new();
+        let mut polygons = Vec::new();
+        for row in 0..rows {
+            for column in 0..columns {
+                let corners = [
+                    point(column, row),
+                    point(column + 1, row),
+                    point(column + 1, row + 1),
+                    point(column, row + 1),
+                ];
+                for index in 0..corners.len() {
+                    segments.push((corners[index], corners[(index + 1) % corners.len()]));
+                }
+                polygons.push(Polygon {
+                    points: corners.to_vec(),
+                });
+            }
+        }
+        (segments, polygons)
+    }
+
+    #[test]
+    fn test_parallel_classification_matches_serial() {
+        let (mut segments, mut polygons) = grid_layout(24, 24, [0.05, 0.05], [0.4, 0.4]);
+        let (other_segments, other_polygons) = grid_layout(16, 16, [0.3, 0.3], [0.5, 0.5]);
+        segments.extend(other_segments);
+        polygons.extend(other_polygons);
+        let arrangement = arrangement_from_segments(&segments);
+
+        let serial = classify_segments_with_workers(
+            &arrangement.segments,
+            &arrangement.point_positions,
+            &polygons,
+            1,
+        );
+        assert!(serial.0.count() > 0);
+        assert!(serial.1.count() > 0);
+        for workers in [2, 3, 8] {
+            let parallel = classify_segments_with_workers(
+                &arrangement.segments,
+                &arrangement.point_positions,
+                &polygons,
+                workers,
+            );
+            assert_eq!(parallel, serial);
+        }
+    }
+
+    #[test]
+    fn test_prepared_geometry_stays_below_input_size() {
+        let (mut segments, mut polygons) = grid_layout(40, 40, [0.05, 0.05], [0.5, 0.5]);
+        let (other_segments, other_polygons) = grid_layout(30, 30, [0.4, 0.4], [0.5, 0.5]);
+        segments.extend(other_segments);
+        polygons.extend(other_polygons);
+        let arrangement = arrangement_from_segments(&segments);
+        let point_positions = Arc::clone(&arrangement.point_positions.base);
+        let mut original_segments = segments
+            .iter()
+            .map(|(start, end)| {
+                canonical_segment(quantize_point(*start), quantize_point(*end)).unwrap()
+            })
+            .collect::<Vec<_>>();
+        original_segments.sort_unstable_by_key(|segment| (segment.start, segment.end));
+        original_segments.dedup();
+        let group_segments = vec![original_segments.clone()];
+        let group_segment_indices = vec![(0..original_segments.len()).collect::<Vec<_>>()];
+        let input_bytes = payload_input_bytes(&original_segments, &point_positions, &polygons);
+
+        let geometry = prepare_geometry(
+            &original_segments,
+            &point_positions,
+            &group_segments,
+            &group_segment_indices,
+            &polygons,
+            &geometry_cull_rect(&output_cull_rect(&[], 512, 512, None, None)),
+            None,
+            Instant::now(),
+            input_bytes,
+        );
+        assert_eq!(geometry.arrangement.segments, arrangement.segments);
+        geometry.padding_distances(512, 512, 8.0);
+        assert!(geometry.outline_topology().segments.len() > 0);
+        assert!(geometry.heap_bytes() < input_bytes);
+    }
+
     #[test]
     fn test_arrangement_shared_endpoint_does_not_split() {
         let arrangement =
             arrangement_from_segments(&[([0.0, 0.0], [1.0, 0.0]), ([1.0, 0.0], [1.0, 1.0])]);
         assert_eq!(arrangement.segments.len(), 2);
-        assert_eq!(arrangement.group_segments.len(), 1);
-        assert_eq!(arrangement.group_segments[0].len(), 2);
+        assert_eq!(arrangement.group_segment_ids.len(), 1);
+        assert_eq!(arrangement.group_segment_ids[0].len(), 2);
     }
 
     #[test]
@@ -4598,6 +9704,565 @@ mod tests {
         assert!(fill_index < stroke_index);
     }
 
+    #[test]
+    fn test_svg_writer_groups_styles_and_rounds_coordinates() {
+        let edges = parse_edges_json(&square_with_diagonal_json(true, true)).unwrap();
+        let prepared = prepare_drawing(&edges, &[], 128, 128, None, None);
+        let path_count: usize = prepared.groups.iter().map(|group| group.paths.len()).sum();
+
+        let mut coarse = Vec::new();
+        write_edges_svg(&prepared, 128, 128, 0, &mut coarse).unwrap();
+        let coarse = String::from_utf8(coarse).unwrap();
+        let mut fine = Vec::new();
+        write_edges_svg(&prepared, 128, 128, 3, &mut fine).unwrap();
+        let fine = String::from_utf8(fine).unwrap();
+
+        assert_eq!(coarse.matches("<g ").count(), prepared.groups.len());
+        assert_eq!(coarse.matches("</g>").count(), prepared.groups.len());
+        let paths: Vec<&str> = coarse
+            .lines()
+            .filter(|line| line.starts_with("<path"))
+            .collect();
+        assert_eq!(paths.len(), path_count);
+        assert!(paths
+            .iter()
+            .all(|line| !line.contains("stroke") && !line.contains('.')));
+        assert!(fine.contains("12.8"));
+        assert!(coarse.contains("M13,"));
+        assert_eq!(svg_number(-0.001, 2), "0");
+        assert_eq!(svg_number(6.0, 3), "6");
+    }
+
+    #[test]
+    fn test_capture_profile_records_render_phases_and_counters() {
+        let payload = parse_drawer_payload(VALID_JSON).unwrap();
+        clear_geometry_cache();
+        let (svg, report) = capture_profile(|| {
+            let (svg, nested) = capture_profile(|| {
+                draw_to_bytes_from_payload("svg", 128, 128, &payload, PngCompression::Default)
+            });
+            assert_eq!(nested, ProfileReport::default());
+            assert!(profile_capturing());
+            svg
+        });
+
+        assert!(svg.unwrap().starts_with(b"<svg"));
+        let labels: Vec<&str> = report
+            .phases
+            .iter()
+            .map(|phase| phase.name.as_str())
+            .collect();
+        assert!(labels.contains(&"path_build"));
+        assert!(labels.contains(&"prepare_total"));
+        assert!(labels.contains(&"render_svg"));
+        assert!(report
+            .phases
+            .iter()
+            .all(|phase| phase.seconds >= 0.0 && phase.start_seconds >= 0.0));
+        assert!(report.counter("arrangement_segments").unwrap() > 0);
+        assert!(report.counter("candidate_pairs").is_some());
+        assert!(report.peak_bytes("arrangement").is_some());
+        assert!(report.peak_bytes("render_svg").unwrap() > 0);
+        assert!(!profile_capturing());
+
+        let json: serde_json::Value = serde_json::from_str(&report.to_json()).unwrap();
+        assert_eq!(
+            json["phases"].as_array().unwrap().len(),
+            report.phases.len()
+        );
+        assert_eq!(
+            json["counters"]["arrangement_segments"].as_u64(),
+            report
+                .counter("arrangement_segments")
+                .map(|value| value as u64)
+        );
+        assert_eq!(
+            json["peak_bytes"]["render_svg"].as_u64(),
+            report.peak_bytes("render_svg").map(|bytes| bytes as u64)
+        );
+        assert_eq!(finish_profile_capture(), ProfileReport::default());
+    }
+
+    #[test]
+    fn test_overlapping_phase_keeps_earlier_phase_peak() {
+        const BLOCK_BYTES: usize = 1 << 20;
+        let outer = begin_phase_memory();
+        drop(std::hint::black_box(vec![1u8; BLOCK_BYTES]));
+        let inner = begin_phase_memory();
+        let inner_peak = finish_phase_memory("inner", Some(inner)).unwrap();
+        let outer_peak = finish_phase_memory("outer", Some(outer)).unwrap();
+        assert!(outer_peak >= BLOCK_BYTES);
+        assert!(inner_peak <= outer_peak);
+
+        // Other tests may be measuring phases of their own; tracking only
+        // stays on while one is.
+        let active = lock_memory_phases();
+        assert!(*active > 0 || !ALLOCATION_TRACKING.load(Ordering::Relaxed));
+    }
+
+    #[test]
+    fn test_draw_to_bytes_matches_path_output() {
+        let dir = tempdir().unwrap();
+        let image_path = dir.path().join("edge.png");
+        draw_to_path(image_path.as_path(), 128, 128, VALID_JSON).unwrap();
+
+        let png = draw_to_bytes("png", 128, 128, VALID_JSON, PngCompression::Default).unwrap();
+        assert_eq!(png, fs::read(&image_path).unwrap());
+
+        let svg = draw_to_bytes("SVG", 128, 128, VALID_JSON, PngCompression::Default).unwrap();
+        assert!(String::from_utf8(svg).unwrap().contains("<svg"));
+
+        let rgba = draw_to_bytes("rgba", 128, 96, VALID_JSON, PngCompression::Default).unwrap();
+        assert_eq!(rgba.len(), 128 * 96 * 4);
+        assert!(rgba.chunks_exact(4).any(|pixel| pixel[3] == 255));
+
+        assert!(draw_to_bytes("jpeg", 128, 128, VALID_JSON, PngCompression::Default).is_err());
+    }
+
+    #[test]
+    fn test_cull_drops_geometry_outside_output_without_changing_pixels() {
+        let far_json = VALID_JSON.replace(
+            r#"{"uv1": [0.2, 0.8], "uv2": [0.8, 0.2]}"#,
+            r#"{"uv1": [0.2, 0.8], "uv2": [0.8, 0.2]},
+          {"uv1": [3.0, 3.0], "uv2": [3.5, 3.2]},
+          {"uv1": [-2.0, 0.5], "uv2": [-1.5, 0.5]}"#,
+        );
+        let edges = parse_edges_json(&far_json).unwrap();
+        let inputs = collect_arrangement_inputs(&edges);
+        assert_eq!(inputs.original_segments.len(), 4);
+
+        let style = DrawStyle {
+            internal_width: 2.0,
+            outline_width: 4.0,
+            internal_color: [255, 0, 0, 255],
+            outline_color: [0, 255, 0, 255],
+            draw_outline: true,
+            draw_internal: false,
+        };
+        let rect = output_cull_rect(&[style], 128, 128, None, None);
+        let culled = cull_arrangement_inputs(
+            &inputs.original_segments,
+            &inputs.point_positions,
+            &inputs.group_segments,
+            &rect,
+        )
+        .unwrap();
+        assert_eq!(culled.original_segments.len(), 2);
+        assert_eq!(culled.group_segments[0].len(), 2);
+        assert!(cull_arrangement_inputs(
+            &culled.original_segments,
+            &culled.point_positions,
+            &culled.group_segments,
+            &rect,
+        )
+        .is_none());
+
+        let expected =
+            draw_to_bytes("rgba", 128, 128, VALID_JSON, PngCompression::Default).unwrap();
+        let actual = draw_to_bytes("rgba", 128, 128, &far_json, PngCompression::Default).unwrap();
+        assert_eq!(actual, expected);
+    }
+
+    #[test]
+    fn test_geometry_cache_hits_across_resolutions_and_checks_inputs() {
+        let far_json = VALID_JSON.replace(
+            r#"{"uv1": [0.2, 0.8], "uv2": [0.8, 0.2]}"#,
+            r#"{"uv1": [0.2, 0.8], "uv2": [0.8, 0.2]},
+          {"uv1": [1.02, 0.5], "uv2": [1.3, 0.5]},
+          {"uv1": [3.0, 3.0], "uv2": [3.5, 3.2]}"#,
+        );
+        let payload =
+            compact_payload_from_drawer_payload(&parse_drawer_payload(&far_json).unwrap());
+        let cache = GeometryCache::new();
+        let prepare = |width: u32, width_scale: f32| {
+            let (styles, padding_warning, island_fill) =
+                scaled_payload_style(&payload, width_scale);
+            let output = output_cull_rect(
+                &styles,
+                width,
+                width,
+                padding_warning.as_ref(),
+                island_fill.as_ref(),
+            );
+            prepare_geometry(
+                &payload.arrangement_input_segments,
+                &payload.point_positions,
+                &payload.arrangement_input_group_segments,
+                &payload.arrangement_input_group_segment_indices,
+                &payload.polygons,
+                &geometry_cull_rect(&output),
+                Some(&cache),
+                Instant::now(),
+                0,
+            )
+        };
+
+        // The output cull rects of these sizes differ, the geometry rect does
+        // not: the preview and the final render share one arrangement.
+        let final_render = prepare(4096, 1.0);
+        let preview = prepare(512, 0.125);
+        let thumbnail = prepare(128, 1.0);
+        assert!(Arc::ptr_eq(&final_render, &preview));
+        assert!(Arc::ptr_eq(&final_render, &thumbnail));
+        assert_eq!(cache.lock().len(), 1);
+        // The crossing diagonals split into four, the segment just outside
+        // the canvas is kept and the far one is culled.
+        assert_eq!(final_render.arrangement.segments.len(), 5);
+
+        // A colliding key with other inputs must not return the cached entry.
+        let rect = geometry_cull_rect(&output_cull_rect(&payload.styles, 4096, 4096, None, None));
+        let (key, inputs) = geometry_cache_key(
+            &payload.arrangement_input_segments,
+            &payload.point_positions,
+            &payload.arrangement_input_group_segments,
+            &payload.polygons,
+            &rect,
+        );
+        let other = collect_arrangement_inputs(
+            &parse_edges_json(&VALID_JSON.replace("[0.8, 0.2]", "[0.8, 0.25]")).unwrap(),
+        );
+        let (other_key, other_inputs) = geometry_cache_key(
+            &other.original_segments,
+            &other.point_positions,
+            &other.group_segments,
+            &[],
+            &rect,
+        );
+        assert!(cache.get(key, &inputs).is_some());
+        assert!(cache.get(key, &other_inputs).is_none());
+        assert_ne!(key, other_key);
+        assert_ne!(inputs.check, other_inputs.check);
+    }
+
+    #[test]
+    fn test_output_batch_builds_one_arrangement_with_or_without_cache() {
+        let payload = compact_payload_from_drawer_payload(
+            &parse_drawer_payload(&payload_with_island_fill_json()).unwrap(),
+        );
+        let outputs = [(4096, 1.0), (512, 0.125), (64, 1.0)]
+            .into_iter()
+            .map(|(size, width_scale)| OutputSpec {
+                path: PathBuf::from(format!("out_{size}.png")),
+                width: size,
+                height: size,
+                width_scale,
+                png_compression: PngCompression::Default,
+            })
+            .collect::<Vec<_>>();
+        // The thumbnail needs a wider geometry rect than the others, so one
+        // rect per output would not share an arrangement.
+        let rect = |output: &OutputSpec| {
+            geometry_cull_rect(&compact_output_cull_rect(
+                &payload,
+                output.width,
+                output.height,
+                output.width_scale,
+            ))
+            .max
+        };
+        assert_ne!(rect(&outputs[0]), rect(&outputs[2]));
+
+        let cache = GeometryCache::new();
+        for cache in [None, Some(&cache)] {
+            ARRANGEMENT_BUILDS.with(|builds| builds.set(0));
+            let prepared = prepare_compact_outputs(&payload, &outputs, cache);
+            assert_eq!(prepared.len(), outputs.len());
+            assert_eq!(ARRANGEMENT_BUILDS.with(|builds| builds.get()), 1);
+        }
+        assert_eq!(cache.lock().len(), 1);
+        ARRANGEMENT_BUILDS.with(|builds| builds.set(0));
+        prepare_compact_outputs(&payload, &outputs, Some(&cache));
+        assert_eq!(ARRANGEMENT_BUILDS.with(|builds| builds.get()), 0);
+    }
+
+    #[test]
+    fn test_draw_to_paths_matches_single_output_renders() {
+        let dir = tempdir().unwrap();
+        let json = payload_with_island_fill_json();
+        let outputs = [
+            (dir.path().join("large.png"), 160, 128, 1.0),
+            (dir.path().join("small.tga"), 64, 48, 0.5),
+            (dir.path().join("vector.svg"), 96, 96, 1.0),
+        ]
+        .into_iter()
+        .map(|(path, width, height, width_scale)| OutputSpec {
+            path,
+            width,
+            height,
+            width_scale,
+            png_compression: PngCompression::Default,
+        })
+        .collect::<Vec<_>>();
+        draw_to_paths(&json, &outputs).unwrap();
+
+        let payload = compact_payload_from_drawer_payload(&parse_drawer_payload(&json).unwrap());
+        for output in &outputs {
+            let prepared = prepare_drawing_from_compact(
+                &payload,
+                output.width,
+                output.height,
+                output.width_scale,
+            );
+            let format = OutputFormat::from_path(&output.path);
+            let expected = render_prepared_to_bytes(
+                &prepared,
+                output.width,
+                output.height,
+                format,
+                PngCompression::Default,
+            )
+            .unwrap();
+            assert_eq!(fs::read(&output.path).unwrap(), expected);
+        }
+    }
+
+    #[test]
+    fn test_payload_batch_matches_single_payload_renders() {
+        let dir = tempdir().unwrap();
+        let jobs = [
+            (payload_with_island_fill_json(), "tile_1001", 1.0),
+            (VALID_JSON.to_string(), "tile_1002", 0.5),
+        ]
+        .into_iter()
+        .map(|(json, name, width_scale)| {
+            let payload =
+                compact_payload_from_drawer_payload(&parse_drawer_payload(&json).unwrap());
+            let outputs = [("png", 96, 80), ("svg", 64, 64)]
+                .into_iter()
+                .map(|(extension, width, height)| OutputSpec {
+                    path: dir.path().join(format!("{name}.{extension}")),
+                    width,
+                    height,
+                    width_scale,
+                    png_compression: PngCompression::Default,
+                })
+                .collect::<Vec<_>>();
+            (payload, outputs)
+        })
+        .collect::<Vec<_>>();
+        draw_compact_payloads_to_paths(&jobs).unwrap();
+
+        for (payload, outputs) in &jobs {
+            for output in outputs {
+                let prepared = prepare_drawing_from_compact(
+                    payload,
+                    output.width,
+                    output.height,
+                    output.width_scale,
+                );
+                let expected = render_prepared_to_bytes(
+                    &prepared,
+                    output.width,
+                    output.height,
+                    OutputFormat::from_path(&output.path),
+                    PngCompression::Default,
+                )
+                .unwrap();
+                assert_eq!(fs::read(&output.path).unwrap(), expected);
+            }
+        }
+    }
+
+    fn decode_png_rgba(png: &[u8]) -> (u32, u32, Vec<u8>) {
+        use std::io::Read;
+
+        assert_eq!(&png[..8], b"\x89PNG\r\n\x1a\n");
+        let mut offset = 8;
+        let mut size = (0, 0);
+        let mut image_data = Vec::new();
+        while offset < png.len() {
+            let length = u32::from_be_bytes(png[offset..offset + 4].try_into().unwrap()) as usize;
+            let kind = &png[offset + 4..offset + 8];
+            let data = &png[offset + 8..offset + 8 + length];
+            let crc = u32::from_be_bytes(
+                png[offset + 8 + length..offset + 12 + length]
+                    .try_into()
+                    .unwrap(),
+            );
+            let mut hasher = crc32fast::Hasher::new();
+            hasher.update(kind);
+            hasher.update(data);
+            assert_eq!(hasher.finalize(), crc);
+            match kind {
+                b"IHDR" => {
+                    size = (
+                        u32::from_be_bytes(data[0..4].try_into().unwrap()),
+                        u32::from_be_bytes(data[4..8].try_into().unwrap()),
+                    );
+                }
+                b"IDAT" => image_data.extend_from_slice(data),
+                _ => {}
+            }
+            offset += 12 + length;
+        }
+
+        let mut filtered = Vec::new();
+        flate2::read::ZlibDecoder::new(image_data.as_slice())
+            .read_to_end(&mut filtered)
+            .unwrap();
+        let stride = size.0 as usize * 4;
+        let mut rgba: Vec<u8> = Vec::with_capacity(stride * size.1 as usize);
+        for (row_index, row) in filtered.chunks_exact(stride + 1).enumerate() {
+            let row_start = row_index * stride;
+            for (index, &value) in row[1..].iter().enumerate() {
+                let left = if index >= 4 {
+                    rgba[row_start + index - 4]
+                } else {
+                    0
+                };
+                let above = if row_index > 0 {
+                    rgba[row_start + index - stride]
+                } else {
+                    0
+                };
+                let upper_left = if row_index > 0 && index >= 4 {
+                    rgba[row_start + index - stride - 4]
+                } else {
+                    0
+                };
+                let prediction = match row[0] {
+                    1 => left,
+                    2 => above,
+                    3 => ((left as u16 + above as u16) / 2) as u8,
+                    4 => paeth_predictor(left, above, upper_left),
+                    _ => 0,
+                };
+                rgba.push(value.wrapping_add(prediction));
+            }
+        }
+        (size.0, size.1, rgba)
+    }
+
+    fn lod_outline_edges(offsets: &[usize], points: &[f64]) -> Vec<[[u64; 2]; 2]> {
+        let mut counts = HashMap::new();
+        for polygon in offsets.windows(2) {
+            let ring = (polygon[0]..polygon[1])
+                .map(|corner| {
+                    [
+                        points[corner * 2].to_bits(),
+                        points[corner * 2 + 1].to_bits(),
+                    ]
+                })
+                .collect::<Vec<_>>();
+            for (index, &point) in ring.iter().enumerate() {
+                let previous = ring[(index + ring.len() - 1) % ring.len()];
+                *counts
+                    .entry([previous.min(point), previous.max(point)])
+                    .or_insert(0) += 1;
+            }
+        }
+        let mut outline = counts
+            .into_iter()
+            .filter(|&(_, count)| count == 1)
+            .map(|(edge, _)| edge)
+            .collect::<Vec<_>>();
+        outline.sort();
+        outline
+    }
+
+    #[test]
+    fn test_lod_level_keeps_outline_and_clears_notch() {
+        // A 32x32 grid with a one face wide notch up to row 24 from the
+        // bottom edge. At 8 cells per UV each level cell spans four faces.
+        let (columns, rows) = (32usize, 32usize);
+        let mut offsets = vec![0];
+        let mut points = Vec::new();
+        for row in 0..rows {
+            for column in 0..columns {
+                if column == 13 && row < 24 {
+                    continue;
+                }
+                for [x, y] in [[0, 0], [1, 0], [1, 1], [0, 1]] {
+                    points.push((column + x) as f64 / columns as f64);
+                    points.push((row + y) as f64 / rows as f64);
+                }
+                offsets.push(points.len() / 2);
+            }
+        }
+
+        let (level_offsets, level_points, moved) =
+            build_lod_level(&offsets, &points, &[], 8.0).unwrap();
+
+        assert!(level_offsets.len() < offsets.len());
+        assert!(!moved.is_empty());
+        assert_eq!(
+            lod_outline_edges(&level_offsets, &level_points),
+            lod_outline_edges(&offsets, &points)
+        );
+        let barriers = lod_outline_edges(&offsets, &points)
+            .into_iter()
+            .map(|edge| edge.map(|point| point.map(f64::from_bits)))
+            .collect::<Vec<_>>();
+        for polygon in level_offsets.windows(2) {
+            for corner in polygon[0]..polygon[1] {
+                let next = if corner + 1 == polygon[1] {
+                    polygon[0]
+                } else {
+                    corner + 1
+                };
+                let start = [level_points[corner * 2], level_points[corner * 2 + 1]];
+                let end = [level_points[next * 2], level_points[next * 2 + 1]];
+                assert!(
+                    barriers
+                        .iter()
+                        .all(|&barrier| !lod_segment_meets_barrier(start, end, barrier)),
+                    "{:?} -> {:?} crosses the outline",
+                    start,
+                    end
+                );
+            }
+        }
+    }
+
+    #[test]
+    fn test_png_compression_levels_round_trip_pixels() {
+        let rgba = draw_to_bytes("rgba", 96, 64, VALID_JSON, PngCompression::Default).unwrap();
+        let mut sizes = Vec::new();
+        for compression in [
+            PngCompression::None,
+            PngCompression::Fast,
+            PngCompression::Best,
+        ] {
+            let png = draw_to_bytes("png", 96, 64, VALID_JSON, compression).unwrap();
+            let (width, height, decoded) = decode_png_rgba(&png);
+            assert_eq!((width, height), (96, 64));
+            assert_eq!(decoded, rgba);
+            sizes.push(png.len());
+        }
+        assert!(sizes[0] > sizes[1]);
+        assert!(sizes[1] >= sizes[2]);
+        assert!(PngCompression::from_name("ultra").is_err());
+    }
+
+    #[test]
+    fn test_uncompressed_raster_formats_by_extension() {
+        let dir = tempdir().unwrap();
+        let rgba = draw_to_bytes("rgba", 40, 30, VALID_JSON, PngCompression::Default).unwrap();
+        let bgra: Vec<u8> = rgba
+            .chunks_exact(4)
+            .flat_map(|pixel| [pixel[2], pixel[1], pixel[0], pixel[3]])
+            .collect();
+
+        let tga_path = dir.path().join("edge.tga");
+        draw_to_path(tga_path.as_path(), 40, 30, VALID_JSON).unwrap();
+        let tga = fs::read(&tga_path).unwrap();
+        assert_eq!(tga.len(), 18 + 40 * 30 * 4);
+        assert_eq!(tga[2], 2);
+        assert_eq!(&tga[12..16], &[40, 0, 30, 0]);
+        assert_eq!(&tga[18..], bgra.as_slice());
+
+        let bmp_path = dir.path().join("edge.bmp");
+        draw_to_path(bmp_path.as_path(), 40, 30, VALID_JSON).unwrap();
+        let bmp = fs::read(&bmp_path).unwrap();
+        assert_eq!(&bmp[..2], b"BM");
+        assert_eq!(bmp.len(), 14 + 108 + 40 * 30 * 4);
+        assert_eq!(&bmp[14 + 108..], bgra.as_slice());
+
+        let raw_path = dir.path().join("edge.rgba");
+        draw_to_path(raw_path.as_path(), 40, 30, VALID_JSON).unwrap();
+        assert_eq!(fs::read(&raw_path).unwrap(), rgba);
+    }
+
     #[test]
     fn test_load_edges_input_from_file() {
         let dir = tempdir().unwrap();
@@ -1,9 +1,9 @@
 use std::path::PathBuf;
 
 use clap::{Arg, Command};
-use edge_drawer::draw_to_path_from_input;
+use edge_drawer::{draw_to_path_from_input, set_svg_precision, PngCompression};
 
-fn parse_arguments() -> (PathBuf, u32, u32, String) {
+fn parse_arguments() -> (PathBuf, u32, u32, String, PngCompression, Option<usize>) {
     let matches = Command::new("UV Image Edge Drawer")
         .version("1.0")
         .about("Draws edges on an image based on JSON input")
@@ -31,6 +31,20 @@ fn parse_arguments() -> (PathBuf, u32, u32, String) {
                 .required(true)
                 .index(4),
         )
+        .arg(
+            Arg::new("PNG_COMPRESSION")
+                .help("Sets the PNG compression level")
+                .long("png-compression")
+                .takes_value(true)
+                .possible_values(["default", "fast", "none", "best"])
+                .default_value("default"),
+        )
+        .arg(
+            Arg::new("SVG_PRECISION")
+                .help("Sets the number of decimals written for SVG coordinates")
+                .long("svg-precision")
+                .takes_value(true),
+        )
         .get_matches();
 
     let image_path = PathBuf::from(matches.get_one::<String>("IMAGE").unwrap());
@@ -45,12 +59,33 @@ fn parse_arguments() -> (PathBuf, u32, u32, String) {
         .parse()
         .expect("Invalid HEIGHT");
     let edges_input = matches.get_one::<String>("EDGES").unwrap().to_string();
+    let png_compression =
+        PngCompression::from_name(matches.get_one::<String>("PNG_COMPRESSION").unwrap())
+            .expect("Invalid PNG_COMPRESSION");
+    let svg_precision = matches
+        .get_one::<String>("SVG_PRECISION")
+        .map(|value| value.parse().expect("Invalid SVG_PRECISION"));
 
-    (image_path, width, height, edges_input)
+    (
+        image_path,
+        width,
+        height,
+        edges_input,
+        png_compression,
+        svg_precision,
+    )
 }
 
 fn main() {
-    let (image_path, width, height, edges_input) = parse_arguments();
-    draw_to_path_from_input(image_path.as_path(), width, height, &edges_input)
-        .expect("Failed to draw edges");
+    let (image_path, width, height, edges_input, png_compression, svg_precision) =
+        parse_arguments();
+    set_svg_precision(svg_precision);
+    draw_to_path_from_input(
+        image_path.as_path(),
+        width,
+        height,
+        &edges_input,
+        png_compression,
+    )
+    .expect("Failed to draw edges");
 }
@@ -0,0 +1,227 @@
+"""Benchmark the Python payload pipeline outside Maya.
+
+Meshes are replayed through ``offline_maya`` from ``capture_mesh.py``
+recordings or generated as UV-cut grids. Each phase is timed from a cold
+topology cache; a second, traced pass records its peak traced memory.
+Results are printed as one JSON object per run so runs from different
+commits can be compared.
+
+    python scripts/bench_pipeline.py character.json.gz --iterations 5
+    python scripts/bench_pipeline.py --grid 300x300:8 --output results.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import offline_maya
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_GRID = "200x200:4"
+DEFAULT_ITERATIONS = 3
+DEFAULT_RESOLUTION = 2048
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time the uv_snapshot_edge_drawer payload pipeline on replayed meshes.")
+    parser.add_argument("recordings", nargs="*", type=Path, help="Recordings written by capture_mesh.py.")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        help="Add a generated COLUMNSxROWS[:SHELLS] grid mesh. Used when no recording is given (default {}).".format(
+            DEFAULT_GRID
+        ),
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed runs per phase.")
+    parser.add_argument("--resolution", type=int, default=DEFAULT_RESOLUTION, help="Output size the payload is built for.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced pass that records peak memory.")
+    parser.add_argument("--output", type=Path, default=None, help="Append the JSON result to this file.")
+    return parser.parse_args()
+
+
+def parse_grid(spec: str) -> tuple[int, int, int]:
+    size, _, shells = spec.partition(":")
+    columns, _, rows = size.partition("x")
+    return int(columns), int(rows or columns), int(shells or 1)
+
+
+def build_recording(args: argparse.Namespace) -> tuple[dict[str, Any], list[str]]:
+    """One recording holding every requested mesh, plus labels describing the inputs."""
+    recording = offline_maya.load_recordings(args.recordings)
+    labels = [str(path) for path in args.recordings]
+    grids = args.grid or ([] if args.recordings else [DEFAULT_GRID])
+    for index, spec in enumerate(grids):
+        columns, rows, shells = parse_grid(spec)
+        name = "|grid{}|grid{}Shape".format(index, index)
+        recording["meshes"].extend(offline_maya.grid_recording(columns, rows, shells=shells, name=name)["meshes"])
+        labels.append("grid:{}".format(spec))
+    return recording, labels
+
+
+def default_settings(ui: Any, resolution: int) -> dict[str, Any]:
+    """Snapshot settings as the UI collects them, with the UI's default appearance."""
+    settings: dict[str, Any] = {
+        "x_resolution": resolution,
+        "y_resolution": resolution,
+        "fold_angle": 60,
+        "padding_warning_enabled": True,
+        "padding_pixels": 8,
+        "padding_mode": "exact",
+        "padding_warning_color": ui.WARNING_COLOR,
+        "padding_warning_width": ui.WARNING_WIDTH,
+        "island_fill_enabled": True,
+        "island_fill_opacity": ui.ISLAND_FILL_OPACITY / 100.0,
+        "island_fill_padding": ui.ISLAND_FILL_PADDING,
+        "uv_min_max": (0.0, 1.0, 0.0, 1.0),
+    }
+    for edge_key, _label, color, width in ui.EDGE_APPEARANCE_SPECS:
+        for mode in ("internal", "outline"):
+            settings["{}_{}_color".format(edge_key, mode)] = color
+            settings["{}_{}_width".format(edge_key, mode)] = width
+            settings["{}_draw_{}".format(edge_key, mode)] = edge_key != "fold"
+    return settings
+
+
+class TimingRecorder(object):
+    """Wall time and net allocated blocks of each phase."""
+
+    def __init__(self):
+        self.seconds: dict[str, list[float]] = {}
+        self.blocks: dict[str, list[int]] = {}
+
+    def add(self, name: str, seconds: float, blocks: int = 0) -> None:
+        self.seconds.setdefault(name, []).append(seconds)
+        self.blocks.setdefault(name, []).append(blocks)
+
+    def measure(self, name: str, run: Callable[[], Any]) -> Any:
+        blocks_before = sys.getallocatedblocks()
+        started = time.perf_counter()
+        result = run()
+        self.add(name, time.perf_counter() - started, sys.getallocatedblocks() - blocks_before)
+        return result
+
+
+class MemoryRecorder(object):
+    """Peak bytes allocated while each phase runs, traced with tracemalloc."""
+
+    def __init__(self):
+        self.peak_bytes: dict[str, int] = {}
+
+    def add(self, name: str, seconds: float, blocks: int = 0) -> None:
+        del name, seconds, blocks
+
+    def measure(self, name: str, run: Callable[[], Any]) -> Any:
+        tracemalloc.start()
+        try:
+            result = run()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del current
+        self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), peak)
+        return result
+
+
+def run_pipeline(drawer: Any, ui: Any, mesh_names: list[str], settings: dict[str, Any], recorder: Any) -> None:
+    """Build snapshots and payload buffers from a cold cache, measuring each phase."""
+    drawer.clear_mesh_topology_cache()
+    needs_edge_data = ui._settings_need_edge_data(settings)
+
+    def build_snapshots():
+        for mesh_name in mesh_names:
+            session = drawer.start_mesh_topology_build_session(mesh_name, include_edges=needs_edge_data)
+            while not session.step():
+                pass
+            for phase, seconds in session.phase_timings.items():
+                recorder.add("topology_" + phase, seconds)
+        return [drawer.get_mesh_topology_snapshot(mesh_name, include_edges=needs_edge_data) for mesh_name in mesh_names]
+
+    snapshots = recorder.measure("MeshTopologyBuildSession", build_snapshots)
+
+    def build_polygon_buffers():
+        for mesh_name in mesh_names:
+            fn_mesh = drawer.get_mfnmesh_from_meshlike(mesh_name)
+            drawer.build_polygon_buffers_from_mesh(fn_mesh, fn_mesh.currentUVSetName())
+
+    recorder.measure("build_polygon_buffers_from_mesh", build_polygon_buffers)
+
+    config = ui._build_drawer_config(settings)
+    groups = []
+    for snapshot in snapshots:
+        groups.extend(snapshot.get_draw_info(config).values())
+    recorder.measure("_merge_payload_edge_groups", lambda: drawer._merge_payload_edge_groups(groups))
+
+    polygon_offsets, polygon_points = snapshots[0].get_polygon_buffers() if snapshots else ([0], [])
+    payload = {"edges": groups, "polygon_offsets": polygon_offsets, "polygon_points": polygon_points}
+    recorder.measure("build_drawer_payload_buffers", lambda: drawer.build_drawer_payload_buffers(payload))
+
+    payload_data = recorder.measure(
+        "_build_payload_from_snapshots", lambda: ui._build_payload_from_snapshots(settings, snapshots)
+    )
+    for phase, seconds in getattr(payload_data, "profile_phases", {}).items():
+        if phase != "total":
+            recorder.add("payload_" + phase, seconds)
+
+
+def native_available() -> bool:
+    try:
+        from uv_snapshot_edge_drawer import _edge_drawer  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main() -> int:
+    args = parse_args()
+    recording, labels = build_recording(args)
+    mesh_names = offline_maya.install(recording)
+    sys.path.insert(0, str(REPO_ROOT / "python"))
+    import uv_snapshot_edge_drawer as drawer
+    import uv_snapshot_edge_drawer.ui as ui
+
+    settings = default_settings(ui, args.resolution)
+    timings = TimingRecorder()
+    for _ in range(max(1, args.iterations)):
+        run_pipeline(drawer, ui, mesh_names, settings, timings)
+    memory = MemoryRecorder()
+    if not args.no_memory:
+        run_pipeline(drawer, ui, mesh_names, settings, memory)
+
+    meshes = recording["meshes"]
+    result = {
+        "benchmark": "python_pipeline",
+        "inputs": labels,
+        "meshes": len(meshes),
+        "polygons": sum(len(mesh["vertex_counts"]) for mesh in meshes),
+        "edges": sum(len(mesh["edge_vertices"]) // 2 for mesh in meshes),
+        "resolution": args.resolution,
+        "iterations": max(1, args.iterations),
+        "native": native_available(),
+        "python": platform.python_version(),
+        "phases": {name: statistics.median(values) for name, values in timings.seconds.items()},
+        "phases_min": {name: min(values) for name, values in timings.seconds.items()},
+        "allocated_blocks": {
+            name: int(statistics.median(values)) for name, values in timings.blocks.items() if any(values)
+        },
+        "peak_bytes": memory.peak_bytes,
+    }
+    line = json.dumps(result, sort_keys=True)
+    print(line)
+    if args.output is not None:
+        with args.output.open("a", encoding="utf-8") as output_file:
+            output_file.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Record the MFnMesh arrays of Maya meshes for offline benchmarks.
+
+The recording holds what ``offline_maya.py`` needs to replay the meshes
+outside Maya: face vertices, the current UV set, edge smoothing, face
+normals, creases and UV borders.
+
+From the Maya script editor, with this directory on ``sys.path``::
+
+    import capture_mesh
+    capture_mesh.capture_selection("D:/bench/character.json.gz")
+
+From a shell::
+
+    mayapy scripts/capture_mesh.py scene.mb character.json.gz [|body|bodyShape ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from typing import Any
+
+
+RECORDING_VERSION = 1
+
+
+def _mesh_record(shape: str) -> dict[str, Any]:
+    from maya import cmds
+    from maya.api import OpenMaya as om
+
+    selection = om.MSelectionList()
+    selection.add(shape)
+    fn_mesh = om.MFnMesh(selection.getDagPath(0))
+    uv_set_name = fn_mesh.currentUVSetName()
+    uv_set_names = list(fn_mesh.getUVSetNames())
+
+    vertex_counts, vertex_ids = fn_mesh.getVertices()
+    face_uv_counts, face_uv_ids = fn_mesh.getAssignedUVs(uv_set_name)
+    us, vs = fn_mesh.getUVs(uv_set_name)
+
+    edge_vertices = []
+    edge_smooth = []
+    for edge_id in range(fn_mesh.numEdges):
+        edge_vertices.extend(fn_mesh.getEdgeVertices(edge_id))
+        edge_smooth.append(bool(fn_mesh.isEdgeSmooth(edge_id)))
+
+    face_normals = []
+    for face_id in range(fn_mesh.numPolygons):
+        normal = fn_mesh.getPolygonNormal(face_id)
+        face_normals.extend([normal.x, normal.y, normal.z])
+
+    try:
+        crease_edges, crease_values = fn_mesh.getCreaseEdges()
+    except RuntimeError:
+        # Maya raises when the mesh has no creases.
+        crease_edges, crease_values = [], []
+
+    uv_border_edges = None
+    if cmds.about(apiVersion=True) >= 20230000:
+        uv_border_edges = list(fn_mesh.getUVBorderEdges(uv_set_names.index(uv_set_name)))
+
+    transforms = cmds.listRelatives(shape, parent=True, fullPath=True) or []
+    return {
+        "name": fn_mesh.fullPathName(),
+        "transform": transforms[0] if transforms else None,
+        "uv_set_names": uv_set_names,
+        "current_uv_set": uv_set_name,
+        "vertex_counts": list(vertex_counts),
+        "vertex_ids": list(vertex_ids),
+        "face_uv_counts": list(face_uv_counts),
+        "face_uv_ids": list(face_uv_ids),
+        "us": list(us),
+        "vs": list(vs),
+        "edge_vertices": edge_vertices,
+        "edge_smooth": edge_smooth,
+        "face_normals": face_normals,
+        "crease_edges": list(crease_edges),
+        "crease_values": list(crease_values),
+        "uv_border_edges": uv_border_edges,
+    }
+
+
+def capture_meshes(shapes: list[str], path: str) -> str:
+    """Write a recording of the given mesh shapes; a .gz path is gzipped."""
+    from maya import cmds
+
+    recording = {
+        "version": RECORDING_VERSION,
+        "api_version": cmds.about(apiVersion=True),
+        "meshes": [_mesh_record(shape) for shape in shapes],
+    }
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as recording_file:
+        json.dump(recording, recording_file, separators=(",", ":"))
+    print("capture_mesh: wrote {} mesh(es) to {}".format(len(shapes), path))
+    return path
+
+
+def capture_selection(path: str) -> str:
+    """Record every mesh shape under the current selection."""
+    from maya import cmds
+
+    shapes = cmds.ls(sl=True, dag=True, noIntermediate=True, type="mesh", long=True) or []
+    if not shapes:
+        raise RuntimeError("Select some mesh")
+    return capture_meshes(shapes, path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record Maya meshes for the offline pipeline benchmark.")
+    parser.add_argument("scene", help="Maya scene to open.")
+    parser.add_argument("output", help="Recording path; .json or .json.gz.")
+    parser.add_argument("shapes", nargs="*", help="Mesh shapes to record. Defaults to every mesh in the scene.")
+    args = parser.parse_args()
+
+    import maya.standalone
+
+    maya.standalone.initialize(name="python")
+    try:
+        from maya import cmds
+
+        cmds.file(os.path.abspath(args.scene), open=True, force=True)
+        shapes = args.shapes or cmds.ls(type="mesh", noIntermediate=True, long=True) or []
+        if not shapes:
+            print("capture_mesh: no meshes in {}".format(args.scene), file=sys.stderr)
+            return 1
+        capture_meshes(shapes, args.output)
+    finally:
+        maya.standalone.uninitialize()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""Replay recorded meshes through a minimal stand-in for ``maya.cmds`` and ``maya.api.OpenMaya``.
+
+Only the calls uv_snapshot_edge_drawer makes while building topology snapshots
+and payloads are provided. Meshes come from ``capture_mesh.py`` recordings or
+from ``grid_recording``, which needs no Maya at all.
+
+    import offline_maya
+    offline_maya.install(offline_maya.load_recordings(["scene.json.gz"]))
+    import uv_snapshot_edge_drawer as drawer
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import sys
+import types
+from pathlib import Path
+from typing import Any
+
+
+RECORDING_VERSION = 1
+DEFAULT_API_VERSION = 20240000
+
+_MESHES: dict[str, "RecordedMesh"] = {}
+_TRANSFORMS: dict[str, str] = {}
+_API_VERSION = DEFAULT_API_VERSION
+
+
+def open_recording(path: str | Path, mode: str = "rt"):
+    """Open a recording, transparently gzipped when the name ends in .gz."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def load_recordings(paths: list[str | Path]) -> dict[str, Any]:
+    """Merge several recording files into one recording."""
+    merged: dict[str, Any] = {"version": RECORDING_VERSION, "api_version": DEFAULT_API_VERSION, "meshes": []}
+    for path in paths:
+        with open_recording(path) as recording_file:
+            recording = json.load(recording_file)
+        if recording.get("version") != RECORDING_VERSION:
+            raise ValueError("{}: unsupported recording version {}".format(path, recording.get("version")))
+        merged["api_version"] = recording.get("api_version", DEFAULT_API_VERSION)
+        merged["meshes"].extend(recording["meshes"])
+    return merged
+
+
+def _edges_from_faces(vertex_counts: list[int], vertex_ids: list[int]) -> list[int]:
+    """Flat vertex pairs of every face edge, numbered in order of first use."""
+    edge_index: dict[tuple[int, int], int] = {}
+    edge_vertices: list[int] = []
+    start = 0
+    for count in vertex_counts:
+        ring = vertex_ids[start:start + count]
+        for corner in range(count):
+            a, b = ring[corner], ring[(corner + 1) % count]
+            key = (min(a, b), max(a, b))
+            if key not in edge_index:
+                edge_index[key] = len(edge_index)
+                edge_vertices.extend(key)
+        start += count
+    return edge_vertices
+
+
+def grid_recording(
+    columns: int,
+    rows: int,
+    shells: int = 1,
+    name: str = "|grid|gridShape",
+    removed_faces: set[tuple[int, int]] | None = None,
+) -> dict[str, Any]:
+    """Recording of a flat quad grid cut into `shells` UV strips along its columns.
+
+    The cuts are UV borders with split UVs, the outer ring is a mesh boundary
+    and every fourth row of edges is hard, so each edge category gets work.
+    Faces listed in `removed_faces` as (column, row) are left out, which cuts
+    holes and notches into the outline.
+    """
+    faces = [
+        (column, row)
+        for row in range(rows)
+        for column in range(columns)
+        if not removed_faces or (column, row) not in removed_faces
+    ]
+    face_count = len(faces)
+    vertex_ids: list[int] = []
+    for column, row in faces:
+        first = row * (columns + 1) + column
+        vertex_ids.extend([first, first + 1, first + columns + 2, first + columns + 1])
+
+    shells = max(1, min(shells, columns))
+    shell_of_column = [column * shells // columns for column in range(columns)]
+    uv_index: dict[tuple[int, int, int], int] = {}
+    us: list[float] = []
+    vs: list[float] = []
+    face_uv_ids: list[int] = []
+    for column, row in faces:
+        shell = shell_of_column[column]
+        for corner in ((column, row), (column + 1, row), (column + 1, row + 1), (column, row + 1)):
+            key = (shell, corner[0], corner[1])
+            if key not in uv_index:
+                uv_index[key] = len(us)
+                # Shift each shell right by half a cell per cut so the strips do not touch.
+                us.append((corner[0] + shell * 0.5) / (columns + shells * 0.5))
+                vs.append(corner[1] / float(rows))
+            face_uv_ids.append(uv_index[key])
+
+    data: dict[str, Any] = {
+        "name": name,
+        "transform": name.rsplit("|", 1)[0],
+        "uv_set_names": ["map1"],
+        "current_uv_set": "map1",
+        "vertex_counts": [4] * face_count,
+        "vertex_ids": vertex_ids,
+        "face_uv_counts": [4] * face_count,
+        "face_uv_ids": face_uv_ids,
+        "us": us,
+        "vs": vs,
+        "edge_vertices": _edges_from_faces([4] * face_count, vertex_ids),
+        "face_normals": [0.0, 0.0, 1.0] * face_count,
+        "crease_edges": [],
+        "crease_values": [],
+    }
+    data["edge_smooth"] = [True] * (len(data["edge_vertices"]) // 2)
+    mesh = RecordedMesh(data)
+
+    row_of = columns + 1
+    data["edge_smooth"] = [
+        not (a // row_of == b // row_of and (a // row_of) % 4 == 0) for a, b in mesh.edge_vertices
+    ]
+    data["uv_border_edges"] = [
+        edge_id
+        for edge_id, edge_faces in enumerate(mesh.edge_faces)
+        if len(edge_faces) == 2
+        and shell_of_column[faces[edge_faces[0]][0]] != shell_of_column[faces[edge_faces[1]][0]]
+    ]
+    return {"version": RECORDING_VERSION, "api_version": DEFAULT_API_VERSION, "meshes": [data]}
+
+
+class RecordedMesh(object):
+    """Mesh arrays plus the adjacency the iterators need, derived once on load."""
+
+    def __init__(self, data: dict[str, Any]):
+        self.name = data["name"]
+        self.transform = data.get("transform")
+        self.uv_set_names = list(data["uv_set_names"])
+        self.current_uv_set = data["current_uv_set"]
+        self.vertex_counts = data["vertex_counts"]
+        self.vertex_ids = data["vertex_ids"]
+        self.face_uv_counts = data["face_uv_counts"]
+        self.face_uv_ids = data["face_uv_ids"]
+        self.us = data["us"]
+        self.vs = data["vs"]
+        flat_edges = data["edge_vertices"]
+        self.edge_vertices = [(flat_edges[index], flat_edges[index + 1]) for index in range(0, len(flat_edges), 2)]
+        self.edge_smooth = data["edge_smooth"]
+        flat_normals = data["face_normals"]
+        self.face_normals = [tuple(flat_normals[index:index + 3]) for index in range(0, len(flat_normals), 3)]
+        self.crease_edges = data.get("crease_edges") or []
+        self.crease_values = data.get("crease_values") or []
+        self.uv_border_edges = data.get("uv_border_edges")
+        self._derive_adjacency()
+
+    def _derive_adjacency(self) -> None:
+        edge_index = {(min(a, b), max(a, b)): edge_id for edge_id, (a, b) in enumerate(self.edge_vertices)}
+        self.edge_faces: list[list[int]] = [[] for _ in self.edge_vertices]
+        self.face_vertex_uvs: list[dict[int, int]] = []
+        self.face_uv_starts: list[int] = []
+        start = 0
+        uv_start = 0
+        for face_id, count in enumerate(self.vertex_counts):
+            ring = self.vertex_ids[start:start + count]
+            uv_count = self.face_uv_counts[face_id]
+            uv_ids = self.face_uv_ids[uv_start:uv_start + uv_count]
+            self.face_vertex_uvs.append(dict(zip(ring, uv_ids)) if uv_count == count else {})
+            self.face_uv_starts.append(uv_start)
+            for corner in range(count):
+                a, b = ring[corner], ring[(corner + 1) % count]
+                edge_id = edge_index.get((min(a, b), max(a, b)))
+                if edge_id is not None and face_id not in self.edge_faces[edge_id]:
+                    self.edge_faces[edge_id].append(face_id)
+            start += count
+            uv_start += uv_count
+
+    def face_uvs(self, face_id: int) -> tuple[list[float], list[float]]:
+        uv_start = self.face_uv_starts[face_id]
+        uv_ids = self.face_uv_ids[uv_start:uv_start + self.face_uv_counts[face_id]]
+        return [self.us[uv_id] for uv_id in uv_ids], [self.vs[uv_id] for uv_id in uv_ids]
+
+
+##############################################################################
+# maya.api.OpenMaya
+##############################################################################
+class MObject(object):
+
+    def __init__(self, mesh: RecordedMesh | None = None):
+        self.mesh = mesh
+
+
+class MVector(object):
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def length(self) -> float:
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def angle(self, other: "MVector") -> float:
+        lengths = self.length() * other.length()
+        if lengths == 0.0:
+            return 0.0
+        dot = self.x * other.x + self.y * other.y + self.z * other.z
+        return math.acos(max(-1.0, min(1.0, dot / lengths)))
+
+
+class MPoint(MVector):
+    pass
+
+
+class MDagPath(object):
+
+    def __init__(self, mesh: RecordedMesh | None = None):
+        self.mesh = mesh
+
+    def fullPathName(self) -> str:
+        return self.mesh.name if self.mesh is not None else ""
+
+
+class MSelectionList(object):
+
+    def __init__(self):
+        self._names: list[str] = []
+
+    def add(self, name: str) -> None:
+        self._names.append(name)
+
+    def getDagPath(self, index: int) -> MDagPath:
+        return MDagPath(_find_mesh(self._names[index]))
+
+    def getDependNode(self, index: int) -> MObject:
+        return MObject(_find_mesh(self._names[index]))
+
+
+class MFnMesh(object):
+
+    def __init__(self, source: MDagPath | MObject):
+        if source.mesh is None:
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+        self._mesh = source.mesh
+
+    @property
+    def numPolygons(self) -> int:
+        return len(self._mesh.vertex_counts)
+
+    @property
+    def numEdges(self) -> int:
+        return len(self._mesh.edge_vertices)
+
+    def object(self) -> MObject:
+        return MObject(self._mesh)
+
+    def fullPathName(self) -> str:
+        return self._mesh.name
+
+    def currentUVSetName(self) -> str:
+        return self._mesh.current_uv_set
+
+    def getUVSetNames(self) -> list[str]:
+        return list(self._mesh.uv_set_names)
+
+    def _check_uv_set(self, uv_set_name: str) -> None:
+        if uv_set_name != self._mesh.current_uv_set:
+            raise RuntimeError("(kInvalidParameter): only the recorded UV set {} is available".format(
+                self._mesh.current_uv_set))
+
+    def getCreaseEdges(self) -> tuple[list[int], list[float]]:
+        if not self._mesh.crease_edges:
+            raise RuntimeError("(kFailure): no crease edges")
+        return list(self._mesh.crease_edges), list(self._mesh.crease_values)
+
+    def getUVBorderEdges(self, uv_set_id: int) -> list[int]:
+        del uv_set_id
+        if self._mesh.uv_border_edges is None:
+            raise RuntimeError("(kFailure): UV border edges were not recorded")
+        return list(self._mesh.uv_border_edges)
+
+    def getAssignedUVs(self, uv_set_name: str = "") -> tuple[list[int], list[int]]:
+        self._check_uv_set(uv_set_name or self._mesh.current_uv_set)
+        return list(self._mesh.face_uv_counts), list(self._mesh.face_uv_ids)
+
+    def getUVs(self, uv_set_name: str = "") -> tuple[list[float], list[float]]:
+        self._check_uv_set(uv_set_name or self._mesh.current_uv_set)
+        return list(self._mesh.us), list(self._mesh.vs)
+
+
+class _MeshIterator(object):
+
+    def __init__(self, mesh_object: MObject, count: int):
+        self._mesh = mesh_object.mesh
+        self._count = count
+        self._index = 0
+
+    def isDone(self) -> bool:
+        return self._index >= self._count
+
+    def next(self) -> None:
+        self._index += 1
+
+    def index(self) -> int:
+        return self._index
+
+    def setIndex(self, index: int) -> None:
+        if not 0 <= index < self._count:
+            raise IndexError("index out of range")
+        self._index = index
+
+
+class MItMeshVertex(_MeshIterator):
+
+    def __init__(self, mesh_object: MObject):
+        super(MItMeshVertex, self).__init__(mesh_object, max(mesh_object.mesh.vertex_ids, default=-1) + 1)
+
+    def getUV(self, face_id: int, uv_set: str = "") -> tuple[float, float]:
+        del uv_set
+        uv_id = self._mesh.face_vertex_uvs[face_id].get(self._index)
+        if uv_id is None:
+            raise RuntimeError("(kFailure): vertex {} has no UV in face {}".format(self._index, face_id))
+        return self._mesh.us[uv_id], self._mesh.vs[uv_id]
+
+
+class MItMeshEdge(_MeshIterator):
+
+    def __init__(self, mesh_object: MObject):
+        super(MItMeshEdge, self).__init__(mesh_object, len(mesh_object.mesh.edge_vertices))
+
+    @property
+    def isSmooth(self) -> bool:
+        return bool(self._mesh.edge_smooth[self._index])
+
+    def vertexId(self, which: int) -> int:
+        return self._mesh.edge_vertices[self._index][which]
+
+    def getConnectedFaces(self) -> list[int]:
+        return list(self._mesh.edge_faces[self._index])
+
+    def numConnectedFaces(self) -> int:
+        return len(self._mesh.edge_faces[self._index])
+
+    def onBoundary(self) -> bool:
+        return len(self._mesh.edge_faces[self._index]) == 1
+
+
+class MItMeshPolygon(_MeshIterator):
+
+    def __init__(self, mesh_object: MObject):
+        super(MItMeshPolygon, self).__init__(mesh_object, len(mesh_object.mesh.vertex_counts))
+
+    def getNormal(self) -> MVector:
+        return MVector(*self._mesh.face_normals[self._index])
+
+    def getUVs(self, uv_set: str = "") -> tuple[list[float], list[float]]:
+        del uv_set
+        return self._mesh.face_uvs(self._index)
+
+
+class MMessage(object):
+
+    @staticmethod
+    def removeCallback(callback_id: int) -> None:
+        del callback_id
+
+
+class MNodeMessage(MMessage):
+    _next_callback_id = 0
+
+    @classmethod
+    def addNodeDirtyPlugCallback(cls, node: MObject, callback: Any) -> int:
+        del node, callback
+        cls._next_callback_id += 1
+        return cls._next_callback_id
+
+
+##############################################################################
+# maya.cmds
+##############################################################################
+def _find_mesh(name: str) -> RecordedMesh:
+    mesh = _MESHES.get(name)
+    if mesh is None:
+        shape = _TRANSFORMS.get(name)
+        mesh = _MESHES.get(shape) if shape else None
+    if mesh is None:
+        matches = [mesh for full_name, mesh in _MESHES.items() if full_name.endswith("|" + name.lstrip("|"))]
+        if len(matches) != 1:
+            raise RuntimeError("(kInvalidParameter): Object does not exist: {}".format(name))
+        mesh = matches[0]
+    return mesh
+
+
+def _about(**kwargs: Any) -> Any:
+    if kwargs.get("apiVersion"):
+        return _API_VERSION
+    return None
+
+
+def _node_type(name: str, **_kwargs: Any) -> str:
+    return "transform" if name in _TRANSFORMS else "mesh"
+
+
+def _list_relatives(name: str, **_kwargs: Any) -> list[str]:
+    return [_TRANSFORMS[name]] if name in _TRANSFORMS else []
+
+
+def _ls(*names: str, **_kwargs: Any) -> list[str]:
+    if not names:
+        return list(_MESHES)
+    return [name for name in names if name in _MESHES or name in _TRANSFORMS]
+
+
+def _warning(message: str) -> None:
+    print("Warning: {}".format(message))
+
+
+def _get_attr(attribute: str, **_kwargs: Any) -> Any:
+    if attribute.endswith(".intermediateObject"):
+        return False
+    raise RuntimeError("offline_maya does not record {}".format(attribute))
+
+
+def install(recording: dict[str, Any]) -> list[str]:
+    """Register the stand-in modules under ``maya`` and return the recorded mesh names.
+
+    Modules already imported from a real Maya are replaced, so call this
+    before importing uv_snapshot_edge_drawer.
+    """
+    global _API_VERSION
+    _API_VERSION = int(recording.get("api_version", DEFAULT_API_VERSION))
+    _MESHES.clear()
+    _TRANSFORMS.clear()
+    for data in recording["meshes"]:
+        mesh = RecordedMesh(data)
+        _MESHES[mesh.name] = mesh
+        if mesh.transform:
+            _TRANSFORMS[mesh.transform] = mesh.name
+
+    maya = types.ModuleType("maya")
+    maya.__path__ = []  # type: ignore[attr-defined]
+    api = types.ModuleType("maya.api")
+    api.__path__ = []  # type: ignore[attr-defined]
+    open_maya = types.ModuleType("maya.api.OpenMaya")
+    for api_type in (
+        MObject,
+        MVector,
+        MPoint,
+        MDagPath,
+        MSelectionList,
+        MFnMesh,
+        MItMeshVertex,
+        MItMeshEdge,
+        MItMeshPolygon,
+        MMessage,
+        MNodeMessage,
+    ):
+        setattr(open_maya, api_type.__name__, api_type)
+
+    cmds = types.ModuleType("maya.cmds")
+    cmds.about = _about  # type: ignore[attr-defined]
+    cmds.nodeType = _node_type  # type: ignore[attr-defined]
+    cmds.listRelatives = _list_relatives  # type: ignore[attr-defined]
+    cmds.ls = _ls  # type: ignore[attr-defined]
+    cmds.warning = _warning  # type: ignore[attr-defined]
+    cmds.getAttr = _get_attr  # type: ignore[attr-defined]
+    mel = types.ModuleType("maya.mel")
+
+    maya.cmds = cmds  # type: ignore[attr-defined]
+    maya.mel = mel  # type: ignore[attr-defined]
+    maya.api = api  # type: ignore[attr-defined]
+    api.OpenMaya = open_maya  # type: ignore[attr-defined]
+    sys.modules.update({
+        "maya": maya,
+        "maya.api": api,
+        "maya.api.OpenMaya": open_maya,
+        "maya.cmds": cmds,
+        "maya.mel": mel,
+    })
+    return list(_MESHES)
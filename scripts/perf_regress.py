@@ -0,0 +1,287 @@
+"""Catch performance regressions against a stored baseline.
+
+Runs the native synthetic benchmark (``cargo bench --bench synthetic``) and
+the Python payload pipeline benchmark (``bench_pipeline.py``), flattens their
+phase timings and heap peaks into metrics and writes them to
+``<results-dir>/<commit>.json``. The results are then compared with the
+baseline; the script exits with 1 when a metric regressed.
+
+A metric regresses when it exceeds the baseline by more than ``--tolerance``
+plus ``--noise-factor`` times the larger run-to-run spread (median minus
+fastest iteration) of the two runs. Metrics below ``--min-seconds`` or
+``--min-bytes`` in both runs are too small to compare and are skipped.
+Baselines depend on the machine, so keep one per machine:
+
+    python scripts/perf_regress.py --update-baseline       # on the release commit
+    python scripts/perf_regress.py                         # later; exit 1 on regression
+    python scripts/perf_regress.py --compare build/perf/1a2b3c4d5e6f.json
+
+Everything runs offline; pass ``--cargo-offline`` when the crate
+dependencies are already in the local cargo cache and the network is off.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CRATE_MANIFEST = REPO_ROOT / "rust" / "edge_drawer" / "Cargo.toml"
+BENCH_PIPELINE = Path(__file__).resolve().parent / "bench_pipeline.py"
+DEFAULT_RESULTS_DIR = REPO_ROOT / "build" / "perf"
+RESULTS_VERSION = 1
+DEFAULT_ITERATIONS = 5
+DEFAULT_TOLERANCE = 0.10
+DEFAULT_NOISE_FACTOR = 3.0
+DEFAULT_MIN_SECONDS = 0.002
+DEFAULT_MIN_BYTES = 256 * 1024
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the benchmarks and compare them with a stored baseline.")
+    parser.add_argument("--results-dir", type=Path, default=DEFAULT_RESULTS_DIR, help="Where results are written.")
+    parser.add_argument(
+        "--baseline", type=Path, default=None, help="Baseline results. Defaults to RESULTS_DIR/baseline.json."
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="Compare an existing results file instead of running benchmarks."
+    )
+    parser.add_argument("--no-native", action="store_true", help="Skip the native synthetic benchmark.")
+    parser.add_argument("--no-python", action="store_true", help="Skip the Python pipeline benchmark.")
+    parser.add_argument("--quick", action="store_true", help="Use the reduced native case sizes.")
+    parser.add_argument("--native-filter", default=None, help="Only run native cases whose name contains this.")
+    parser.add_argument("--resolutions", default=None, help="Native output sizes, e.g. 1024,2048.")
+    parser.add_argument("--recording", action="append", default=[], type=Path, help="capture_mesh.py recording.")
+    parser.add_argument("--grid", action="append", default=[], help="Generated COLUMNSxROWS[:SHELLS] grid mesh.")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed runs per benchmark.")
+    parser.add_argument("--cargo-offline", action="store_true", help="Pass --offline to cargo.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown.")
+    parser.add_argument(
+        "--noise-factor", type=float, default=DEFAULT_NOISE_FACTOR, help="Multiples of run spread to allow on top."
+    )
+    parser.add_argument("--min-seconds", type=float, default=DEFAULT_MIN_SECONDS, help="Ignore faster phases.")
+    parser.add_argument("--min-bytes", type=int, default=DEFAULT_MIN_BYTES, help="Ignore smaller heap peaks.")
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    """Short HEAD hash, suffixed with -dirty when tracked files have changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if status else "")
+
+
+def json_lines(output: str) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+
+def run_native(args: argparse.Namespace) -> list[dict[str, Any]]:
+    if shutil.which("cargo") is None:
+        raise RuntimeError("cargo is not on PATH; pass --no-native to skip the native benchmark")
+    command = ["cargo", "bench", "--manifest-path", str(CRATE_MANIFEST), "--bench", "synthetic"]
+    if args.cargo_offline:
+        command.append("--offline")
+    command += ["--", "--iterations", str(max(1, args.iterations))]
+    if args.quick:
+        command.append("--quick")
+    if args.resolutions:
+        command += ["--resolutions", args.resolutions]
+    if args.native_filter:
+        command.append(args.native_filter)
+    print("perf_regress: {}".format(" ".join(command)), file=sys.stderr)
+    completed = subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError("native benchmark failed with exit code {}".format(completed.returncode))
+    return json_lines(completed.stdout)
+
+
+def run_python(args: argparse.Namespace) -> list[dict[str, Any]]:
+    command = [sys.executable, str(BENCH_PIPELINE), "--iterations", str(max(1, args.iterations))]
+    command += [str(path) for path in args.recording]
+    for spec in args.grid:
+        command += ["--grid", spec]
+    print("perf_regress: {}".format(" ".join(command)), file=sys.stderr)
+    completed = subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError("Python pipeline benchmark failed with exit code {}".format(completed.returncode))
+    return json_lines(completed.stdout)
+
+
+def add_timings(metrics: dict[str, Any], prefix: str, record: dict[str, Any]) -> None:
+    fastest = record.get("phases_min", {})
+    for phase, seconds in record.get("phases", {}).items():
+        metrics["{}/{}".format(prefix, phase)] = {
+            "unit": "s",
+            "value": seconds,
+            "noise": max(0.0, seconds - fastest.get(phase, seconds)),
+        }
+
+
+def add_peaks(metrics: dict[str, Any], prefix: str, record: dict[str, Any]) -> None:
+    for phase, peak_bytes in record.get("peak_bytes", {}).items():
+        metrics["{}/peak/{}".format(prefix, phase)] = {"unit": "bytes", "value": peak_bytes, "noise": 0}
+
+
+def collect_metrics(native: list[dict[str, Any]], python: list[dict[str, Any]]) -> dict[str, Any]:
+    """Flatten benchmark records into metrics keyed by benchmark, case and phase."""
+    metrics: dict[str, Any] = {}
+    for record in native:
+        prefix = "native/{}@{}".format(record["case"], record["resolution"])
+        add_timings(metrics, prefix, record)
+        add_peaks(metrics, prefix, record)
+    for record in python:
+        prefix = "python/{}".format("+".join(record.get("inputs", [])))
+        add_timings(metrics, prefix, record)
+        add_peaks(metrics, prefix, record)
+    return metrics
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict[str, Any]:
+    native = [] if args.no_native else run_native(args)
+    python = [] if args.no_python else run_python(args)
+    return {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {
+            "system": platform.system(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "iterations": max(1, args.iterations),
+        "metrics": collect_metrics(native, python),
+        "records": {"native": native, "python": python},
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], args: argparse.Namespace) -> list[dict[str, Any]]:
+    """One row per metric present in either run, with a status of ok, regressed, improved, new, missing or small."""
+    rows = []
+    baseline_metrics = baseline.get("metrics", {})
+    current_metrics = current.get("metrics", {})
+    for key in sorted(set(baseline_metrics) | set(current_metrics)):
+        old = baseline_metrics.get(key)
+        new = current_metrics.get(key)
+        row = {"metric": key, "baseline": old and old["value"], "current": new and new["value"]}
+        if old is None or new is None:
+            row["status"] = "new" if old is None else "missing"
+            rows.append(row)
+            continue
+
+        floor = args.min_seconds if new["unit"] == "s" else args.min_bytes
+        if max(old["value"], new["value"]) < floor:
+            row["status"] = "small"
+            rows.append(row)
+            continue
+
+        noise = args.noise_factor * max(old.get("noise", 0), new.get("noise", 0))
+        allowed = old["value"] * (1.0 + args.tolerance) + noise
+        row["allowed"] = allowed
+        if new["value"] > allowed:
+            row["status"] = "regressed"
+        elif new["value"] < old["value"] * (1.0 - args.tolerance) - noise:
+            row["status"] = "improved"
+        else:
+            row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def format_value(value: Any, unit: str) -> str:
+    if value is None:
+        return "-"
+    if unit == "s":
+        return "{:.4f}s".format(value)
+    return "{:.1f}MiB".format(value / (1024.0 * 1024.0))
+
+
+def print_report(rows: list[dict[str, Any]], baseline: dict[str, Any], current: dict[str, Any]) -> None:
+    print("perf_regress: {} against baseline {}".format(current.get("commit"), baseline.get("commit")))
+    if baseline.get("machine") != current.get("machine"):
+        print("perf_regress: warning: baseline was recorded on a different machine")
+    metrics = {**baseline.get("metrics", {}), **current.get("metrics", {})}
+    for row in rows:
+        if row["status"] == "small":
+            continue
+        unit = metrics[row["metric"]]["unit"]
+        change = ""
+        if row["baseline"] and row["current"] is not None:
+            change = "{:+.1f}%".format((row["current"] / row["baseline"] - 1.0) * 100.0)
+        print(
+            "{:<10} {:<64} {:>12} {:>12} {:>8}".format(
+                row["status"],
+                row["metric"],
+                format_value(row["baseline"], unit),
+                format_value(row["current"], unit),
+                change,
+            )
+        )
+    counts: dict[str, int] = {}
+    for row in rows:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+    print("perf_regress: " + ", ".join("{} {}".format(count, status) for status, count in sorted(counts.items())))
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    with path.open(encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+def write_results(results: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=1, sort_keys=True)
+    print("perf_regress: wrote {}".format(path))
+
+
+def main() -> int:
+    args = parse_args()
+    baseline_path = args.baseline or args.results_dir / "baseline.json"
+    if args.compare is not None:
+        current = load_results(args.compare)
+    else:
+        try:
+            current = run_benchmarks(args)
+        except RuntimeError as exc:
+            print("perf_regress: {}".format(exc), file=sys.stderr)
+            return 2
+        write_results(current, args.results_dir / "{}.json".format(current["commit"]))
+
+    if args.update_baseline:
+        write_results(current, baseline_path)
+        return 0
+    if not baseline_path.exists():
+        print("perf_regress: no baseline at {}; rerun with --update-baseline to store one".format(baseline_path))
+        return 0
+
+    baseline = load_results(baseline_path)
+    rows = compare(baseline, current, args)
+    print_report(rows, baseline, current)
+    return 1 if any(row["status"] == "regressed" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Geometry LOD checks on offline grids replayed through ``scripts/offline_maya.py``.
+
+    python -m unittest discover -s tests
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+sys.path.insert(0, str(REPO_ROOT / "python"))
+
+import offline_maya  # noqa: E402
+
+COLUMNS = 64
+ROWS = 64
+# A one face wide notch from the bottom edge up to row 48. At 16 cells per
+# UV the level cell spanning grid columns 29..32 holds the notch plus an
+# interior vertex column on either side of it.
+NOTCH_COLUMN = 30
+NOTCH_ROWS = 48
+CELLS_PER_UV = 16
+EPSILON = 1e-9
+# Four shells, well over LOD_MIN_POLYGONS, drawn at a preview density of 32
+# pixels per UV, which selects the 64 cells per UV level.
+LARGE_COLUMNS = 240
+LARGE_ROWS = 240
+LARGE_SHELLS = 4
+PREVIEW_PIXELS_PER_UV = 32
+
+
+def _outline_edges(polygon_offsets, polygon_points):
+    counts = {}
+    for polygon_index in range(len(polygon_offsets) - 1):
+        start = polygon_offsets[polygon_index]
+        end = polygon_offsets[polygon_index + 1]
+        previous = (polygon_points[end * 2 - 2], polygon_points[end * 2 - 1])
+        for point_index in range(start * 2, end * 2, 2):
+            point = (polygon_points[point_index], polygon_points[point_index + 1])
+            key = (previous, point) if previous <= point else (point, previous)
+            counts[key] = counts.get(key, 0) + 1
+            previous = point
+    return {edge for edge, count in counts.items() if count == 1}
+
+
+def _polygon_segments(polygon_offsets, polygon_points):
+    for polygon_index in range(len(polygon_offsets) - 1):
+        start = polygon_offsets[polygon_index]
+        end = polygon_offsets[polygon_index + 1]
+        previous = (polygon_points[end * 2 - 2], polygon_points[end * 2 - 1])
+        for point_index in range(start * 2, end * 2, 2):
+            point = (polygon_points[point_index], polygon_points[point_index + 1])
+            yield previous, point
+            previous = point
+
+
+class NotchedGridLodTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        removed = {(NOTCH_COLUMN, row) for row in range(NOTCH_ROWS)}
+        cls.kept_faces = {
+            (column, row) for row in range(ROWS) for column in range(COLUMNS) if (column, row) not in removed
+        }
+        names = offline_maya.install(offline_maya.grid_recording(COLUMNS, ROWS, removed_faces=removed))
+        import uv_snapshot_edge_drawer as drawer
+
+        cls.snapshot = drawer.get_mesh_topology_snapshot(names[0])
+        cls.level = cls.snapshot._build_lod_level(CELLS_PER_UV)
+
+    def _inside_grid(self, point):
+        # grid_recording places a single shell at u = column / (columns + 0.5).
+        x = point[0] * (COLUMNS + 0.5)
+        y = point[1] * ROWS
+        for column in {math.floor(x - EPSILON), math.floor(x + EPSILON)}:
+            for row in {math.floor(y - EPSILON), math.floor(y + EPSILON)}:
+                if (column, row) in self.kept_faces:
+                    return True
+        return False
+
+    def _assert_segments_inside(self, segments):
+        for start, end in segments:
+            for step in range(1, 8):
+                t = step / 8.0
+                point = (start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+                self.assertTrue(self._inside_grid(point), "{} -> {} leaves the outline".format(start, end))
+
+    def test_level_is_simplified(self):
+        self.assertLess(len(self.level.polygon_offsets), len(self.snapshot.polygon_offsets))
+
+    def test_outline_is_preserved(self):
+        self.assertEqual(
+            _outline_edges(self.level.polygon_offsets, self.level.polygon_points),
+            _outline_edges(self.snapshot.polygon_offsets, self.snapshot.polygon_points),
+        )
+
+    def test_polygon_edges_stay_inside_outline(self):
+        self._assert_segments_inside(_polygon_segments(self.level.polygon_offsets, self.level.polygon_points))
+
+    def test_edge_lines_stay_inside_outline(self):
+        lines = [line for lines in self.level.edge_lines.values() for line in lines]
+        lines.extend(line for candidate in self.level.fold_candidates for line in candidate.lines)
+        self.assertTrue(lines)
+        self._assert_segments_inside((tuple(line.uv1), tuple(line.uv2)) for line in lines)
+
+
+class LargeGridLodTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        names = offline_maya.install(
+            offline_maya.grid_recording(LARGE_COLUMNS, LARGE_ROWS, shells=LARGE_SHELLS, name="|large|largeShape")
+        )
+        import uv_snapshot_edge_drawer as drawer
+
+        cls.drawer = drawer
+        cls.snapshot = drawer.get_mesh_topology_snapshot(names[0])
+        cls.level = cls.snapshot.get_lod_snapshot(PREVIEW_PIXELS_PER_UV)
+
+    def test_preview_uses_a_cached_simplified_level(self):
+        self.assertEqual(self.drawer.lod_cells_per_uv(PREVIEW_PIXELS_PER_UV), 64)
+        self.assertLess(len(self.level.polygon_offsets), len(self.snapshot.polygon_offsets) // 4)
+        self.assertIs(self.snapshot.get_lod_snapshot(PREVIEW_PIXELS_PER_UV), self.level)
+
+    def test_outline_is_preserved(self):
+        self.assertEqual(
+            _outline_edges(self.level.polygon_offsets, self.level.polygon_points),
+            _outline_edges(self.snapshot.polygon_offsets, self.snapshot.polygon_points),
+        )
+
+    def test_level_keeps_edge_lines(self):
+        self.assertEqual(self.level.edge_lines["border"], self.snapshot.edge_lines["border"])
+        self.assertEqual(self.level.edge_lines["boundary"], self.snapshot.edge_lines["boundary"])
+        self.assertTrue(self.level.edge_lines["hard"])
+        self.assertTrue(self.level.edge_lines["soft"])
+        self.assertLess(len(self.level.edge_lines["soft"]), len(self.snapshot.edge_lines["soft"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+"""Profile report checks: merging a native capture and the Chrome trace layout.
+
+    python -m unittest discover -s tests
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+sys.path.insert(0, str(REPO_ROOT / "python"))
+
+import offline_maya  # noqa: E402
+
+# As written by the native finish_profile_capture (ProfileReport::to_json).
+NATIVE_REPORT_JSON = json.dumps({
+    "phases": [
+        {"name": "arrangement", "start": 0.0, "seconds": 0.25, "thread": 0},
+        {"name": "render_raster", "start": 0.25, "seconds": 0.5, "thread": 1},
+        {"name": "encode", "start": 0.5, "seconds": 0.125, "thread": 0},
+    ],
+    "counters": {"arrangement_segments": 40, "candidate_pairs": 7},
+    "peak_bytes": {"arrangement": 4096, "render_raster": 65536},
+})
+BLOCK_BYTES = 1 << 20
+
+
+def _drawer():
+    offline_maya.install(offline_maya.grid_recording(2, 2))
+    import uv_snapshot_edge_drawer as drawer
+
+    return drawer
+
+
+class ProfileReportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.drawer = _drawer()
+
+    def _report(self):
+        report = self.drawer.ProfileReport("pCube1")
+        report.add_phase("get_draw_info", 0.5)
+        report.add_counter("arrangement_segments", 2)
+        report.add_peak_bytes("arrangement", 8192)
+        report.snapshot_bytes["pCube1"] = 1024
+        start = report.add_phase("render", 1.0)
+        report.merge_native(json.loads(NATIVE_REPORT_JSON), start)
+        return report
+
+    def test_merge_native_offsets_phases_and_sums_counters(self):
+        report = self._report()
+        native = [phase for phase in report.phases if phase["thread"].startswith("native-")]
+        self.assertEqual(
+            [(phase["name"], phase["start"], phase["thread"]) for phase in native],
+            [
+                ("arrangement", 0.5, "native-0"),
+                ("render_raster", 0.75, "native-1"),
+                ("encode", 1.0, "native-0"),
+            ],
+        )
+        self.assertEqual(report.counters, {"arrangement_segments": 42, "candidate_pairs": 7})
+        self.assertEqual(report.peak_bytes, {"arrangement": 8192, "render_raster": 65536})
+
+    def test_chrome_trace_names_each_thread_before_its_phases(self):
+        events = self._report().to_chrome_trace()["traceEvents"]
+        metadata = [event for event in events if event["ph"] == "M"]
+        self.assertEqual(
+            [(event["name"], event["tid"], event["args"]["name"]) for event in metadata],
+            [
+                ("thread_name", 1, "python"),
+                ("thread_name", 2, "native-0"),
+                ("thread_name", 3, "native-1"),
+            ],
+        )
+        named = set()
+        for event in events:
+            self.assertEqual(event["pid"], 1)
+            if event["ph"] == "M":
+                named.add(event["tid"])
+            else:
+                self.assertIn(event["tid"], named)
+
+    def test_chrome_trace_phases_are_complete_events_in_microseconds(self):
+        events = [event for event in self._report().to_chrome_trace()["traceEvents"] if event["ph"] == "X"]
+        by_name = {event["name"]: event for event in events}
+        self.assertEqual(len(events), 5)
+        self.assertEqual((by_name["render"]["tid"], by_name["render"]["ts"], by_name["render"]["dur"]), (1, 5e5, 1e6))
+        self.assertEqual(
+            (by_name["render_raster"]["tid"], by_name["render_raster"]["ts"], by_name["render_raster"]["dur"]),
+            (3, 7.5e5, 5e5),
+        )
+        self.assertEqual(by_name["encode"]["tid"], by_name["arrangement"]["tid"])
+        self.assertTrue(all(event["cat"] == "pCube1" for event in events))
+
+    def test_chrome_trace_keeps_totals_in_other_data(self):
+        trace = self._report().to_chrome_trace()
+        self.assertEqual(trace["displayTimeUnit"], "ms")
+        self.assertEqual(
+            trace["otherData"],
+            {
+                "label": "pCube1",
+                "counters": {"arrangement_segments": 42, "candidate_pairs": 7},
+                "peak_bytes": {"arrangement": 8192, "render_raster": 65536},
+                "snapshot_bytes": {"pCube1": 1024},
+                "memory_unavailable": None,
+            },
+        )
+        json.dumps(trace)
+
+
+class PhaseMemoryTrackerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.drawer = _drawer()
+
+    def _measure(self, memory, name, size):
+        baseline = memory.start_phase()
+        block = bytearray(size)
+        del block
+        memory.finish_phase(name, baseline)
+
+    def test_phases_keep_their_largest_peak(self):
+        tracemalloc = self.drawer.tracemalloc
+        was_tracing = tracemalloc.is_tracing()
+        memory = self.drawer.PhaseMemoryTracker(enabled=True)
+        self.assertTrue(memory.enabled)
+        self.assertIsNone(memory.unavailable)
+        self._measure(memory, "build", BLOCK_BYTES)
+        self._measure(memory, "build", 1024)
+        self._measure(memory, "draw", 2 * BLOCK_BYTES)
+        peaks = memory.stop()
+        self.assertGreaterEqual(peaks["build"], BLOCK_BYTES)
+        self.assertLess(peaks["build"], 2 * BLOCK_BYTES)
+        self.assertGreaterEqual(peaks["draw"], 2 * BLOCK_BYTES)
+        self.assertEqual(tracemalloc.is_tracing(), was_tracing)
+
+    def test_disabled_tracker_measures_nothing(self):
+        memory = self.drawer.PhaseMemoryTracker(enabled=False)
+        self.assertIsNone(memory.start_phase())
+        self._measure(memory, "build", BLOCK_BYTES)
+        self.assertEqual(memory.stop(), {})
+        self.assertIsNone(memory.unavailable)
+
+    def test_missing_reset_peak_is_reported_unavailable(self):
+        # tracemalloc as shipped before Python 3.9.
+        old_tracemalloc = types.SimpleNamespace(
+            is_tracing=lambda: False,
+            start=lambda: None,
+            stop=lambda: None,
+            get_traced_memory=lambda: (0, 0),
+        )
+        with mock.patch.object(self.drawer, "tracemalloc", old_tracemalloc):
+            memory = self.drawer.PhaseMemoryTracker(enabled=True)
+        self.assertFalse(memory.enabled)
+        self.assertIn("3.9", memory.unavailable)
+        self.assertIsNone(memory.start_phase())
+        self.assertEqual(memory.stop(), {})
+
+    def test_unavailable_marker_reaches_the_report(self):
+        from uv_snapshot_edge_drawer import ui
+
+        payload_data = types.SimpleNamespace(profile_memory_unavailable="tracemalloc is not available")
+        report = ui._payload_profile_report("pCube1", payload_data)
+        self.assertEqual(report.as_dict()["memory_unavailable"], "tracemalloc is not available")
+        self.assertEqual(report.to_chrome_trace()["otherData"]["memory_unavailable"], "tracemalloc is not available")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""UDIM tile bucketing checks on hand-built snapshots.
+
+    python -m unittest discover -s tests
+"""
+
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+sys.path.insert(0, str(REPO_ROOT / "python"))
+
+import offline_maya  # noqa: E402
+
+MARGIN = 0.25
+
+
+def _drawer():
+    offline_maya.install(offline_maya.grid_recording(2, 2))
+    import uv_snapshot_edge_drawer as drawer
+
+    return drawer
+
+
+def _square(u_min, v_min, size):
+    return [u_min, v_min, u_min + size, v_min, u_min + size, v_min + size, u_min, v_min + size]
+
+
+class UdimTilesTouchingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.drawer = _drawer()
+
+    def _tiles(self, u_values, v_values, margin=0.0):
+        return self.drawer._udim_tiles_touching(u_values, v_values, margin)
+
+    def test_bounds_ending_on_a_border_stay_in_their_tile(self):
+        self.assertEqual(self._tiles((0.5, 1.0), (0.0, 1.0)), [1001])
+        self.assertEqual(self._tiles((1.0, 2.0), (1.0, 2.0)), [1012])
+
+    def test_point_on_a_border_belongs_to_the_upper_tile(self):
+        self.assertEqual(self._tiles((1.0,), (1.0,)), [1012])
+
+    def test_margin_reaches_into_neighbours(self):
+        self.assertEqual(self._tiles((0.9,), (0.5,), MARGIN), [1001, 1002])
+        self.assertEqual(self._tiles((1.5,), (1.1,), MARGIN), [1002, 1012])
+
+    def test_negative_coordinates_are_ignored(self):
+        self.assertEqual(self._tiles((-2.0, -1.5), (0.2, 0.4)), [])
+        self.assertEqual(self._tiles((0.2, 0.4), (-0.5, -0.1)), [])
+        self.assertEqual(self._tiles((-0.5, 0.5), (-0.5, 0.5)), [1001])
+
+    def test_columns_past_the_tenth_are_ignored(self):
+        self.assertEqual(self._tiles((10.2, 10.8), (0.2, 0.4)), [])
+        self.assertEqual(self._tiles((9.5, 10.5), (0.2, 0.4)), [1010])
+        self.assertEqual(self._tiles((9.9,), (0.5,), MARGIN), [1010])
+
+    def test_rows_are_not_limited(self):
+        self.assertEqual(self._tiles((0.5,), (12.5,)), [1121])
+
+
+class UdimTileSnapshotsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.drawer = _drawer()
+        drawer = cls.drawer
+        squares = [
+            _square(0.25, 0.25, 0.5),  # inside 1001
+            _square(0.5, 0.5, 0.5),  # ends exactly on the 1001/1002 and 1001/1011 borders
+            _square(1.9, 0.2, 0.2),  # straddles 1002 and 1003
+            _square(-1.5, 0.2, 0.5),  # left of the grid
+            _square(10.2, 0.2, 0.5),  # right of the tenth column
+            _square(0.2, -0.8, 0.5),  # below the grid
+        ]
+        cls.polygon_points = [value for square in squares for value in square]
+        cls.polygon_offsets = [4 * index for index in range(len(squares) + 1)]
+        cls.border_line = drawer.EdgeLine(0, (0.5, 0.5), (1.0, 1.0))  # ends on the 1001 corner
+        cls.crossing_line = drawer.EdgeLine(1, (1.8, 0.5), (2.2, 0.5))
+        cls.outside_line = drawer.EdgeLine(2, (-0.5, 0.5), (-0.1, 0.5))
+        cls.far_line = drawer.EdgeLine(3, (11.0, 0.5), (12.0, 0.5))
+        cls.fold_line = drawer.EdgeLine(4, (2.9, 0.5), (2.95, 0.5))
+        cls.snapshot = drawer.MeshTopologySnapshot(
+            "udimMesh",
+            "map1",
+            {
+                "border": [cls.border_line, cls.outside_line],
+                "hard": [cls.crossing_line, cls.far_line],
+            },
+            [drawer.FoldCandidate(0.5, [cls.fold_line])],
+            polygon_offsets=cls.polygon_offsets,
+            polygon_points=cls.polygon_points,
+        )
+
+    def _tile_squares(self, tile_snapshot):
+        offsets = tile_snapshot.polygon_offsets
+        points = tile_snapshot.polygon_points
+        return [points[offsets[index] * 2:offsets[index + 1] * 2] for index in range(len(offsets) - 1)]
+
+    def test_only_tiles_with_geometry_inside_are_occupied(self):
+        tiles = self.snapshot.get_udim_tile_snapshots()
+        self.assertEqual(sorted(tiles), [1001, 1002, 1003])
+
+    def test_border_exact_geometry_stays_in_its_tile(self):
+        tiles = self.snapshot.get_udim_tile_snapshots()
+        self.assertEqual(
+            self._tile_squares(tiles[1001]),
+            [_square(0.25, 0.25, 0.5), _square(0.5, 0.5, 0.5)],
+        )
+        self.assertEqual(tiles[1001].edge_lines["border"], [self.border_line])
+        self.assertEqual(tiles[1002].edge_lines["border"], [])
+
+    def test_crossing_geometry_is_copied_into_every_tile(self):
+        tiles = self.snapshot.get_udim_tile_snapshots()
+        for tile in (1002, 1003):
+            self.assertEqual(self._tile_squares(tiles[tile]), [_square(1.9, 0.2, 0.2)])
+            self.assertEqual(tiles[tile].edge_lines["hard"], [self.crossing_line])
+        self.assertEqual(tiles[1003].fold_candidates[0].lines, [self.fold_line])
+        self.assertEqual(tiles[1003].fold_candidates[0].angle_radians, 0.5)
+        self.assertEqual(tiles[1001].fold_candidates, [])
+
+    def test_margin_copies_neighbours_without_occupying_tiles(self):
+        tiles = self.snapshot.get_udim_tile_snapshots(MARGIN)
+        self.assertEqual(sorted(tiles), [1001, 1002, 1003])
+        self.assertIn(_square(0.5, 0.5, 0.5), self._tile_squares(tiles[1002]))
+        self.assertNotIn(_square(1.9, 0.2, 0.2), self._tile_squares(tiles[1001]))
+        self.assertEqual(tiles[1001].edge_lines["border"], [self.border_line, self.outside_line])
+        self.assertEqual(tiles[1001].edge_lines["hard"], [])
+        self.assertEqual(tiles[1003].edge_lines["hard"], [self.crossing_line])
+
+    def test_results_are_kept_per_margin(self):
+        self.assertIs(self.snapshot.get_udim_tile_snapshots(), self.snapshot.get_udim_tile_snapshots())
+        self.assertIsNot(self.snapshot.get_udim_tile_snapshots(), self.snapshot.get_udim_tile_snapshots(MARGIN))
+
+
+if __name__ == "__main__":
+    unittest.main()